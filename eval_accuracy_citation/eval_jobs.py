@@ -0,0 +1,450 @@
+"""
+后台评测任务管理
+
+/eval/do_eval 不再在HTTP请求中顺序执行整个评测流程，而是创建一个后台任务：
+- 每个任务有唯一的 job_id，可以查询进度、取消
+- 查询和LLM评分以有限的并发度执行，同步的评分函数在工作线程中运行，不阻塞服务器事件循环
+- 每个问题的结果在完成后立即追加到 results.jsonl，任务状态保存在 job.json
+- 服务器重启或任务被取消后，可以续跑：已完成的问题不会重新评测
+- 多进程部署（Gunicorn）下，任务状态每次都从 job.json 读取，任一工作进程都能查询、取消和续跑；
+  执行任务的进程记录 owner_pid 并持有 job.lock 文件锁，其他进程据此判断任务是否仍在执行
+"""
+
+import asyncio
+import json
+import os
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows: 只有单进程部署，不需要跨进程锁
+    fcntl = None
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from rag_eval_pipeline import (
+    build_final_result,
+    compute_averages,
+    convert_numpy_types,
+    evaluate_question,
+    load_questions,
+)
+from settings import EVAL_CONCURRENCY, EVAL_JOBS_DIR
+
+JOB_FILE = "job.json"
+QUESTIONS_FILE = "questions.json"
+RESULTS_FILE = "results.jsonl"
+LOCK_FILE = "job.lock"
+CANCEL_FILE = "cancel"
+
+# 执行任务的进程检查其他进程发出的取消请求的间隔（秒）
+CANCEL_POLL_INTERVAL = 1.0
+
+# 任务状态
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+INTERRUPTED = "interrupted"
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+RESUMABLE_STATUSES = (FAILED, CANCELLED, INTERRUPTED)
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class EvalJobManager:
+    """
+    管理后台评测任务
+
+    :param rag: LightRAG实例，传给评测函数用于直接查询
+    :param jobs_dir: 任务状态和增量结果的保存目录
+    :param concurrency: 默认的并发评测问题数
+    :param evaluate: 单题评测协程函数 (question_data, rag=..., run_sync=...) -> 结果项或None
+    :param question_loader: 读取问题的函数 (line_number) -> 问题列表
+    """
+
+    def __init__(
+        self,
+        rag=None,
+        jobs_dir=EVAL_JOBS_DIR,
+        concurrency=EVAL_CONCURRENCY,
+        evaluate=evaluate_question,
+        question_loader=load_questions,
+    ):
+        self.rag = rag
+        self.jobs_dir = jobs_dir
+        self.concurrency = max(1, int(concurrency))
+        self._evaluate = evaluate
+        self._load_questions = question_loader
+        # 只记录本进程执行的任务；任务状态以 job.json 为准
+        self._tasks = {}
+        self._locks = {}
+        self._shutting_down = False
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self._recover()
+
+    # -------------------------- 状态持久化 --------------------------
+    def _job_path(self, job_id, name):
+        return os.path.join(self.jobs_dir, job_id, name)
+
+    def _save_job(self, job):
+        path = self._job_path(job["job_id"], JOB_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def _read_job(self, job_id):
+        """从 job.json 读取任务状态，任务不存在时返回 None"""
+        path = self._job_path(job_id, JOB_FILE)
+        if not os.path.isfile(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"无法加载评测任务 {job_id}: {e}")
+            return None
+
+    def _load_job(self, job_id):
+        """读取任务状态；执行进程已退出的活动任务标记为 interrupted"""
+        job = self._read_job(job_id)
+        if job is None or job.get("status") not in ACTIVE_STATUSES:
+            return job
+        if self._is_running(job_id):
+            return job
+        # 再次读取：锁可能在两次读取之间被释放（任务刚结束）
+        job = self._read_job(job_id)
+        if job is not None and job.get("status") in ACTIVE_STATUSES:
+            job["status"] = INTERRUPTED
+            job["owner_pid"] = None
+            self._save_job(job)
+        return job
+
+    def _recover(self):
+        """上次进程退出时仍在执行的任务标记为 interrupted，可续跑；其他存活进程正在执行的任务不受影响"""
+        for job_id in os.listdir(self.jobs_dir):
+            self._load_job(job_id)
+
+    # -------------------------- 跨进程任务锁 --------------------------
+    def _try_lock(self, job_id):
+        """尝试获取任务锁，成功返回文件对象，锁被其他执行者持有时返回 None"""
+        lock_file = open(self._job_path(job_id, LOCK_FILE), "a+")
+        if fcntl is None:
+            if job_id in self._locks:
+                lock_file.close()
+                return None
+            return lock_file
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    def _is_running(self, job_id):
+        """任务是否正由某个存活的进程（包括本进程）执行"""
+        if job_id in self._locks:
+            return True
+        if not os.path.isdir(os.path.join(self.jobs_dir, job_id)):
+            return False
+        lock_file = self._try_lock(job_id)
+        if lock_file is None:
+            return True
+        # 进程退出时操作系统会释放文件锁，能拿到锁说明没有进程在执行
+        lock_file.close()
+        return False
+
+    def _release_lock(self, job_id):
+        lock_file = self._locks.pop(job_id, None)
+        if lock_file is not None:
+            lock_file.close()
+
+    def _cancel_requested(self, job_id):
+        return os.path.exists(self._job_path(job_id, CANCEL_FILE))
+
+    def _clear_cancel_request(self, job_id):
+        try:
+            os.remove(self._job_path(job_id, CANCEL_FILE))
+        except FileNotFoundError:
+            pass
+
+    # -------------------------- 读取结果 --------------------------
+    def _read_results(self, job_id):
+        """读取已完成的问题结果：{问题序号: 记录}，失败的记录不计入，续跑时重试"""
+        done = {}
+        path = self._job_path(job_id, RESULTS_FILE)
+        if not os.path.exists(path):
+            return done
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 进程在写入时中断，最后一行可能不完整
+                    continue
+                if record.get("error") is None:
+                    done[record["index"]] = record
+        return done
+
+    def _append_result(self, job_id, record):
+        with open(self._job_path(job_id, RESULTS_FILE), "a", encoding="utf-8") as f:
+            f.write(
+                json.dumps(convert_numpy_types(record), ensure_ascii=False, default=str)
+                + "\n"
+            )
+
+    # -------------------------- 任务接口 --------------------------
+    def start(self, line_number=None, output_file=None, concurrency=None):
+        """创建并启动一个评测任务，立即返回任务状态"""
+        questions = [q for q in self._load_questions(line_number) if q]
+        job_id = (
+            f"eval-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        )
+        os.makedirs(os.path.join(self.jobs_dir, job_id))
+        # 先拿到任务锁再写入 job.json，其他进程不会把新任务误判为已中断
+        self._locks[job_id] = self._try_lock(job_id)
+        with open(self._job_path(job_id, QUESTIONS_FILE), "w", encoding="utf-8") as f:
+            json.dump(questions, f, ensure_ascii=False)
+        job = {
+            "job_id": job_id,
+            "status": QUEUED,
+            "owner_pid": os.getpid(),
+            "line_number": line_number,
+            "output_file": output_file,
+            "concurrency": max(1, int(concurrency or self.concurrency)),
+            "total": len(questions),
+            "completed": 0,
+            "failed": 0,
+            "created_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+            "averages": None,
+            "results_file": None,
+            "error": None,
+        }
+        self._save_job(job)
+        self._launch(job_id)
+        return self.get(job_id)
+
+    def resume(self, job_id):
+        """续跑被取消、失败或中断的任务，已完成的问题不会重新评测"""
+        if self._read_job(job_id) is None:
+            raise KeyError(job_id)
+        lock_file = None if job_id in self._locks else self._try_lock(job_id)
+        if lock_file is None:
+            raise ValueError(f"Job {job_id} is running and cannot be resumed")
+        self._locks[job_id] = lock_file
+        try:
+            # 持有锁后再读取状态，避免两个进程同时续跑同一个任务
+            job = self._load_job(job_id)
+            if job is None:
+                raise KeyError(job_id)
+            if job["status"] not in RESUMABLE_STATUSES:
+                raise ValueError(
+                    f"Job {job_id} is {job['status']} and cannot be resumed"
+                )
+            self._clear_cancel_request(job_id)
+            job.update(
+                status=QUEUED, owner_pid=os.getpid(), error=None, finished_at=None
+            )
+            self._save_job(job)
+        except Exception:
+            self._release_lock(job_id)
+            raise
+        self._launch(job_id)
+        return self.get(job_id)
+
+    async def cancel(self, job_id):
+        """取消正在执行的任务，已完成的结果会保留
+
+        任务在其他工作进程中执行时，写入取消请求，由执行进程在下次检查时取消
+        """
+        if self._read_job(job_id) is None:
+            raise KeyError(job_id)
+        task = self._tasks.get(job_id)
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            return self.get(job_id)
+        if self._is_running(job_id):
+            with open(self._job_path(job_id, CANCEL_FILE), "w", encoding="utf-8") as f:
+                f.write(_now())
+            job = self.get(job_id)
+            job["cancel_requested"] = True
+            return job
+        return self.get(job_id)
+
+    def get(self, job_id):
+        job = self._load_job(job_id)
+        if job is None:
+            return None
+        job["progress"] = (
+            round(job["completed"] / job["total"], 4) if job["total"] else 1.0
+        )
+        return job
+
+    def list(self):
+        jobs = (self.get(job_id) for job_id in os.listdir(self.jobs_dir))
+        return sorted(
+            (job for job in jobs if job is not None),
+            key=lambda job: job["created_at"],
+            reverse=True,
+        )
+
+    async def wait(self, job_id):
+        """等待本进程执行的任务结束并返回任务状态"""
+        task = self._tasks.get(job_id)
+        if task is not None:
+            try:
+                await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # 任务被取消时返回其状态；等待方自身被取消时继续抛出
+                if not task.cancelled():
+                    raise
+        return self.get(job_id)
+
+    def load_final_result(self, job_id):
+        """读取已完成任务的最终评测结果"""
+        job = self._read_job(job_id)
+        if job is None or not job.get("results_file"):
+            return None
+        with open(job["results_file"], "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    async def shutdown(self):
+        """服务器关闭时停止本进程的所有任务，任务标记为 interrupted 以便下次续跑"""
+        self._shutting_down = True
+        tasks = [task for task in self._tasks.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # -------------------------- 执行 --------------------------
+    def _launch(self, job_id):
+        task = asyncio.create_task(self._run(job_id))
+        # 任务在开始执行前被取消时 _run 的 finally 不会执行，锁在这里释放
+        task.add_done_callback(lambda _: self._release_lock(job_id))
+        self._tasks[job_id] = task
+
+    async def _watch_cancel_request(self, job_id, job_task):
+        """其他工作进程请求取消时，取消本进程中执行的任务"""
+        while True:
+            await asyncio.sleep(CANCEL_POLL_INTERVAL)
+            if self._cancel_requested(job_id):
+                job_task.cancel()
+                return
+
+    async def _run(self, job_id):
+        job = self._read_job(job_id)
+        with open(self._job_path(job_id, QUESTIONS_FILE), "r", encoding="utf-8") as f:
+            questions = json.load(f)
+        done = self._read_results(job_id)
+        pending = [i for i in range(len(questions)) if i not in done]
+
+        job.update(
+            status=RUNNING,
+            owner_pid=os.getpid(),
+            started_at=job.get("started_at") or _now(),
+            completed=len(done),
+            failed=0,
+        )
+        self._save_job(job)
+        print(
+            f"=== 评测任务 {job_id} 开始: 共 {job['total']} 个问题，"
+            f"待评测 {len(pending)} 个，并发 {job['concurrency']} ==="
+        )
+
+        # 评分是同步的LLM调用，使用任务自己的线程池，线程数等于并发度
+        executor = ThreadPoolExecutor(
+            max_workers=job["concurrency"], thread_name_prefix=f"eval-{job_id[-6:]}"
+        )
+        loop = asyncio.get_running_loop()
+        cancel_watcher = asyncio.create_task(
+            self._watch_cancel_request(job_id, asyncio.current_task())
+        )
+
+        async def run_sync(func):
+            return await loop.run_in_executor(executor, func)
+
+        queue = asyncio.Queue()
+        for index in pending:
+            queue.put_nowait(index)
+
+        async def worker():
+            while True:
+                try:
+                    index = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                record = {"index": index, "result": None, "error": None}
+                try:
+                    record["result"] = await self._evaluate(
+                        questions[index], rag=self.rag, run_sync=run_sync
+                    )
+                    job["completed"] += 1
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"评测任务 {job_id} 第{index + 1}个问题失败: {e}")
+                    record["error"] = str(e)
+                    job["failed"] += 1
+                self._append_result(job_id, record)
+                self._save_job(job)
+
+        try:
+            await asyncio.gather(
+                *(worker() for _ in range(min(job["concurrency"], len(pending)) or 1))
+            )
+
+            done = self._read_results(job_id)
+            detailed_results = [
+                done[i]["result"]
+                for i in sorted(done)
+                if done[i].get("result") is not None
+            ]
+            final_result = await loop.run_in_executor(
+                executor, build_final_result, detailed_results, job["output_file"]
+            )
+            job.update(
+                status=FAILED if job["failed"] else COMPLETED,
+                averages=compute_averages(detailed_results),
+                results_file=final_result["results_file"],
+                error=(
+                    f"{job['failed']} questions failed, resume the job to retry them"
+                    if job["failed"]
+                    else None
+                ),
+            )
+        except asyncio.CancelledError:
+            job["status"] = INTERRUPTED if self._shutting_down else CANCELLED
+            raise
+        except Exception as e:
+            job.update(status=FAILED, error=str(e))
+            print(f"评测任务 {job_id} 出错: {e}")
+        finally:
+            cancel_watcher.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._clear_cancel_request(job_id)
+            job["finished_at"] = _now()
+            job["owner_pid"] = None
+            self._save_job(job)
+            self._release_lock(job_id)
+            print(f"=== 评测任务 {job_id} 结束: {job['status']} ===")
+
+
+__all__ = ["EvalJobManager"]
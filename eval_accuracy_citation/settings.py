@@ -104,3 +104,10 @@ EVAL_LLM_MODEL = os.getenv("EVAL_LLM_MODEL")  # 评测LLM模型（优先级高
 OUTPUT_DIR = os.path.join(project_root, "eval_accuracy_citation")
 
 
+
+# 后台评测任务配置（来源：eval_jobs.py）
+# 作用：/eval/do_eval 在后台任务中执行评测，以下配置控制并发度和任务状态的保存位置
+# EVAL_MAX_CONCURRENT: 同时评测的问题数量（查询和LLM评分都受此限制，与RAGAS评测共用）
+# EVAL_JOBS_DIR: 每个任务的状态(job.json)和增量结果(results.jsonl)保存目录，用于进度查询和中断后续跑
+EVAL_CONCURRENCY = int(os.getenv("EVAL_MAX_CONCURRENT", "2"))
+EVAL_JOBS_DIR = os.getenv("EVAL_JOBS_DIR", os.path.join(OUTPUT_DIR, "eval_jobs"))
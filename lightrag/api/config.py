@@ -37,6 +37,9 @@ from lightrag.constants import (
     DEFAULT_SUMMARY_LANGUAGE,
     DEFAULT_EMBEDDING_FUNC_MAX_ASYNC,
     DEFAULT_EMBEDDING_BATCH_NUM,
+    DEFAULT_EMBEDDING_BATCH_WAIT_MS,
+    DEFAULT_ENABLE_COMPRESSION,
+    DEFAULT_COMPRESSION_MIN_SIZE,
     DEFAULT_OLLAMA_MODEL_NAME,
     DEFAULT_OLLAMA_MODEL_TAG,
     DEFAULT_RERANK_BINDING,
@@ -247,6 +250,7 @@ def parse_args() -> argparse.Namespace:
             "aws_bedrock",
             "jina",
             "gemini",
+            "local",
         ],
         help="Embedding binding type (default: from env or ollama)",
     )
@@ -254,7 +258,7 @@ def parse_args() -> argparse.Namespace:
         "--rerank-binding",
         type=str,
         default=get_env_value("RERANK_BINDING", DEFAULT_RERANK_BINDING),
-        choices=["null", "cohere", "jina", "aliyun"],
+        choices=["null", "cohere", "jina", "aliyun", "local"],
         help=f"Rerank binding type (default: from env or {DEFAULT_RERANK_BINDING})",
     )
 
@@ -392,12 +396,19 @@ def parse_args() -> argparse.Namespace:
 
     # Add environment variables that were previously read directly
     args.cors_origins = get_env_value("CORS_ORIGINS", "*")
+    args.enable_compression = get_env_value(
+        "ENABLE_COMPRESSION", DEFAULT_ENABLE_COMPRESSION, bool
+    )
+    args.compression_min_size = get_env_value(
+        "COMPRESSION_MIN_SIZE", DEFAULT_COMPRESSION_MIN_SIZE, int
+    )
     args.summary_language = get_env_value("SUMMARY_LANGUAGE", DEFAULT_SUMMARY_LANGUAGE)
     args.entity_types = get_env_value("ENTITY_TYPES", DEFAULT_ENTITY_TYPES, list)
     args.whitelist_paths = get_env_value("WHITELIST_PATHS", "/health,/api/*")
 
     # For JWT Auth
     args.auth_accounts = get_env_value("AUTH_ACCOUNTS", "")
+    args.admin_accounts = get_env_value("ADMIN_ACCOUNTS", "")
     args.token_secret = get_env_value("TOKEN_SECRET", "lightrag-jwt-default-secret")
     args.token_expire_hours = get_env_value("TOKEN_EXPIRE_HOURS", 48, int)
     args.guest_token_expire_hours = get_env_value("GUEST_TOKEN_EXPIRE_HOURS", 24, int)
@@ -444,6 +455,9 @@ def parse_args() -> argparse.Namespace:
     args.embedding_batch_num = get_env_value(
         "EMBEDDING_BATCH_NUM", DEFAULT_EMBEDDING_BATCH_NUM, int
     )
+    args.embedding_batch_wait_ms = get_env_value(
+        "EMBEDDING_BATCH_WAIT_MS", DEFAULT_EMBEDDING_BATCH_WAIT_MS, float
+    )
 
     # Embedding token limit configuration
     args.embedding_token_limit = get_env_value(
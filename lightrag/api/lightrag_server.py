@@ -9,6 +9,7 @@ from fastapi.openapi.docs import (
     get_swagger_ui_html,
     get_swagger_ui_oauth2_redirect_html,
 )
+import asyncio
 import os
 import logging
 import logging.config
@@ -16,7 +17,7 @@ import sys
 import uvicorn
 import pipmaster as pm
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response
 from pathlib import Path
 import configparser
 from ascii_colors import ASCIIColors
@@ -37,13 +38,14 @@ from lightrag.utils import get_env_value
 from lightrag import LightRAG, __version__ as core_version
 from lightrag.api import __api_version__
 from lightrag.types import GPTKeywordExtractionFormat
-from lightrag.utils import EmbeddingFunc
+from lightrag.utils import EmbeddingFunc, EmbeddingMicroBatcher
 from lightrag.constants import (
     DEFAULT_LOG_MAX_BYTES,
     DEFAULT_LOG_BACKUP_COUNT,
     DEFAULT_LOG_FILENAME,
     DEFAULT_LLM_TIMEOUT,
     DEFAULT_EMBEDDING_TIMEOUT,
+    DEFAULT_METRICS_PUBLISH_INTERVAL,
 )
 from lightrag.api.routers.document_routes import (
     DocumentManager,
@@ -52,9 +54,18 @@ from lightrag.api.routers.document_routes import (
 from lightrag.api.routers.query_routes import create_query_routes
 from lightrag.api.routers.graph_routes import create_graph_routes
 from lightrag.api.routers.ollama_api import OllamaAPI
-from lightrag.api.routers.eval_routes import create_eval_routes
+from lightrag.api.routers.eval_routes import EvalJobManager, create_eval_routes
+from lightrag.api.routers.profiling_routes import create_profiling_routes
+from lightrag.api.responses import CompressionMiddleware
 
 from lightrag.utils import logger, set_verbose_debug
+from lightrag.metrics import (
+    PROMETHEUS_CONTENT_TYPE,
+    collect_metrics,
+    render_metrics,
+    run_metrics_publisher,
+)
+from lightrag.profiling import ProfilerController
 from lightrag.kg.shared_storage import (
     get_namespace_data,
     get_default_workspace,
@@ -344,6 +355,14 @@ def create_app(args):
     # Initialize document manager with workspace support for data isolation
     doc_manager = DocumentManager(args.input_dir, workspace=args.workspace)
 
+    # Each Gunicorn worker publishes its metrics so any worker can answer /metrics
+    metrics_publish_interval = get_env_value(
+        "METRICS_PUBLISH_INTERVAL", DEFAULT_METRICS_PUBLISH_INTERVAL, float
+    )
+
+    # On-demand profiling; every worker polls for sessions addressed to it
+    profiler_controller = ProfilerController(os.path.join(args.working_dir, "profiles"))
+
     @asynccontextmanager
     async def lifespan(app: FastAPI):
         """Lifespan context manager for startup and shutdown events"""
@@ -358,11 +377,24 @@ def create_app(args):
             # Data migration regardless of storage implementation
             await rag.check_and_migrate_data()
 
+            metrics_publisher = asyncio.create_task(
+                run_metrics_publisher(metrics_publish_interval)
+            )
+            app.state.background_tasks.add(metrics_publisher)
+            app.state.background_tasks.add(
+                asyncio.create_task(profiler_controller.run())
+            )
+
             ASCIIColors.green("\nServer is ready to accept connections! 🚀\n")
 
             yield
 
         finally:
+            for task in app.state.background_tasks:
+                task.cancel()
+
+            await eval_job_manager.shutdown()
+
             # Clean up database connections
             await rag.finalize_storages()
 
@@ -458,6 +490,12 @@ def create_app(args):
         allow_headers=["*"],
     )
 
+    # Compress large JSON bodies (graphs, document lists, query data)
+    if args.enable_compression:
+        app.add_middleware(
+            CompressionMiddleware, minimum_size=args.compression_min_size
+        )
+
     # Create combined auth dependency for all endpoints
     combined_auth = get_combined_auth_dependency(api_key)
 
@@ -658,7 +696,8 @@ def create_app(args):
         1. Imports the provider embedding function
         2. Extracts max_token_size and embedding_dim from provider if it's an EmbeddingFunc
         3. Creates an optimized wrapper that calls the underlying function directly (avoiding double-wrapping)
-        4. Returns a properly configured EmbeddingFunc instance
+        4. Puts a micro-batcher in front of it when EMBEDDING_BATCH_WAIT_MS > 0
+        5. Returns a properly configured EmbeddingFunc instance
         """
 
         # Step 1: Import provider function and extract default attributes
@@ -695,6 +734,10 @@ def create_app(args):
                 from lightrag.llm.lollms import lollms_embed
 
                 provider_func = lollms_embed
+            elif binding == "local":
+                from lightrag.llm.local import local_embed
+
+                provider_func = local_embed
 
             # Extract attributes if provider is an EmbeddingFunc
             if provider_func and isinstance(provider_func, EmbeddingFunc):
@@ -814,6 +857,15 @@ def create_app(args):
                         embedding_dim=embedding_dim,
                         task_type=gemini_options.get("task_type", "RETRIEVAL_DOCUMENT"),
                     )
+                elif binding == "local":
+                    from lightrag.llm.local import local_embed
+
+                    actual_func = (
+                        local_embed.func
+                        if isinstance(local_embed, EmbeddingFunc)
+                        else local_embed
+                    )
+                    return await actual_func(texts, model=model)
                 else:  # openai and compatible
                     from lightrag.llm.openai import openai_embed
 
@@ -832,10 +884,19 @@ def create_app(args):
             except ImportError as e:
                 raise Exception(f"Failed to import {binding} embedding: {e}")
 
-        # Step 4: Wrap in EmbeddingFunc and return
+        # Step 4: Coalesce concurrent small calls (e.g. query embeddings) into batches
+        embedding_call = optimized_embedding_function
+        if args.embedding_batch_wait_ms > 0:
+            embedding_call = EmbeddingMicroBatcher(
+                optimized_embedding_function,
+                max_batch_size=args.embedding_batch_num,
+                max_wait_ms=args.embedding_batch_wait_ms,
+            )
+
+        # Step 5: Wrap in EmbeddingFunc and return
         embedding_func_instance = EmbeddingFunc(
             embedding_dim=final_embedding_dim,
-            func=optimized_embedding_function,
+            func=embedding_call,
             max_token_size=final_max_token_size,
             send_dimensions=False,  # Will be set later based on binding requirements
         )
@@ -940,13 +1001,19 @@ def create_app(args):
     # Configure rerank function based on args.rerank_bindingparameter
     rerank_model_func = None
     if args.rerank_binding != "null":
-        from lightrag.rerank import cohere_rerank, jina_rerank, ali_rerank
+        from lightrag.rerank import (
+            cohere_rerank,
+            jina_rerank,
+            ali_rerank,
+            local_rerank,
+        )
 
         # Map rerank binding to corresponding function
         rerank_functions = {
             "cohere": cohere_rerank,
             "jina": jina_rerank,
             "aliyun": ali_rerank,
+            "local": local_rerank,
         }
 
         # Select the appropriate rerank function based on binding
@@ -1066,7 +1133,10 @@ def create_app(args):
     )
     app.include_router(create_query_routes(rag, api_key, args.top_k))
     app.include_router(create_graph_routes(rag, api_key))
-    app.include_router(create_eval_routes(rag, api_key))
+    # Background evaluation jobs; stopped (and marked interrupted) on shutdown
+    eval_job_manager = EvalJobManager(rag=rag)
+    app.include_router(create_eval_routes(rag, api_key, eval_job_manager))
+    app.include_router(create_profiling_routes(profiler_controller, api_key))
 
     # Add Ollama API routes
     ollama_api = OllamaAPI(rag, top_k=args.top_k, api_key=api_key)
@@ -1234,6 +1304,18 @@ def create_app(args):
             logger.error(f"Error getting health status: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    @app.get("/metrics", dependencies=[Depends(combined_auth)])
+    async def get_metrics():
+        """Prometheus metrics, aggregated across all worker processes"""
+        try:
+            merged = await collect_metrics(stale_after=metrics_publish_interval * 3)
+            return Response(
+                content=render_metrics(merged), media_type=PROMETHEUS_CONTENT_TYPE
+            )
+        except Exception as e:
+            logger.error(f"Error collecting metrics: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+
     # Custom StaticFiles class for smart caching
     class SmartStaticFiles(StaticFiles):  # Renamed from NoCacheStaticFiles
         async def get_response(self, path: str, scope):
@@ -7,5 +7,6 @@ from .query_routes import router as query_router
 from .graph_routes import router as graph_router
 from .ollama_api import OllamaAPI
 from .eval_routes import create_eval_routes
+from .profiling_routes import create_profiling_routes
 
-__all__ = ["document_router", "query_router", "graph_router", "OllamaAPI", "create_eval_routes"]
+__all__ = ["document_router", "query_router", "graph_router", "OllamaAPI", "create_eval_routes", "create_profiling_routes"]
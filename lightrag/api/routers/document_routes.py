@@ -3,6 +3,7 @@ This module contains all document-related routes for the LightRAG API.
 """
 
 import asyncio
+import json
 from functools import lru_cache
 from lightrag.utils import logger, get_pinyin_sort_key
 import aiofiles
@@ -26,6 +27,7 @@ from lightrag import LightRAG
 from lightrag.base import DeletionResult, DocProcessingStatus, DocStatus
 from lightrag.utils import generate_track_id
 from lightrag.api.utils_api import get_combined_auth_dependency
+from lightrag.api.responses import FastJSONResponse
 from ..config import global_args
 
 
@@ -75,6 +77,7 @@ def format_datetime(dt: Any) -> Optional[str]:
 router = APIRouter(
     prefix="/documents",
     tags=["documents"],
+    default_response_class=FastJSONResponse,
 )
 
 # Temporary file prefix
@@ -744,6 +747,7 @@ class PipelineStatusResponse(BaseModel):
         latest_message: Latest message from pipeline processing
         history_messages: List of history messages
         update_status: Status of update flags for all namespaces
+        stages: Worker pool utilization and queue depth per pipeline stage
     """
 
     autoscanned: bool = False
@@ -757,6 +761,7 @@ class PipelineStatusResponse(BaseModel):
     latest_message: str = ""
     history_messages: Optional[List[str]] = None
     update_status: Optional[dict] = None
+    stages: Optional[dict] = None
 
     @field_validator("job_start", mode="before")
     @classmethod
@@ -1791,6 +1796,127 @@ async def run_scanning_process(
         logger.error(traceback.format_exc())
 
 
+async def _delete_document_files(
+    doc_manager: DocumentManager,
+    file_path: str,
+    pipeline_status: dict,
+    pipeline_status_lock,
+) -> None:
+    """Remove the input file (and enqueued copies) of a deleted document"""
+    try:
+        deleted_files = []
+        # SECURITY FIX: Use secure path validation to prevent arbitrary file deletion
+        safe_file_path = validate_file_path_security(file_path, doc_manager.input_dir)
+
+        if safe_file_path is None:
+            # Security violation detected - log and skip file deletion
+            security_msg = f"Security violation: Unsafe file path detected for deletion - {file_path}"
+            logger.warning(security_msg)
+            async with pipeline_status_lock:
+                pipeline_status["latest_message"] = security_msg
+                pipeline_status["history_messages"].append(security_msg)
+        else:
+            # check and delete files from input_dir directory
+            if safe_file_path.exists():
+                try:
+                    safe_file_path.unlink()
+                    deleted_files.append(safe_file_path.name)
+                    file_delete_msg = (
+                        f"Successfully deleted input_dir file: {file_path}"
+                    )
+                    logger.info(file_delete_msg)
+                    async with pipeline_status_lock:
+                        pipeline_status["latest_message"] = file_delete_msg
+                        pipeline_status["history_messages"].append(file_delete_msg)
+                except Exception as file_error:
+                    file_error_msg = f"Failed to delete input_dir file {file_path}: {str(file_error)}"
+                    logger.debug(file_error_msg)
+                    async with pipeline_status_lock:
+                        pipeline_status["latest_message"] = file_error_msg
+                        pipeline_status["history_messages"].append(file_error_msg)
+
+            # Also check and delete files from __enqueued__ directory
+            enqueued_dir = doc_manager.input_dir / "__enqueued__"
+            if enqueued_dir.exists():
+                # SECURITY FIX: Validate that the file path is safe before processing
+                # Only proceed if the original path validation passed
+                base_name = Path(file_path).stem
+                extension = Path(file_path).suffix
+
+                # Search for exact match and files with numeric suffixes
+                for enqueued_file in enqueued_dir.glob(f"{base_name}*{extension}"):
+                    # Additional security check: ensure enqueued file is within enqueued directory
+                    safe_enqueued_path = validate_file_path_security(
+                        enqueued_file.name, enqueued_dir
+                    )
+                    if safe_enqueued_path is not None:
+                        try:
+                            enqueued_file.unlink()
+                            deleted_files.append(enqueued_file.name)
+                            logger.info(
+                                f"Successfully deleted enqueued file: {enqueued_file.name}"
+                            )
+                        except Exception as enqueued_error:
+                            file_error_msg = f"Failed to delete enqueued file {enqueued_file.name}: {str(enqueued_error)}"
+                            logger.debug(file_error_msg)
+                            async with pipeline_status_lock:
+                                pipeline_status["latest_message"] = file_error_msg
+                                pipeline_status["history_messages"].append(
+                                    file_error_msg
+                                )
+                    else:
+                        security_msg = f"Security violation: Unsafe enqueued file path detected - {enqueued_file.name}"
+                        logger.warning(security_msg)
+
+        if deleted_files == []:
+            file_error_msg = (
+                f"File deletion skipped, missing or unsafe file: {file_path}"
+            )
+            logger.warning(file_error_msg)
+            async with pipeline_status_lock:
+                pipeline_status["latest_message"] = file_error_msg
+                pipeline_status["history_messages"].append(file_error_msg)
+
+    except Exception as file_error:
+        file_error_msg = f"Failed to delete file {file_path}: {str(file_error)}"
+        logger.error(file_error_msg)
+        async with pipeline_status_lock:
+            pipeline_status["latest_message"] = file_error_msg
+            pipeline_status["history_messages"].append(file_error_msg)
+
+
+async def _delete_document_batch(
+    rag: LightRAG, batch: List[str], delete_llm_cache: bool
+) -> List[DeletionResult]:
+    """Delete a batch with one plan, reporting every document of the batch
+
+    An exception escaping ``adelete_by_doc_ids`` is turned into a failed result
+    for each document, and documents missing from its results are reported as
+    failed as well, so every id of ``batch`` gets exactly one result.
+    """
+    try:
+        results = await rag.adelete_by_doc_ids(batch, delete_llm_cache=delete_llm_cache)
+    except Exception as e:
+        logger.error(f"Error deleting documents {batch}: {e}")
+        logger.error(traceback.format_exc())
+        results = []
+        error_message = str(e)
+    else:
+        error_message = "No deletion result returned"
+    by_id = {result.doc_id: result for result in results}
+    return [
+        by_id.get(doc_id)
+        or DeletionResult(
+            status="fail",
+            doc_id=doc_id,
+            message=error_message,
+            status_code=500,
+            file_path=None,
+        )
+        for doc_id in batch
+    ]
+
+
 async def background_delete_documents(
     rag: LightRAG,
     doc_manager: DocumentManager,
@@ -1798,7 +1924,14 @@ async def background_delete_documents(
     delete_file: bool = False,
     delete_llm_cache: bool = False,
 ):
-    """Background task to delete multiple documents"""
+    """Background task to delete multiple documents
+
+    Documents are deleted in batches of ``rag.deletion_batch_size``: each batch
+    is resolved with a single deletion plan, so shared entities and relations
+    are rebuilt once per batch instead of once per document. If the shared plan
+    of a batch fails, its unresolved documents are retried one at a time so the
+    failure is reported against the document that caused it.
+    """
     from lightrag.kg.shared_storage import (
         get_namespace_data,
         get_namespace_lock,
@@ -1811,7 +1944,12 @@ async def background_delete_documents(
         "pipeline_status", workspace=rag.workspace
     )
 
+    # Duplicate ids are deleted once; positions number the progress messages
+    doc_ids = list(dict.fromkeys(doc_ids))
+    positions = {doc_id: index for index, doc_id in enumerate(doc_ids, 1)}
     total_docs = len(doc_ids)
+    batch_size = max(1, rag.deletion_batch_size)
+    total_batches = (total_docs + batch_size - 1) // batch_size
     successful_deletions = []
     failed_deletions = []
 
@@ -1825,11 +1963,11 @@ async def background_delete_documents(
         pipeline_status.update(
             {
                 "busy": True,
-                # Job name can not be changed, it's verified in adelete_by_doc_id()
+                # Job name can not be changed, it's verified in adelete_by_doc_ids()
                 "job_name": f"Deleting {total_docs} Documents",
                 "job_start": datetime.now().isoformat(),
                 "docs": total_docs,
-                "batchs": total_docs,
+                "batchs": total_batches,
                 "cur_batch": 0,
                 "latest_message": "Starting document deletion process",
             }
@@ -1842,172 +1980,89 @@ async def background_delete_documents(
             )
 
     try:
-        # Loop through each document ID and delete them one by one
-        for i, doc_id in enumerate(doc_ids, 1):
-            # Check for cancellation at the start of each document deletion
+        for batch_index, batch_start in enumerate(range(0, total_docs, batch_size), 1):
+            batch = doc_ids[batch_start : batch_start + batch_size]
+            first, last = batch_start + 1, batch_start + len(batch)
+
+            # Check for cancellation at the start of each batch
             async with pipeline_status_lock:
                 if pipeline_status.get("cancellation_requested", False):
-                    cancel_msg = f"Deletion cancelled by user at document {i}/{total_docs}. {len(successful_deletions)} deleted, {total_docs - i + 1} remaining."
+                    cancel_msg = f"Deletion cancelled by user at document {first}/{total_docs}. {len(successful_deletions)} deleted, {total_docs - first + 1} remaining."
                     logger.info(cancel_msg)
                     pipeline_status["latest_message"] = cancel_msg
                     pipeline_status["history_messages"].append(cancel_msg)
                     # Add remaining documents to failed list with cancellation reason
-                    failed_deletions.extend(
-                        doc_ids[i - 1 :]
-                    )  # i-1 because enumerate starts at 1
+                    failed_deletions.extend(doc_ids[batch_start:])
                     break  # Exit the loop, remaining documents unchanged
 
-                start_msg = f"Deleting document {i}/{total_docs}: {doc_id}"
+                start_msg = (
+                    f"Deleting documents {first}-{last}/{total_docs}"
+                    if len(batch) > 1
+                    else f"Deleting document {first}/{total_docs}: {batch[0]}"
+                )
                 logger.info(start_msg)
-                pipeline_status["cur_batch"] = i
+                pipeline_status["cur_batch"] = batch_index
                 pipeline_status["latest_message"] = start_msg
                 pipeline_status["history_messages"].append(start_msg)
 
-            file_path = "#"
-            try:
-                result = await rag.adelete_by_doc_id(
-                    doc_id, delete_llm_cache=delete_llm_cache
-                )
-                file_path = (
-                    getattr(result, "file_path", "-") if "result" in locals() else "-"
-                )
-                if result.status == "success":
-                    successful_deletions.append(doc_id)
-                    success_msg = (
-                        f"Document deleted {i}/{total_docs}: {doc_id}[{file_path}]"
+            results = await _delete_document_batch(rag, batch, delete_llm_cache)
+            retry_ids = (
+                [result.doc_id for result in results if result.status == "fail"]
+                if len(batch) > 1
+                else []
+            )
+            if retry_ids:
+                retry_msg = f"Batch deletion of documents {first}-{last}/{total_docs} failed, retrying {len(retry_ids)} documents one at a time"
+                logger.warning(retry_msg)
+                async with pipeline_status_lock:
+                    pipeline_status["latest_message"] = retry_msg
+                    pipeline_status["history_messages"].append(retry_msg)
+                retried = {}
+                for doc_id in retry_ids:
+                    (retried[doc_id],) = await _delete_document_batch(
+                        rag, [doc_id], delete_llm_cache
                     )
-                    logger.info(success_msg)
-                    async with pipeline_status_lock:
-                        pipeline_status["history_messages"].append(success_msg)
-
-                    # Handle file deletion if requested and file_path is available
-                    if (
-                        delete_file
-                        and result.file_path
-                        and result.file_path != "unknown_source"
-                    ):
-                        try:
-                            deleted_files = []
-                            # SECURITY FIX: Use secure path validation to prevent arbitrary file deletion
-                            safe_file_path = validate_file_path_security(
-                                result.file_path, doc_manager.input_dir
-                            )
+                results = [retried.get(result.doc_id, result) for result in results]
 
-                            if safe_file_path is None:
-                                # Security violation detected - log and skip file deletion
-                                security_msg = f"Security violation: Unsafe file path detected for deletion - {result.file_path}"
-                                logger.warning(security_msg)
-                                async with pipeline_status_lock:
-                                    pipeline_status["latest_message"] = security_msg
-                                    pipeline_status["history_messages"].append(
-                                        security_msg
-                                    )
-                            else:
-                                # check and delete files from input_dir directory
-                                if safe_file_path.exists():
-                                    try:
-                                        safe_file_path.unlink()
-                                        deleted_files.append(safe_file_path.name)
-                                        file_delete_msg = f"Successfully deleted input_dir file: {result.file_path}"
-                                        logger.info(file_delete_msg)
-                                        async with pipeline_status_lock:
-                                            pipeline_status["latest_message"] = (
-                                                file_delete_msg
-                                            )
-                                            pipeline_status["history_messages"].append(
-                                                file_delete_msg
-                                            )
-                                    except Exception as file_error:
-                                        file_error_msg = f"Failed to delete input_dir file {result.file_path}: {str(file_error)}"
-                                        logger.debug(file_error_msg)
-                                        async with pipeline_status_lock:
-                                            pipeline_status["latest_message"] = (
-                                                file_error_msg
-                                            )
-                                            pipeline_status["history_messages"].append(
-                                                file_error_msg
-                                            )
-
-                                # Also check and delete files from __enqueued__ directory
-                                enqueued_dir = doc_manager.input_dir / "__enqueued__"
-                                if enqueued_dir.exists():
-                                    # SECURITY FIX: Validate that the file path is safe before processing
-                                    # Only proceed if the original path validation passed
-                                    base_name = Path(result.file_path).stem
-                                    extension = Path(result.file_path).suffix
-
-                                    # Search for exact match and files with numeric suffixes
-                                    for enqueued_file in enqueued_dir.glob(
-                                        f"{base_name}*{extension}"
-                                    ):
-                                        # Additional security check: ensure enqueued file is within enqueued directory
-                                        safe_enqueued_path = (
-                                            validate_file_path_security(
-                                                enqueued_file.name, enqueued_dir
-                                            )
-                                        )
-                                        if safe_enqueued_path is not None:
-                                            try:
-                                                enqueued_file.unlink()
-                                                deleted_files.append(enqueued_file.name)
-                                                logger.info(
-                                                    f"Successfully deleted enqueued file: {enqueued_file.name}"
-                                                )
-                                            except Exception as enqueued_error:
-                                                file_error_msg = f"Failed to delete enqueued file {enqueued_file.name}: {str(enqueued_error)}"
-                                                logger.debug(file_error_msg)
-                                                async with pipeline_status_lock:
-                                                    pipeline_status[
-                                                        "latest_message"
-                                                    ] = file_error_msg
-                                                    pipeline_status[
-                                                        "history_messages"
-                                                    ].append(file_error_msg)
-                                        else:
-                                            security_msg = f"Security violation: Unsafe enqueued file path detected - {enqueued_file.name}"
-                                            logger.warning(security_msg)
-
-                            if deleted_files == []:
-                                file_error_msg = f"File deletion skipped, missing or unsafe file: {result.file_path}"
-                                logger.warning(file_error_msg)
-                                async with pipeline_status_lock:
-                                    pipeline_status["latest_message"] = file_error_msg
-                                    pipeline_status["history_messages"].append(
-                                        file_error_msg
-                                    )
-
-                        except Exception as file_error:
-                            file_error_msg = f"Failed to delete file {result.file_path}: {str(file_error)}"
-                            logger.error(file_error_msg)
-                            async with pipeline_status_lock:
-                                pipeline_status["latest_message"] = file_error_msg
-                                pipeline_status["history_messages"].append(
-                                    file_error_msg
-                                )
-                    elif delete_file:
-                        no_file_msg = (
-                            f"File deletion skipped, missing file path: {doc_id}"
-                        )
-                        logger.warning(no_file_msg)
-                        async with pipeline_status_lock:
-                            pipeline_status["latest_message"] = no_file_msg
-                            pipeline_status["history_messages"].append(no_file_msg)
-                else:
+            for result in results:
+                doc_id = result.doc_id
+                i = positions[doc_id]
+                file_path = result.file_path or "-"
+                if result.status != "success":
                     failed_deletions.append(doc_id)
                     error_msg = f"Failed to delete {i}/{total_docs}: {doc_id}[{file_path}] - {result.message}"
                     logger.error(error_msg)
                     async with pipeline_status_lock:
                         pipeline_status["latest_message"] = error_msg
                         pipeline_status["history_messages"].append(error_msg)
+                    continue
 
-            except Exception as e:
-                failed_deletions.append(doc_id)
-                error_msg = f"Error deleting document {i}/{total_docs}: {doc_id}[{file_path}] - {str(e)}"
-                logger.error(error_msg)
-                logger.error(traceback.format_exc())
+                successful_deletions.append(doc_id)
+                success_msg = (
+                    f"Document deleted {i}/{total_docs}: {doc_id}[{file_path}]"
+                )
+                logger.info(success_msg)
                 async with pipeline_status_lock:
-                    pipeline_status["latest_message"] = error_msg
-                    pipeline_status["history_messages"].append(error_msg)
+                    pipeline_status["history_messages"].append(success_msg)
+
+                # Handle file deletion if requested and file_path is available
+                if (
+                    delete_file
+                    and result.file_path
+                    and result.file_path != "unknown_source"
+                ):
+                    await _delete_document_files(
+                        doc_manager,
+                        result.file_path,
+                        pipeline_status,
+                        pipeline_status_lock,
+                    )
+                elif delete_file:
+                    no_file_msg = f"File deletion skipped, missing file path: {doc_id}"
+                    logger.warning(no_file_msg)
+                    async with pipeline_status_lock:
+                        pipeline_status["latest_message"] = no_file_msg
+                        pipeline_status["history_messages"].append(no_file_msg)
 
     except Exception as e:
         error_msg = f"Critical error during batch deletion: {str(e)}"
@@ -2340,17 +2395,22 @@ def create_document_routes(
             # Use drop method to clear all data
             drop_tasks = []
             storages = [
-                rag.text_chunks,
-                rag.full_docs,
-                rag.full_entities,
-                rag.full_relations,
-                rag.entity_chunks,
-                rag.relation_chunks,
-                rag.entities_vdb,
-                rag.relationships_vdb,
-                rag.chunks_vdb,
-                rag.chunk_entity_relation_graph,
-                rag.doc_status,
+                storage
+                for storage in (
+                    rag.text_chunks,
+                    rag.full_docs,
+                    rag.full_entities,
+                    rag.full_relations,
+                    rag.entity_chunks,
+                    rag.relation_chunks,
+                    rag.entities_vdb,
+                    rag.relationships_vdb,
+                    rag.chunks_vdb,
+                    rag.chunk_entity_relation_graph,
+                    rag.doc_status,
+                    rag.lexical_index,
+                )
+                if storage is not None
             ]
 
             # Log storage drop start
@@ -2360,8 +2420,7 @@ def create_document_routes(
                 )
 
             for storage in storages:
-                if storage is not None:
-                    drop_tasks.append(storage.drop())
+                drop_tasks.append(storage.drop())
 
             # Wait for all drop tasks to complete
             drop_results = await asyncio.gather(*drop_tasks, return_exceptions=True)
@@ -2938,6 +2997,146 @@ def create_document_routes(
             logger.error(traceback.format_exc())
             raise HTTPException(status_code=500, detail=str(e))
 
+    @router.get(
+        "/track_status/{track_id}/stream",
+        dependencies=[Depends(combined_auth)],
+    )
+    async def stream_track_status(track_id: str):
+        """
+        Stream processing progress of documents by tracking ID (Server-Sent Events).
+
+        Replaces polling of /pipeline_status and /track_status. Progress is pushed by
+        the indexing pipeline through the progress bus, so neither the pipeline_status
+        lock nor doc status storage is touched while streaming.
+
+        Each `progress` event carries a JSON payload with:
+            - track_id, version, total_docs, finished_docs, searchable_docs, stage_counts, finished
+            - eta_seconds: Estimated seconds until the whole track is done (null if unknown)
+            - documents: Per-document stage, chunks_total, chunks_done, eta_seconds, searchable and error_msg
+
+        With ENABLE_CHUNK_FAST_PATH, a document is `searchable` (by naive and mix
+        queries) as soon as its chunks are embedded, before graph extraction finishes.
+
+        The stream ends after the event in which every document reached a terminal
+        stage (processed or failed). Comment lines are sent as keep-alives. If the
+        pipeline is idle and the track made no progress for
+        PROGRESS_IDLE_TIMEOUT_SECONDS (e.g. documents left pending after a
+        cancellation), a final `idle` event is sent and the stream ends.
+
+        Args:
+            track_id (str): The tracking ID returned from upload, text, or texts endpoints
+
+        Raises:
+            HTTPException: If track_id is invalid (400) or no documents exist for it (404).
+        """
+        from fastapi.responses import StreamingResponse
+        from lightrag.kg.shared_storage import get_namespace_data
+        from lightrag.progress import (
+            PROGRESS_IDLE_TIMEOUT_SECONDS,
+            get_track_progress,
+            watch_track_progress,
+        )
+
+        if not track_id or not track_id.strip():
+            raise HTTPException(status_code=400, detail="Track ID cannot be empty")
+        track_id = track_id.strip()
+
+        # Fall back to doc status storage once when the bus has no record of the
+        # track (e.g. it finished before a restart or has not been scheduled yet)
+        initial_payload = None
+        if await get_track_progress(rag.workspace, track_id) is None:
+            docs_by_track_id = await rag.aget_docs_by_track_id(track_id)
+            if not docs_by_track_id:
+                raise HTTPException(
+                    status_code=404, detail=f"No documents found for track {track_id}"
+                )
+            documents = []
+            for doc_id, doc_status in docs_by_track_id.items():
+                status_value = (
+                    doc_status.status.value
+                    if isinstance(doc_status.status, DocStatus)
+                    else str(doc_status.status)
+                )
+                documents.append(
+                    {
+                        "doc_id": doc_id,
+                        "file_path": doc_status.file_path,
+                        "stage": status_value,
+                        "chunks_total": doc_status.chunks_count or 0,
+                        "chunks_done": 0,
+                        "eta_seconds": None,
+                        "searchable": status_value == DocStatus.PROCESSED.value
+                        or (doc_status.metadata or {}).get("searchable") == "chunks",
+                        "error_msg": doc_status.error_msg,
+                    }
+                )
+            stage_counts: Dict[str, int] = {}
+            for doc in documents:
+                stage_counts[doc["stage"]] = stage_counts.get(doc["stage"], 0) + 1
+            finished_docs = sum(
+                1
+                for doc in documents
+                if doc["stage"] in (DocStatus.PROCESSED.value, DocStatus.FAILED.value)
+            )
+            initial_payload = {
+                "track_id": track_id,
+                "version": 0,
+                "total_docs": len(documents),
+                "finished_docs": finished_docs,
+                "searchable_docs": sum(1 for doc in documents if doc["searchable"]),
+                "stage_counts": stage_counts,
+                "finished": finished_docs == len(documents),
+                "eta_seconds": 0.0 if finished_docs == len(documents) else None,
+                "documents": documents,
+            }
+
+        async def pipeline_busy() -> bool:
+            pipeline_status = await get_namespace_data(
+                "pipeline_status", workspace=rag.workspace
+            )
+            return bool(pipeline_status.get("busy", False))
+
+        async def event_generator():
+            if initial_payload is not None:
+                yield f"event: progress\ndata: {json.dumps(initial_payload, ensure_ascii=False)}\n\n"
+                if initial_payload["finished"]:
+                    return
+
+            idle_ticks = 0
+            finished = False
+            async for payload in watch_track_progress(
+                rag.workspace,
+                track_id,
+                idle_timeout=PROGRESS_IDLE_TIMEOUT_SECONDS,
+                is_busy=pipeline_busy,
+            ):
+                if payload is None:
+                    idle_ticks += 1
+                    if idle_ticks >= 15:
+                        idle_ticks = 0
+                        yield ": keep-alive\n\n"
+                    continue
+                idle_ticks = 0
+                finished = payload["finished"]
+                yield f"event: progress\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+            if not finished:
+                idle_payload = {
+                    "track_id": track_id,
+                    "idle_seconds": PROGRESS_IDLE_TIMEOUT_SECONDS,
+                }
+                yield f"event: idle\ndata: {json.dumps(idle_payload)}\n\n"
+
+        return StreamingResponse(
+            event_generator(),
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+                "X-Accel-Buffering": "no",  # Ensure proper handling of streaming response when proxied by Nginx
+            },
+        )
+
     @router.post(
         "/paginated",
         response_model=PaginatedDocsResponse,
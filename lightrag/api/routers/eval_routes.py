@@ -8,7 +8,7 @@ import asyncio
 import sys
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import JSONResponse, FileResponse, Response
 from lightrag.api.utils_api import get_combined_auth_dependency
 
@@ -21,8 +21,6 @@ eval_dir = project_root / "eval_accuracy_citation"
 
 if eval_dir.exists():
     sys.path.insert(0, str(eval_dir))
-    # 导入评测管道
-    from rag_eval_pipeline import run_eval_pipeline
 else:
     # 尝试其他可能的相对路径结构
     alternative_paths = [
@@ -36,18 +34,24 @@ else:
         if alt_path.exists():
             eval_dir = alt_path
             sys.path.insert(0, str(eval_dir))
-            from rag_eval_pipeline import run_eval_pipeline
             found = True
             break
     
     if not found:
         raise ImportError(f"无法找到eval_accuracy_citation目录: {eval_dir}\n尝试的替代路径: {alternative_paths}")
 
+# 后台评测任务管理（依赖上面加入的eval_accuracy_citation路径）
+from eval_jobs import EvalJobManager  # noqa: E402
+
 
 router = APIRouter(tags=["evaluation"])
 
-def create_eval_routes(rag, api_key: str = None):
+def create_eval_routes(
+    rag, api_key: str = None, job_manager: Optional[EvalJobManager] = None
+):
     combined_auth = get_combined_auth_dependency(api_key)
+    if job_manager is None:
+        job_manager = EvalJobManager(rag=rag)
 
     @router.get(
         "/eval/data",
@@ -172,7 +176,7 @@ def create_eval_routes(rag, api_key: str = None):
         dependencies=[Depends(combined_auth)],
         responses={
             200: {
-                "description": "Successfully completed evaluation pipeline",
+                "description": "Evaluation job started (or, with wait=true, the completed evaluation results)",
                 "content": {
                     "application/json": {
                         "schema": {
@@ -238,34 +242,104 @@ def create_eval_routes(rag, api_key: str = None):
             }
         }
     )
-    async def do_eval(line_number: Optional[int] = None, output_file: Optional[str] = None):
+    async def do_eval(
+        line_number: Optional[int] = None,
+        output_file: Optional[str] = None,
+        concurrency: Optional[int] = Query(
+            default=None, ge=1, description="Questions evaluated in parallel, defaults to EVAL_MAX_CONCURRENT"
+        ),
+        wait: bool = Query(
+            default=False, description="Wait for the job to finish and return the evaluation results"
+        ),
+    ):
         """
-        Run the complete RAG evaluation pipeline.
+        Run the complete RAG evaluation pipeline as a background job.
         
-        This endpoint executes the full evaluation pipeline including:
-        1. Reading evaluation questions from EVAL.jsonl
-        2. Getting responses from LightRAG server
-        3. Evaluating responses using various metrics
-        4. Saving results to a JSON file
+        The pipeline reads the evaluation questions from EVAL.jsonl, gets responses
+        from LightRAG, scores them and saves the results to a JSON file. Questions are
+        evaluated with bounded parallelism, scoring runs in worker threads so the
+        server keeps serving requests, and partial results are written as each
+        question finishes. Use the /eval/jobs endpoints to follow progress, cancel
+        or resume the job.
         
         Args:
             line_number: Specific line number to evaluate (1-based), if None evaluates all questions
             output_file: Output file path, if None generates a timestamped filename automatically
+            concurrency: Number of questions evaluated in parallel
+            wait: If True, wait for the job and return the evaluation results (detailed results,
+                averages, total count and results file path) instead of the job status
         
         Returns:
-            Dict[str, Any]: Evaluation results including detailed results, averages, total count, and results file path
+            Dict[str, Any]: The job status, or the evaluation results when wait is True
         
         Raises:
-            HTTPException: If the evaluation pipeline fails to execute
+            HTTPException: If the evaluation job cannot be started or fails
         """
         try:
-            # 调用评测管道，传递rag对象
-            results = await run_eval_pipeline(line_number=line_number, output_file=output_file, rag=rag)
-            return results
+            job = job_manager.start(
+                line_number=line_number, output_file=output_file, concurrency=concurrency
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=500,
                 detail=f"Evaluation pipeline failed: {str(e)}"
             )
+        if not wait:
+            return job
+
+        job = await job_manager.wait(job["job_id"])
+        if job["status"] != "completed":
+            raise HTTPException(
+                status_code=500,
+                detail=f"Evaluation pipeline failed: {job.get('error') or job['status']}"
+            )
+        return job_manager.load_final_result(job["job_id"])
+
+    @router.get("/eval/jobs", dependencies=[Depends(combined_auth)])
+    async def list_eval_jobs():
+        """
+        List evaluation jobs, newest first, with their status and progress.
+        """
+        return job_manager.list()
+
+    @router.get("/eval/jobs/{job_id}", dependencies=[Depends(combined_auth)])
+    async def get_eval_job(job_id: str):
+        """
+        Get the status and progress of an evaluation job.
+        
+        Completed jobs include the average scores and the results file path.
+        """
+        job = job_manager.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Evaluation job not found: {job_id}")
+        return job
+
+    @router.post("/eval/jobs/{job_id}/cancel", dependencies=[Depends(combined_auth)])
+    async def cancel_eval_job(job_id: str):
+        """
+        Cancel a running evaluation job. Finished questions are kept and the job can be resumed.
+
+        A job running in another worker process is cancelled by that worker within a
+        second; the response then carries `cancel_requested: true`.
+        """
+        try:
+            return await job_manager.cancel(job_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"Evaluation job not found: {job_id}")
+
+    @router.post("/eval/jobs/{job_id}/resume", dependencies=[Depends(combined_auth)])
+    async def resume_eval_job(job_id: str):
+        """
+        Resume a cancelled, failed or interrupted evaluation job.
+        
+        Questions that already have results are skipped; failed questions are retried.
+        Returns 409 if the job is still running, in this or another worker process.
+        """
+        try:
+            return job_manager.resume(job_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"Evaluation job not found: {job_id}")
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e))
 
     return router
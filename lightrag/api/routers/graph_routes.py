@@ -2,15 +2,49 @@
 This module contains all graph-related routes for the LightRAG API.
 """
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 import traceback
 from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
+from lightrag.types import KnowledgeGraph
 from lightrag.utils import logger
 from ..utils_api import get_combined_auth_dependency
+from ..responses import FastJSONResponse
 
-router = APIRouter(tags=["graph"])
+router = APIRouter(tags=["graph"], default_response_class=FastJSONResponse)
+
+# Number of nodes or edges serialized per chunk of a streamed graph response
+GRAPH_STREAM_BATCH_SIZE = 500
+
+
+def iter_knowledge_graph_json(
+    graph: KnowledgeGraph, batch_size: int = GRAPH_STREAM_BATCH_SIZE
+) -> Iterator[str]:
+    """Serialize a KnowledgeGraph as one JSON document, in chunks.
+
+    The output is identical to the regular JSON response body, but is produced
+    batch by batch so large graphs never need a single serialized string. The
+    graph itself is fully built before serialization starts, so this improves
+    time to first byte and avoids the serialized copy, but does not lower the
+    memory peak of building the graph.
+    """
+
+    def items(name: str, values: list) -> Iterator[str]:
+        yield f'"{name}":['
+        for start in range(0, len(values), batch_size):
+            prefix = "," if start else ""
+            yield prefix + ",".join(
+                value.model_dump_json() for value in values[start : start + batch_size]
+            )
+        yield "]"
+
+    yield "{"
+    yield from items("nodes", graph.nodes)
+    yield ","
+    yield from items("edges", graph.edges)
+    yield f',"is_truncated":{"true" if graph.is_truncated else "false"}}}'
 
 
 class EntityUpdateRequest(BaseModel):
@@ -161,6 +195,9 @@ def create_graph_routes(rag, api_key: Optional[str] = None):
         label: str = Query(..., description="Label to get knowledge graph for"),
         max_depth: int = Query(3, description="Maximum depth of graph", ge=1),
         max_nodes: int = Query(1000, description="Maximum nodes to return", ge=1),
+        stream: bool = Query(
+            False, description="Stream the JSON body in chunks for large graphs"
+        ),
     ):
         """
         Retrieve a connected subgraph of nodes where the label includes the specified label.
@@ -172,6 +209,9 @@ def create_graph_routes(rag, api_key: Optional[str] = None):
             label (str): Label of the starting node
             max_depth (int, optional): Maximum depth of the subgraph,Defaults to 3
             max_nodes: Maxiumu nodes to return
+            stream (bool, optional): Send the same JSON body as a chunked stream.
+                The subgraph is still built in memory first; only its serialization
+                is streamed.
 
         Returns:
             Dict[str, List[str]]: Knowledge graph for label
@@ -182,11 +222,17 @@ def create_graph_routes(rag, api_key: Optional[str] = None):
                 f"get_knowledge_graph called with label: '{label}' (length: {len(label)}, repr: {repr(label)})"
             )
 
-            return await rag.get_knowledge_graph(
+            graph = await rag.get_knowledge_graph(
                 node_label=label,
                 max_depth=max_depth,
                 max_nodes=max_nodes,
             )
+            if stream:
+                return StreamingResponse(
+                    iter_knowledge_graph_json(graph), media_type="application/json"
+                )
+            # Serialize the model directly instead of through jsonable_encoder
+            return FastJSONResponse(graph)
         except Exception as e:
             logger.error(f"Error getting knowledge graph for label '{label}': {str(e)}")
             logger.error(traceback.format_exc())
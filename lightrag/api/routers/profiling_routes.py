@@ -0,0 +1,162 @@
+"""
+This module contains the admin-only profiling routes for the LightRAG API.
+"""
+
+import os
+from typing import Any, Dict, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
+
+from lightrag.profiling import (
+    DEFAULT_SAMPLE_INTERVAL,
+    MAX_PROFILE_DURATION,
+    ProfilerController,
+)
+from lightrag.utils import logger
+from ..utils_api import get_admin_auth_dependency
+
+router = APIRouter(tags=["profiling"])
+
+
+class ProfileStartRequest(BaseModel):
+    duration: float = Field(
+        default=30.0,
+        gt=0,
+        le=MAX_PROFILE_DURATION,
+        description="Seconds to sample before the profile is written",
+    )
+    worker: Optional[int] = Field(
+        default=None,
+        description="PID of the worker to profile, see GET /profiling/workers. Defaults to the worker handling this request",
+    )
+    interval_ms: float = Field(
+        default=DEFAULT_SAMPLE_INTERVAL * 1000,
+        ge=1,
+        le=1000,
+        description="Sampling interval in milliseconds",
+    )
+    include_idle: bool = Field(
+        default=False,
+        description="Keep samples of threads waiting in the event loop or a thread pool",
+    )
+
+
+class ProfileSession(BaseModel):
+    session_id: str
+    pid: int
+    status: Literal["requested", "running", "completed", "cancelled", "failed"]
+    duration: float
+    interval: float
+    include_idle: bool
+    requested_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    samples: int = 0
+    stages: Dict[str, int] = Field(
+        default_factory=dict, description="Samples per stage label, most first"
+    )
+    error: Optional[str] = None
+    stop_requested: bool = False
+
+
+def create_profiling_routes(
+    controller: ProfilerController, api_key: Optional[str] = None
+):
+    admin_auth = get_admin_auth_dependency(api_key)
+
+    @router.get("/profiling/workers", dependencies=[Depends(admin_auth)])
+    async def list_profiling_workers() -> List[Dict[str, Any]]:
+        """List worker processes that can be profiled"""
+        return await controller.workers()
+
+    @router.get(
+        "/profiling/sessions",
+        response_model=List[ProfileSession],
+        dependencies=[Depends(admin_auth)],
+    )
+    async def list_profiling_sessions():
+        """List profiling sessions, newest first"""
+        return await controller.list()
+
+    @router.post(
+        "/profiling/start",
+        response_model=ProfileSession,
+        dependencies=[Depends(admin_auth)],
+    )
+    async def start_profiling(request: ProfileStartRequest):
+        """
+        Start a sampling profiler in one worker for `duration` seconds.
+
+        The profile is written when the duration elapses or the session is
+        stopped, and can then be downloaded as collapsed stacks or speedscope JSON.
+        """
+        try:
+            return await controller.start(
+                request.duration,
+                worker=request.worker,
+                interval=request.interval_ms / 1000,
+                include_idle=request.include_idle,
+            )
+        except LookupError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except (ValueError, RuntimeError) as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except Exception as e:
+            logger.error(f"Error starting profiler: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    @router.post(
+        "/profiling/sessions/{session_id}/stop",
+        response_model=ProfileSession,
+        dependencies=[Depends(admin_auth)],
+    )
+    async def stop_profiling(session_id: str):
+        """Stop a session early; the samples taken so far are written"""
+        try:
+            return await controller.stop(session_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Profiling session not found")
+
+    @router.get(
+        "/profiling/sessions/{session_id}",
+        response_model=ProfileSession,
+        dependencies=[Depends(admin_auth)],
+    )
+    async def get_profiling_session(session_id: str):
+        session = await controller.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Profiling session not found")
+        return session
+
+    @router.get(
+        "/profiling/sessions/{session_id}/download",
+        dependencies=[Depends(admin_auth)],
+    )
+    async def download_profile(
+        session_id: str,
+        format: Literal["collapsed", "speedscope"] = Query(
+            "speedscope",
+            description="collapsed: folded stacks for flamegraph tools; speedscope: https://www.speedscope.app JSON",
+        ),
+    ):
+        """Download the profile of a completed session"""
+        session = await controller.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Profiling session not found")
+        if session["status"] != "completed":
+            raise HTTPException(
+                status_code=409,
+                detail=f"Profiling session is {session['status']}",
+            )
+        path = controller.output_path(session_id, format)
+        if not os.path.exists(path):
+            raise HTTPException(status_code=404, detail="Profile file not found")
+        return FileResponse(
+            path,
+            media_type="application/json" if format == "speedscope" else "text/plain",
+            filename=os.path.basename(path),
+        )
+
+    return router
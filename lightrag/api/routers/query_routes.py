@@ -2,17 +2,19 @@
 This module contains all query-related routes for the LightRAG API.
 """
 
+import asyncio
 import json
 from typing import Any, Dict, List, Literal, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from lightrag.base import QueryParam
 from lightrag.api.utils_api import get_combined_auth_dependency
+from lightrag.api.responses import FastJSONResponse
 from lightrag.utils import logger
 from pydantic import BaseModel, Field, field_validator
 import numpy as np
 from datetime import datetime, timezone
 
-router = APIRouter(tags=["query"])
+router = APIRouter(tags=["query"], default_response_class=FastJSONResponse)
 
 
 def compute_cosine_similarity(vec1, vec2):
@@ -35,6 +37,75 @@ def compute_cosine_similarity(vec1, vec2):
     return float(np.clip(cosine_sim, 0.0, 1.0))
 
 
+async def enrich_references(
+    rag, query: str, data: Dict[str, Any], include_chunk_content: bool
+) -> List[Dict[str, Any]]:
+    """Attach per-chunk scores (and chunk content if requested) to references
+
+    Chunks from vector retrieval keep their original score. Chunks without one
+    (e.g. knowledge graph results) are scored by cosine similarity to the query;
+    the query and all of those chunks are embedded in one concurrent round trip.
+    """
+    references = data.get("references", [])
+    chunks = data.get("chunks", [])
+
+    unscored = [
+        chunk.get("content", "")
+        for chunk in chunks
+        if chunk.get("score") is None and chunk.get("content")
+    ]
+    query_vec = None
+    chunk_vecs: Dict[str, Any] = {}
+    if unscored:
+        query_result, chunk_result = await asyncio.gather(
+            rag.embedding_func([query]),
+            rag.embedding_func(unscored),
+            return_exceptions=True,
+        )
+        if isinstance(query_result, Exception):
+            logger.error(f"Failed to generate query embedding: {query_result}")
+        else:
+            query_vec = query_result[0]
+        if isinstance(chunk_result, Exception):
+            logger.warning(f"Embedding calculation failed for chunks: {chunk_result}")
+        else:
+            chunk_vecs = dict(zip(unscored, chunk_result))
+
+    ref_id_to_content: Dict[str, List[str]] = {}
+    ref_id_to_scores: Dict[str, List[float]] = {}
+    for chunk in chunks:
+        ref_id = str(chunk.get("reference_id", ""))
+        content = chunk.get("content", "")
+        raw_score = chunk.get("score")
+
+        if raw_score is not None:
+            # 1. 优先使用向量检索返回的原始分数
+            final_score = float(raw_score)
+        elif query_vec is not None and content in chunk_vecs:
+            # 2. 无原始分数时（如知识图谱检索结果），基于向量计算余弦相似度
+            final_score = compute_cosine_similarity(query_vec, chunk_vecs[content])
+        else:
+            # 3. 兜底逻辑：无法计算向量相似度时赋予中间分
+            final_score = 0.5
+
+        if ref_id:
+            if content and include_chunk_content:
+                ref_id_to_content.setdefault(ref_id, []).append(content)
+            ref_id_to_scores.setdefault(ref_id, []).append(round(final_score, 4))
+
+    enriched_references = []
+    for ref in references:
+        ref_copy = ref.copy()
+        ref_id = str(ref.get("reference_id", ""))
+        if ref_id in ref_id_to_content:
+            # Keep content as a list of chunks (one file may have multiple chunks)
+            ref_copy["content"] = ref_id_to_content[ref_id]
+        if ref_id in ref_id_to_scores:
+            ref_copy["scores"] = ref_id_to_scores[ref_id]
+        enriched_references.append(ref_copy)
+    return enriched_references
+
+
 # 反馈模型
 class FeedbackRequest(BaseModel):
     query_id: str = Field(description="Query ID received from the response")
@@ -211,17 +282,25 @@ class QueryDataResponse(BaseModel):
         description="Query result data containing entities, relationships, chunks, and references"
     )
     metadata: Dict[str, Any] = Field(
-        description="Query metadata including mode, keywords, and processing information"
+        description="Query metadata including mode, keywords, and processing information, and per-stage timings when query tracing is enabled"
     )
 
 
 class StreamChunkResponse(BaseModel):
     """Response model for streaming chunks in NDJSON format"""
 
-    query_id: Optional[str] = Field(description="Unique ID for this query")
-    references: Optional[List[Dict[str, str]]] = Field(
+    event: Optional[
+        Literal["context_ready", "token", "references", "error", "done"]
+    ] = Field(
+        default=None,
+        description="Event type in streaming mode; absent in the single non-streaming message",
+    )
+    query_id: Optional[str] = Field(
+        default=None, description="Unique ID for this query"
+    )
+    references: Optional[List[Dict[str, Any]]] = Field(
         default=None,
-        description="Reference list (only in first chunk when include_references=True)",
+        description="Reference list: unscored in context_ready, with scores in the references event (include_references=True only)",
     )
     response: Optional[str] = Field(
         default=None, description="Response content chunk or complete response"
@@ -465,74 +544,11 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
             if not response_content:
                 response_content = "No relevant context found for the query."
 
-            # 预先计算 Query 的向量
-            query_vec = None
-            try:
-                query_embeddings = await rag.embedding_func([request.query])
-                query_vec = query_embeddings[0]
-            except Exception as e:
-                logger.error(f"Failed to generate query embedding: {e}")
-
-            # Enrich references with chunk content if requested
+            # Enrich references with scores and chunk content if requested
             if request.include_references:
-                chunks = data.get("chunks", [])
-                # Create a mapping from reference_id to chunk content
-                ref_id_to_content = {}
-                ref_id_to_scores = {}
-
-                for chunk in chunks:
-                    ref_id = str(chunk.get("reference_id", ""))
-                    content = chunk.get("content", "")
-                    raw_score = chunk.get("score")
-
-                    # 扩展评分逻辑
-                    final_score = 0.0
-
-                    if raw_score is not None:
-                        # 1. 优先使用向量检索返回的原始分数
-                        final_score = float(raw_score)
-
-                    elif query_vec is not None and content:
-                        # 2. 无原始分数时（如知识图谱检索结果），基于向量计算余弦相似度
-                        try:
-                            chunk_embeddings = await rag.embedding_func([content])
-                            chunk_vec = chunk_embeddings[0]
-                            final_score = compute_cosine_similarity(
-                                query_vec, chunk_vec
-                            )
-                        except Exception as e:
-                            logger.warning(
-                                f"Embedding calculation failed for chunk {ref_id}: {e}"
-                            )
-                            final_score = 0.5
-                    else:
-                        # 3. 兜底逻辑
-                        final_score = 0.5
-
-                    final_score = round(float(final_score), 4)
-
-                    if ref_id:
-                        if content and request.include_chunk_content:
-                            ref_id_to_content.setdefault(ref_id, []).append(content)
-
-                        # 存储分数
-                        ref_id_to_scores.setdefault(ref_id, []).append(final_score)
-
-                # Add content to references
-                enriched_references = []
-                for ref in references:
-                    ref_copy = ref.copy()
-                    ref_id = str(ref.get("reference_id", ""))
-                    if ref_id in ref_id_to_content:
-                        # Keep content as a list of chunks (one file may have multiple chunks)
-                        ref_copy["content"] = ref_id_to_content[ref_id]
-
-                    # 填充得分
-                    if ref_id in ref_id_to_scores:
-                        ref_copy["scores"] = ref_id_to_scores[ref_id]
-
-                    enriched_references.append(ref_copy)
-                references = enriched_references
+                references = await enrich_references(
+                    rag, request.query, data, request.include_chunk_content
+                )
 
             # Return response with or without references based on request
             if request.include_references:
@@ -559,23 +575,23 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
                             "type": "string",
                             "format": "ndjson",
                             "description": "Newline-delimited JSON (NDJSON) format used for both streaming and non-streaming responses. For streaming: multiple lines with separate JSON objects. For non-streaming: single line with complete JSON object.",
-                            "example": '{"references": [{"reference_id": "1", "file_path": "/documents/ai.pdf"}]}\n{"response": "Artificial Intelligence is"}\n{"response": " a field of computer science"}\n{"response": " that focuses on creating intelligent machines."}',
+                            "example": '{"event": "context_ready", "query_id": "q-1", "references": [{"reference_id": "1", "file_path": "/documents/ai.pdf"}]}\n{"event": "token", "response": "Artificial Intelligence is"}\n{"event": "token", "response": " a field of computer science"}\n{"event": "references", "references": [{"reference_id": "1", "file_path": "/documents/ai.pdf", "scores": [0.82]}]}\n{"event": "token", "response": " that focuses on creating intelligent machines."}\n{"event": "done"}',
                         },
                         "examples": {
                             "streaming_with_references": {
                                 "summary": "Streaming mode with references (stream=true)",
-                                "description": "Multiple NDJSON lines when stream=True and include_references=True. First line contains references, subsequent lines contain response chunks.",
-                                "value": '{"references": [{"reference_id": "1", "file_path": "/documents/ai_overview.pdf"}, {"reference_id": "2", "file_path": "/documents/ml_basics.txt"}]}\n{"response": "Artificial Intelligence (AI) is a branch of computer science"}\n{"response": " that aims to create intelligent machines capable of performing"}\n{"response": " tasks that typically require human intelligence, such as learning,"}\n{"response": " reasoning, and problem-solving."}',
+                                "description": "Multiple NDJSON lines when stream=True and include_references=True. The context_ready line is sent as soon as retrieval finishes and lists the references; token lines follow; a references line with scores arrives once scoring (which runs concurrently with the LLM) completes; done ends the stream.",
+                                "value": '{"event": "context_ready", "query_id": "q-1", "references": [{"reference_id": "1", "file_path": "/documents/ai_overview.pdf"}, {"reference_id": "2", "file_path": "/documents/ml_basics.txt"}]}\n{"event": "token", "response": "Artificial Intelligence (AI) is a branch of computer science"}\n{"event": "token", "response": " that aims to create intelligent machines capable of performing"}\n{"event": "references", "references": [{"reference_id": "1", "file_path": "/documents/ai_overview.pdf", "scores": [0.82, 0.77]}, {"reference_id": "2", "file_path": "/documents/ml_basics.txt", "scores": [0.64]}]}\n{"event": "token", "response": " tasks that typically require human intelligence, such as learning,"}\n{"event": "token", "response": " reasoning, and problem-solving."}\n{"event": "done"}',
                             },
                             "streaming_with_chunk_content": {
                                 "summary": "Streaming mode with chunk content (stream=true, include_chunk_content=true)",
-                                "description": "Multiple NDJSON lines when stream=True, include_references=True, and include_chunk_content=True. First line contains references with content arrays (one file may have multiple chunks), subsequent lines contain response chunks.",
-                                "value": '{"references": [{"reference_id": "1", "file_path": "/documents/ai_overview.pdf", "content": ["Artificial Intelligence (AI) represents a transformative field...", "AI systems can be categorized into narrow AI and general AI..."]}, {"reference_id": "2", "file_path": "/documents/ml_basics.txt", "content": ["Machine learning is a subset of AI that enables computers to learn..."]}]}\n{"response": "Artificial Intelligence (AI) is a branch of computer science"}\n{"response": " that aims to create intelligent machines capable of performing"}\n{"response": " tasks that typically require human intelligence."}',
+                                "description": "Multiple NDJSON lines when stream=True, include_references=True, and include_chunk_content=True. The references event carries content arrays (one file may have multiple chunks) next to the scores.",
+                                "value": '{"event": "context_ready", "query_id": "q-1", "references": [{"reference_id": "1", "file_path": "/documents/ai_overview.pdf"}, {"reference_id": "2", "file_path": "/documents/ml_basics.txt"}]}\n{"event": "token", "response": "Artificial Intelligence (AI) is a branch of computer science"}\n{"event": "token", "response": " that aims to create intelligent machines capable of performing"}\n{"event": "token", "response": " tasks that typically require human intelligence."}\n{"event": "references", "references": [{"reference_id": "1", "file_path": "/documents/ai_overview.pdf", "content": ["Artificial Intelligence (AI) represents a transformative field...", "AI systems can be categorized into narrow AI and general AI..."], "scores": [0.82, 0.77]}, {"reference_id": "2", "file_path": "/documents/ml_basics.txt", "content": ["Machine learning is a subset of AI that enables computers to learn..."], "scores": [0.64]}]}\n{"event": "done"}',
                             },
                             "streaming_without_references": {
                                 "summary": "Streaming mode without references (stream=true)",
-                                "description": "Multiple NDJSON lines when stream=True and include_references=False. Only response chunks are sent.",
-                                "value": '{"response": "Machine learning is a subset of artificial intelligence"}\n{"response": " that enables computers to learn and improve from experience"}\n{"response": " without being explicitly programmed for every task."}',
+                                "description": "Multiple NDJSON lines when stream=True and include_references=False. No references are computed or sent.",
+                                "value": '{"event": "context_ready", "query_id": "q-1"}\n{"event": "token", "response": "Machine learning is a subset of artificial intelligence"}\n{"event": "token", "response": " that enables computers to learn and improve from experience"}\n{"event": "token", "response": " without being explicitly programmed for every task."}\n{"event": "done"}',
                             },
                             "non_streaming_with_references": {
                                 "summary": "Non-streaming mode with references (stream=false)",
@@ -590,7 +606,7 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
                             "error_response": {
                                 "summary": "Error during streaming",
                                 "description": "Error handling in NDJSON format when an error occurs during processing.",
-                                "value": '{"references": [{"reference_id": "1", "file_path": "/documents/ai.pdf"}]}\n{"response": "Artificial Intelligence is"}\n{"error": "LLM service temporarily unavailable"}',
+                                "value": '{"event": "context_ready", "query_id": "q-1", "references": [{"reference_id": "1", "file_path": "/documents/ai.pdf"}]}\n{"event": "token", "response": "Artificial Intelligence is"}\n{"event": "error", "error": "LLM service temporarily unavailable"}\n{"event": "done"}',
                             },
                         },
                     }
@@ -636,9 +652,12 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
         **Response Modes:**
         - Real-time response delivery as content is generated
         - NDJSON format: each line is a separate JSON object
-        - First line: `{"references": [...]}` (if include_references=True)
-        - Subsequent lines: `{"response": "content chunk"}`
-        - Error handling: `{"error": "error message"}`
+        - Every line carries an `event` field:
+          - `{"event": "context_ready", "query_id": "...", "references": [...]}`: sent as soon as retrieval finishes (references only if include_references=True, without scores)
+          - `{"event": "token", "response": "content chunk"}`: LLM output
+          - `{"event": "references", "references": [...]}`: references with scores (and chunk content), sent when scoring finishes; scoring runs while tokens stream
+          - `{"event": "error", "error": "error message"}`: streaming failure
+          - `{"event": "done"}`: last line
 
         > If stream parameter is False, or the query hit LLM cache, complete response delivered in a single streaming message.
 
@@ -708,7 +727,7 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
         async for line in response.iter_lines():
             data = json.loads(line)
             if "references" in data:
-                # Handle references (first message)
+                # Basic list in context_ready, replaced by the scored list later
                 references = data["references"]
             if "response" in data:
                 # Handle content chunk
@@ -719,7 +738,7 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
         ```
 
         **Error Handling:**
-        - Streaming errors are delivered as `{"error": "message"}` lines
+        - Streaming errors are delivered as `{"event": "error", "error": "message"}` lines
         - Non-streaming errors raise HTTP exceptions
         - Partial responses may be delivered before errors in streaming mode
         - Always check for error objects when processing streaming responses
@@ -738,9 +757,11 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
         Returns:
             StreamingResponse: NDJSON streaming response containing:
                 - **Streaming mode**: Multiple JSON objects, one per line
-                  - References object (if requested): `{"references": [...]}`
-                  - Content chunks: `{"response": "chunk content"}`
-                  - Error objects: `{"error": "error message"}`
+                  - Context ready: `{"event": "context_ready", "query_id": "...", "references": [...]}`
+                  - Content chunks: `{"event": "token", "response": "chunk content"}`
+                  - Scored references (if requested): `{"event": "references", "references": [...]}`
+                  - Error objects: `{"event": "error", "error": "error message"}`
+                  - End of stream: `{"event": "done"}`
                 - **Non-streaming mode**: Single JSON object
                   - Complete response: `{"references": [...], "response": "complete content"}`
 
@@ -766,126 +787,80 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
             # 获取 ID
             query_id = result.get("query_id")
 
-            # 预先计算 Query 的向量
-            try:
-                query_embeddings = await rag.embedding_func([request.query])
-                query_vec = query_embeddings[0]
-            except Exception as e:
-                logger.error(f"Failed to generate query embedding: {e}")
-                query_vec = None
+            def ndjson(packet: Dict[str, Any]) -> str:
+                return f"{json.dumps(packet, ensure_ascii=False)}\n"
 
             async def stream_generator():
-                # Extract references and LLM response from unified result
-                references = result.get("data", {}).get("references", [])
+                data = result.get("data", {})
+                references = data.get("references", [])
                 llm_response = result.get("llm_response", {})
 
-                # Enrich references with chunk content if requested
-                if request.include_references:
-                    data = result.get("data", {})
-                    chunks = data.get("chunks", [])
-                    # Create a mapping from reference_id to chunk content
-                    ref_id_to_content = {}
-                    ref_id_to_scores = {}
-
-                    for chunk in chunks:
-                        ref_id = str(chunk.get("reference_id", ""))
-                        content = chunk.get("content", "")
-                        raw_score = chunk.get("score")
-
-                        final_score = 0.0
-
-                        if raw_score is not None:
-                            # 1. 优先使用向量检索返回的原始分数
-                            # 说明：向量检索（如FAISS）已计算相似度分数，直接复用避免重复计算
-                            final_score = float(raw_score)
-
-                        elif query_vec is not None and content:
-                            # 2. 无原始分数时（如知识图谱检索结果），基于向量计算余弦相似度
-                            # 前置条件：需同时具备查询向量（query_vec）和chunk内容（content）
-                            try:
-                                # 生成当前chunk的嵌入向量（与query向量使用同一embedding函数，保证维度一致）
-                                chunk_embeddings = await rag.embedding_func([content])
-                                chunk_vec = chunk_embeddings[0]
-
-                                # 计算query向量与chunk向量的余弦相似度（取值范围[-1,1]，越接近1越相关）
-                                final_score = compute_cosine_similarity(
-                                    query_vec, chunk_vec
-                                )
-
-                            except Exception as e:
-                                logger.warning(
-                                    f"Embedding calculation failed for chunk {ref_id}: {e}"
-                                )
-                                final_score = 0.5  # 出错了给个中间分
-                        else:
-                            # 3. 兜底逻辑：无原始分数且无法计算向量相似度（如缺少query_vec或content）
-                            # 赋予中间分（0.5），平衡召回准确性与覆盖率
-                            final_score = 0.5
-
-                        final_score = round(float(final_score), 4)
-
-                        if ref_id:
-                            if content and request.include_chunk_content:
-                                ref_id_to_content.setdefault(ref_id, []).append(content)
-
-                            # 存储分数
-                            ref_id_to_scores.setdefault(ref_id, []).append(final_score)
-
-                    # Add content to references
-                    enriched_references = []
-                    for ref in references:
-                        ref_copy = ref.copy()
-                        ref_id = str(ref.get("reference_id", ""))
-                        if ref_id in ref_id_to_content:
-                            # Keep content as a list of chunks (one file may have multiple chunks)
-                            ref_copy["content"] = ref_id_to_content[ref_id]
-                        if ref_id in ref_id_to_scores:
-                            ref_copy["scores"] = ref_id_to_scores[ref_id]
-
-                        enriched_references.append(ref_copy)
-                    references = enriched_references
-
-                if llm_response.get("is_streaming"):
-                    # Streaming mode: send references first, then stream response chunks
-
-                    initial_packet = {}
-                    # 注入 query_id
+                if not llm_response.get("is_streaming"):
+                    # Non-streaming mode: send complete response in one message
+                    response_content = llm_response.get("content", "")
+                    if not response_content:
+                        response_content = "No relevant context found for the query."
+
+                    complete_response = {"response": response_content}
                     if query_id:
-                        initial_packet["query_id"] = query_id
-                    # 注入 references
+                        complete_response["query_id"] = query_id
                     if request.include_references:
-                        initial_packet["references"] = references
-                    # 发送初始数据包 (只要有 query_id 或 references 就发送)
-                    if initial_packet:
-                        yield f"{json.dumps(initial_packet, ensure_ascii=False)}\n"
+                        complete_response["references"] = await enrich_references(
+                            rag, request.query, data, request.include_chunk_content
+                        )
+                    yield ndjson(complete_response)
+                    return
 
-                    # if request.include_references:
-                    #     yield f"{json.dumps({'references': references}, ensure_ascii=False)}\n"
+                # Streaming mode: announce the retrieved context right away, score
+                # references while the LLM streams, and send them once ready
+                scoring_task = None
+                if request.include_references:
+                    scoring_task = asyncio.create_task(
+                        enrich_references(
+                            rag, request.query, data, request.include_chunk_content
+                        )
+                    )
+
+                async def references_event():
+                    nonlocal scoring_task
+                    task, scoring_task = scoring_task, None
+                    try:
+                        return ndjson({"event": "references", "references": await task})
+                    except Exception as e:
+                        logger.warning(f"Reference scoring failed: {e}")
+                        return None
+
+                try:
+                    context_packet: Dict[str, Any] = {"event": "context_ready"}
+                    if query_id:
+                        context_packet["query_id"] = query_id
+                    if request.include_references:
+                        context_packet["references"] = references
+                    yield ndjson(context_packet)
 
                     response_stream = llm_response.get("response_iterator")
                     if response_stream:
                         try:
                             async for chunk in response_stream:
                                 if chunk:  # Only send non-empty content
-                                    yield f"{json.dumps({'response': chunk}, ensure_ascii=False)}\n"
+                                    yield ndjson({"event": "token", "response": chunk})
+                                if scoring_task is not None and scoring_task.done():
+                                    packet = await references_event()
+                                    if packet:
+                                        yield packet
                         except Exception as e:
                             logger.error(f"Streaming error: {str(e)}")
-                            yield f"{json.dumps({'error': str(e)}, ensure_ascii=False)}\n"
-                else:
-                    # Non-streaming mode: send complete response in one message
-                    response_content = llm_response.get("content", "")
-                    if not response_content:
-                        response_content = "No relevant context found for the query."
-
-                    # Create complete response object
-                    complete_response = {"response": response_content}
-                    # 注入 query_id
-                    if query_id:
-                        complete_response["query_id"] = query_id
-                    if request.include_references:
-                        complete_response["references"] = references
-
-                    yield f"{json.dumps(complete_response, ensure_ascii=False)}\n"
+                            yield ndjson({"event": "error", "error": str(e)})
+
+                    if scoring_task is not None:
+                        packet = await references_event()
+                        if packet:
+                            yield packet
+                    yield ndjson({"event": "done"})
+                finally:
+                    # Client disconnected before the references were sent
+                    if scoring_task is not None:
+                        scoring_task.cancel()
 
             return StreamingResponse(
                 stream_generator(),
@@ -969,6 +944,21 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
             logger.error(f"Error submitting feedback: {e}", exc_info=True)
             raise HTTPException(status_code=500, detail=str(e))
 
+    @router.get("/feedback/stats", dependencies=[Depends(combined_auth)])
+    async def feedback_stats_endpoint():
+        """
+        Aggregated like/dislike statistics of the current workspace.
+
+        Returns overall totals and per query cluster counts with like/dislike
+        rates. Queries are clustered by their most specific terms. Statistics
+        are maintained incrementally as feedback is submitted.
+        """
+        try:
+            return rag.get_feedback_stats()
+        except Exception as e:
+            logger.error(f"Error getting feedback stats: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=str(e))
+
     @router.post(
         "/query/data",
         response_model=QueryDataResponse,
@@ -1374,7 +1364,9 @@ def create_query_routes(rag, api_key: Optional[str] = None, top_k: int = 60):
 
             # aquery_data returns the new format with status, message, data, and metadata
             if isinstance(response, dict):
-                return QueryDataResponse(**response)
+                # Validated once here, then rendered by orjson without FastAPI's
+                # second validation and jsonable_encoder pass over the context data
+                return FastJSONResponse(QueryDataResponse(**response).model_dump())
             else:
                 # Handle unexpected response format
                 return QueryDataResponse(
@@ -55,6 +55,11 @@ for path in whitelist_paths:
 # Global authentication configuration
 auth_configured = bool(auth_handler.accounts)
 
+# Login accounts allowed to use admin endpoints
+admin_accounts = {
+    name.strip() for name in global_args.admin_accounts.split(",") if name.strip()
+}
+
 
 def get_combined_auth_dependency(api_key: Optional[str] = None):
     """
@@ -166,6 +171,60 @@ def get_combined_auth_dependency(api_key: Optional[str] = None):
     return combined_dependency
 
 
+def get_admin_auth_dependency(api_key: Optional[str] = None):
+    """
+    Create an authentication dependency for admin-only endpoints.
+
+    Admins are API key holders and logged in users listed in ADMIN_ACCOUNTS.
+    Whitelist paths and guest tokens are not accepted. A server without any
+    authentication configured is open, as for every other endpoint.
+
+    Args:
+        api_key (Optional[str]): API key for validation
+
+    Returns:
+        Callable: A dependency function that implements the authentication logic
+    """
+    api_key_configured = bool(api_key)
+
+    oauth2_scheme = OAuth2PasswordBearer(
+        tokenUrl="login", auto_error=False, description="OAuth2 Password Authentication"
+    )
+    api_key_header = None
+    if api_key_configured:
+        api_key_header = APIKeyHeader(
+            name="X-API-Key", auto_error=False, description="API Key Authentication"
+        )
+
+    async def admin_dependency(
+        token: str = Security(oauth2_scheme),
+        api_key_header_value: Optional[str] = None
+        if api_key_header is None
+        else Security(api_key_header),
+    ):
+        if api_key_configured and api_key_header_value == api_key:
+            return
+
+        if token and auth_configured:
+            # Raises 401 for invalid or expired tokens
+            token_info = auth_handler.validate_token(token)
+            if (
+                token_info.get("role") != "guest"
+                and token_info.get("username") in admin_accounts
+            ):
+                return
+
+        if not auth_configured and not api_key_configured:
+            return
+
+        raise HTTPException(
+            status_code=HTTP_403_FORBIDDEN,
+            detail="Admin privileges required.",
+        )
+
+    return admin_dependency
+
+
 def display_splash_screen(args: argparse.Namespace) -> None:
     """
     Display a colorful splash screen showing LightRAG server configuration
@@ -205,6 +264,10 @@ def display_splash_screen(args: argparse.Namespace) -> None:
     ASCIIColors.yellow(f"{args.timeout}")
     ASCIIColors.white("    ├─ CORS Origins: ", end="")
     ASCIIColors.yellow(f"{args.cors_origins}")
+    ASCIIColors.white("    ├─ Compression: ", end="")
+    ASCIIColors.yellow(
+        f"{args.enable_compression} (min {args.compression_min_size} bytes)"
+    )
     ASCIIColors.white("    ├─ SSL Enabled: ", end="")
     ASCIIColors.yellow(f"{args.ssl}")
     if args.ssl:
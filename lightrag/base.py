@@ -16,7 +16,11 @@ from typing import (
     List,
     AsyncIterator,
 )
-from .utils import EmbeddingFunc
+import asyncio
+
+import numpy as np
+
+from .utils import EmbeddingFunc, logger
 from .types import KnowledgeGraph
 from .constants import (
     DEFAULT_TOP_K,
@@ -162,6 +166,11 @@ class QueryParam:
     Default is True to enable reranking when rerank model is available.
     """
 
+    enable_lexical_search: bool = True
+    """Fuse BM25 keyword matches with vector search when retrieving text chunks.
+    Has no effect when the lexical index is disabled on the LightRAG instance.
+    """
+
     include_references: bool = False
     """If True, includes reference list in the response for supported endpoints.
     This parameter controls whether the API response includes a references field
@@ -313,6 +322,67 @@ class BaseVectorStorage(StorageNameSpace, ABC):
         """
         pass
 
+    async def _embed_for_upsert(
+        self, ids: list[str], contents: list[str], batch_size: int
+    ) -> np.ndarray:
+        """Embed contents for an upsert, reusing stored vectors when content is unchanged
+
+        A record whose stored ``content`` equals the new content keeps its
+        existing vector (fetched in bulk via get_vectors_by_ids); only new or
+        changed contents are sent to the embedding function.
+        """
+        reused: dict[int, Any] = {}
+        try:
+            stored_records = await self.get_by_ids(ids)
+            stored_contents = {
+                str(record["id"]): record.get("content")
+                for record in stored_records
+                if record and record.get("id") is not None
+            }
+            unchanged = [
+                i
+                for i, (record_id, content) in enumerate(zip(ids, contents))
+                if stored_contents.get(str(record_id)) == content
+            ]
+            if unchanged:
+                vectors = await self.get_vectors_by_ids([ids[i] for i in unchanged])
+                for i in unchanged:
+                    vector = vectors.get(ids[i])
+                    if (
+                        vector is not None
+                        and len(vector) == self.embedding_func.embedding_dim
+                    ):
+                        reused[i] = vector
+        except Exception as e:
+            logger.debug(
+                f"[{self.workspace}] Vector reuse lookup failed for {self.namespace}, embedding all: {e}"
+            )
+            reused = {}
+
+        pending = [i for i in range(len(contents)) if i not in reused]
+        embedded: dict[int, Any] = {}
+        if pending:
+            batches = [
+                pending[i : i + batch_size] for i in range(0, len(pending), batch_size)
+            ]
+            embeddings_list = await asyncio.gather(
+                *(
+                    self.embedding_func([contents[i] for i in batch])
+                    for batch in batches
+                )
+            )
+            for batch, batch_embeddings in zip(batches, embeddings_list):
+                embedded.update(zip(batch, batch_embeddings))
+        if reused:
+            logger.debug(
+                f"[{self.workspace}] Reused {len(reused)}/{len(contents)} stored vectors in {self.namespace}"
+            )
+
+        return np.array(
+            [reused[i] if i in reused else embedded[i] for i in range(len(contents))],
+            dtype=np.float32,
+        )
+
 
 @dataclass
 class BaseKVStorage(StorageNameSpace, ABC):
@@ -807,6 +877,21 @@ class DeletionResult:
     file_path: str | None = None
 
 
+@dataclass(slots=True)
+class QueryContext:
+    """Per-request state of a single query.
+
+    Kept apart from the (shared, read-only) LightRAG configuration and layered
+    over it only for the duration of one query, see ``LightRAG.query_config``.
+    """
+
+    query_id: str
+    feedback_context: str = ""
+
+    def as_config_overlay(self) -> dict[str, Any]:
+        return {"query_id": self.query_id, "feedback_context": self.feedback_context}
+
+
 # Unified Query Result Data Structures for Reference List Support
 
 
@@ -13,6 +13,10 @@ DEFAULT_MAX_GRAPH_NODES = 1000
 # Default values for extraction settings
 DEFAULT_SUMMARY_LANGUAGE = "English"  # Default language for document processing
 DEFAULT_MAX_GLEANING = 1
+# Gleaning is skipped for terminated first passes on chunks shorter than this
+DEFAULT_GLEANING_SKIP_MIN_TOKENS = 150
+# Gleaning is skipped once it adds less than this share of new entities/relations
+DEFAULT_GLEANING_MIN_YIELD = 0.05
 DEFAULT_ENTITY_NAME_MAX_LENGTH = 256
 
 # Number of description fragments to trigger LLM summary
@@ -47,6 +51,7 @@ DEFAULT_CHUNK_TOP_K = 20
 DEFAULT_MAX_ENTITY_TOKENS = 6000
 DEFAULT_MAX_RELATION_TOKENS = 8000
 DEFAULT_MAX_TOTAL_TOKENS = 30000
+DEFAULT_TOKEN_COUNT_CACHE_SIZE = 20000  # Memoized token counts kept per tokenizer
 DEFAULT_COSINE_THRESHOLD = 0.2
 DEFAULT_RELATED_CHUNK_NUMBER = 5
 DEFAULT_KG_CHUNK_PICK_METHOD = "VECTOR"
@@ -57,6 +62,13 @@ DEFAULT_HISTORY_TURNS = 0
 # Rerank configuration defaults
 DEFAULT_MIN_RERANK_SCORE = 0.0
 DEFAULT_RERANK_BINDING = "null"
+DEFAULT_RERANK_CACHE_TTL = (
+    3600  # Seconds a cached (query, chunk) rerank score stays valid, 0 disables
+)
+DEFAULT_RERANK_CACHE_SIZE = 10000
+DEFAULT_RERANK_MIN_VECTOR_SCORE = (
+    0.0  # Drop vector hits below this score before reranking
+)
 
 # Default source ids limit in meta data for entity and relation
 DEFAULT_MAX_SOURCE_IDS_PER_ENTITY = 300
@@ -86,10 +98,36 @@ DEFAULT_TEMPERATURE = 1.0
 # Async configuration defaults
 DEFAULT_MAX_ASYNC = 4  # Default maximum async operations
 DEFAULT_MAX_PARALLEL_INSERT = 2  # Default maximum parallel insert operations
+DEFAULT_DELETION_BATCH_SIZE = 50  # Default documents per batch deletion step
+# Worker pools of the staged indexing pipeline (extract and merge use MAX_PARALLEL_INSERT)
+DEFAULT_PIPELINE_PREPARE_WORKERS = 4  # Loading and chunking documents
+DEFAULT_PIPELINE_EMBED_WORKERS = 2  # Embedding and persisting chunks
+DEFAULT_PIPELINE_MAX_INFLIGHT_DOCS = (
+    0  # Documents in flight, 0 means 4 * MAX_PARALLEL_INSERT
+)
+DEFAULT_CHUNK_FAST_PATH_FLUSH_DELAY = 1.0  # Seconds to coalesce fast path flushes
 
 # Embedding configuration defaults
 DEFAULT_EMBEDDING_FUNC_MAX_ASYNC = 8  # Default max async for embedding functions
 DEFAULT_EMBEDDING_BATCH_NUM = 10  # Default batch size for embedding computations
+DEFAULT_EMBEDDING_BATCH_WAIT_MS = (
+    5  # Window for coalescing concurrent embedding calls, 0 disables
+)
+
+# Seconds to batch feedback submissions before they are flushed to disk
+DEFAULT_FEEDBACK_FLUSH_DELAY = 2.0
+
+# Per-stage query timings returned in query metadata, optional OpenTelemetry export
+DEFAULT_ENABLE_QUERY_TRACING = True
+DEFAULT_QUERY_TRACING_OTEL = False
+
+# Storage latency metrics and how often each worker publishes metrics for /metrics
+DEFAULT_ENABLE_METRICS = True
+DEFAULT_METRICS_PUBLISH_INTERVAL = 5.0
+
+# Compress API responses above this many bytes with brotli or gzip
+DEFAULT_ENABLE_COMPRESSION = True
+DEFAULT_COMPRESSION_MIN_SIZE = 1024
 
 # Gunicorn worker timeout
 DEFAULT_TIMEOUT = 300
@@ -0,0 +1,253 @@
+"""
+User feedback store with an in-memory digest.
+
+Feedback records are written to the ``feedback`` KV storage right away, but
+the storage is flushed to disk with a debounce, so bursts of submissions cost
+one write. The prompt context built from recent feedback and per-cluster
+like/dislike statistics are kept as a digest in shared namespace data: it is
+updated incrementally when feedback is written and read by queries without
+touching storage (and is visible to every worker process).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+from typing import Any
+
+from lightrag.base import BaseKVStorage
+from lightrag.kg.shared_storage import get_namespace_data, get_namespace_lock
+from lightrag.utils import logger
+
+FEEDBACK_DIGEST_NAMESPACE = "feedback_digest"
+RECENT_HISTORY_KEY = "recent_history"
+STATS_KEY = "feedback_stats"
+NO_FEEDBACK_CONTEXT = "暂无反馈记录。"
+
+# Number of recent feedback records kept for the prompt context
+RECENT_HISTORY_LIMIT = 10
+# Upper bound of tracked query clusters; the least used ones are evicted
+MAX_FEEDBACK_CLUSTERS = 1000
+
+_CLUSTER_TERM_PATTERN = re.compile(r"[一-鿿]|[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by do does for from how in is it of on or the to "
+    "was what when where which who why with 的 了 是 吗 呢 什 么 怎 样 如 何".split()
+)
+
+
+def feedback_cluster_key(query: str | None, max_terms: int = 4) -> str:
+    """Group queries by their most specific terms.
+
+    Queries sharing the same longest (non stop-word) terms land in the same
+    cluster regardless of word order, casing or punctuation.
+    """
+    terms = {
+        term
+        for term in _CLUSTER_TERM_PATTERN.findall((query or "").lower())
+        if term not in _STOPWORDS
+    }
+    if not terms:
+        return "_empty"
+    selected = sorted(terms, key=lambda term: (-len(term), term))[:max_terms]
+    return " ".join(sorted(selected))
+
+
+def _sanitize(text: str) -> str:
+    # 1. 替换 XML 标签字符，防止闭合标签攻击
+    # 2. 移除换行符，防止破坏 Prompt 结构
+    return text.replace("<", "[").replace(">", "]").replace("\n", " ")
+
+
+def format_feedback_context(recent: list[dict[str, Any]], limit: int = 3) -> str:
+    """Format the most recent feedback records as prompt text"""
+    context_lines = []
+    # 倒序取最近的
+    for item in reversed(recent):
+        if len(context_lines) >= limit:
+            break
+        if not isinstance(item, dict):
+            continue
+
+        f_type = (item.get("feedback_type") or "").lower()
+        raw_comment = item.get("comment", "无评论")
+        comment = _sanitize(raw_comment) if raw_comment else "无评论"
+        q = _sanitize(item.get("query") or "")
+
+        if f_type == "dislike":
+            context_lines.append(
+                f"- [用户不满/Dislike] 问题: '{q}'。原因/建议: {comment}。请避免此类错误。"
+            )
+        elif f_type == "like":
+            context_lines.append(
+                f"- [用户点赞/Like] 问题: '{q}'。原因: {comment}。请保持这种回答方式。"
+            )
+
+    return "\n".join(context_lines) if context_lines else NO_FEEDBACK_CONTEXT
+
+
+def _empty_stats() -> dict[str, Any]:
+    return {"totals": {"like": 0, "dislike": 0}, "clusters": {}}
+
+
+def _add_to_stats(stats: dict[str, Any], feedback: dict[str, Any]) -> dict[str, Any]:
+    """Return a copy of ``stats`` with one more feedback record counted"""
+    f_type = (feedback.get("feedback_type") or "").lower()
+    if f_type not in ("like", "dislike"):
+        return stats
+    totals = dict(stats["totals"])
+    totals[f_type] = totals.get(f_type, 0) + 1
+    clusters = dict(stats["clusters"])
+    key = feedback_cluster_key(feedback.get("query"))
+    cluster = dict(clusters.get(key) or {"like": 0, "dislike": 0, "sample_query": None})
+    cluster[f_type] += 1
+    cluster["sample_query"] = feedback.get("query") or cluster["sample_query"]
+    cluster["last_at"] = feedback.get("created_at")
+    clusters.pop(key, None)
+    clusters[key] = cluster  # most recently updated clusters are kept last
+    if len(clusters) > MAX_FEEDBACK_CLUSTERS:
+        clusters.pop(next(iter(clusters)))
+    return {"totals": totals, "clusters": clusters}
+
+
+def _with_rates(counts: dict[str, Any]) -> dict[str, Any]:
+    total = counts.get("like", 0) + counts.get("dislike", 0)
+    return {
+        **counts,
+        "total": total,
+        "like_rate": round(counts.get("like", 0) / total, 4) if total else None,
+        "dislike_rate": round(counts.get("dislike", 0) / total, 4) if total else None,
+    }
+
+
+class FeedbackStore:
+    """Feedback persistence with a shared in-memory digest for prompt injection"""
+
+    def __init__(
+        self,
+        storage: BaseKVStorage,
+        workspace: str,
+        flush_delay: float = 2.0,
+        context_limit: int = 3,
+    ):
+        self.storage = storage
+        self.workspace = workspace
+        self.flush_delay = flush_delay
+        self.context_limit = context_limit
+        self._digest: dict[str, Any] | None = None
+        self._flush_task: asyncio.Task | None = None
+
+    async def _get_digest(self) -> dict[str, Any]:
+        if self._digest is None:
+            self._digest = await get_namespace_data(
+                FEEDBACK_DIGEST_NAMESPACE, workspace=self.workspace
+            )
+        return self._digest
+
+    def _lock(self):
+        return get_namespace_lock(FEEDBACK_DIGEST_NAMESPACE, workspace=self.workspace)
+
+    async def load(self) -> None:
+        """Build the digest from storage once; later updates are incremental"""
+        digest = await self._get_digest()
+        async with self._lock():
+            if digest.get("loaded"):
+                return
+            wrapper = await self.storage.get_by_id(RECENT_HISTORY_KEY)
+            recent = (
+                wrapper["data"]
+                if isinstance(wrapper, dict) and isinstance(wrapper.get("data"), list)
+                else []
+            )
+            stats = await self.storage.get_by_id(STATS_KEY)
+            if not (isinstance(stats, dict) and "clusters" in stats):
+                # Older stores have no aggregates yet; start from the recent records
+                stats = _empty_stats()
+                for item in recent:
+                    if isinstance(item, dict):
+                        stats = _add_to_stats(stats, item)
+            digest.update(
+                {
+                    "recent": recent[-RECENT_HISTORY_LIMIT:],
+                    "context": format_feedback_context(recent, self.context_limit),
+                    "stats": {
+                        "totals": stats["totals"],
+                        "clusters": stats["clusters"],
+                    },
+                    "loaded": True,
+                }
+            )
+
+    async def submit(self, query_id: str, feedback_data: dict[str, Any]) -> None:
+        """Store one feedback record and update the digest incrementally"""
+        digest = await self._get_digest()
+        if not digest.get("loaded"):
+            await self.load()
+        async with self._lock():
+            recent = (list(digest.get("recent") or []) + [feedback_data])[
+                -RECENT_HISTORY_LIMIT:
+            ]
+            stats = _add_to_stats(digest.get("stats") or _empty_stats(), feedback_data)
+            # Values are reassigned as a whole so shared Manager dicts propagate them
+            digest["recent"] = recent
+            digest["stats"] = stats
+            digest["context"] = format_feedback_context(recent, self.context_limit)
+
+            # 将列表包装在字典 {"data": ...} 中，满足 JsonKVStorage 的要求
+            await self.storage.upsert(
+                {
+                    query_id: feedback_data,
+                    RECENT_HISTORY_KEY: {"data": recent},
+                    STATS_KEY: stats,
+                }
+            )
+        self._schedule_flush()
+
+    def context(self) -> str:
+        """Prompt text built from recent feedback; never touches storage"""
+        if self._digest is None:
+            return NO_FEEDBACK_CONTEXT
+        return self._digest.get("context") or NO_FEEDBACK_CONTEXT
+
+    def recent(self) -> list[dict[str, Any]]:
+        """Most recent feedback records, oldest first"""
+        return list((self._digest or {}).get("recent") or [])
+
+    def stats(self) -> dict[str, Any]:
+        """Like/dislike counts and rates, overall and per query cluster"""
+        stats = (self._digest or {}).get("stats") or _empty_stats()
+        return {
+            "totals": _with_rates(stats["totals"]),
+            "clusters": {
+                key: _with_rates(cluster) for key, cluster in stats["clusters"].items()
+            },
+        }
+
+    def _schedule_flush(self) -> None:
+        if self.flush_delay <= 0:
+            self._flush_task = asyncio.create_task(self.flush())
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self.flush_delay)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Persist pending feedback records to disk"""
+        try:
+            await self.storage.index_done_callback()
+        except Exception as e:
+            logger.error(f"Failed to persist feedback: {e}")
+
+    async def close(self) -> None:
+        """Flush pending writes and stop the debounce timer"""
+        task, self._flush_task = self._flush_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
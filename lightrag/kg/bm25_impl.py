@@ -0,0 +1,260 @@
+import asyncio
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, final
+
+from lightrag.base import StorageNameSpace
+from lightrag.utils import load_json, logger, write_json
+from .shared_storage import (
+    get_namespace_lock,
+    get_update_flag,
+    set_all_update_flags,
+)
+
+# Characters of scripts written without spaces between words (kana, CJK, hangul)
+_CJK_RANGES = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+# CJK runs, or words made of letters/digits joined by identifier punctuation
+# (keeps part numbers, error codes and API names such as "ab-12.3" or "foo_bar")
+_TOKEN_PATTERN = re.compile(
+    f"(?P<cjk>[{_CJK_RANGES}]+)"
+    f"|(?P<word>[^\\W_{_CJK_RANGES}]+(?:[._\\-/:#][^\\W_{_CJK_RANGES}]+)*)"
+)
+_WORD_SPLIT_PATTERN = re.compile(r"[._\-/:#]+")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Query terms found in more than this share of the chunks (CJK characters such
+# as 的 or 是) are skipped when the query has rarer terms: their idf is below
+# ln(4), yet walking their postings costs time linear in the corpus size
+BM25_MAX_DF_RATIO = 0.25
+
+
+def tokenize_for_bm25(text: str) -> list[str]:
+    """Split text into BM25 terms.
+
+    Latin/numeric words are lowercased; compound identifiers are kept whole and
+    also split into their parts. CJK runs are indexed as character unigrams and
+    bigrams, since they carry no word boundaries.
+    """
+    terms: list[str] = []
+    for match in _TOKEN_PATTERN.finditer(text.lower()):
+        cjk = match.group("cjk")
+        if cjk:
+            terms.extend(cjk)
+            terms.extend(cjk[i : i + 2] for i in range(len(cjk) - 1))
+            continue
+        word = match.group("word")
+        terms.append(word)
+        parts = _WORD_SPLIT_PATTERN.split(word)
+        if len(parts) > 1:
+            terms.extend(part for part in parts if part)
+    return terms
+
+
+class BM25Index:
+    """In-memory BM25 inverted index over documents identified by string ids"""
+
+    def __init__(self):
+        self.doc_terms: dict[str, dict[str, int]] = {}
+        self.doc_lengths: dict[str, int] = {}
+        self.postings: dict[str, dict[str, int]] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.doc_terms
+
+    def add(self, doc_id: str, text: str) -> None:
+        self.add_terms(doc_id, dict(Counter(tokenize_for_bm25(text))))
+
+    def add_terms(self, doc_id: str, term_freqs: dict[str, int]) -> None:
+        if doc_id in self.doc_terms:
+            self.remove(doc_id)
+        self.doc_terms[doc_id] = term_freqs
+        length = sum(term_freqs.values())
+        self.doc_lengths[doc_id] = length
+        self.total_length += length
+        for term, freq in term_freqs.items():
+            self.postings.setdefault(term, {})[doc_id] = freq
+
+    def remove(self, doc_id: str) -> bool:
+        term_freqs = self.doc_terms.pop(doc_id, None)
+        if term_freqs is None:
+            return False
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        for term in term_freqs:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
+        return True
+
+    def search(self, query: str, top_k: int) -> list[tuple[str, float]]:
+        """Return up to ``top_k`` (doc_id, score) pairs, best first"""
+        doc_count = len(self.doc_terms)
+        if not doc_count or top_k <= 0:
+            return []
+        avg_length = self.total_length / doc_count or 1.0
+        postings = [
+            posting
+            for posting in map(self.postings.get, set(tokenize_for_bm25(query)))
+            if posting
+        ]
+        max_df = BM25_MAX_DF_RATIO * doc_count
+        if any(len(posting) <= max_df for posting in postings):
+            postings = [posting for posting in postings if len(posting) <= max_df]
+        scores: dict[str, float] = {}
+        for posting in postings:
+            df = len(posting)
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            for doc_id, freq in posting.items():
+                norm = BM25_K1 * (
+                    1 - BM25_B + BM25_B * self.doc_lengths[doc_id] / avg_length
+                )
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (
+                    BM25_K1 + 1
+                ) / (freq + norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:top_k]
+
+
+@final
+@dataclass
+class BM25ChunkIndex(StorageNameSpace):
+    """BM25 index over text chunks, persisted as a JSON file next to other storages.
+
+    Like NetworkXStorage, each process keeps the index in memory and reloads it
+    when another process signals an update.
+    """
+
+    def __post_init__(self):
+        working_dir = self.global_config["working_dir"]
+        if self.workspace:
+            workspace_dir = os.path.join(working_dir, self.workspace)
+        else:
+            workspace_dir = working_dir
+            self.workspace = ""
+        os.makedirs(workspace_dir, exist_ok=True)
+        self._file_name = os.path.join(workspace_dir, f"{self.namespace}.json")
+        self._storage_lock = None
+        self.storage_updated = None
+        self._dirty = False
+        # Serializes index mutations with searches scored in a worker thread
+        self._index_lock = asyncio.Lock()
+        self._index = self._load_index()
+        # True when no index file existed, so earlier chunks still need indexing
+        self.needs_backfill = not os.path.exists(self._file_name)
+
+    def _load_index(self) -> BM25Index:
+        index = BM25Index()
+        data = load_json(self._file_name) or {}
+        for doc_id, term_freqs in data.get("docs", {}).items():
+            index.add_terms(doc_id, term_freqs)
+        if len(index):
+            logger.info(
+                f"[{self.workspace}] Loaded BM25 index {self._file_name} with {len(index)} chunks"
+            )
+        return index
+
+    async def initialize(self):
+        """Initialize storage data"""
+        self.storage_updated = await get_update_flag(
+            self.namespace, workspace=self.workspace
+        )
+        self._storage_lock = get_namespace_lock(
+            self.namespace, workspace=self.workspace
+        )
+
+    async def _get_index(self) -> BM25Index:
+        """Check if the index should be reloaded"""
+        async with self._storage_lock:
+            if self.storage_updated.value:
+                logger.info(
+                    f"[{self.workspace}] Process {os.getpid()} reloading BM25 index {self._file_name} due to modifications by another process"
+                )
+                self._index = self._load_index()
+                self._dirty = False
+                self.storage_updated.value = False
+            return self._index
+
+    async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
+        """Index chunks given as ``{chunk_id: {"content": ...}}``
+
+        Importance notes:
+        1. Changes will be persisted to disk during the next index_done_callback
+        2. Only one process should updating the storage at a time before index_done_callback
+        """
+        index = await self._get_index()
+        async with self._index_lock:
+            for chunk_id, chunk in data.items():
+                content = chunk.get("content")
+                if content:
+                    index.add(chunk_id, content)
+                    self._dirty = True
+
+    async def delete(self, ids) -> None:
+        """Remove chunks from the index"""
+        index = await self._get_index()
+        async with self._index_lock:
+            for chunk_id in ids:
+                if index.remove(chunk_id):
+                    self._dirty = True
+
+    async def search(self, query: str, top_k: int) -> list[tuple[str, float]]:
+        """Return up to ``top_k`` (chunk_id, bm25_score) pairs, best first"""
+        index = await self._get_index()
+        # Scoring walks postings that grow with the corpus; keep it off the event loop
+        async with self._index_lock:
+            return await asyncio.to_thread(index.search, query, top_k)
+
+    async def index_done_callback(self) -> bool:
+        """Save data to disk"""
+        async with self._storage_lock:
+            if self.storage_updated.value:
+                # Storage was updated by another process, reload data instead of saving
+                logger.info(
+                    f"[{self.workspace}] BM25 index was updated by another process, reloading..."
+                )
+                self._index = self._load_index()
+                self._dirty = False
+                self.storage_updated.value = False
+                return False
+
+            if not self._dirty and os.path.exists(self._file_name):
+                return True
+            try:
+                write_json({"docs": self._index.doc_terms}, self._file_name)
+                self._dirty = False
+                self.needs_backfill = False
+                await set_all_update_flags(self.namespace, workspace=self.workspace)
+                self.storage_updated.value = False
+                return True
+            except Exception as e:
+                logger.error(f"[{self.workspace}] Error saving BM25 index: {e}")
+                return False
+
+    async def drop(self) -> dict[str, str]:
+        """Drop all indexed chunks and remove the index file"""
+        try:
+            async with self._storage_lock:
+                if os.path.exists(self._file_name):
+                    os.remove(self._file_name)
+                self._index = BM25Index()
+                self._dirty = False
+                await set_all_update_flags(self.namespace, workspace=self.workspace)
+                self.storage_updated.value = False
+                logger.info(
+                    f"[{self.workspace}] Process {os.getpid()} drop BM25 index:{self._file_name}"
+                )
+            return {"status": "success", "message": "data dropped"}
+        except Exception as e:
+            logger.error(
+                f"[{self.workspace}] Error dropping BM25 index:{self._file_name}: {e}"
+            )
+            return {"status": "error", "message": str(e)}
@@ -1,6 +1,5 @@
 import os
 import time
-import asyncio
 from typing import Any, final
 import json
 import numpy as np
@@ -130,17 +129,10 @@ class FaissVectorDBStorage(BaseVectorStorage):
             list_data.append(meta)
             contents.append(v["content"])
 
-        # Split into batches for embedding if needed
-        batches = [
-            contents[i : i + self._max_batch_size]
-            for i in range(0, len(contents), self._max_batch_size)
-        ]
-
-        embedding_tasks = [self.embedding_func(batch) for batch in batches]
-        embeddings_list = await asyncio.gather(*embedding_tasks)
-
-        # Flatten the list of arrays
-        embeddings = np.concatenate(embeddings_list, axis=0)
+        # Execute embedding outside of lock; unchanged contents reuse stored vectors
+        embeddings = await self._embed_for_upsert(
+            list(data.keys()), contents, self._max_batch_size
+        )
         if len(embeddings) != len(list_data):
             logger.error(
                 f"[{self.workspace}] Embedding size mismatch. Embeddings: {len(embeddings)}, Data: {len(list_data)}"
@@ -1,4 +1,7 @@
+import asyncio
+from bisect import bisect_left, insort
 from dataclasses import dataclass
+from enum import Enum
 import os
 from typing import Any, Union, final
 
@@ -12,6 +15,7 @@ from lightrag.utils import (
     logger,
     write_json,
     get_pinyin_sort_key,
+    TrigramIndex,
 )
 from lightrag.exceptions import StorageNotInitializedError
 from .shared_storage import (
@@ -24,6 +28,162 @@ from .shared_storage import (
     try_initialize_namespace,
 )
 
+SORT_FIELDS = ("created_at", "updated_at", "id", "file_path")
+
+# Writes remembered in the shared generation record, so stale indexes of other
+# processes can replay the changed doc ids instead of rebuilding from scratch
+INDEX_CHANGE_LOG_SIZE = 64
+# Writes touching more documents are logged without ids and force a rebuild
+INDEX_CHANGE_MAX_IDS = 1000
+
+
+def _file_extension(file_path: str) -> str:
+    """Lowercase suffix starting at the last dot, e.g. 'a/b.PDF' -> '.pdf'"""
+    pos = file_path.rfind(".")
+    return file_path[pos:].lower() if pos >= 0 else ""
+
+
+def _to_doc_processing_status(doc_data: dict[str, Any]) -> DocProcessingStatus:
+    # Make a copy of the data to avoid modifying the original
+    data = doc_data.copy()
+    # Remove deprecated content field if it exists
+    data.pop("content", None)
+    # If file_path is not in data, use document id as file path
+    if "file_path" not in data:
+        data["file_path"] = "no-file-path"
+    # Ensure new fields exist with default values
+    if "metadata" not in data:
+        data["metadata"] = {}
+    if "error_msg" not in data:
+        data["error_msg"] = None
+    return DocProcessingStatus(**data)
+
+
+class _DocStatusIndex:
+    """In-memory secondary indexes over the doc status records of one process.
+
+    Sets are represented by insertion-ordered dicts so lookups keep the order
+    in which documents were stored. Sorted views hold ``(sort_key, doc_id)``
+    tuples kept in order with bisect on every upsert and delete.
+    """
+
+    def __init__(self):
+        self.generation: int | None = None
+        self.by_status: dict[str, dict[str, None]] = {}
+        self.by_track: dict[str, dict[str, None]] = {}
+        self.by_file_path: dict[str, dict[str, None]] = {}
+        self.by_ext: dict[str, dict[str, None]] = {}
+        self.sorted: dict[str, list[tuple[str, str]]] = {f: [] for f in SORT_FIELDS}
+        self.sort_keys: dict[str, dict[str, str]] = {}
+        self.entries: dict[str, tuple[str, str | None, str, str]] = {}
+        self.keywords = TrigramIndex()
+
+    @staticmethod
+    def _add_to(index: dict[str, dict[str, None]], key, doc_id: str) -> None:
+        bucket = index.get(key)
+        if bucket is None:
+            bucket = index[key] = {}
+        bucket[doc_id] = None
+
+    @staticmethod
+    def _remove_from(index: dict[str, dict[str, None]], key, doc_id: str) -> None:
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(doc_id, None)
+            if not bucket:
+                del index[key]
+
+    @classmethod
+    def build(
+        cls, data, previous: "_DocStatusIndex | None" = None
+    ) -> "_DocStatusIndex":
+        """Bulk-build indexes over ``data`` with a single sort per sorted view.
+
+        Pinyin file path keys of documents whose file path is unchanged are
+        reused from ``previous``.
+        """
+        index = cls()
+        sorted_views: dict[str, list[tuple[str, str]]] = {f: [] for f in SORT_FIELDS}
+        for doc_id, doc_data in data.items():
+            file_path_key = None
+            if previous is not None:
+                entry = previous.entries.get(doc_id)
+                if (
+                    entry is not None
+                    and doc_data.get("file_path")
+                    and (entry[2] == doc_data["file_path"])
+                ):
+                    file_path_key = previous.sort_keys[doc_id]["file_path"]
+            sort_keys = index._index_doc(doc_id, doc_data, file_path_key)
+            for field, key in sort_keys.items():
+                sorted_views[field].append((key, doc_id))
+        for view in sorted_views.values():
+            view.sort()
+        index.sorted = sorted_views
+        return index
+
+    def add(self, doc_id: str, doc_data: dict[str, Any]) -> None:
+        if doc_id in self.entries:
+            self.remove(doc_id)
+        sort_keys = self._index_doc(doc_id, doc_data)
+        for field, key in sort_keys.items():
+            insort(self.sorted[field], (key, doc_id))
+
+    def _index_doc(
+        self, doc_id: str, doc_data: dict[str, Any], file_path_key: str | None = None
+    ) -> dict[str, str]:
+        """Add a new document to every index except the sorted views"""
+        status = doc_data.get("status")
+        if isinstance(status, Enum):
+            status = status.value
+        track_id = doc_data.get("track_id")
+        raw_file_path = doc_data.get("file_path")
+        file_path = raw_file_path or ""
+        ext = _file_extension(file_path)
+        self.entries[doc_id] = (status, track_id, file_path, ext)
+
+        self._add_to(self.by_status, status, doc_id)
+        if track_id:
+            self._add_to(self.by_track, track_id, doc_id)
+        if raw_file_path is not None:
+            self._add_to(self.by_file_path, raw_file_path, doc_id)
+        self._add_to(self.by_ext, ext, doc_id)
+
+        if file_path_key is None:
+            # Use pinyin sorting for file_path field to support Chinese characters
+            file_path_key = get_pinyin_sort_key(
+                doc_data.get("file_path", "no-file-path")
+            )
+        sort_keys = {
+            "created_at": str(doc_data.get("created_at") or ""),
+            "updated_at": str(doc_data.get("updated_at") or ""),
+            "id": doc_id,
+            "file_path": file_path_key,
+        }
+        self.sort_keys[doc_id] = sort_keys
+
+        self.keywords.add(doc_id, doc_id, file_path, doc_data.get("content_summary"))
+        return sort_keys
+
+    def remove(self, doc_id: str) -> None:
+        entry = self.entries.pop(doc_id, None)
+        if entry is None:
+            return
+        status, track_id, file_path, ext = entry
+        self._remove_from(self.by_status, status, doc_id)
+        if track_id:
+            self._remove_from(self.by_track, track_id, doc_id)
+        self._remove_from(self.by_file_path, file_path, doc_id)
+        self._remove_from(self.by_ext, ext, doc_id)
+
+        for field, key in self.sort_keys.pop(doc_id).items():
+            ordered = self.sorted[field]
+            pos = bisect_left(ordered, (key, doc_id))
+            if pos < len(ordered) and ordered[pos] == (key, doc_id):
+                del ordered[pos]
+
+        self.keywords.remove(doc_id)
+
 
 @final
 @dataclass
@@ -45,6 +205,8 @@ class JsonDocStatusStorage(DocStatusStorage):
         self._data = None
         self._storage_lock = None
         self.storage_updated = None
+        self._index = _DocStatusIndex()
+        self._index_meta = None
 
     async def initialize(self):
         """Initialize storage data"""
@@ -62,14 +224,119 @@ class JsonDocStatusStorage(DocStatusStorage):
             self._data = await get_namespace_data(
                 self.namespace, workspace=self.workspace
             )
+            # Shared generation counter telling each process (and each storage
+            # instance) when its secondary indexes are stale
+            self._index_meta = await get_namespace_data(
+                f"{self.namespace}_index_meta", workspace=self.workspace
+            )
             if need_init:
                 loaded_data = load_json(self._file_name) or {}
                 async with self._storage_lock:
                     self._data.update(loaded_data)
+                    self._bump_index_generation()
                     logger.info(
                         f"[{self.workspace}] Process {os.getpid()} doc status load {self.namespace} with {len(loaded_data)} records"
                     )
 
+    def _shared_generation(self) -> int:
+        return (
+            self._index_meta.get("generation", 0) if self._index_meta is not None else 0
+        )
+
+    def _catch_up_index(self) -> bool:
+        """Bring the local index up to date by replaying logged writes.
+
+        Returns False when a full rebuild is needed. Must be called while
+        holding the storage lock.
+        """
+        generation = self._shared_generation()
+        local = self._index.generation
+        if local is None or local > generation:
+            return False
+        if local < generation:
+            changes = [
+                doc_ids
+                for change_generation, doc_ids in self._index_meta.get("changes", ())
+                if change_generation > local
+            ]
+            if len(changes) != generation - local or any(
+                doc_ids is None for doc_ids in changes
+            ):
+                return False
+            for doc_ids in changes:
+                for doc_id in doc_ids:
+                    doc_data = self._data.get(doc_id)
+                    if doc_data is None:
+                        self._index.remove(doc_id)
+                    else:
+                        self._index.add(doc_id, doc_data)
+            self._index.generation = generation
+        # The size check also catches records written directly into _data
+        return len(self._index.entries) == len(self._data)
+
+    def _sync_index(self) -> None:
+        """Update secondary indexes if another writer changed the data.
+
+        Must be called while holding the storage lock.
+        """
+        if not self._catch_up_index():
+            generation = self._shared_generation()
+            self._index = _DocStatusIndex.build(self._data, previous=self._index)
+            self._index.generation = generation
+
+    async def _refresh_index(self) -> None:
+        """Rebuild stale indexes from a snapshot without holding the storage lock.
+
+        Writes by other processes are normally replayed from the change log.
+        When they cannot be (the log was truncated, or a write touched too many
+        documents), the index is rebuilt in a worker thread from a snapshot, so
+        other readers and writers are not blocked meanwhile. Writes that land
+        during the build are replayed afterwards by ``_sync_index``.
+        """
+        if self._storage_lock is None:
+            raise StorageNotInitializedError("JsonDocStatusStorage")
+        if self._index.generation == self._shared_generation() and len(
+            self._index.entries
+        ) == len(self._data):
+            return
+        async with self._storage_lock:
+            if self._catch_up_index():
+                return
+            generation = self._shared_generation()
+            # One round trip for multiprocessing Manager dicts
+            snapshot = (
+                self._data._getvalue()
+                if hasattr(self._data, "_getvalue")
+                else dict(self._data)
+            )
+            previous = self._index
+        index = await asyncio.to_thread(_DocStatusIndex.build, snapshot, previous)
+        index.generation = generation
+        async with self._storage_lock:
+            # Keep an index a concurrent refresh installed if it is newer
+            if self._index is previous:
+                self._index = index
+
+    def _bump_index_generation(self, doc_ids=None) -> None:
+        """Mark indexes of other instances stale after a write by this one.
+
+        ``doc_ids`` are the documents the write touched, None if unknown. Must
+        be called while holding the storage lock, after the local index has
+        been updated to reflect the write.
+        """
+        if self._index_meta is None:
+            return
+        generation = self._index_meta.get("generation", 0) + 1
+        if doc_ids is not None and len(doc_ids) > INDEX_CHANGE_MAX_IDS:
+            doc_ids = None
+        changes = list(self._index_meta.get("changes", ()))
+        changes.append((generation, list(doc_ids) if doc_ids is not None else None))
+        # Reassign whole values so they propagate through Manager dicts
+        self._index_meta["changes"] = changes[-INDEX_CHANGE_LOG_SIZE:]
+        self._index_meta["generation"] = generation
+        if self._index.generation == generation - 1:
+            self._index.generation = generation
+
     async def filter_keys(self, keys: set[str]) -> set[str]:
         """Return keys that should be processed (not in storage or not successfully processed)"""
         if self._storage_lock is None:
@@ -95,68 +362,47 @@ class JsonDocStatusStorage(DocStatusStorage):
         counts = {status.value: 0 for status in DocStatus}
         if self._storage_lock is None:
             raise StorageNotInitializedError("JsonDocStatusStorage")
+        await self._refresh_index()
         async with self._storage_lock:
-            for doc in self._data.values():
-                counts[doc["status"]] += 1
+            self._sync_index()
+            for status, doc_ids in self._index.by_status.items():
+                counts[status] = counts.get(status, 0) + len(doc_ids)
         return counts
 
     async def get_docs_by_status(
         self, status: DocStatus
     ) -> dict[str, DocProcessingStatus]:
         """Get all documents with a specific status"""
-        result = {}
+        await self._refresh_index()
         async with self._storage_lock:
-            for k, v in self._data.items():
-                if v["status"] == status.value:
-                    try:
-                        # Make a copy of the data to avoid modifying the original
-                        data = v.copy()
-                        # Remove deprecated content field if it exists
-                        data.pop("content", None)
-                        # If file_path is not in data, use document id as file path
-                        if "file_path" not in data:
-                            data["file_path"] = "no-file-path"
-                        # Ensure new fields exist with default values
-                        if "metadata" not in data:
-                            data["metadata"] = {}
-                        if "error_msg" not in data:
-                            data["error_msg"] = None
-                        result[k] = DocProcessingStatus(**data)
-                    except KeyError as e:
-                        logger.error(
-                            f"[{self.workspace}] Missing required field for document {k}: {e}"
-                        )
-                        continue
+            self._sync_index()
+            doc_ids = list(self._index.by_status.get(status.value, ()))
+            return self._collect_docs(doc_ids)
+
+    def _collect_docs(self, doc_ids: list[str]) -> dict[str, DocProcessingStatus]:
+        result = {}
+        for k in doc_ids:
+            v = self._data.get(k)
+            if v is None:
+                continue
+            try:
+                result[k] = _to_doc_processing_status(v)
+            except KeyError as e:
+                logger.error(
+                    f"[{self.workspace}] Missing required field for document {k}: {e}"
+                )
+                continue
         return result
 
     async def get_docs_by_track_id(
         self, track_id: str
     ) -> dict[str, DocProcessingStatus]:
         """Get all documents with a specific track_id"""
-        result = {}
+        await self._refresh_index()
         async with self._storage_lock:
-            for k, v in self._data.items():
-                if v.get("track_id") == track_id:
-                    try:
-                        # Make a copy of the data to avoid modifying the original
-                        data = v.copy()
-                        # Remove deprecated content field if it exists
-                        data.pop("content", None)
-                        # If file_path is not in data, use document id as file path
-                        if "file_path" not in data:
-                            data["file_path"] = "no-file-path"
-                        # Ensure new fields exist with default values
-                        if "metadata" not in data:
-                            data["metadata"] = {}
-                        if "error_msg" not in data:
-                            data["error_msg"] = None
-                        result[k] = DocProcessingStatus(**data)
-                    except KeyError as e:
-                        logger.error(
-                            f"[{self.workspace}] Missing required field for document {k}: {e}"
-                        )
-                        continue
-        return result
+            self._sync_index()
+            doc_ids = list(self._index.by_track.get(track_id, ()))
+            return self._collect_docs(doc_ids)
 
     async def index_done_callback(self) -> None:
         async with self._storage_lock:
@@ -180,6 +426,10 @@ class JsonDocStatusStorage(DocStatusStorage):
                     if cleaned_data is not None:
                         self._data.clear()
                         self._data.update(cleaned_data)
+                        self._index = _DocStatusIndex.build(
+                            self._data, previous=self._index
+                        )
+                        self._bump_index_generation()
 
                 await clear_all_update_flags(self.namespace, workspace=self.workspace)
 
@@ -196,12 +446,17 @@ class JsonDocStatusStorage(DocStatusStorage):
         )
         if self._storage_lock is None:
             raise StorageNotInitializedError("JsonDocStatusStorage")
+        await self._refresh_index()
         async with self._storage_lock:
+            self._sync_index()
             # Ensure chunks_list field exists for new documents
             for doc_id, doc_data in data.items():
                 if "chunks_list" not in doc_data:
                     doc_data["chunks_list"] = []
             self._data.update(data)
+            for doc_id, doc_data in data.items():
+                self._index.add(doc_id, doc_data)
+            self._bump_index_generation(data.keys())
             await set_all_update_flags(self.namespace, workspace=self.workspace)
 
         await self.index_done_callback()
@@ -274,92 +529,108 @@ class JsonDocStatusStorage(DocStatusStorage):
                     clean_type if clean_type.startswith(".") else f".{clean_type}"
                 )
 
-        # For JSON storage, we load all data and sort/filter in memory
-        all_docs = []
+        reverse_sort = sort_direction.lower() == "desc"
+        start_idx = (page - 1) * page_size
+        end_idx = start_idx + page_size
 
+        await self._refresh_index()
         async with self._storage_lock:
-            for doc_id, doc_data in self._data.items():
-                # 1. Apply status filter
-                if (
-                    status_filter is not None
-                    and doc_data.get("status") != status_filter.value
-                ):
-                    continue
-
-                # 2. Apply file type filter
-                if target_ext:
-                    file_path = doc_data.get("file_path", "")
-                    # 检查文件名是否以指定后缀结尾 (不区分大小写)
-                    if not file_path.lower().endswith(target_ext):
-                        continue
-
-                # 3. Apply keyword filter
-                if search_term:
-                    # Check ID match
-                    id_match = search_term in doc_id.lower()
-
-                    # Check file path match
-                    file_path = doc_data.get("file_path", "")
-                    path_match = file_path and search_term in file_path.lower()
-
-                    # Check content summary match
-                    summary = doc_data.get("content_summary", "")
-                    summary_match = summary and search_term in summary.lower()
-
-                    if not (id_match or path_match or summary_match):
-                        continue
+            self._sync_index()
+            index = self._index
+
+            # Candidate sets from the secondary indexes, smallest first
+            filters: list = []
+            if status_filter is not None:
+                filters.append(index.by_status.get(status_filter.value, {}))
+            if target_ext:
+                if target_ext.count(".") == 1:
+                    filters.append(index.by_ext.get(target_ext, {}))
+                else:
+                    # Multi-part suffixes (e.g. ".tar.gz") are not indexed
+                    filters.append(
+                        {
+                            doc_id: None
+                            for doc_id, entry in index.entries.items()
+                            if entry[2].lower().endswith(target_ext)
+                        }
+                    )
+            if search_term:
+                keyword_candidates = index.keywords.candidates(search_term)
+                if keyword_candidates is None:
+                    # Terms shorter than a trigram are matched by scanning
+                    keyword_candidates = index.entries.keys()
+                filters.append(
+                    {
+                        doc_id: None
+                        for doc_id in keyword_candidates
+                        if self._matches_keyword(doc_id, search_term)
+                    }
+                )
 
+            ordered = index.sorted[sort_field]
+            if not filters:
+                total_count = len(ordered)
+                if reverse_sort:
+                    lo, hi = max(total_count - end_idx, 0), total_count - start_idx
+                    page_keys = ordered[lo:hi][::-1] if hi > 0 else []
+                else:
+                    page_keys = ordered[start_idx:end_idx]
+                page_ids = [doc_id for _, doc_id in page_keys]
+            else:
+                filters.sort(key=len)
+                matched = filters[0]
+                for other in filters[1:]:
+                    matched = [doc_id for doc_id in matched if doc_id in other]
+                matched = set(matched)
+                total_count = len(matched)
+
+                if total_count * 8 < len(ordered):
+                    # Few matches: sort them directly by their stored sort keys
+                    sort_keys = index.sort_keys
+                    matched_keys = sorted(
+                        ((sort_keys[doc_id][sort_field], doc_id) for doc_id in matched),
+                        reverse=reverse_sort,
+                    )
+                    page_ids = [doc_id for _, doc_id in matched_keys[start_idx:end_idx]]
+                else:
+                    # Many matches: walk the pre-sorted view and stop after the page
+                    page_ids = []
+                    position = 0
+                    walk = reversed(ordered) if reverse_sort else iter(ordered)
+                    for _, doc_id in walk:
+                        if doc_id not in matched:
+                            continue
+                        if position >= start_idx:
+                            page_ids.append(doc_id)
+                            if len(page_ids) >= page_size:
+                                break
+                        position += 1
+
+            paginated_docs = []
+            for doc_id in page_ids:
                 try:
-                    # Prepare document data
-                    data = doc_data.copy()
-                    data.pop("content", None)
-                    if "file_path" not in data:
-                        data["file_path"] = "no-file-path"
-                    if "metadata" not in data:
-                        data["metadata"] = {}
-                    if "error_msg" not in data:
-                        data["error_msg"] = None
-
-                    doc_status = DocProcessingStatus(**data)
-
-                    # Add sort key for sorting
-                    if sort_field == "id":
-                        doc_status._sort_key = doc_id
-                    elif sort_field == "file_path":
-                        # Use pinyin sorting for file_path field to support Chinese characters
-                        file_path_value = getattr(doc_status, sort_field, "")
-                        doc_status._sort_key = get_pinyin_sort_key(file_path_value)
-                    else:
-                        doc_status._sort_key = getattr(doc_status, sort_field, "")
-
-                    all_docs.append((doc_id, doc_status))
-
+                    paginated_docs.append(
+                        (doc_id, _to_doc_processing_status(self._data[doc_id]))
+                    )
                 except KeyError as e:
                     logger.error(
                         f"[{self.workspace}] Error processing document {doc_id}: {e}"
                     )
                     continue
 
-        # Sort documents
-        reverse_sort = sort_direction.lower() == "desc"
-        all_docs.sort(
-            key=lambda x: getattr(x[1], "_sort_key", ""), reverse=reverse_sort
-        )
-
-        # Remove sort key from documents
-        for doc_id, doc in all_docs:
-            if hasattr(doc, "_sort_key"):
-                delattr(doc, "_sort_key")
-
-        total_count = len(all_docs)
-
-        # Apply pagination
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        paginated_docs = all_docs[start_idx:end_idx]
-
         return paginated_docs, total_count
 
+    def _matches_keyword(self, doc_id: str, search_term: str) -> bool:
+        """Verify a keyword candidate against doc id, file path and content summary"""
+        if search_term in doc_id.lower():
+            return True
+        doc_data = self._data.get(doc_id) or {}
+        file_path = doc_data.get("file_path", "")
+        if file_path and search_term in file_path.lower():
+            return True
+        summary = doc_data.get("content_summary", "")
+        return bool(summary and search_term in summary.lower())
+
     async def get_all_status_counts(self) -> dict[str, int]:
         """Get counts of documents in each status for all documents
 
@@ -387,14 +658,18 @@ class JsonDocStatusStorage(DocStatusStorage):
         Returns:
             None
         """
+        await self._refresh_index()
         async with self._storage_lock:
+            self._sync_index()
             any_deleted = False
             for doc_id in doc_ids:
                 result = self._data.pop(doc_id, None)
                 if result is not None:
                     any_deleted = True
+                    self._index.remove(doc_id)
 
             if any_deleted:
+                self._bump_index_generation(doc_ids)
                 await set_all_update_flags(self.namespace, workspace=self.workspace)
 
     async def get_doc_by_file_path(self, file_path: str) -> Union[dict[str, Any], None]:
@@ -410,9 +685,12 @@ class JsonDocStatusStorage(DocStatusStorage):
         if self._storage_lock is None:
             raise StorageNotInitializedError("JsonDocStatusStorage")
 
+        await self._refresh_index()
         async with self._storage_lock:
-            for doc_id, doc_data in self._data.items():
-                if doc_data.get("file_path") == file_path:
+            self._sync_index()
+            for doc_id in self._index.by_file_path.get(file_path, ()):
+                doc_data = self._data.get(doc_id)
+                if doc_data is not None:
                     # Return complete document data, consistent with get_by_ids method
                     return doc_data
 
@@ -434,6 +712,8 @@ class JsonDocStatusStorage(DocStatusStorage):
         try:
             async with self._storage_lock:
                 self._data.clear()
+                self._index = _DocStatusIndex()
+                self._bump_index_generation()
                 await set_all_update_flags(self.namespace, workspace=self.workspace)
 
             await self.index_done_callback()
@@ -1,4 +1,3 @@
-import asyncio
 import os
 from typing import Any, final
 from dataclasses import dataclass
@@ -1053,15 +1052,10 @@ class MilvusVectorDBStorage(BaseVectorStorage):
             for k, v in data.items()
         ]
         contents = [v["content"] for v in data.values()]
-        batches = [
-            contents[i : i + self._max_batch_size]
-            for i in range(0, len(contents), self._max_batch_size)
-        ]
-
-        embedding_tasks = [self.embedding_func(batch) for batch in batches]
-        embeddings_list = await asyncio.gather(*embedding_tasks)
-
-        embeddings = np.concatenate(embeddings_list)
+        # Execute embedding outside of lock; unchanged contents reuse stored vectors
+        embeddings = await self._embed_for_upsert(
+            list(data.keys()), contents, self._max_batch_size
+        )
         for i, d in enumerate(list_data):
             d["vector"] = embeddings[i]
         results = self._client.upsert(
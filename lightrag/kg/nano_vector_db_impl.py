@@ -1,4 +1,3 @@
-import asyncio
 import base64
 import os
 import zlib
@@ -113,16 +112,10 @@ class NanoVectorDBStorage(BaseVectorStorage):
             for k, v in data.items()
         ]
         contents = [v["content"] for v in data.values()]
-        batches = [
-            contents[i : i + self._max_batch_size]
-            for i in range(0, len(contents), self._max_batch_size)
-        ]
-
-        # Execute embedding outside of lock to avoid long lock times
-        embedding_tasks = [self.embedding_func(batch) for batch in batches]
-        embeddings_list = await asyncio.gather(*embedding_tasks)
-
-        embeddings = np.concatenate(embeddings_list)
+        # Execute embedding outside of lock; unchanged contents reuse stored vectors
+        embeddings = await self._embed_for_upsert(
+            list(data.keys()), contents, self._max_batch_size
+        )
         if len(embeddings) == len(list_data):
             for i, d in enumerate(list_data):
                 # Compress vector using Float16 + zlib + Base64 for storage optimization
@@ -163,7 +156,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
             {
                 **{k: v for k, v in dp.items() if k != "vector"},
                 "id": dp["__id__"],
-                "distance": dp["__metrics__"],
+                "distance": float(dp["__metrics__"]),
                 "created_at": dp.get("__created_at__"),
             }
             for dp in results
@@ -1,9 +1,12 @@
 import os
+from bisect import bisect_left, insort
+from collections import OrderedDict, deque
 from dataclasses import dataclass
+from itertools import islice
 from typing import final
 
 from lightrag.types import KnowledgeGraph, KnowledgeGraphNode, KnowledgeGraphEdge
-from lightrag.utils import logger
+from lightrag.utils import logger, TrigramIndex
 from lightrag.base import BaseGraphStorage
 import networkx as nx
 from .shared_storage import (
@@ -19,6 +22,94 @@ from dotenv import load_dotenv
 # the OS environment variables take precedence over the .env file
 load_dotenv(dotenv_path=".env", override=False)
 
+# Number of (label, max_depth, max_nodes) subgraph responses kept per storage
+SUBGRAPH_CACHE_SIZE = 32
+
+
+class _GraphLabelIndex:
+    """Label search and degree ranking structures maintained alongside the graph.
+
+    - ``labels``: trigram index over node labels for substring search
+    - ``buckets``: nodes grouped by degree, with ``bucket_degrees`` kept sorted,
+      so the top-k nodes by degree are read without sorting the whole graph
+
+    Ties within a degree follow node insertion order, matching a stable sort
+    over ``graph.nodes()``. Buckets stay in that order while nodes arrive with
+    increasing ordinals; otherwise they are re-sorted lazily on read.
+    """
+
+    def __init__(self, graph: nx.Graph):
+        self.graph = graph
+        self.labels = TrigramIndex()
+        self.ordinals: dict = {}
+        self.degrees: dict = {}
+        self.buckets: dict[int, dict] = {}
+        self.bucket_degrees: list[int] = []
+        self._unsorted_buckets: set[int] = set()
+        self._next_ordinal = 0
+        for node, degree in graph.degree():
+            self.add_node(node, degree)
+
+    def _bucket_add(self, node, degree: int) -> None:
+        bucket = self.buckets.get(degree)
+        if bucket is None:
+            bucket = self.buckets[degree] = {}
+            insort(self.bucket_degrees, degree)
+        elif self.ordinals[node] < self.ordinals[next(reversed(bucket))]:
+            self._unsorted_buckets.add(degree)
+        bucket[node] = None
+
+    def _bucket_remove(self, node, degree: int) -> None:
+        bucket = self.buckets[degree]
+        del bucket[node]
+        if not bucket:
+            del self.buckets[degree]
+            del self.bucket_degrees[bisect_left(self.bucket_degrees, degree)]
+            self._unsorted_buckets.discard(degree)
+
+    def add_node(self, node, degree: int = 0) -> None:
+        if node in self.degrees:
+            self.set_degree(node, degree)
+            return
+        self.ordinals[node] = self._next_ordinal
+        self._next_ordinal += 1
+        self.degrees[node] = degree
+        self._bucket_add(node, degree)
+        self.labels.add(node, str(node))
+
+    def remove_node(self, node) -> None:
+        degree = self.degrees.pop(node, None)
+        if degree is None:
+            return
+        del self.ordinals[node]
+        self._bucket_remove(node, degree)
+        self.labels.remove(node)
+
+    def set_degree(self, node, degree: int) -> None:
+        old_degree = self.degrees.get(node)
+        if old_degree is None:
+            self.add_node(node, degree)
+        elif old_degree != degree:
+            self._bucket_remove(node, old_degree)
+            self.degrees[node] = degree
+            self._bucket_add(node, degree)
+
+    def top_nodes(self, limit: int) -> list:
+        """Return up to ``limit`` nodes ordered by degree (highest first)"""
+        result = []
+        ordinals = self.ordinals
+        for degree in reversed(self.bucket_degrees):
+            needed = limit - len(result)
+            if needed <= 0:
+                break
+            if degree in self._unsorted_buckets:
+                self.buckets[degree] = dict.fromkeys(
+                    sorted(self.buckets[degree], key=ordinals.__getitem__)
+                )
+                self._unsorted_buckets.discard(degree)
+            result.extend(islice(self.buckets[degree], needed))
+        return result
+
 
 @final
 @dataclass
@@ -53,6 +144,13 @@ class NetworkXStorage(BaseGraphStorage):
         self._storage_lock = None
         self.storage_updated = None
         self._graph = None
+        # Built lazily on first label search / ranking, then maintained incrementally
+        self._label_index: _GraphLabelIndex | None = None
+        # Bumped on every mutation or reload; cached subgraphs of older versions are stale
+        self._graph_version = 0
+        self._subgraph_cache: OrderedDict[tuple, tuple[int, KnowledgeGraph]] = (
+            OrderedDict()
+        )
 
         # Load initial graph
         preloaded_graph = NetworkXStorage.load_nx_graph(self._graphml_xml_file)
@@ -90,11 +188,43 @@ class NetworkXStorage(BaseGraphStorage):
                 self._graph = (
                     NetworkXStorage.load_nx_graph(self._graphml_xml_file) or nx.Graph()
                 )
+                self._reset_views()
                 # Reset update flag
                 self.storage_updated.value = False
 
             return self._graph
 
+    def _get_label_index(self, graph: nx.Graph) -> _GraphLabelIndex:
+        index = self._label_index
+        # Rebuild when the graph object was replaced or mutated out of band
+        if (
+            index is None
+            or index.graph is not graph
+            or len(index.degrees) != graph.number_of_nodes()
+        ):
+            index = self._label_index = _GraphLabelIndex(graph)
+        return index
+
+    def _reset_views(self) -> None:
+        """Drop all structures derived from the graph after it was replaced"""
+        self._label_index = None
+        self._invalidate_subgraphs()
+
+    def _invalidate_subgraphs(self) -> None:
+        self._graph_version += 1
+        self._subgraph_cache.clear()
+
+    def _refresh_degrees(self, graph: nx.Graph, nodes) -> None:
+        """Sync derived views after ``nodes`` were added, changed or removed"""
+        self._invalidate_subgraphs()
+        if self._label_index is None:
+            return
+        for node in nodes:
+            if graph.has_node(node):
+                self._label_index.set_degree(node, graph.degree(node))
+            else:
+                self._label_index.remove_node(node)
+
     async def has_node(self, node_id: str) -> bool:
         graph = await self._get_graph()
         return graph.has_node(node_id)
@@ -138,6 +268,7 @@ class NetworkXStorage(BaseGraphStorage):
         """
         graph = await self._get_graph()
         graph.add_node(node_id, **node_data)
+        self._refresh_degrees(graph, (node_id,))
 
     async def upsert_edge(
         self, source_node_id: str, target_node_id: str, edge_data: dict[str, str]
@@ -150,6 +281,7 @@ class NetworkXStorage(BaseGraphStorage):
         """
         graph = await self._get_graph()
         graph.add_edge(source_node_id, target_node_id, **edge_data)
+        self._refresh_degrees(graph, (source_node_id, target_node_id))
 
     async def delete_node(self, node_id: str) -> None:
         """
@@ -160,7 +292,9 @@ class NetworkXStorage(BaseGraphStorage):
         """
         graph = await self._get_graph()
         if graph.has_node(node_id):
+            neighbors = list(graph.neighbors(node_id))
             graph.remove_node(node_id)
+            self._refresh_degrees(graph, [node_id, *neighbors])
             logger.debug(f"[{self.workspace}] Node {node_id} deleted from the graph")
         else:
             logger.warning(
@@ -179,9 +313,13 @@ class NetworkXStorage(BaseGraphStorage):
             nodes: List of node IDs to be deleted
         """
         graph = await self._get_graph()
+        affected = set()
         for node in nodes:
             if graph.has_node(node):
+                affected.update(graph.neighbors(node))
+                affected.add(node)
                 graph.remove_node(node)
+        self._refresh_degrees(graph, affected)
 
     async def remove_edges(self, edges: list[tuple[str, str]]):
         """Delete multiple edges
@@ -195,9 +333,12 @@ class NetworkXStorage(BaseGraphStorage):
             edges: List of edges to be deleted, each edge is a (source, target) tuple
         """
         graph = await self._get_graph()
+        affected = set()
         for source, target in edges:
             if graph.has_edge(source, target):
                 graph.remove_edge(source, target)
+                affected.update((source, target))
+        self._refresh_degrees(graph, affected)
 
     async def get_all_labels(self) -> list[str]:
         """
@@ -225,12 +366,10 @@ class NetworkXStorage(BaseGraphStorage):
         """
         graph = await self._get_graph()
 
-        # Get degrees of all nodes and sort by degree descending
-        degrees = dict(graph.degree())
-        sorted_nodes = sorted(degrees.items(), key=lambda x: x[1], reverse=True)
-
-        # Return top labels limited by the specified limit
-        popular_labels = [str(node) for node, _ in sorted_nodes[:limit]]
+        # Read the top nodes from the maintained degree buckets
+        popular_labels = [
+            str(node) for node in self._get_label_index(graph).top_nodes(limit)
+        ]
 
         logger.debug(
             f"[{self.workspace}] Retrieved {len(popular_labels)} popular labels (limit: {limit})"
@@ -255,9 +394,15 @@ class NetworkXStorage(BaseGraphStorage):
         if not query_lower:
             return []
 
+        # Narrow candidates with the trigram index; queries shorter than a
+        # trigram fall back to scanning all nodes
+        candidates = self._get_label_index(graph).labels.candidates(query_lower)
+        if candidates is None:
+            candidates = graph.nodes()
+
         # Collect matching nodes with relevance scores
         matches = []
-        for node in graph.nodes():
+        for node in candidates:
             node_str = str(node)
             node_lower = node_str.lower()
 
@@ -321,23 +466,30 @@ class NetworkXStorage(BaseGraphStorage):
 
         graph = await self._get_graph()
 
+        # Responses are cached per graph version; the returned object is shared
+        # between callers and must be treated as read-only
+        cache_key = (node_label, max_depth, max_nodes)
+        cached = self._subgraph_cache.get(cache_key)
+        if cached is not None and cached[0] == self._graph_version:
+            self._subgraph_cache.move_to_end(cache_key)
+            return cached[1]
+        version = self._graph_version
+
         result = KnowledgeGraph()
+        index = self._get_label_index(graph)
+        degrees = index.degrees
 
         # Handle special case for "*" label
         if node_label == "*":
-            # Get degrees of all nodes
-            degrees = dict(graph.degree())
-            # Sort nodes by degree in descending order and take top max_nodes
-            sorted_nodes = sorted(degrees.items(), key=lambda x: x[1], reverse=True)
-
-            # Check if graph is truncated
-            if len(sorted_nodes) > max_nodes:
+            # Take the top max_nodes nodes from the maintained degree ranking
+            total_nodes = graph.number_of_nodes()
+            if total_nodes > max_nodes:
                 result.is_truncated = True
                 logger.info(
-                    f"[{self.workspace}] Graph truncated: {len(sorted_nodes)} nodes found, limited to {max_nodes}"
+                    f"[{self.workspace}] Graph truncated: {total_nodes} nodes found, limited to {max_nodes}"
                 )
 
-            limited_nodes = [node for node, _ in sorted_nodes[:max_nodes]]
+            limited_nodes = index.top_nodes(max_nodes)
             # Create subgraph with the highest degree nodes
             subgraph = graph.subgraph(limited_nodes)
         else:
@@ -352,7 +504,7 @@ class NetworkXStorage(BaseGraphStorage):
             bfs_nodes = []
             visited = set()
             # Store (node, depth, degree) in the queue
-            queue = [(node_label, 0, graph.degree(node_label))]
+            queue = deque([(node_label, 0, degrees[node_label])])
 
             # Flag to track if there are unexplored neighbors due to depth limit
             has_unexplored_neighbors = False
@@ -365,7 +517,7 @@ class NetworkXStorage(BaseGraphStorage):
                 # Collect all nodes at the current depth
                 current_level_nodes = []
                 while queue and queue[0][1] == current_depth:
-                    current_level_nodes.append(queue.pop(0))
+                    current_level_nodes.append(queue.popleft())
 
                 # Sort nodes at current depth by degree (highest first)
                 current_level_nodes.sort(key=lambda x: x[2], reverse=True)
@@ -378,24 +530,18 @@ class NetworkXStorage(BaseGraphStorage):
 
                         # Only explore neighbors if we haven't reached max_depth
                         if depth < max_depth:
-                            # Add neighbor nodes to queue with incremented depth
-                            neighbors = list(graph.neighbors(current_node))
-                            # Filter out already visited neighbors
-                            unvisited_neighbors = [
-                                n for n in neighbors if n not in visited
-                            ]
-                            # Add neighbors to the queue with their degrees
-                            for neighbor in unvisited_neighbors:
-                                neighbor_degree = graph.degree(neighbor)
-                                queue.append((neighbor, depth + 1, neighbor_degree))
-                        else:
-                            # Check if there are unexplored neighbors (skipped due to depth limit)
-                            neighbors = list(graph.neighbors(current_node))
-                            unvisited_neighbors = [
-                                n for n in neighbors if n not in visited
-                            ]
-                            if unvisited_neighbors:
-                                has_unexplored_neighbors = True
+                            # Add unvisited neighbors to the queue with their degrees
+                            queue.extend(
+                                (neighbor, depth + 1, degrees[neighbor])
+                                for neighbor in graph.neighbors(current_node)
+                                if neighbor not in visited
+                            )
+                        elif any(
+                            neighbor not in visited
+                            for neighbor in graph.neighbors(current_node)
+                        ):
+                            # Unexplored neighbors skipped due to depth limit
+                            has_unexplored_neighbors = True
 
                     # Check if we've reached max_nodes
                     if len(bfs_nodes) >= max_nodes:
@@ -417,58 +563,46 @@ class NetworkXStorage(BaseGraphStorage):
             subgraph = graph.subgraph(bfs_nodes)
 
         # Add nodes to result
-        seen_nodes = set()
-        seen_edges = set()
-        for node in subgraph.nodes():
-            if str(node) in seen_nodes:
-                continue
-
-            node_data = dict(subgraph.nodes[node])
-            # Get entity_type as labels
-            labels = []
-            if "entity_type" in node_data:
-                if isinstance(node_data["entity_type"], list):
-                    labels.extend(node_data["entity_type"])
-                else:
-                    labels.append(node_data["entity_type"])
-
-            # Create node with properties
-            node_properties = {k: v for k, v in node_data.items()}
-
+        for node, node_data in subgraph.nodes(data=True):
+            node_id = str(node)
             result.nodes.append(
                 KnowledgeGraphNode(
-                    id=str(node), labels=[str(node)], properties=node_properties
+                    id=node_id, labels=[node_id], properties=dict(node_data)
                 )
             )
-            seen_nodes.add(str(node))
 
         # Add edges to result
-        for edge in subgraph.edges():
-            source, target = edge
+        seen_edges = set()
+        for source, target, edge_data in subgraph.edges(data=True):
+            source, target = str(source), str(target)
             # Esure unique edge_id for undirect graph
-            if str(source) > str(target):
+            if source > target:
                 source, target = target, source
             edge_id = f"{source}-{target}"
             if edge_id in seen_edges:
                 continue
-
-            edge_data = dict(subgraph.edges[edge])
+            seen_edges.add(edge_id)
 
             # Create edge with complete information
             result.edges.append(
                 KnowledgeGraphEdge(
                     id=edge_id,
                     type="DIRECTED",
-                    source=str(source),
-                    target=str(target),
-                    properties=edge_data,
+                    source=source,
+                    target=target,
+                    properties=dict(edge_data),
                 )
             )
-            seen_edges.add(edge_id)
 
         logger.info(
             f"[{self.workspace}] Subgraph query successful | Node count: {len(result.nodes)} | Edge count: {len(result.edges)}"
         )
+
+        if version == self._graph_version:
+            self._subgraph_cache[cache_key] = (version, result)
+            self._subgraph_cache.move_to_end(cache_key)
+            while len(self._subgraph_cache) > SUBGRAPH_CACHE_SIZE:
+                self._subgraph_cache.popitem(last=False)
         return result
 
     async def get_all_nodes(self) -> list[dict]:
@@ -512,6 +646,7 @@ class NetworkXStorage(BaseGraphStorage):
                 self._graph = (
                     NetworkXStorage.load_nx_graph(self._graphml_xml_file) or nx.Graph()
                 )
+                self._reset_views()
                 # Reset update flag
                 self.storage_updated.value = False
                 return False  # Return error
@@ -554,6 +689,7 @@ class NetworkXStorage(BaseGraphStorage):
                 if os.path.exists(self._graphml_xml_file):
                     os.remove(self._graphml_xml_file)
                 self._graph = nx.Graph()
+                self._reset_views()
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.namespace, workspace=self.workspace)
                 # Reset own update flag to avoid self-reloading
@@ -6,7 +6,6 @@ import datetime
 from datetime import timezone
 from dataclasses import dataclass, field
 from typing import Any, Awaitable, Callable, TypeVar, Union, final
-import numpy as np
 import configparser
 import ssl
 import itertools
@@ -2298,15 +2297,10 @@ class PGVectorStorage(BaseVectorStorage):
             for k, v in data.items()
         ]
         contents = [v["content"] for v in data.values()]
-        batches = [
-            contents[i : i + self._max_batch_size]
-            for i in range(0, len(contents), self._max_batch_size)
-        ]
-
-        embedding_tasks = [self.embedding_func(batch) for batch in batches]
-        embeddings_list = await asyncio.gather(*embedding_tasks)
-
-        embeddings = np.concatenate(embeddings_list)
+        # Execute embedding outside of lock; unchanged contents reuse stored vectors
+        embeddings = await self._embed_for_upsert(
+            list(data.keys()), contents, self._max_batch_size
+        )
         for i, d in enumerate(list_data):
             d["__vector__"] = embeddings[i]
         for item in list_data:
@@ -8,15 +8,18 @@ import os
 import time
 import warnings
 import uuid
-from dataclasses import asdict, dataclass, field
+from collections import ChainMap
+from dataclasses import asdict, dataclass, field, fields
 from datetime import datetime, timezone
 from functools import partial
+from types import MappingProxyType
 from typing import (
     Any,
     AsyncIterator,
     Awaitable,
     Callable,
     Iterator,
+    Mapping,
     cast,
     final,
     Literal,
@@ -29,6 +32,12 @@ from lightrag.prompt import PROMPTS
 from lightrag.exceptions import PipelineCancelledException
 from lightrag.constants import (
     DEFAULT_MAX_GLEANING,
+    DEFAULT_GLEANING_SKIP_MIN_TOKENS,
+    DEFAULT_GLEANING_MIN_YIELD,
+    DEFAULT_FEEDBACK_FLUSH_DELAY,
+    DEFAULT_ENABLE_QUERY_TRACING,
+    DEFAULT_QUERY_TRACING_OTEL,
+    DEFAULT_ENABLE_METRICS,
     DEFAULT_FORCE_LLM_SUMMARY_ON_MERGE,
     DEFAULT_TOP_K,
     DEFAULT_CHUNK_TOP_K,
@@ -39,11 +48,19 @@ from lightrag.constants import (
     DEFAULT_RELATED_CHUNK_NUMBER,
     DEFAULT_KG_CHUNK_PICK_METHOD,
     DEFAULT_MIN_RERANK_SCORE,
+    DEFAULT_RERANK_CACHE_SIZE,
+    DEFAULT_RERANK_CACHE_TTL,
+    DEFAULT_RERANK_MIN_VECTOR_SCORE,
     DEFAULT_SUMMARY_MAX_TOKENS,
     DEFAULT_SUMMARY_CONTEXT_SIZE,
     DEFAULT_SUMMARY_LENGTH_RECOMMENDED,
     DEFAULT_MAX_ASYNC,
     DEFAULT_MAX_PARALLEL_INSERT,
+    DEFAULT_PIPELINE_PREPARE_WORKERS,
+    DEFAULT_PIPELINE_EMBED_WORKERS,
+    DEFAULT_PIPELINE_MAX_INFLIGHT_DOCS,
+    DEFAULT_CHUNK_FAST_PATH_FLUSH_DELAY,
+    DEFAULT_DELETION_BATCH_SIZE,
     DEFAULT_MAX_GRAPH_NODES,
     DEFAULT_MAX_SOURCE_IDS_PER_ENTITY,
     DEFAULT_MAX_SOURCE_IDS_PER_RELATION,
@@ -63,6 +80,7 @@ from lightrag.kg import (
 )
 
 
+from lightrag.kg.bm25_impl import BM25ChunkIndex
 from lightrag.kg.shared_storage import (
     get_namespace_data,
     get_data_init_lock,
@@ -83,6 +101,7 @@ from lightrag.base import (
     StoragesStatus,
     DeletionResult,
     OllamaServerInfos,
+    QueryContext,
     QueryResult,
 )
 from lightrag.namespace import NameSpace
@@ -94,6 +113,16 @@ from lightrag.operate import (
     naive_query,
     rebuild_knowledge_from_chunks,
 )
+from lightrag.feedback import FeedbackStore
+from lightrag.tracing import attach_timings, query_trace
+from lightrag.metrics import instrument_storage
+from lightrag.progress import (
+    DebouncedFlush,
+    DocProgressReporter,
+    PipelineStages,
+    ProgressStage,
+    publish_pending_docs,
+)
 from lightrag.constants import GRAPH_FIELD_SEP
 from lightrag.utils import (
     Tokenizer,
@@ -112,6 +141,7 @@ from lightrag.utils import (
     subtract_source_ids,
     make_relation_chunk_key,
     normalize_source_ids_limit_method,
+    invalidate_rerank_cache,
 )
 from lightrag.types import KnowledgeGraph
 from dotenv import load_dotenv
@@ -126,6 +156,23 @@ config = configparser.ConfigParser()
 config.read("config.ini", "utf-8")
 
 
+@dataclass
+class _DeletionPlan:
+    """Graph changes caused by removing a set of chunks"""
+
+    entities_to_delete: set[str] = field(default_factory=set)
+    entities_to_rebuild: dict[str, list[str]] = field(default_factory=dict)
+    relationships_to_delete: set[tuple[str, str]] = field(default_factory=set)
+    relationships_to_rebuild: dict[tuple[str, str], list[str]] = field(
+        default_factory=dict
+    )
+    # Remaining chunk ids per element, empty for deleted elements
+    entity_chunk_updates: dict[str, list[str]] = field(default_factory=dict)
+    relation_chunk_updates: dict[tuple[str, str], list[str]] = field(
+        default_factory=dict
+    )
+
+
 @final
 @dataclass
 class LightRAG:
@@ -212,6 +259,28 @@ class LightRAG:
     )
     """Maximum number of entity extraction attempts for ambiguous content."""
 
+    enable_gleaning_skip: bool = field(
+        default=get_env_value("ENABLE_GLEANING_SKIP", True, bool)
+    )
+    """Skip the gleaning round for chunks whose first extraction pass is judged complete."""
+
+    gleaning_skip_min_tokens: int = field(
+        default=get_env_value(
+            "GLEANING_SKIP_MIN_TOKENS", DEFAULT_GLEANING_SKIP_MIN_TOKENS, int
+        )
+    )
+    """Terminated first passes on chunks shorter than this many tokens are not gleaned."""
+
+    gleaning_min_yield: float = field(
+        default=get_env_value("GLEANING_MIN_YIELD", DEFAULT_GLEANING_MIN_YIELD, float)
+    )
+    """Skip gleaning once it adds less than this share of new entities and relations."""
+
+    enable_extraction_reuse: bool = field(
+        default=get_env_value("ENABLE_EXTRACTION_REUSE", True, bool)
+    )
+    """Reuse stored extraction results for chunks already extracted with the same prompt and model."""
+
     force_llm_summary_on_merge: int = field(
         default=get_env_value(
             "FORCE_LLM_SUMMARY_ON_MERGE", DEFAULT_FORCE_LLM_SUMMARY_ON_MERGE, int
@@ -357,6 +426,23 @@ class LightRAG:
     )
     """Minimum rerank score threshold for filtering chunks after reranking."""
 
+    rerank_cache_ttl: int = field(
+        default=get_env_value("RERANK_CACHE_TTL", DEFAULT_RERANK_CACHE_TTL, int)
+    )
+    """Seconds a (query, chunk) rerank score is reused. Set to 0 to disable the cache."""
+
+    rerank_cache_size: int = field(
+        default=get_env_value("RERANK_CACHE_SIZE", DEFAULT_RERANK_CACHE_SIZE, int)
+    )
+    """Maximum number of cached (query, chunk) rerank scores per workspace."""
+
+    rerank_min_vector_score: float = field(
+        default=get_env_value(
+            "RERANK_MIN_VECTOR_SCORE", DEFAULT_RERANK_MIN_VECTOR_SCORE, float
+        )
+    )
+    """Vector hits scoring below this are dropped before reranking. Chunks without a vector score are kept."""
+
     # Storage
     # ---
 
@@ -369,6 +455,30 @@ class LightRAG:
     enable_llm_cache_for_entity_extract: bool = field(default=True)
     """If True, enables caching for entity extraction steps to reduce LLM costs."""
 
+    feedback_flush_delay: float = field(
+        default=get_env_value(
+            "FEEDBACK_FLUSH_DELAY", DEFAULT_FEEDBACK_FLUSH_DELAY, float
+        )
+    )
+    """Seconds to batch feedback submissions before the feedback storage is written to disk."""
+
+    enable_query_tracing: bool = field(
+        default=get_env_value(
+            "ENABLE_QUERY_TRACING", DEFAULT_ENABLE_QUERY_TRACING, bool
+        )
+    )
+    """Record per-stage timings of each query and return them as `metadata.timings`."""
+
+    query_tracing_otel: bool = field(
+        default=get_env_value("QUERY_TRACING_OTEL", DEFAULT_QUERY_TRACING_OTEL, bool)
+    )
+    """Also export query traces to OpenTelemetry (requires the opentelemetry package)."""
+
+    enable_metrics: bool = field(
+        default=get_env_value("ENABLE_METRICS", DEFAULT_ENABLE_METRICS, bool)
+    )
+    """Record storage operation latencies for the Prometheus `/metrics` endpoint."""
+
     # Extensions
     # ---
 
@@ -377,6 +487,49 @@ class LightRAG:
     )
     """Maximum number of parallel insert operations."""
 
+    pipeline_prepare_workers: int = field(
+        default=get_env_value(
+            "PIPELINE_PREPARE_WORKERS", DEFAULT_PIPELINE_PREPARE_WORKERS, int
+        )
+    )
+    """Workers for the load and chunk stages of the indexing pipeline."""
+
+    pipeline_embed_workers: int = field(
+        default=get_env_value(
+            "PIPELINE_EMBED_WORKERS", DEFAULT_PIPELINE_EMBED_WORKERS, int
+        )
+    )
+    """Workers for the stage that embeds and persists the chunks of a document."""
+
+    enable_chunk_fast_path: bool = field(
+        default=get_env_value("ENABLE_CHUNK_FAST_PATH", False, bool)
+    )
+    """Flush chunk storages right after chunk embedding so new documents are searchable by naive/mix queries before graph extraction finishes."""
+
+    chunk_fast_path_flush_delay: float = field(
+        default=get_env_value(
+            "CHUNK_FAST_PATH_FLUSH_DELAY", DEFAULT_CHUNK_FAST_PATH_FLUSH_DELAY, float
+        )
+    )
+    """Seconds to collect documents whose chunks are embedded into one fast path flush of the chunk storages."""
+
+    pipeline_max_inflight_docs: int = field(
+        default=get_env_value(
+            "PIPELINE_MAX_INFLIGHT_DOCS", DEFAULT_PIPELINE_MAX_INFLIGHT_DOCS, int
+        )
+    )
+    """Maximum documents in flight across pipeline stages; 0 means 4 * max_parallel_insert."""
+
+    enable_lexical_index: bool = field(
+        default=get_env_value("ENABLE_LEXICAL_INDEX", True, bool)
+    )
+    """Maintain a local BM25 index over text chunks, used as an extra retrieval channel."""
+
+    deletion_batch_size: int = field(
+        default=get_env_value("DELETION_BATCH_SIZE", DEFAULT_DELETION_BATCH_SIZE, int)
+    )
+    """Number of documents resolved and deleted together by background batch deletion."""
+
     max_graph_nodes: int = field(
         default=get_env_value("MAX_GRAPH_NODES", DEFAULT_MAX_GRAPH_NODES, int)
     )
@@ -442,6 +595,31 @@ class LightRAG:
 
     _storages_status: StoragesStatus = field(default=StoragesStatus.NOT_CREATED)
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        # Reassigning a config field invalidates the cached config view
+        if name in self.__dataclass_fields__:
+            self.__dict__.pop("_config_view", None)
+
+    @property
+    def config_view(self) -> Mapping[str, Any]:
+        """Read-only view of the configuration, passed as ``global_config``.
+
+        Unlike ``asdict(self)`` nothing is deep-copied: values are shared with
+        the instance, and the view is rebuilt only after a field is reassigned.
+        """
+        view = self.__dict__.get("_config_view")
+        if view is None:
+            view = MappingProxyType(
+                {f.name: getattr(self, f.name) for f in fields(self)}
+            )
+            self.__dict__["_config_view"] = view
+        return view
+
+    def query_config(self, context: QueryContext) -> Mapping[str, Any]:
+        """Layer per-request state over the shared config view without copying it"""
+        return ChainMap(context.as_config_overlay(), self.config_view)
+
     def __post_init__(self):
         from lightrag.kg.shared_storage import (
             initialize_share_data,
@@ -633,6 +811,17 @@ class LightRAG:
             meta_fields={"full_doc_id", "content", "file_path"},
         )
 
+        # Local lexical (BM25) index over text chunks
+        self.lexical_index: BM25ChunkIndex | None = (
+            BM25ChunkIndex(
+                namespace=NameSpace.LEXICAL_STORE_CHUNKS,
+                workspace=self.workspace,
+                global_config=global_config,
+            )
+            if self.enable_lexical_index
+            else None
+        )
+
         # Initialize document status storage
         self.doc_status: DocStatusStorage = self.doc_status_storage_cls(
             namespace=NameSpace.DOC_STATUS,
@@ -648,6 +837,28 @@ class LightRAG:
             global_config=global_config,
             embedding_func=None,
         )
+        self.feedback_store = FeedbackStore(
+            self.feedback,
+            workspace=self.workspace,
+            flush_delay=self.feedback_flush_delay,
+        )
+
+        if self.enable_metrics:
+            for storage in (
+                self.llm_response_cache,
+                self.text_chunks,
+                self.full_docs,
+                self.full_entities,
+                self.full_relations,
+                self.entity_chunks,
+                self.relation_chunks,
+                self.chunk_entity_relation_graph,
+                self.entities_vdb,
+                self.relationships_vdb,
+                self.chunks_vdb,
+                self.doc_status,
+            ):
+                instrument_storage(storage)
 
         # Directly use llm_response_cache, don't create a new object
         hashing_kv = self.llm_response_cache
@@ -700,17 +911,25 @@ class LightRAG:
                 self.llm_response_cache,
                 self.doc_status,
                 self.feedback,
+                self.lexical_index,
             ):
                 if storage:
                     # logger.debug(f"Initializing storage: {storage}")
                     await storage.initialize()
 
+            if self.lexical_index and self.lexical_index.needs_backfill:
+                await self._backfill_lexical_index()
+
+            await self.feedback_store.load()
+
             self._storages_status = StoragesStatus.INITIALIZED
             logger.debug("All storage types initialized")
 
     async def finalize_storages(self):
         """Asynchronously finalize the storages with improved error handling"""
         if self._storages_status == StoragesStatus.INITIALIZED:
+            await self.feedback_store.close()
+
             storages = [
                 ("full_docs", self.full_docs),
                 ("text_chunks", self.text_chunks),
@@ -725,6 +944,7 @@ class LightRAG:
                 ("llm_response_cache", self.llm_response_cache),
                 ("doc_status", self.doc_status),
                 ("feedback", self.feedback),
+                ("lexical_index", self.lexical_index),
             ]
 
             # Finalize each storage individually to ensure one failure doesn't prevent others from closing
@@ -757,90 +977,46 @@ class LightRAG:
 
             self._storages_status = StoragesStatus.FINALIZED
 
+    async def _backfill_lexical_index(self, batch_size: int = 500) -> None:
+        """Index chunks of already processed documents into a new lexical index"""
+        processed_docs = await self.doc_status.get_docs_by_status(DocStatus.PROCESSED)
+        chunk_ids = [
+            chunk_id
+            for status_doc in processed_docs.values()
+            for chunk_id in (status_doc.chunks_list or [])
+        ]
+        if chunk_ids:
+            logger.info(
+                f"[{self.workspace}] Building lexical index for {len(chunk_ids)} existing chunks"
+            )
+        for start in range(0, len(chunk_ids), batch_size):
+            batch = chunk_ids[start : start + batch_size]
+            chunks = await self.text_chunks.get_by_ids(batch)
+            await self.lexical_index.upsert(
+                {
+                    chunk_id: chunk
+                    for chunk_id, chunk in zip(batch, chunks)
+                    if chunk is not None
+                }
+            )
+        await self.lexical_index.index_done_callback()
+
     # 提交反馈
     async def submit_feedback(self, query_id: str, feedback_data: dict) -> bool:
         """
         提交用户反馈并更新历史记录供 Prompt 使用。
-        """
-        # 存储单条反馈详情 (feedback_data 是 dict，可以直接存)
-        await self.feedback.upsert({query_id: feedback_data})
-
-        # 更新"最近反馈历史"列表
-        history_wrapper = await self.feedback.get_by_id("recent_history")
-
-        # 从包装对象中提取列表，如果不存在则初始化空列表
-        if (
-            history_wrapper
-            and "data" in history_wrapper
-            and isinstance(history_wrapper["data"], list)
-        ):
-            history = history_wrapper["data"]
-        else:
-            history = []
-
-        # 添加新反馈到历史
-        history.append(feedback_data)
 
-        # 只保留最近 10 条
-        if len(history) > 10:
-            history = history[-10:]
-
-        # 将列表包装在字典 {"data": ...} 中，满足 JsonKVStorage 的要求
-        await self.feedback.upsert({"recent_history": {"data": history}})
-        await self.feedback.index_done_callback()
+        The record is stored immediately; the feedback storage is flushed to disk
+        in batches after ``feedback_flush_delay`` seconds.
+        """
+        await self.feedback_store.submit(query_id, feedback_data)
         logger.info(f"Feedback submitted for query {query_id}")
         return True
 
     # 获取反馈上下文
-    async def _get_feedback_context(self, limit: int = 3) -> str:
-        """获取最近的反馈记录并格式化为 Prompt 文本"""
-        # 从存储中获取包装对象
-        history_wrapper = await self.feedback.get_by_id("recent_history")
-
-        # 检查包装对象是否存在且包含 data 列表
-        # 增加类型检查，防止数据损坏导致的错误
-        if (
-            not history_wrapper
-            or not isinstance(history_wrapper, dict)
-            or "data" not in history_wrapper
-        ):
-            return "暂无反馈记录。"
-
-        recent_feedbacks = history_wrapper["data"]
-
-        if not isinstance(recent_feedbacks, list) or not recent_feedbacks:
-            return "暂无反馈记录。"
-
-        context_lines = []
-        # 倒序取最近的
-        for item in reversed(recent_feedbacks):
-            if len(context_lines) >= limit:
-                break
-
-            f_type = item.get("feedback_type", "").lower()
-            raw_comment = item.get("comment", "无评论")
-            if raw_comment:
-                # 1. 替换 XML 标签字符，防止闭合标签攻击
-                # 2. 移除换行符，防止破坏 Prompt 结构
-                comment = (
-                    raw_comment.replace("<", "[").replace(">", "]").replace("\n", " ")
-                )
-            else:
-                comment = "无评论"
-
-            q = item.get("query", "")
-            q = q.replace("<", "[").replace(">", "]").replace("\n", " ")
-
-            if f_type == "dislike":
-                context_lines.append(
-                    f"- [用户不满/Dislike] 问题: '{q}'。原因/建议: {comment}。请避免此类错误。"
-                )
-            elif f_type == "like":
-                context_lines.append(
-                    f"- [用户点赞/Like] 问题: '{q}'。原因: {comment}。请保持这种回答方式。"
-                )
-
-        return "\n".join(context_lines) if context_lines else "暂无反馈记录。"
+    def get_feedback_stats(self) -> dict[str, Any]:
+        """Like/dislike counts and rates of this workspace, overall and per query cluster"""
+        return self.feedback_store.stats()
 
     async def check_and_migrate_data(self):
         """Check if data migration is needed and perform migration if necessary"""
@@ -1335,6 +1511,8 @@ class LightRAG:
                 self.full_docs.upsert(new_docs),
                 self.text_chunks.upsert(inserting_chunks),
             ]
+            if self.lexical_index:
+                tasks.append(self.lexical_index.upsert(inserting_chunks))
             await asyncio.gather(*tasks)
 
         finally:
@@ -1822,10 +2000,26 @@ class LightRAG:
                 job_name = f"{path_prefix}[{total_files} files]"
                 pipeline_status["job_name"] = job_name
 
+                # Register the batch with the progress bus so track subscribers
+                # know how many documents to expect
+                await publish_pending_docs(self.workspace, to_process_docs)
+
                 # Create a counter to track the number of processed files
                 processed_count = 0
-                # Create a semaphore to limit the number of concurrent file processing
-                semaphore = asyncio.Semaphore(self.max_parallel_insert)
+                # Each stage gets its own bounded worker pool, so loading, chunking
+                # and chunk embedding of later files overlap with LLM extraction
+                stages = self._create_pipeline_stages(
+                    pipeline_status, pipeline_status_lock
+                )
+                # Fast path flushes of documents embedded close together are
+                # coalesced, as each flush rewrites whole storage files
+                chunk_flush = (
+                    DebouncedFlush(
+                        self._flush_chunk_storages, self.chunk_fast_path_flush_delay
+                    )
+                    if self.enable_chunk_fast_path
+                    else None
+                )
 
                 async def process_document(
                     doc_id: str,
@@ -1834,7 +2028,8 @@ class LightRAG:
                     split_by_character_only: bool,
                     pipeline_status: dict,
                     pipeline_status_lock: asyncio.Lock,
-                    semaphore: asyncio.Semaphore,
+                    stages: PipelineStages,
+                    chunk_flush: DebouncedFlush | None,
                 ) -> None:
                     """Process single document"""
                     # Initialize variables at the start to prevent UnboundLocalError in error handling
@@ -1844,8 +2039,15 @@ class LightRAG:
                     processing_start_time = int(time.time())
                     first_stage_tasks = []
                     entity_relation_task = None
+                    gleaning_stats: dict[str, Any] = {}
+                    doc_progress = DocProgressReporter(
+                        self.workspace,
+                        status_doc.track_id,
+                        doc_id,
+                        getattr(status_doc, "file_path", None),
+                    )
 
-                    async with semaphore:
+                    async with stages.admit():
                         nonlocal processed_count
                         # Initialize to prevent UnboundLocalError in error handling
                         first_stage_tasks = []
@@ -1886,8 +2088,11 @@ class LightRAG:
                                         pipeline_status["history_messages"][-5000:]
                                     )
 
+                            await doc_progress.stage(ProgressStage.CHUNKING)
+
                             # Get document content from full_docs
-                            content_data = await self.full_docs.get_by_id(doc_id)
+                            async with stages.slot("parse"):
+                                content_data = await self.full_docs.get_by_id(doc_id)
                             if not content_data:
                                 raise Exception(
                                     f"Document content not found in full_docs for doc_id: {doc_id}"
@@ -1895,7 +2100,7 @@ class LightRAG:
                             content = content_data["content"]
 
                             # Call chunking function, supporting both sync and async implementations
-                            chunking_result = self.chunking_func(
+                            chunking_args = (
                                 self.tokenizer,
                                 content,
                                 split_by_character,
@@ -1903,10 +2108,19 @@ class LightRAG:
                                 self.chunk_overlap_token_size,
                                 self.chunk_token_size,
                             )
+                            async with stages.slot("chunk"):
+                                if inspect.iscoroutinefunction(self.chunking_func):
+                                    chunking_result = self.chunking_func(*chunking_args)
+                                else:
+                                    # Tokenizing is CPU bound; run it off the event loop
+                                    # so the chunk workers actually run side by side
+                                    chunking_result = await asyncio.to_thread(
+                                        self.chunking_func, *chunking_args
+                                    )
 
-                            # If result is awaitable, await to get actual result
-                            if inspect.isawaitable(chunking_result):
-                                chunking_result = await chunking_result
+                                # If result is awaitable, await to get actual result
+                                if inspect.isawaitable(chunking_result):
+                                    chunking_result = await chunking_result
 
                             # Validate return type
                             if not isinstance(chunking_result, (list, tuple)):
@@ -1939,55 +2153,75 @@ class LightRAG:
 
                             # Process document in two stages
                             # Stage 1: Process text chunks and docs (parallel execution)
-                            doc_status_task = asyncio.create_task(
-                                self.doc_status.upsert(
-                                    {
-                                        doc_id: {
-                                            "status": DocStatus.PROCESSING,
-                                            "chunks_count": len(chunks),
-                                            "chunks_list": list(
-                                                chunks.keys()
-                                            ),  # Save chunks list
-                                            "content_summary": status_doc.content_summary,
-                                            "content_length": status_doc.content_length,
-                                            "created_at": status_doc.created_at,
-                                            "updated_at": datetime.now(
-                                                timezone.utc
-                                            ).isoformat(),
-                                            "file_path": file_path,
-                                            "track_id": status_doc.track_id,  # Preserve existing track_id
-                                            "metadata": {
-                                                "processing_start_time": processing_start_time
-                                            },
-                                        }
-                                    }
-                                )
-                            )
-                            chunks_vdb_task = asyncio.create_task(
-                                self.chunks_vdb.upsert(chunks)
-                            )
-                            text_chunks_task = asyncio.create_task(
-                                self.text_chunks.upsert(chunks)
-                            )
-
-                            # First stage tasks (parallel execution)
-                            first_stage_tasks = [
-                                doc_status_task,
-                                chunks_vdb_task,
-                                text_chunks_task,
-                            ]
+                            processing_status = {
+                                "status": DocStatus.PROCESSING,
+                                "chunks_count": len(chunks),
+                                "chunks_list": list(chunks.keys()),  # Save chunks list
+                                "content_summary": status_doc.content_summary,
+                                "content_length": status_doc.content_length,
+                                "created_at": status_doc.created_at,
+                                "updated_at": datetime.now(timezone.utc).isoformat(),
+                                "file_path": file_path,
+                                "track_id": status_doc.track_id,  # Preserve existing track_id
+                                "metadata": {
+                                    "processing_start_time": processing_start_time
+                                },
+                            }
                             entity_relation_task = None
 
-                            # Execute first stage tasks
-                            await asyncio.gather(*first_stage_tasks)
+                            # Execute first stage tasks; they are only created once an
+                            # embed worker is held, so embedding stays bounded
+                            async with stages.slot("embed"):
+                                doc_status_task = asyncio.create_task(
+                                    self.doc_status.upsert({doc_id: processing_status})
+                                )
+                                chunks_vdb_task = asyncio.create_task(
+                                    self.chunks_vdb.upsert(chunks)
+                                )
+                                text_chunks_task = asyncio.create_task(
+                                    self.text_chunks.upsert(chunks)
+                                )
+
+                                # First stage tasks (parallel execution)
+                                first_stage_tasks = [
+                                    doc_status_task,
+                                    chunks_vdb_task,
+                                    text_chunks_task,
+                                ]
+                                if self.lexical_index:
+                                    first_stage_tasks.append(
+                                        asyncio.create_task(
+                                            self.lexical_index.upsert(chunks)
+                                        )
+                                    )
+                                await asyncio.gather(*first_stage_tasks)
+                                if chunk_flush is not None:
+                                    await self._make_chunks_searchable(
+                                        doc_id,
+                                        processing_status,
+                                        chunk_flush,
+                                        doc_progress,
+                                    )
 
                             # Stage 2: Process entity relation graph (after text_chunks are saved)
-                            entity_relation_task = asyncio.create_task(
-                                self._process_extract_entities(
-                                    chunks, pipeline_status, pipeline_status_lock
-                                )
+                            await doc_progress.stage(
+                                ProgressStage.EXTRACTING, chunks_total=len(chunks)
                             )
-                            chunk_results = await entity_relation_task
+                            async with stages.slot("extract"):
+                                entity_relation_task = asyncio.create_task(
+                                    self._process_extract_entities(
+                                        chunks,
+                                        pipeline_status,
+                                        pipeline_status_lock,
+                                        doc_progress=doc_progress,
+                                        gleaning_stats=gleaning_stats,
+                                    )
+                                )
+                                chunk_results = await entity_relation_task
+                            if gleaning_stats.get("skipped"):
+                                logger.info(
+                                    f"Gleaning saved {gleaning_stats['skipped']} LLM call(s) for {doc_id}: {gleaning_stats['skip_reasons']}"
+                                )
                             file_extraction_stage_ok = True
 
                         except Exception as e:
@@ -2035,6 +2269,10 @@ class LightRAG:
                             # Record processing end time for failed case
                             processing_end_time = int(time.time())
 
+                            await doc_progress.stage(
+                                ProgressStage.FAILED, error_msg=str(e)
+                            )
+
                             # Update document status to failed
                             await self.doc_status.upsert(
                                 {
@@ -2069,53 +2307,60 @@ class LightRAG:
                                             "User cancelled"
                                         )
 
-                                # Use chunk_results from entity_relation_task
-                                await merge_nodes_and_edges(
-                                    chunk_results=chunk_results,  # result collected from entity_relation_task
-                                    knowledge_graph_inst=self.chunk_entity_relation_graph,
-                                    entity_vdb=self.entities_vdb,
-                                    relationships_vdb=self.relationships_vdb,
-                                    global_config=asdict(self),
-                                    full_entities_storage=self.full_entities,
-                                    full_relations_storage=self.full_relations,
-                                    doc_id=doc_id,
-                                    pipeline_status=pipeline_status,
-                                    pipeline_status_lock=pipeline_status_lock,
-                                    llm_response_cache=self.llm_response_cache,
-                                    entity_chunks_storage=self.entity_chunks,
-                                    relation_chunks_storage=self.relation_chunks,
-                                    current_file_number=current_file_number,
-                                    total_files=total_files,
-                                    file_path=file_path,
-                                )
+                                await doc_progress.stage(ProgressStage.MERGING)
 
-                                # Record processing end time
-                                processing_end_time = int(time.time())
+                                # Use chunk_results from entity_relation_task
+                                async with stages.slot("merge"):
+                                    await merge_nodes_and_edges(
+                                        chunk_results=chunk_results,  # result collected from entity_relation_task
+                                        knowledge_graph_inst=self.chunk_entity_relation_graph,
+                                        entity_vdb=self.entities_vdb,
+                                        relationships_vdb=self.relationships_vdb,
+                                        global_config=self.config_view,
+                                        full_entities_storage=self.full_entities,
+                                        full_relations_storage=self.full_relations,
+                                        doc_id=doc_id,
+                                        pipeline_status=pipeline_status,
+                                        pipeline_status_lock=pipeline_status_lock,
+                                        llm_response_cache=self.llm_response_cache,
+                                        entity_chunks_storage=self.entity_chunks,
+                                        relation_chunks_storage=self.relation_chunks,
+                                        current_file_number=current_file_number,
+                                        total_files=total_files,
+                                        file_path=file_path,
+                                    )
 
-                                await self.doc_status.upsert(
-                                    {
-                                        doc_id: {
-                                            "status": DocStatus.PROCESSED,
-                                            "chunks_count": len(chunks),
-                                            "chunks_list": list(chunks.keys()),
-                                            "content_summary": status_doc.content_summary,
-                                            "content_length": status_doc.content_length,
-                                            "created_at": status_doc.created_at,
-                                            "updated_at": datetime.now(
-                                                timezone.utc
-                                            ).isoformat(),
-                                            "file_path": file_path,
-                                            "track_id": status_doc.track_id,  # Preserve existing track_id
-                                            "metadata": {
-                                                "processing_start_time": processing_start_time,
-                                                "processing_end_time": processing_end_time,
-                                            },
+                                async with stages.slot("persist"):
+                                    # Record processing end time
+                                    processing_end_time = int(time.time())
+
+                                    await self.doc_status.upsert(
+                                        {
+                                            doc_id: {
+                                                "status": DocStatus.PROCESSED,
+                                                "chunks_count": len(chunks),
+                                                "chunks_list": list(chunks.keys()),
+                                                "content_summary": status_doc.content_summary,
+                                                "content_length": status_doc.content_length,
+                                                "created_at": status_doc.created_at,
+                                                "updated_at": datetime.now(
+                                                    timezone.utc
+                                                ).isoformat(),
+                                                "file_path": file_path,
+                                                "track_id": status_doc.track_id,  # Preserve existing track_id
+                                                "metadata": {
+                                                    "processing_start_time": processing_start_time,
+                                                    "processing_end_time": processing_end_time,
+                                                    "gleaning": gleaning_stats,
+                                                },
+                                            }
                                         }
-                                    }
-                                )
+                                    )
 
-                                # Call _insert_done after processing each file
-                                await self._insert_done()
+                                    # Call _insert_done after processing each file
+                                    await self._insert_done()
+
+                                await doc_progress.stage(ProgressStage.PROCESSED)
 
                                 async with pipeline_status_lock:
                                     log_message = f"Completed processing file {current_file_number}/{total_files}: {file_path}"
@@ -2162,6 +2407,10 @@ class LightRAG:
                                 # Record processing end time for failed case
                                 processing_end_time = int(time.time())
 
+                                await doc_progress.stage(
+                                    ProgressStage.FAILED, error_msg=str(e)
+                                )
+
                                 # Update document status to failed
                                 await self.doc_status.upsert(
                                     {
@@ -2193,7 +2442,8 @@ class LightRAG:
                             split_by_character_only,
                             pipeline_status,
                             pipeline_status_lock,
-                            semaphore,
+                            stages,
+                            chunk_flush,
                         )
                     )
 
@@ -2211,6 +2461,9 @@ class LightRAG:
 
                     # Exit directly (document statuses already updated in process_document)
                     return
+                finally:
+                    if chunk_flush is not None:
+                        await chunk_flush.drain()
 
                 # Check if there's a pending request to process more documents (with lock)
                 has_pending_request = False
@@ -2252,17 +2505,84 @@ class LightRAG:
                 pipeline_status["latest_message"] = log_message
                 pipeline_status["history_messages"].append(log_message)
 
+    def _create_pipeline_stages(
+        self, pipeline_status: dict, pipeline_status_lock: Any
+    ) -> PipelineStages:
+        """Build the per-stage worker pools for one pipeline run"""
+        max_inflight = self.pipeline_max_inflight_docs or 4 * self.max_parallel_insert
+        return PipelineStages(
+            {
+                "parse": self.pipeline_prepare_workers,
+                "chunk": self.pipeline_prepare_workers,
+                "embed": self.pipeline_embed_workers,
+                "extract": self.max_parallel_insert,
+                "merge": self.max_parallel_insert,
+                # Storage flushes in _insert_done are serialized
+                "persist": 1,
+            },
+            max_inflight=max(max_inflight, self.max_parallel_insert),
+            pipeline_status=pipeline_status,
+            pipeline_status_lock=pipeline_status_lock,
+        )
+
+    async def _make_chunks_searchable(
+        self,
+        doc_id: str,
+        processing_status: dict[str, Any],
+        chunk_flush: DebouncedFlush,
+        doc_progress: DocProgressReporter,
+    ) -> None:
+        """Schedule the chunk storages of a document to be persisted ahead of graph extraction
+
+        The document stays in PROCESSING status, but its chunks are flushed so
+        naive and mix queries (in every worker process) can retrieve them while
+        the extraction stage is still running. The flush is shared with other
+        documents embedded within CHUNK_FAST_PATH_FLUSH_DELAY; the document is
+        reported searchable once it has completed.
+        """
+        processing_status["metadata"] = {
+            **processing_status["metadata"],
+            "searchable": "chunks",
+            "chunks_searchable_at": int(time.time()),
+        }
+        processing_status["updated_at"] = datetime.now(timezone.utc).isoformat()
+        await self.doc_status.upsert({doc_id: processing_status})
+        chunk_flush.request(doc_progress.mark_searchable)
+
+    async def _flush_chunk_storages(self) -> None:
+        """Persist the storages written by the embed stage"""
+        await asyncio.gather(
+            *[
+                storage_inst.index_done_callback()
+                for storage_inst in (
+                    self.doc_status,
+                    self.text_chunks,
+                    self.chunks_vdb,
+                    self.lexical_index,
+                )
+                if storage_inst is not None
+            ]
+        )
+        invalidate_rerank_cache(self.working_dir, self.workspace)
+
     async def _process_extract_entities(
-        self, chunk: dict[str, Any], pipeline_status=None, pipeline_status_lock=None
+        self,
+        chunk: dict[str, Any],
+        pipeline_status=None,
+        pipeline_status_lock=None,
+        doc_progress: DocProgressReporter | None = None,
+        gleaning_stats: dict[str, Any] | None = None,
     ) -> list:
         try:
             chunk_results = await extract_entities(
                 chunk,
-                global_config=asdict(self),
+                global_config=self.config_view,
                 pipeline_status=pipeline_status,
                 pipeline_status_lock=pipeline_status_lock,
                 llm_response_cache=self.llm_response_cache,
                 text_chunks_storage=self.text_chunks,
+                doc_progress=doc_progress,
+                gleaning_stats=gleaning_stats,
             )
             return chunk_results
         except Exception as e:
@@ -2291,10 +2611,13 @@ class LightRAG:
                 self.relationships_vdb,
                 self.chunks_vdb,
                 self.chunk_entity_relation_graph,
+                self.lexical_index,
             ]
             if storage_inst is not None
         ]
         await asyncio.gather(*tasks)
+        # Cached rerank scores may refer to chunks that changed or disappeared
+        invalidate_rerank_cache(self.working_dir, self.workspace)
 
         log_message = "In memory DB persist to disk"
         logger.info(log_message)
@@ -2351,6 +2674,11 @@ class LightRAG:
                 await asyncio.gather(
                     self.chunks_vdb.upsert(all_chunks_data),
                     self.text_chunks.upsert(all_chunks_data),
+                    *(
+                        [self.lexical_index.upsert(all_chunks_data)]
+                        if self.lexical_index
+                        else []
+                    ),
                 )
 
             # Insert entities into knowledge graph
@@ -2637,6 +2965,11 @@ class LightRAG:
                         "relations_after_truncation": int,  # Relations after token truncation
                         "merged_chunks_count": int,          # Chunks before final processing
                         "final_chunks_count": int            # Final chunks in result
+                    },
+                    "timings": {                     # Present when enable_query_tracing is on
+                        "total_ms": float,           # Retrieval wall time
+                        "stages": Dict[str, float],  # Time per stage (keywords, vector_query, graph, rerank, ...)
+                        "spans": List[dict]          # Individual spans with parent, start_ms, duration_ms
                     }
                 }
             }
@@ -2672,7 +3005,7 @@ class LightRAG:
             actual data is nested under the 'data' field, with 'status' and 'message'
             fields at the top level.
         """
-        global_config = asdict(self)
+        global_config = self.config_view
 
         # Create a copy of param to avoid modifying the original
         data_param = QueryParam(
@@ -2695,45 +3028,55 @@ class LightRAG:
             enable_rerank=param.enable_rerank,
         )
 
-        query_result = None
+        with query_trace(
+            self.enable_query_tracing, "query_data", mode=data_param.mode
+        ) as trace:
+            query_result = None
 
-        if data_param.mode in ["local", "global", "hybrid", "mix"]:
-            logger.debug(f"[aquery_data] Using kg_query for mode: {data_param.mode}")
-            query_result = await kg_query(
-                query.strip(),
-                self.chunk_entity_relation_graph,
-                self.entities_vdb,
-                self.relationships_vdb,
-                self.text_chunks,
-                data_param,  # Use data_param with only_need_context=True
-                global_config,
-                hashing_kv=self.llm_response_cache,
-                system_prompt=None,
-                chunks_vdb=self.chunks_vdb,
-            )
-        elif data_param.mode == "naive":
-            logger.debug(f"[aquery_data] Using naive_query for mode: {data_param.mode}")
-            query_result = await naive_query(
-                query.strip(),
-                self.chunks_vdb,
-                data_param,  # Use data_param with only_need_context=True
-                global_config,
-                hashing_kv=self.llm_response_cache,
-                system_prompt=None,
-            )
-        elif data_param.mode == "bypass":
-            logger.debug("[aquery_data] Using bypass mode")
-            # bypass mode returns empty data using convert_to_user_format
-            empty_raw_data = convert_to_user_format(
-                [],  # no entities
-                [],  # no relationships
-                [],  # no chunks
-                [],  # no references
-                "bypass",
-            )
-            query_result = QueryResult(content="", raw_data=empty_raw_data)
-        else:
-            raise ValueError(f"Unknown mode {data_param.mode}")
+            if data_param.mode in ["local", "global", "hybrid", "mix"]:
+                logger.debug(
+                    f"[aquery_data] Using kg_query for mode: {data_param.mode}"
+                )
+                query_result = await kg_query(
+                    query.strip(),
+                    self.chunk_entity_relation_graph,
+                    self.entities_vdb,
+                    self.relationships_vdb,
+                    self.text_chunks,
+                    data_param,  # Use data_param with only_need_context=True
+                    global_config,
+                    hashing_kv=self.llm_response_cache,
+                    system_prompt=None,
+                    chunks_vdb=self.chunks_vdb,
+                    lexical_index=self.lexical_index,
+                )
+            elif data_param.mode == "naive":
+                logger.debug(
+                    f"[aquery_data] Using naive_query for mode: {data_param.mode}"
+                )
+                query_result = await naive_query(
+                    query.strip(),
+                    self.chunks_vdb,
+                    data_param,  # Use data_param with only_need_context=True
+                    global_config,
+                    hashing_kv=self.llm_response_cache,
+                    system_prompt=None,
+                    lexical_index=self.lexical_index,
+                    text_chunks_db=self.text_chunks,
+                )
+            elif data_param.mode == "bypass":
+                logger.debug("[aquery_data] Using bypass mode")
+                # bypass mode returns empty data using convert_to_user_format
+                empty_raw_data = convert_to_user_format(
+                    [],  # no entities
+                    [],  # no relationships
+                    [],  # no chunks
+                    [],  # no references
+                    "bypass",
+                )
+                query_result = QueryResult(content="", raw_data=empty_raw_data)
+            else:
+                raise ValueError(f"Unknown mode {data_param.mode}")
 
         if query_result is None:
             no_result_message = "Query returned no results"
@@ -2764,6 +3107,7 @@ class LightRAG:
                 )
             else:
                 logger.warning("[aquery_data] No data section found in query result")
+        attach_timings(final_data, trace, self.query_tracing_otel)
 
         await self._query_done()
         return final_data
@@ -2787,23 +3131,31 @@ class LightRAG:
 
         Returns:
             dict[str, Any]: Complete response with structured data and LLM response.
+            Stage timings are returned in `metadata.timings` when query tracing is enabled;
+            for streaming responses they cover the work done until the stream starts.
         """
+        with query_trace(self.enable_query_tracing, "query", mode=param.mode) as trace:
+            result = await self._aquery_llm(query, param, system_prompt)
+        attach_timings(result, trace, self.query_tracing_otel)
+        return result
+
+    async def _aquery_llm(
+        self,
+        query: str,
+        param: QueryParam,
+        system_prompt: str | None,
+    ) -> dict[str, Any]:
         query_id = str(uuid.uuid4())  # 生成 Query ID
 
         logger.debug(f"[aquery_llm] Query param: {param}")
 
-        global_config = asdict(self)
-
-        # 获取反馈上下文并注入配置
-        feedback_context = "暂无反馈记录。"
-        try:
-            # 尝试获取反馈上下文
-            feedback_context = await self._get_feedback_context(limit=3)
-        except Exception as e:
-            logger.warning(f"Failed to get feedback context: {e}")
+        # 获取反馈上下文 (in-memory digest, no storage access on the query path)
+        feedback_context = self.feedback_store.context()
 
-        # 注入配置
-        global_config["feedback_context"] = feedback_context
+        # 反馈上下文属于单次请求，叠加在只读配置之上而不复制配置
+        global_config = self.query_config(
+            QueryContext(query_id=query_id, feedback_context=feedback_context)
+        )
 
         try:
             query_result = None
@@ -2820,6 +3172,7 @@ class LightRAG:
                     hashing_kv=self.llm_response_cache,
                     system_prompt=system_prompt,
                     chunks_vdb=self.chunks_vdb,
+                    lexical_index=self.lexical_index,
                 )
             elif param.mode == "naive":
                 query_result = await naive_query(
@@ -2829,6 +3182,8 @@ class LightRAG:
                     global_config,
                     hashing_kv=self.llm_response_cache,
                     system_prompt=system_prompt,
+                    lexical_index=self.lexical_index,
+                    text_chunks_db=self.text_chunks,
                 )
             elif param.mode == "bypass":
                 # Bypass mode: directly use LLM without knowledge retrieval
@@ -3062,25 +3417,8 @@ class LightRAG:
         data across different storage layers are removed or rebuiled. If entities or relationships
         are partially affected, they will be rebuilded using LLM cached from remaining documents.
 
-        **Concurrency Control Design:**
-
-        This function implements a pipeline-based concurrency control to prevent data corruption:
-
-        1. **Single Document Deletion** (when WE acquire pipeline):
-           - Sets job_name to "Single document deletion" (NOT starting with "deleting")
-           - Prevents other adelete_by_doc_id calls from running concurrently
-           - Ensures exclusive access to graph operations for this deletion
-
-        2. **Batch Document Deletion** (when background_delete_documents acquires pipeline):
-           - Sets job_name to "Deleting {N} Documents" (starts with "deleting")
-           - Allows multiple adelete_by_doc_id calls to join the deletion queue
-           - Each call validates the job name to ensure it's part of a deletion operation
-
-        The validation logic `if not job_name.startswith("deleting") or "document" not in job_name`
-        ensures that:
-        - adelete_by_doc_id can only run when pipeline is idle OR during batch deletion
-        - Prevents concurrent single deletions that could cause race conditions
-        - Rejects operations when pipeline is busy with non-deletion tasks
+        This is a thin wrapper around `adelete_by_doc_ids`, which documents the
+        concurrency control shared by single and batch deletions.
 
         Args:
             doc_id (str): The unique identifier of the document to be deleted.
@@ -3095,434 +3433,634 @@ class LightRAG:
                 - `status_code` (int): HTTP status code (e.g., 200, 404, 403, 500).
                 - `file_path` (str | None): The file path of the deleted document, if available.
         """
-        # Get pipeline status shared data and lock for validation
-        pipeline_status = await get_namespace_data(
-            "pipeline_status", workspace=self.workspace
-        )
-        pipeline_status_lock = get_namespace_lock(
-            "pipeline_status", workspace=self.workspace
+        results = await self.adelete_by_doc_ids(
+            [doc_id], delete_llm_cache=delete_llm_cache
         )
+        return results[0]
 
-        # Track whether WE acquired the pipeline
-        we_acquired_pipeline = False
+    async def adelete_by_doc_ids(
+        self, doc_ids: list[str], delete_llm_cache: bool = False
+    ) -> list[DeletionResult]:
+        """Delete a batch of documents with one deletion plan.
 
-        # Check and acquire pipeline if needed
-        async with pipeline_status_lock:
-            if not pipeline_status.get("busy", False):
-                # Pipeline is idle - WE acquire it for this deletion
-                we_acquired_pipeline = True
+        Chunks, entities and relations affected by all documents of the batch are
+        resolved together: vector and KV entries are removed with one bulk call per
+        storage, and every partially affected entity or relation is rebuilt exactly
+        once (in parallel, see `rebuild_knowledge_from_chunks`) from the chunks that
+        remain after the whole batch is gone.
+
+        **Concurrency Control Design:**
+
+        This function implements a pipeline-based concurrency control to prevent data corruption:
+
+        1. **Direct Deletion** (when WE acquire pipeline):
+           - Sets job_name to "Single document deletion" or "Batch document deletion"
+             (NOT starting with "deleting")
+           - Prevents other deletion calls from running concurrently
+           - Ensures exclusive access to graph operations for this deletion
+
+        2. **Background Batch Deletion** (when background_delete_documents acquires pipeline):
+           - Sets job_name to "Deleting {N} Documents" (starts with "deleting")
+           - Allows deletion calls to join the deletion queue
+           - Each call validates the job name to ensure it's part of a deletion operation
+
+        The validation logic `if not job_name.startswith("deleting") or "document" not in job_name`
+        ensures that:
+        - Deletion can only run when pipeline is idle OR during batch deletion
+        - Prevents concurrent direct deletions that could cause race conditions
+        - Rejects operations when pipeline is busy with non-deletion tasks
+
+        Args:
+            doc_ids (list[str]): Identifiers of the documents to be deleted.
+            delete_llm_cache (bool): Whether to delete cached LLM extraction results
+                associated with the documents. Defaults to False.
+
+        Returns:
+            list[DeletionResult]: One result per distinct doc id, in request order.
+                If a bulk step fails, every document of the batch that was not
+                resolved yet is reported as failed.
+        """
+        doc_ids = list(dict.fromkeys(doc_ids))
+        if not doc_ids:
+            return []
+        batch_label = doc_ids[0] if len(doc_ids) == 1 else f"{len(doc_ids)} documents"
+
+        # Get pipeline status shared data and lock for validation
+        pipeline_status = await get_namespace_data(
+            "pipeline_status", workspace=self.workspace
+        )
+        pipeline_status_lock = get_namespace_lock(
+            "pipeline_status", workspace=self.workspace
+        )
+
+        # Track whether WE acquired the pipeline
+        we_acquired_pipeline = False
+
+        # Check and acquire pipeline if needed
+        async with pipeline_status_lock:
+            if not pipeline_status.get("busy", False):
+                # Pipeline is idle - WE acquire it for this deletion
+                we_acquired_pipeline = True
                 pipeline_status.update(
                     {
                         "busy": True,
-                        "job_name": "Single document deletion",
+                        "job_name": "Single document deletion"
+                        if len(doc_ids) == 1
+                        else "Batch document deletion",
                         "job_start": datetime.now(timezone.utc).isoformat(),
-                        "docs": 1,
+                        "docs": len(doc_ids),
                         "batchs": 1,
                         "cur_batch": 0,
                         "request_pending": False,
                         "cancellation_requested": False,
-                        "latest_message": f"Starting deletion for document: {doc_id}",
+                        "latest_message": f"Starting deletion for document: {batch_label}",
                     }
                 )
                 # Initialize history messages
                 pipeline_status["history_messages"][:] = [
-                    f"Starting deletion for document: {doc_id}"
+                    f"Starting deletion for document: {batch_label}"
                 ]
             else:
                 # Pipeline already busy - verify it's a deletion job
                 job_name = pipeline_status.get("job_name", "").lower()
                 if not job_name.startswith("deleting") or "document" not in job_name:
-                    return DeletionResult(
-                        status="not_allowed",
-                        doc_id=doc_id,
-                        message=f"Deletion not allowed: current job '{pipeline_status.get('job_name')}' is not a document deletion job",
-                        status_code=403,
-                        file_path=None,
-                    )
+                    return [
+                        DeletionResult(
+                            status="not_allowed",
+                            doc_id=doc_id,
+                            message=f"Deletion not allowed: current job '{pipeline_status.get('job_name')}' is not a document deletion job",
+                            status_code=403,
+                            file_path=None,
+                        )
+                        for doc_id in doc_ids
+                    ]
                 # Pipeline is busy with deletion - proceed without acquiring
 
+        results: dict[str, DeletionResult] = {}
+        file_paths: dict[str, str | None] = {}
         deletion_operations_started = False
         original_exception = None
-        doc_llm_cache_ids: list[str] = []
 
         async with pipeline_status_lock:
-            log_message = f"Starting deletion process for document {doc_id}"
+            log_message = f"Starting deletion process for document {batch_label}"
             logger.info(log_message)
             pipeline_status["latest_message"] = log_message
             pipeline_status["history_messages"].append(log_message)
 
         try:
-            # 1. Get the document status and related data
-            doc_status_data = await self.doc_status.get_by_id(doc_id)
-            file_path = doc_status_data.get("file_path") if doc_status_data else None
-            if not doc_status_data:
-                logger.warning(f"Document {doc_id} not found")
-                return DeletionResult(
-                    status="not_found",
-                    doc_id=doc_id,
-                    message=f"Document {doc_id} not found.",
-                    status_code=404,
-                    file_path="",
-                )
+            # 1. Get the document status and chunk ids of every document
+            doc_chunk_ids: dict[str, set[str]] = {}
+            status_list = await self.doc_status.get_by_ids(doc_ids)
+            for doc_id, doc_status_data in zip(doc_ids, status_list):
+                if not doc_status_data:
+                    logger.warning(f"Document {doc_id} not found")
+                    results[doc_id] = DeletionResult(
+                        status="not_found",
+                        doc_id=doc_id,
+                        message=f"Document {doc_id} not found.",
+                        status_code=404,
+                        file_path="",
+                    )
+                    continue
 
-            # Check document status and log warning for non-completed documents
-            raw_status = doc_status_data.get("status")
-            try:
-                doc_status = DocStatus(raw_status)
-            except ValueError:
-                doc_status = raw_status
+                file_path = doc_status_data.get("file_path")
+                file_paths[doc_id] = file_path
 
-            if doc_status != DocStatus.PROCESSED:
-                if doc_status == DocStatus.PENDING:
-                    warning_msg = (
-                        f"Deleting {doc_id} {file_path}(previous status: PENDING)"
-                    )
-                elif doc_status == DocStatus.PROCESSING:
-                    warning_msg = (
-                        f"Deleting {doc_id} {file_path}(previous status: PROCESSING)"
-                    )
-                elif doc_status == DocStatus.PREPROCESSED:
-                    warning_msg = (
-                        f"Deleting {doc_id} {file_path}(previous status: PREPROCESSED)"
-                    )
-                elif doc_status == DocStatus.FAILED:
-                    warning_msg = (
-                        f"Deleting {doc_id} {file_path}(previous status: FAILED)"
-                    )
-                else:
+                # Log non-completed documents for monitoring
+                raw_status = doc_status_data.get("status")
+                try:
+                    doc_status = DocStatus(raw_status)
+                except ValueError:
+                    doc_status = raw_status
+                if doc_status != DocStatus.PROCESSED:
                     status_text = (
-                        doc_status.value
+                        doc_status.name
                         if isinstance(doc_status, DocStatus)
                         else str(doc_status)
                     )
                     warning_msg = (
                         f"Deleting {doc_id} {file_path}(previous status: {status_text})"
                     )
-                logger.info(warning_msg)
-                # Update pipeline status for monitoring
-                async with pipeline_status_lock:
-                    pipeline_status["latest_message"] = warning_msg
-                    pipeline_status["history_messages"].append(warning_msg)
+                    logger.info(warning_msg)
+                    async with pipeline_status_lock:
+                        pipeline_status["latest_message"] = warning_msg
+                        pipeline_status["history_messages"].append(warning_msg)
 
-            # 2. Get chunk IDs from document status
-            chunk_ids = set(doc_status_data.get("chunks_list", []))
+                doc_chunk_ids[doc_id] = set(doc_status_data.get("chunks_list", []))
 
-            if not chunk_ids:
-                logger.warning(f"No chunks found for document {doc_id}")
-                # Mark that deletion operations have started
-                deletion_operations_started = True
+            if not doc_chunk_ids:
+                return [results[doc_id] for doc_id in doc_ids]
+
+            # Mark that deletion operations have started
+            deletion_operations_started = True
+
+            # 2. Documents without chunks only need their doc entries removed
+            empty_doc_ids = [
+                doc_id for doc_id, chunk_ids in doc_chunk_ids.items() if not chunk_ids
+            ]
+            if empty_doc_ids:
+                for doc_id in empty_doc_ids:
+                    logger.warning(f"No chunks found for document {doc_id}")
+                    del doc_chunk_ids[doc_id]
                 try:
-                    # Still need to delete the doc status and full doc
-                    await self.full_docs.delete([doc_id])
-                    await self.doc_status.delete([doc_id])
+                    await self.full_docs.delete(empty_doc_ids)
+                    await self.doc_status.delete(empty_doc_ids)
                 except Exception as e:
                     logger.error(
-                        f"Failed to delete document {doc_id} with no chunks: {e}"
+                        f"Failed to delete documents {empty_doc_ids} with no chunks: {e}"
                     )
                     raise Exception(f"Failed to delete document entry: {e}") from e
 
-                async with pipeline_status_lock:
+                for doc_id in empty_doc_ids:
                     log_message = (
                         f"Document deleted without associated chunks: {doc_id}"
                     )
                     logger.info(log_message)
-                    pipeline_status["latest_message"] = log_message
-                    pipeline_status["history_messages"].append(log_message)
+                    async with pipeline_status_lock:
+                        pipeline_status["latest_message"] = log_message
+                        pipeline_status["history_messages"].append(log_message)
+                    results[doc_id] = DeletionResult(
+                        status="success",
+                        doc_id=doc_id,
+                        message=log_message,
+                        status_code=200,
+                        file_path=file_paths[doc_id],
+                    )
 
-                return DeletionResult(
-                    status="success",
-                    doc_id=doc_id,
-                    message=log_message,
-                    status_code=200,
-                    file_path=file_path,
+            if doc_chunk_ids:
+                log_message = await self._delete_documents_with_chunks(
+                    doc_chunk_ids,
+                    delete_llm_cache,
+                    pipeline_status,
+                    pipeline_status_lock,
                 )
+                for doc_id in doc_chunk_ids:
+                    results[doc_id] = DeletionResult(
+                        status="success",
+                        doc_id=doc_id,
+                        message=log_message,
+                        status_code=200,
+                        file_path=file_paths[doc_id],
+                    )
 
-            # Mark that deletion operations have started
-            deletion_operations_started = True
+            return [results[doc_id] for doc_id in doc_ids]
 
-            if delete_llm_cache and chunk_ids:
-                if not self.llm_response_cache:
-                    logger.info(
-                        "Skipping LLM cache collection for document %s because cache storage is unavailable",
-                        doc_id,
-                    )
-                elif not self.text_chunks:
-                    logger.info(
-                        "Skipping LLM cache collection for document %s because text chunk storage is unavailable",
-                        doc_id,
+        except Exception as e:
+            original_exception = e
+            error_message = f"Error while deleting document {batch_label}: {e}"
+            logger.error(error_message)
+            logger.error(traceback.format_exc())
+            for doc_id in doc_ids:
+                if doc_id not in results:
+                    results[doc_id] = DeletionResult(
+                        status="fail",
+                        doc_id=doc_id,
+                        message=error_message,
+                        status_code=500,
+                        file_path=file_paths.get(doc_id),
                     )
-                else:
-                    try:
-                        chunk_data_list = await self.text_chunks.get_by_ids(
-                            list(chunk_ids)
-                        )
-                        seen_cache_ids: set[str] = set()
-                        for chunk_data in chunk_data_list:
-                            if not chunk_data or not isinstance(chunk_data, dict):
-                                continue
-                            cache_ids = chunk_data.get("llm_cache_list", [])
-                            if not isinstance(cache_ids, list):
-                                continue
-                            for cache_id in cache_ids:
-                                if (
-                                    isinstance(cache_id, str)
-                                    and cache_id
-                                    and cache_id not in seen_cache_ids
-                                ):
-                                    doc_llm_cache_ids.append(cache_id)
-                                    seen_cache_ids.add(cache_id)
-                        if doc_llm_cache_ids:
-                            logger.info(
-                                "Collected %d LLM cache entries for document %s",
-                                len(doc_llm_cache_ids),
-                                doc_id,
-                            )
-                        else:
-                            logger.info(
-                                "No LLM cache entries found for document %s", doc_id
+            return [results[doc_id] for doc_id in doc_ids]
+
+        finally:
+            # ALWAYS ensure persistence if any deletion operations were started
+            if deletion_operations_started:
+                try:
+                    await self._insert_done()
+                except Exception as persistence_error:
+                    persistence_error_msg = f"Failed to persist data after deletion attempt for {batch_label}: {persistence_error}"
+                    logger.error(persistence_error_msg)
+                    logger.error(traceback.format_exc())
+
+                    # If there was no original exception, this persistence error becomes the main error
+                    if original_exception is None:
+                        return [
+                            DeletionResult(
+                                status="fail",
+                                doc_id=doc_id,
+                                message=f"Deletion completed but failed to persist changes: {persistence_error}",
+                                status_code=500,
+                                file_path=file_paths.get(doc_id),
                             )
-                    except Exception as cache_collect_error:
-                        logger.error(
-                            "Failed to collect LLM cache ids for document %s: %s",
-                            doc_id,
-                            cache_collect_error,
-                        )
-                        raise Exception(
-                            f"Failed to collect LLM cache ids for document {doc_id}: {cache_collect_error}"
-                        ) from cache_collect_error
-
-            # 4. Analyze entities and relationships that will be affected
-            entities_to_delete = set()
-            entities_to_rebuild = {}  # entity_name -> remaining chunk id list
-            relationships_to_delete = set()
-            relationships_to_rebuild = {}  # (src, tgt) -> remaining chunk id list
-            entity_chunk_updates: dict[str, list[str]] = {}
-            relation_chunk_updates: dict[tuple[str, str], list[str]] = {}
+                            if results[doc_id].status == "success"
+                            else results[doc_id]
+                            for doc_id in doc_ids
+                        ]
+                    # If there was an original exception, log the persistence error but don't override the original error
+                    # The original error result was already returned in the except block
+            else:
+                logger.debug(
+                    f"No deletion operations were started for document {batch_label}, skipping persistence"
+                )
 
-            try:
-                # Get affected entities and relations from full_entities and full_relations storage
-                doc_entities_data = await self.full_entities.get_by_id(doc_id)
-                doc_relations_data = await self.full_relations.get_by_id(doc_id)
-
-                affected_nodes = []
-                affected_edges = []
-
-                # Get entity data from graph storage using entity names from full_entities
-                if doc_entities_data and "entity_names" in doc_entities_data:
-                    entity_names = doc_entities_data["entity_names"]
-                    # get_nodes_batch returns dict[str, dict], need to convert to list[dict]
-                    nodes_dict = await self.chunk_entity_relation_graph.get_nodes_batch(
-                        entity_names
-                    )
-                    for entity_name in entity_names:
-                        node_data = nodes_dict.get(entity_name)
-                        if node_data:
-                            # Ensure compatibility with existing logic that expects "id" field
-                            if "id" not in node_data:
-                                node_data["id"] = entity_name
-                            affected_nodes.append(node_data)
-
-                # Get relation data from graph storage using relation pairs from full_relations
-                if doc_relations_data and "relation_pairs" in doc_relations_data:
-                    relation_pairs = doc_relations_data["relation_pairs"]
-                    edge_pairs_dicts = [
-                        {"src": pair[0], "tgt": pair[1]} for pair in relation_pairs
-                    ]
-                    # get_edges_batch returns dict[tuple[str, str], dict], need to convert to list[dict]
-                    edges_dict = await self.chunk_entity_relation_graph.get_edges_batch(
-                        edge_pairs_dicts
+            # Release pipeline only if WE acquired it
+            if we_acquired_pipeline:
+                async with pipeline_status_lock:
+                    pipeline_status["busy"] = False
+                    pipeline_status["cancellation_requested"] = False
+                    completion_msg = (
+                        f"Deletion process completed for document: {batch_label}"
                     )
+                    pipeline_status["latest_message"] = completion_msg
+                    pipeline_status["history_messages"].append(completion_msg)
+                    logger.info(completion_msg)
 
-                    for pair in relation_pairs:
-                        src, tgt = pair[0], pair[1]
-                        edge_key = (src, tgt)
-                        edge_data = edges_dict.get(edge_key)
-                        if edge_data:
-                            # Ensure compatibility with existing logic that expects "source" and "target" fields
-                            if "source" not in edge_data:
-                                edge_data["source"] = src
-                            if "target" not in edge_data:
-                                edge_data["target"] = tgt
-                            affected_edges.append(edge_data)
+    async def _plan_document_deletion(
+        self, doc_ids: list[str], chunk_ids: set[str]
+    ) -> _DeletionPlan:
+        """Work out which graph elements disappear or shrink when chunks are removed
 
-            except Exception as e:
-                logger.error(f"Failed to analyze affected graph elements: {e}")
-                raise Exception(f"Failed to analyze graph dependencies: {e}") from e
+        Entities and relations referenced by any of the documents are looked up
+        with one batch call per storage, and their remaining chunk ids are computed
+        against the union of chunk ids being deleted.
+        """
+        plan = _DeletionPlan()
+
+        # Union of entity names and relation pairs across the documents
+        entity_names: dict[str, None] = {}
+        relation_pairs: dict[tuple[str, str], None] = {}
+        doc_entities_list = await self.full_entities.get_by_ids(doc_ids)
+        doc_relations_list = await self.full_relations.get_by_ids(doc_ids)
+        for doc_entities_data in doc_entities_list:
+            if doc_entities_data and "entity_names" in doc_entities_data:
+                entity_names.update(dict.fromkeys(doc_entities_data["entity_names"]))
+        for doc_relations_data in doc_relations_list:
+            if doc_relations_data and "relation_pairs" in doc_relations_data:
+                relation_pairs.update(
+                    (tuple(pair[:2]), None)
+                    for pair in doc_relations_data["relation_pairs"]
+                )
 
-            try:
-                # Process entities
-                for node_data in affected_nodes:
-                    node_label = node_data.get("entity_id")
-                    if not node_label:
-                        continue
+        graph = self.chunk_entity_relation_graph
+        affected_nodes = []
+        affected_edges = []
+        if entity_names:
+            # get_nodes_batch returns dict[str, dict], need to convert to list[dict]
+            nodes_dict = await graph.get_nodes_batch(list(entity_names))
+            for entity_name in entity_names:
+                node_data = nodes_dict.get(entity_name)
+                if node_data:
+                    # Ensure compatibility with existing logic that expects "id" field
+                    if "id" not in node_data:
+                        node_data["id"] = entity_name
+                    affected_nodes.append(node_data)
+        if relation_pairs:
+            # get_edges_batch returns dict[tuple[str, str], dict], need to convert to list[dict]
+            edges_dict = await graph.get_edges_batch(
+                [{"src": src, "tgt": tgt} for src, tgt in relation_pairs]
+            )
+            for src, tgt in relation_pairs:
+                edge_data = edges_dict.get((src, tgt))
+                if edge_data:
+                    # Ensure compatibility with existing logic that expects "source" and "target" fields
+                    if "source" not in edge_data:
+                        edge_data["source"] = src
+                    if "target" not in edge_data:
+                        edge_data["target"] = tgt
+                    affected_edges.append(edge_data)
+
+        # Process entities
+        node_labels = [
+            node_data["entity_id"]
+            for node_data in affected_nodes
+            if node_data.get("entity_id")
+        ]
+        stored_entity_chunks = (
+            await self.entity_chunks.get_by_ids(node_labels)
+            if self.entity_chunks and node_labels
+            else [None] * len(node_labels)
+        )
+        stored_by_label = dict(zip(node_labels, stored_entity_chunks))
+        for node_data in affected_nodes:
+            node_label = node_data.get("entity_id")
+            if not node_label or node_label in plan.entity_chunk_updates:
+                continue
+
+            existing_sources: list[str] = []
+            stored_chunks = stored_by_label.get(node_label)
+            if stored_chunks and isinstance(stored_chunks, dict):
+                existing_sources = [
+                    chunk_id
+                    for chunk_id in stored_chunks.get("chunk_ids", [])
+                    if chunk_id
+                ]
 
-                    existing_sources: list[str] = []
-                    if self.entity_chunks:
-                        stored_chunks = await self.entity_chunks.get_by_id(node_label)
-                        if stored_chunks and isinstance(stored_chunks, dict):
-                            existing_sources = [
-                                chunk_id
-                                for chunk_id in stored_chunks.get("chunk_ids", [])
-                                if chunk_id
-                            ]
+            if not existing_sources and node_data.get("source_id"):
+                existing_sources = [
+                    chunk_id
+                    for chunk_id in node_data["source_id"].split(GRAPH_FIELD_SEP)
+                    if chunk_id
+                ]
 
-                    if not existing_sources and node_data.get("source_id"):
-                        existing_sources = [
-                            chunk_id
-                            for chunk_id in node_data["source_id"].split(
-                                GRAPH_FIELD_SEP
-                            )
-                            if chunk_id
-                        ]
+            remaining_sources = subtract_source_ids(existing_sources, chunk_ids)
+            if not remaining_sources:
+                # No chunk references left means this entity should be deleted
+                plan.entities_to_delete.add(node_label)
+                plan.entity_chunk_updates[node_label] = []
+            elif remaining_sources != existing_sources:
+                plan.entities_to_rebuild[node_label] = remaining_sources
+                plan.entity_chunk_updates[node_label] = remaining_sources
+            else:
+                logger.info(f"Untouch entity: {node_label}")
+
+        # Process relationships
+        candidate_edges = []
+        for edge_data in affected_edges:
+            # source target is not in normalize order in graph db property
+            src = edge_data.get("source")
+            tgt = edge_data.get("target")
+            if not src or not tgt or "source_id" not in edge_data:
+                continue
+            candidate_edges.append((tuple(sorted((src, tgt))), src, tgt, edge_data))
+
+        relation_keys = [
+            make_relation_chunk_key(src, tgt) for _, src, tgt, _ in candidate_edges
+        ]
+        stored_relation_chunks = (
+            await self.relation_chunks.get_by_ids(relation_keys)
+            if self.relation_chunks and relation_keys
+            else [None] * len(relation_keys)
+        )
+        for (edge_tuple, src, tgt, edge_data), stored_chunks in zip(
+            candidate_edges, stored_relation_chunks
+        ):
+            if edge_tuple in plan.relation_chunk_updates:
+                continue
+
+            existing_sources: list[str] = []
+            if stored_chunks and isinstance(stored_chunks, dict):
+                existing_sources = [
+                    chunk_id
+                    for chunk_id in stored_chunks.get("chunk_ids", [])
+                    if chunk_id
+                ]
 
-                    if not existing_sources:
-                        # No chunk references means this entity should be deleted
-                        entities_to_delete.add(node_label)
-                        entity_chunk_updates[node_label] = []
-                        continue
+            if not existing_sources:
+                existing_sources = [
+                    chunk_id
+                    for chunk_id in edge_data["source_id"].split(GRAPH_FIELD_SEP)
+                    if chunk_id
+                ]
 
-                    remaining_sources = subtract_source_ids(existing_sources, chunk_ids)
+            remaining_sources = subtract_source_ids(existing_sources, chunk_ids)
+            if not remaining_sources:
+                # No chunk references left means this relationship should be deleted
+                plan.relationships_to_delete.add(edge_tuple)
+                plan.relation_chunk_updates[edge_tuple] = []
+            elif remaining_sources != existing_sources:
+                plan.relationships_to_rebuild[edge_tuple] = remaining_sources
+                plan.relation_chunk_updates[edge_tuple] = remaining_sources
+            else:
+                logger.info(f"Untouch relation: {edge_tuple}")
 
-                    if not remaining_sources:
-                        entities_to_delete.add(node_label)
-                        entity_chunk_updates[node_label] = []
-                    elif remaining_sources != existing_sources:
-                        entities_to_rebuild[node_label] = remaining_sources
-                        entity_chunk_updates[node_label] = remaining_sources
-                    else:
-                        logger.info(f"Untouch entity: {node_label}")
+        return plan
 
-                async with pipeline_status_lock:
-                    log_message = f"Found {len(entities_to_rebuild)} affected entities"
-                    logger.info(log_message)
-                    pipeline_status["latest_message"] = log_message
-                    pipeline_status["history_messages"].append(log_message)
+    async def _collect_llm_cache_ids(self, chunk_ids: set[str]) -> list[str]:
+        """Return the LLM cache ids recorded on the given chunks, deduplicated"""
+        if not self.llm_response_cache:
+            logger.info(
+                "Skipping LLM cache collection because cache storage is unavailable"
+            )
+            return []
+        if not self.text_chunks:
+            logger.info(
+                "Skipping LLM cache collection because text chunk storage is unavailable"
+            )
+            return []
+
+        cache_ids: dict[str, None] = {}
+        for chunk_data in await self.text_chunks.get_by_ids(list(chunk_ids)):
+            if not chunk_data or not isinstance(chunk_data, dict):
+                continue
+            chunk_cache_ids = chunk_data.get("llm_cache_list", [])
+            if not isinstance(chunk_cache_ids, list):
+                continue
+            for cache_id in chunk_cache_ids:
+                if isinstance(cache_id, str) and cache_id:
+                    cache_ids[cache_id] = None
+        return list(cache_ids)
+
+    async def _delete_documents_with_chunks(
+        self,
+        doc_chunk_ids: dict[str, set[str]],
+        delete_llm_cache: bool,
+        pipeline_status: dict,
+        pipeline_status_lock,
+    ) -> str:
+        """Delete documents that own chunks and repair the graph they contributed to
 
-                # Process relationships
-                for edge_data in affected_edges:
-                    # source target is not in normalize order in graph db property
-                    src = edge_data.get("source")
-                    tgt = edge_data.get("target")
+        Returns the last status message, used as the per-document result message.
+        Raises on failure; the caller reports every document of the batch as failed.
+        """
+        doc_ids = list(doc_chunk_ids)
+        chunk_ids: set[str] = set().union(*doc_chunk_ids.values())
+        doc_label = doc_ids[0] if len(doc_ids) == 1 else f"{len(doc_ids)} documents"
 
-                    if not src or not tgt or "source_id" not in edge_data:
-                        continue
+        async def log_status(message: str) -> None:
+            logger.info(message)
+            async with pipeline_status_lock:
+                pipeline_status["latest_message"] = message
+                pipeline_status["history_messages"].append(message)
 
-                    edge_tuple = tuple(sorted((src, tgt)))
-                    if (
-                        edge_tuple in relationships_to_delete
-                        or edge_tuple in relationships_to_rebuild
-                    ):
-                        continue
+        # 3. Collect LLM cache ids before chunks are gone
+        doc_llm_cache_ids: list[str] = []
+        if delete_llm_cache:
+            try:
+                doc_llm_cache_ids = await self._collect_llm_cache_ids(chunk_ids)
+                if doc_llm_cache_ids:
+                    logger.info(
+                        "Collected %d LLM cache entries for document %s",
+                        len(doc_llm_cache_ids),
+                        doc_label,
+                    )
+                else:
+                    logger.info("No LLM cache entries found for document %s", doc_label)
+            except Exception as cache_collect_error:
+                logger.error(
+                    "Failed to collect LLM cache ids for document %s: %s",
+                    doc_label,
+                    cache_collect_error,
+                )
+                raise Exception(
+                    f"Failed to collect LLM cache ids for document {doc_label}: {cache_collect_error}"
+                ) from cache_collect_error
 
-                    existing_sources: list[str] = []
-                    if self.relation_chunks:
-                        storage_key = make_relation_chunk_key(src, tgt)
-                        stored_chunks = await self.relation_chunks.get_by_id(
-                            storage_key
-                        )
-                        if stored_chunks and isinstance(stored_chunks, dict):
-                            existing_sources = [
-                                chunk_id
-                                for chunk_id in stored_chunks.get("chunk_ids", [])
-                                if chunk_id
-                            ]
+        # 4. Analyze entities and relationships that will be affected
+        try:
+            plan = await self._plan_document_deletion(doc_ids, chunk_ids)
+        except Exception as e:
+            logger.error(f"Failed to analyze affected graph elements: {e}")
+            raise Exception(f"Failed to analyze graph dependencies: {e}") from e
 
-                    if not existing_sources:
-                        existing_sources = [
-                            chunk_id
-                            for chunk_id in edge_data["source_id"].split(
-                                GRAPH_FIELD_SEP
-                            )
-                            if chunk_id
-                        ]
+        await log_status(f"Found {len(plan.entities_to_rebuild)} affected entities")
+        await log_status(
+            f"Found {len(plan.relationships_to_rebuild)} affected relations"
+        )
 
-                    if not existing_sources:
-                        # No chunk references means this relationship should be deleted
-                        relationships_to_delete.add(edge_tuple)
-                        relation_chunk_updates[edge_tuple] = []
-                        continue
+        try:
+            current_time = int(time.time())
+
+            if plan.entity_chunk_updates and self.entity_chunks:
+                entity_upsert_payload = {
+                    entity_name: {
+                        "chunk_ids": remaining,
+                        "count": len(remaining),
+                        "updated_at": current_time,
+                    }
+                    for entity_name, remaining in plan.entity_chunk_updates.items()
+                    # Empty entities are deleted alongside graph nodes later
+                    if remaining
+                }
+                if entity_upsert_payload:
+                    await self.entity_chunks.upsert(entity_upsert_payload)
+
+            if plan.relation_chunk_updates and self.relation_chunks:
+                relation_upsert_payload = {
+                    make_relation_chunk_key(*edge_tuple): {
+                        "chunk_ids": remaining,
+                        "count": len(remaining),
+                        "updated_at": current_time,
+                    }
+                    for edge_tuple, remaining in plan.relation_chunk_updates.items()
+                    # Empty relations are deleted alongside graph edges later
+                    if remaining
+                }
+                if relation_upsert_payload:
+                    await self.relation_chunks.upsert(relation_upsert_payload)
 
-                    remaining_sources = subtract_source_ids(existing_sources, chunk_ids)
+        except Exception as e:
+            logger.error(f"Failed to process graph analysis results: {e}")
+            raise Exception(f"Failed to process graph dependencies: {e}") from e
 
-                    if not remaining_sources:
-                        relationships_to_delete.add(edge_tuple)
-                        relation_chunk_updates[edge_tuple] = []
-                    elif remaining_sources != existing_sources:
-                        relationships_to_rebuild[edge_tuple] = remaining_sources
-                        relation_chunk_updates[edge_tuple] = remaining_sources
-                    else:
-                        logger.info(f"Untouch relation: {edge_tuple}")
+        # Data integrity is ensured by allowing only one process to hold pipeline at a time（no graph db lock is needed anymore)
 
-                async with pipeline_status_lock:
-                    log_message = (
-                        f"Found {len(relationships_to_rebuild)} affected relations"
+        # 5. Delete chunks from storage
+        try:
+            await self.chunks_vdb.delete(chunk_ids)
+            await self.text_chunks.delete(chunk_ids)
+            if self.lexical_index:
+                await self.lexical_index.delete(chunk_ids)
+            await log_status(
+                f"Successfully deleted {len(chunk_ids)} chunks from storage"
+            )
+        except Exception as e:
+            logger.error(f"Failed to delete chunks: {e}")
+            raise Exception(f"Failed to delete document chunks: {e}") from e
+
+        # 6. Delete relationships that have no remaining sources
+        if plan.relationships_to_delete:
+            try:
+                # Delete from relation vdb
+                rel_ids_to_delete = []
+                for src, tgt in plan.relationships_to_delete:
+                    rel_ids_to_delete.extend(
+                        [
+                            compute_mdhash_id(src + tgt, prefix="rel-"),
+                            compute_mdhash_id(tgt + src, prefix="rel-"),
+                        ]
                     )
-                    logger.info(log_message)
-                    pipeline_status["latest_message"] = log_message
-                    pipeline_status["history_messages"].append(log_message)
+                await self.relationships_vdb.delete(rel_ids_to_delete)
 
-                current_time = int(time.time())
-
-                if entity_chunk_updates and self.entity_chunks:
-                    entity_upsert_payload = {}
-                    for entity_name, remaining in entity_chunk_updates.items():
-                        if not remaining:
-                            # Empty entities are deleted alongside graph nodes later
-                            continue
-                        entity_upsert_payload[entity_name] = {
-                            "chunk_ids": remaining,
-                            "count": len(remaining),
-                            "updated_at": current_time,
-                        }
-                    if entity_upsert_payload:
-                        await self.entity_chunks.upsert(entity_upsert_payload)
-
-                if relation_chunk_updates and self.relation_chunks:
-                    relation_upsert_payload = {}
-                    for edge_tuple, remaining in relation_chunk_updates.items():
-                        if not remaining:
-                            # Empty relations are deleted alongside graph edges later
-                            continue
-                        storage_key = make_relation_chunk_key(*edge_tuple)
-                        relation_upsert_payload[storage_key] = {
-                            "chunk_ids": remaining,
-                            "count": len(remaining),
-                            "updated_at": current_time,
-                        }
+                # Delete from graph
+                await self.chunk_entity_relation_graph.remove_edges(
+                    list(plan.relationships_to_delete)
+                )
 
-                    if relation_upsert_payload:
-                        await self.relation_chunks.upsert(relation_upsert_payload)
+                # Delete from relation_chunks storage
+                if self.relation_chunks:
+                    relation_storage_keys = [
+                        make_relation_chunk_key(src, tgt)
+                        for src, tgt in plan.relationships_to_delete
+                    ]
+                    await self.relation_chunks.delete(relation_storage_keys)
 
-            except Exception as e:
-                logger.error(f"Failed to process graph analysis results: {e}")
-                raise Exception(f"Failed to process graph dependencies: {e}") from e
+                await log_status(
+                    f"Successfully deleted {len(plan.relationships_to_delete)} relations"
+                )
 
-            # Data integrity is ensured by allowing only one process to hold pipeline at a time（no graph db lock is needed anymore)
+            except Exception as e:
+                logger.error(f"Failed to delete relationships: {e}")
+                raise Exception(f"Failed to delete relationships: {e}") from e
 
-            # 5. Delete chunks from storage
-            if chunk_ids:
-                try:
-                    await self.chunks_vdb.delete(chunk_ids)
-                    await self.text_chunks.delete(chunk_ids)
+        # 7. Delete entities that have no remaining sources
+        entities_to_delete = plan.entities_to_delete
+        if entities_to_delete:
+            try:
+                # Batch get all edges for entities to avoid N+1 query problem
+                nodes_edges_dict = (
+                    await self.chunk_entity_relation_graph.get_nodes_edges_batch(
+                        list(entities_to_delete)
+                    )
+                )
 
-                    async with pipeline_status_lock:
-                        log_message = (
-                            f"Successfully deleted {len(chunk_ids)} chunks from storage"
-                        )
-                        logger.info(log_message)
-                        pipeline_status["latest_message"] = log_message
-                        pipeline_status["history_messages"].append(log_message)
+                # Debug: Check and log all edges before deleting nodes
+                edges_to_delete = set()
+                edges_still_exist = 0
+
+                for entity, edges in nodes_edges_dict.items():
+                    if edges:
+                        for src, tgt in edges:
+                            # Normalize edge representation (sorted for consistency)
+                            edge_tuple = tuple(sorted((src, tgt)))
+                            edges_to_delete.add(edge_tuple)
+
+                            if src in entities_to_delete and tgt in entities_to_delete:
+                                logger.warning(f"Edge still exists: {src} <-> {tgt}")
+                            elif src in entities_to_delete:
+                                logger.warning(f"Edge still exists: {src} --> {tgt}")
+                            else:
+                                logger.warning(f"Edge still exists: {src} <-- {tgt}")
+                        edges_still_exist += 1
 
-                except Exception as e:
-                    logger.error(f"Failed to delete chunks: {e}")
-                    raise Exception(f"Failed to delete document chunks: {e}") from e
+                if edges_still_exist:
+                    logger.warning(
+                        f"⚠️ {edges_still_exist} entities still has edges before deletion"
+                    )
 
-            # 6. Delete relationships that have no remaining sources
-            if relationships_to_delete:
-                try:
-                    # Delete from relation vdb
+                # Clean residual edges from VDB and storage before deleting nodes
+                if edges_to_delete:
+                    # Delete from relationships_vdb
                     rel_ids_to_delete = []
-                    for src, tgt in relationships_to_delete:
+                    for src, tgt in edges_to_delete:
                         rel_ids_to_delete.extend(
                             [
                                 compute_mdhash_id(src + tgt, prefix="rel-"),
@@ -3531,243 +4069,105 @@ class LightRAG:
                         )
                     await self.relationships_vdb.delete(rel_ids_to_delete)
 
-                    # Delete from graph
-                    await self.chunk_entity_relation_graph.remove_edges(
-                        list(relationships_to_delete)
-                    )
-
                     # Delete from relation_chunks storage
                     if self.relation_chunks:
                         relation_storage_keys = [
                             make_relation_chunk_key(src, tgt)
-                            for src, tgt in relationships_to_delete
+                            for src, tgt in edges_to_delete
                         ]
                         await self.relation_chunks.delete(relation_storage_keys)
 
-                    async with pipeline_status_lock:
-                        log_message = f"Successfully deleted {len(relationships_to_delete)} relations"
-                        logger.info(log_message)
-                        pipeline_status["latest_message"] = log_message
-                        pipeline_status["history_messages"].append(log_message)
-
-                except Exception as e:
-                    logger.error(f"Failed to delete relationships: {e}")
-                    raise Exception(f"Failed to delete relationships: {e}") from e
+                    # Residual edges of rebuilt relations no longer need a rebuild
+                    for edge_tuple in edges_to_delete:
+                        plan.relationships_to_rebuild.pop(edge_tuple, None)
 
-            # 7. Delete entities that have no remaining sources
-            if entities_to_delete:
-                try:
-                    # Batch get all edges for entities to avoid N+1 query problem
-                    nodes_edges_dict = (
-                        await self.chunk_entity_relation_graph.get_nodes_edges_batch(
-                            list(entities_to_delete)
-                        )
-                    )
-
-                    # Debug: Check and log all edges before deleting nodes
-                    edges_to_delete = set()
-                    edges_still_exist = 0
-
-                    for entity, edges in nodes_edges_dict.items():
-                        if edges:
-                            for src, tgt in edges:
-                                # Normalize edge representation (sorted for consistency)
-                                edge_tuple = tuple(sorted((src, tgt)))
-                                edges_to_delete.add(edge_tuple)
-
-                                if (
-                                    src in entities_to_delete
-                                    and tgt in entities_to_delete
-                                ):
-                                    logger.warning(
-                                        f"Edge still exists: {src} <-> {tgt}"
-                                    )
-                                elif src in entities_to_delete:
-                                    logger.warning(
-                                        f"Edge still exists: {src} --> {tgt}"
-                                    )
-                                else:
-                                    logger.warning(
-                                        f"Edge still exists: {src} <-- {tgt}"
-                                    )
-                            edges_still_exist += 1
-
-                    if edges_still_exist:
-                        logger.warning(
-                            f"⚠️ {edges_still_exist} entities still has edges before deletion"
-                        )
-
-                    # Clean residual edges from VDB and storage before deleting nodes
-                    if edges_to_delete:
-                        # Delete from relationships_vdb
-                        rel_ids_to_delete = []
-                        for src, tgt in edges_to_delete:
-                            rel_ids_to_delete.extend(
-                                [
-                                    compute_mdhash_id(src + tgt, prefix="rel-"),
-                                    compute_mdhash_id(tgt + src, prefix="rel-"),
-                                ]
-                            )
-                        await self.relationships_vdb.delete(rel_ids_to_delete)
-
-                        # Delete from relation_chunks storage
-                        if self.relation_chunks:
-                            relation_storage_keys = [
-                                make_relation_chunk_key(src, tgt)
-                                for src, tgt in edges_to_delete
-                            ]
-                            await self.relation_chunks.delete(relation_storage_keys)
-
-                        logger.info(
-                            f"Cleaned {len(edges_to_delete)} residual edges from VDB and chunk-tracking storage"
-                        )
-
-                    # Delete from graph (edges will be auto-deleted with nodes)
-                    await self.chunk_entity_relation_graph.remove_nodes(
-                        list(entities_to_delete)
+                    logger.info(
+                        f"Cleaned {len(edges_to_delete)} residual edges from VDB and chunk-tracking storage"
                     )
 
-                    # Delete from vector vdb
-                    entity_vdb_ids = [
-                        compute_mdhash_id(entity, prefix="ent-")
-                        for entity in entities_to_delete
-                    ]
-                    await self.entities_vdb.delete(entity_vdb_ids)
+                # Delete from graph (edges will be auto-deleted with nodes)
+                await self.chunk_entity_relation_graph.remove_nodes(
+                    list(entities_to_delete)
+                )
 
-                    # Delete from entity_chunks storage
-                    if self.entity_chunks:
-                        await self.entity_chunks.delete(list(entities_to_delete))
+                # Delete from vector vdb
+                entity_vdb_ids = [
+                    compute_mdhash_id(entity, prefix="ent-")
+                    for entity in entities_to_delete
+                ]
+                await self.entities_vdb.delete(entity_vdb_ids)
 
-                    async with pipeline_status_lock:
-                        log_message = (
-                            f"Successfully deleted {len(entities_to_delete)} entities"
-                        )
-                        logger.info(log_message)
-                        pipeline_status["latest_message"] = log_message
-                        pipeline_status["history_messages"].append(log_message)
+                # Delete from entity_chunks storage
+                if self.entity_chunks:
+                    await self.entity_chunks.delete(list(entities_to_delete))
 
-                except Exception as e:
-                    logger.error(f"Failed to delete entities: {e}")
-                    raise Exception(f"Failed to delete entities: {e}") from e
-
-            # Persist changes to graph database before entity and relationship rebuild
-            await self._insert_done()
+                await log_status(
+                    f"Successfully deleted {len(entities_to_delete)} entities"
+                )
 
-            # 8. Rebuild entities and relationships from remaining chunks
-            if entities_to_rebuild or relationships_to_rebuild:
-                try:
-                    await rebuild_knowledge_from_chunks(
-                        entities_to_rebuild=entities_to_rebuild,
-                        relationships_to_rebuild=relationships_to_rebuild,
-                        knowledge_graph_inst=self.chunk_entity_relation_graph,
-                        entities_vdb=self.entities_vdb,
-                        relationships_vdb=self.relationships_vdb,
-                        text_chunks_storage=self.text_chunks,
-                        llm_response_cache=self.llm_response_cache,
-                        global_config=asdict(self),
-                        pipeline_status=pipeline_status,
-                        pipeline_status_lock=pipeline_status_lock,
-                        entity_chunks_storage=self.entity_chunks,
-                        relation_chunks_storage=self.relation_chunks,
-                    )
+            except Exception as e:
+                logger.error(f"Failed to delete entities: {e}")
+                raise Exception(f"Failed to delete entities: {e}") from e
 
-                except Exception as e:
-                    logger.error(f"Failed to rebuild knowledge from chunks: {e}")
-                    raise Exception(f"Failed to rebuild knowledge graph: {e}") from e
+        # Persist changes to graph database before entity and relationship rebuild
+        await self._insert_done()
 
-            # 9. Delete from full_entities and full_relations storage
+        # 8. Rebuild entities and relationships from remaining chunks, once per
+        # element for the whole batch
+        if plan.entities_to_rebuild or plan.relationships_to_rebuild:
             try:
-                await self.full_entities.delete([doc_id])
-                await self.full_relations.delete([doc_id])
-            except Exception as e:
-                logger.error(f"Failed to delete from full_entities/full_relations: {e}")
-                raise Exception(
-                    f"Failed to delete from full_entities/full_relations: {e}"
-                ) from e
+                await rebuild_knowledge_from_chunks(
+                    entities_to_rebuild=plan.entities_to_rebuild,
+                    relationships_to_rebuild=plan.relationships_to_rebuild,
+                    knowledge_graph_inst=self.chunk_entity_relation_graph,
+                    entities_vdb=self.entities_vdb,
+                    relationships_vdb=self.relationships_vdb,
+                    text_chunks_storage=self.text_chunks,
+                    llm_response_cache=self.llm_response_cache,
+                    global_config=self.config_view,
+                    pipeline_status=pipeline_status,
+                    pipeline_status_lock=pipeline_status_lock,
+                    entity_chunks_storage=self.entity_chunks,
+                    relation_chunks_storage=self.relation_chunks,
+                )
 
-            # 10. Delete original document and status
-            try:
-                await self.full_docs.delete([doc_id])
-                await self.doc_status.delete([doc_id])
             except Exception as e:
-                logger.error(f"Failed to delete document and status: {e}")
-                raise Exception(f"Failed to delete document and status: {e}") from e
-
-            if delete_llm_cache and doc_llm_cache_ids and self.llm_response_cache:
-                try:
-                    await self.llm_response_cache.delete(doc_llm_cache_ids)
-                    cache_log_message = f"Successfully deleted {len(doc_llm_cache_ids)} LLM cache entries for document {doc_id}"
-                    logger.info(cache_log_message)
-                    async with pipeline_status_lock:
-                        pipeline_status["latest_message"] = cache_log_message
-                        pipeline_status["history_messages"].append(cache_log_message)
-                    log_message = cache_log_message
-                except Exception as cache_delete_error:
-                    log_message = f"Failed to delete LLM cache for document {doc_id}: {cache_delete_error}"
-                    logger.error(log_message)
-                    logger.error(traceback.format_exc())
-                    async with pipeline_status_lock:
-                        pipeline_status["latest_message"] = log_message
-                        pipeline_status["history_messages"].append(log_message)
-
-            return DeletionResult(
-                status="success",
-                doc_id=doc_id,
-                message=log_message,
-                status_code=200,
-                file_path=file_path,
-            )
+                logger.error(f"Failed to rebuild knowledge from chunks: {e}")
+                raise Exception(f"Failed to rebuild knowledge graph: {e}") from e
 
+        # 9. Delete from full_entities and full_relations storage
+        try:
+            await self.full_entities.delete(doc_ids)
+            await self.full_relations.delete(doc_ids)
         except Exception as e:
-            original_exception = e
-            error_message = f"Error while deleting document {doc_id}: {e}"
-            logger.error(error_message)
-            logger.error(traceback.format_exc())
-            return DeletionResult(
-                status="fail",
-                doc_id=doc_id,
-                message=error_message,
-                status_code=500,
-                file_path=file_path,
-            )
+            logger.error(f"Failed to delete from full_entities/full_relations: {e}")
+            raise Exception(
+                f"Failed to delete from full_entities/full_relations: {e}"
+            ) from e
 
-        finally:
-            # ALWAYS ensure persistence if any deletion operations were started
-            if deletion_operations_started:
-                try:
-                    await self._insert_done()
-                except Exception as persistence_error:
-                    persistence_error_msg = f"Failed to persist data after deletion attempt for {doc_id}: {persistence_error}"
-                    logger.error(persistence_error_msg)
-                    logger.error(traceback.format_exc())
-
-                    # If there was no original exception, this persistence error becomes the main error
-                    if original_exception is None:
-                        return DeletionResult(
-                            status="fail",
-                            doc_id=doc_id,
-                            message=f"Deletion completed but failed to persist changes: {persistence_error}",
-                            status_code=500,
-                            file_path=file_path,
-                        )
-                    # If there was an original exception, log the persistence error but don't override the original error
-                    # The original error result was already returned in the except block
-            else:
-                logger.debug(
-                    f"No deletion operations were started for document {doc_id}, skipping persistence"
-                )
+        # 10. Delete original documents and status
+        try:
+            await self.full_docs.delete(doc_ids)
+            await self.doc_status.delete(doc_ids)
+        except Exception as e:
+            logger.error(f"Failed to delete document and status: {e}")
+            raise Exception(f"Failed to delete document and status: {e}") from e
 
-            # Release pipeline only if WE acquired it
-            if we_acquired_pipeline:
+        log_message = f"Successfully deleted document {doc_label}"
+        if delete_llm_cache and doc_llm_cache_ids and self.llm_response_cache:
+            try:
+                await self.llm_response_cache.delete(doc_llm_cache_ids)
+                log_message = f"Successfully deleted {len(doc_llm_cache_ids)} LLM cache entries for document {doc_label}"
+                await log_status(log_message)
+            except Exception as cache_delete_error:
+                log_message = f"Failed to delete LLM cache for document {doc_label}: {cache_delete_error}"
+                logger.error(log_message)
+                logger.error(traceback.format_exc())
                 async with pipeline_status_lock:
-                    pipeline_status["busy"] = False
-                    pipeline_status["cancellation_requested"] = False
-                    completion_msg = (
-                        f"Deletion process completed for document: {doc_id}"
-                    )
-                    pipeline_status["latest_message"] = completion_msg
-                    pipeline_status["history_messages"].append(completion_msg)
-                    logger.info(completion_msg)
+                    pipeline_status["latest_message"] = log_message
+                    pipeline_status["history_messages"].append(log_message)
+
+        return log_message
 
     async def adelete_by_entity(self, entity_name: str) -> DeletionResult:
         """Asynchronously delete an entity and all its relationships.
@@ -35,6 +35,7 @@ from tenacity import (
 from lightrag.utils import (
     safe_unicode_decode,
     logger,
+    split_cached_prompt,
 )
 from lightrag.api import __api_version__
 
@@ -46,6 +47,28 @@ class InvalidResponseError(Exception):
     pass
 
 
+def _usage_counts(usage: Any, counts: dict[str, int]) -> dict[str, int]:
+    """Merge an Anthropic usage object into TokenTracker counts
+
+    Anthropic reports uncached, cache-read and cache-write input tokens
+    separately; prompt_tokens is their sum.
+    """
+    if usage is None:
+        return counts
+    counts = dict(counts)
+    input_tokens = getattr(usage, "input_tokens", None)
+    if input_tokens is not None:
+        cached = getattr(usage, "cache_read_input_tokens", None) or 0
+        written = getattr(usage, "cache_creation_input_tokens", None) or 0
+        counts["prompt_tokens"] = input_tokens + cached + written
+        counts["cached_tokens"] = cached
+        counts["cache_write_tokens"] = written
+    output_tokens = getattr(usage, "output_tokens", None)
+    if output_tokens is not None:
+        counts["completion_tokens"] = output_tokens
+    return counts
+
+
 # Core Anthropic completion function with retry
 @retry(
     stop=stop_after_attempt(3),
@@ -62,8 +85,17 @@ async def anthropic_complete_if_cache(
     enable_cot: bool = False,
     base_url: str | None = None,
     api_key: str | None = None,
+    token_tracker: Any | None = None,
+    prompt_cache: bool = True,
     **kwargs: Any,
 ) -> Union[str, AsyncIterator[str]]:
+    """Stream a completion from the Anthropic Messages API
+
+    When the system prompt carries a static prefix (see ``CachedPrompt``) and
+    ``prompt_cache`` is on, the prefix is sent as its own system block with an
+    ephemeral ``cache_control`` marker so Anthropic can reuse it across calls.
+    Cache reads and writes are reported to ``token_tracker``.
+    """
     if history_messages is None:
         history_messages = []
     if enable_cot:
@@ -99,9 +131,24 @@ async def anthropic_complete_if_cache(
         )
     )
 
-    messages: list[dict[str, Any]] = []
+    # The Messages API takes the system prompt as a top-level parameter
     if system_prompt:
-        messages.append({"role": "system", "content": system_prompt})
+        static_prefix, dynamic_suffix = split_cached_prompt(system_prompt)
+        if prompt_cache and static_prefix:
+            system_blocks = [
+                {
+                    "type": "text",
+                    "text": static_prefix,
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ]
+            if dynamic_suffix:
+                system_blocks.append({"type": "text", "text": dynamic_suffix})
+            kwargs["system"] = system_blocks
+        else:
+            kwargs["system"] = str(system_prompt)
+
+    messages: list[dict[str, Any]] = []
     messages.extend(history_messages)
     messages.append({"role": "user", "content": prompt})
 
@@ -131,14 +178,22 @@ async def anthropic_complete_if_cache(
         raise
 
     async def stream_response():
+        usage = {}
         try:
             async for event in response:
+                event_type = getattr(event, "type", None)
+                if event_type == "message_start":
+                    usage = _usage_counts(event.message.usage, usage)
+                    continue
+                if event_type == "message_delta":
+                    usage = _usage_counts(getattr(event, "usage", None), usage)
+                    continue
                 content = (
-                    event.delta.text
-                    if hasattr(event, "delta") and event.delta.text
+                    getattr(event.delta, "text", None)
+                    if hasattr(event, "delta")
                     else None
                 )
-                if content is None:
+                if not content:
                     continue
                 if r"\u" in content:
                     content = safe_unicode_decode(content.encode("utf-8"))
@@ -146,6 +201,14 @@ async def anthropic_complete_if_cache(
         except Exception as e:
             logger.error(f"Error in stream response: {str(e)}")
             raise
+        if token_tracker and usage:
+            token_tracker.add_usage(
+                {
+                    **usage,
+                    "total_tokens": usage.get("prompt_tokens", 0)
+                    + usage.get("completion_tokens", 0),
+                }
+            )
 
     return stream_response()
 
@@ -17,7 +17,7 @@ from tenacity import (
 )
 
 import sys
-from lightrag.utils import wrap_embedding_func_with_attrs
+from lightrag.utils import split_cached_prompt, wrap_embedding_func_with_attrs
 
 if sys.version_info < (3, 9):
     from typing import AsyncIterator
@@ -55,6 +55,46 @@ class BedrockTimeoutError(BedrockError):
     """Error for timeout issues"""
 
 
+# Model families that accept cachePoint blocks in the Converse API
+_PROMPT_CACHE_MODEL_MARKERS = ("anthropic.", "amazon.nova")
+
+
+def _system_blocks(system_prompt: str, model: str, prompt_cache) -> list[dict]:
+    """Converse system blocks, with a cachePoint after the static prefix
+
+    ``prompt_cache`` None enables the cache point only for model families that
+    support prompt caching; other models reject cachePoint blocks.
+    """
+    static_prefix, dynamic_suffix = split_cached_prompt(system_prompt)
+    if prompt_cache is None:
+        prompt_cache = any(marker in model for marker in _PROMPT_CACHE_MODEL_MARKERS)
+    if not (prompt_cache and static_prefix):
+        return [{"text": str(system_prompt)}]
+    blocks = [{"text": static_prefix}, {"cachePoint": {"type": "default"}}]
+    if dynamic_suffix:
+        blocks.append({"text": dynamic_suffix})
+    return blocks
+
+
+def _usage_counts(usage: dict) -> dict[str, int]:
+    """Token counts for TokenTracker from a Converse usage dict
+
+    Converse reports cache reads and writes next to inputTokens; prompt_tokens
+    is their sum.
+    """
+    cached = usage.get("cacheReadInputTokens", 0) or 0
+    written = usage.get("cacheWriteInputTokens", 0) or 0
+    prompt_tokens = usage.get("inputTokens", 0) + cached + written
+    completion_tokens = usage.get("outputTokens", 0)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "cached_tokens": cached,
+        "cache_write_tokens": written,
+    }
+
+
 def _set_env_if_present(key: str, value):
     """Set environment variable only if a non-empty value is provided."""
     if value is not None and value != "":
@@ -150,6 +190,8 @@ async def bedrock_complete_if_cache(
     aws_access_key_id=None,
     aws_secret_access_key=None,
     aws_session_token=None,
+    token_tracker=None,
+    prompt_cache: bool | None = None,
     **kwargs,
 ) -> Union[str, AsyncIterator[str]]:
     if enable_cot:
@@ -201,7 +243,7 @@ async def bedrock_complete_if_cache(
 
     # Define system prompt
     if system_prompt:
-        args["system"] = [{"text": system_prompt}]
+        args["system"] = _system_blocks(system_prompt, model, prompt_cache)
 
     # Map and set up inference parameters
     inference_params_map = {
@@ -255,8 +297,11 @@ async def bedrock_complete_if_cache(
                         text = delta.get("text")
                         if text:
                             yield text
-                    # Handle other event types that might indicate stream end
-                    elif "messageStop" in event:
+                    # Usage arrives in the metadata event after messageStop
+                    elif "metadata" in event:
+                        usage = event["metadata"].get("usage")
+                        if token_tracker and usage:
+                            token_tracker.add_usage(_usage_counts(usage))
                         break
 
             except Exception as e:
@@ -328,6 +373,9 @@ async def bedrock_complete_if_cache(
             if not content or content.strip() == "":
                 raise BedrockError("Received empty content from Bedrock API")
 
+            if token_tracker and response.get("usage"):
+                token_tracker.add_usage(_usage_counts(response["usage"]))
+
             return content
 
         except Exception as e:
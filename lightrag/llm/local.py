@@ -0,0 +1,164 @@
+"""In-process CPU embeddings for offline deployments.
+
+Models are loaded from a local directory (or the Hugging Face cache): ONNX
+Runtime is used when the directory contains an exported ``model.onnx``,
+otherwise sentence-transformers. Inference runs on a small thread pool so it
+does not block the event loop.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import numpy as np
+import pipmaster as pm  # Pipmaster for dynamic library install
+
+from lightrag.utils import logger, wrap_embedding_func_with_attrs
+
+DEFAULT_LOCAL_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+class LocalEmbeddingModel:
+    """Sentence embedding model running in this process"""
+
+    def __init__(
+        self,
+        model_path: str,
+        backend: str = "auto",
+        max_length: int = 512,
+        max_workers: int = 2,
+        normalize: bool = True,
+    ):
+        if backend not in ("auto", "onnx", "sentence_transformers"):
+            raise ValueError(f"Unsupported local embedding backend: {backend}")
+        self.model_path = model_path
+        self.backend = backend
+        self.max_length = max_length
+        self.normalize = normalize
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="lightrag-embed"
+        )
+        self._load_lock = threading.Lock()
+        self._encoder: Callable[[list[str]], np.ndarray] | None = None
+
+    def _find_onnx_file(self) -> str | None:
+        for candidate in ("model.onnx", os.path.join("onnx", "model.onnx")):
+            path = os.path.join(self.model_path, candidate)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def _load_encoder(self) -> Callable[[list[str]], np.ndarray]:
+        onnx_file = (
+            self._find_onnx_file() if self.backend != "sentence_transformers" else None
+        )
+        if self.backend == "onnx" and onnx_file is None:
+            raise FileNotFoundError(f"No model.onnx found under {self.model_path}")
+
+        if onnx_file is None:
+            if not pm.is_installed("sentence-transformers"):
+                pm.install("sentence-transformers")
+            from sentence_transformers import SentenceTransformer
+
+            model = SentenceTransformer(self.model_path, device="cpu")
+            model.max_seq_length = self.max_length
+            logger.info(f"Local embedding model loaded: {self.model_path}")
+            return lambda texts: model.encode(
+                texts,
+                batch_size=len(texts),
+                convert_to_numpy=True,
+                normalize_embeddings=self.normalize,
+            )
+
+        if not pm.is_installed("onnxruntime"):
+            pm.install("onnxruntime")
+        if not pm.is_installed("transformers"):
+            pm.install("transformers")
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(self.model_path)
+        tokenizer_lock = threading.Lock()
+        session = ort.InferenceSession(onnx_file, providers=["CPUExecutionProvider"])
+        input_names = {item.name for item in session.get_inputs()}
+
+        def encode_onnx(texts: list[str]) -> np.ndarray:
+            # Fast tokenizers are not safe to call from several threads at once
+            with tokenizer_lock:
+                encoded = tokenizer(
+                    texts,
+                    padding=True,
+                    truncation=True,
+                    max_length=self.max_length,
+                    return_tensors="np",
+                )
+            feeds = {
+                name: np.asarray(value, dtype=np.int64)
+                for name, value in encoded.items()
+                if name in input_names
+            }
+            hidden = session.run(None, feeds)[0]
+            # Mean pooling over non-padding tokens
+            mask = np.asarray(encoded["attention_mask"], dtype=np.float32)[..., None]
+            embeddings = (hidden * mask).sum(axis=1) / np.clip(
+                mask.sum(axis=1), 1e-9, None
+            )
+            if self.normalize:
+                embeddings /= np.clip(
+                    np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None
+                )
+            return embeddings
+
+        logger.info(f"Local embedding model loaded with ONNX Runtime: {onnx_file}")
+        return encode_onnx
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        if self._encoder is None:
+            with self._load_lock:
+                if self._encoder is None:
+                    self._encoder = self._load_encoder()
+        return np.asarray(self._encoder(texts), dtype=np.float32)
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._encode, list(texts))
+
+
+_local_models: dict[tuple[str, str], LocalEmbeddingModel] = {}
+_local_models_lock = threading.Lock()
+
+
+def get_local_embedding_model(
+    model_path: str, backend: str | None = None
+) -> LocalEmbeddingModel:
+    """Return a shared local embedding model, configured from environment variables"""
+    backend = backend or os.getenv("LOCAL_EMBEDDING_BACKEND", "auto")
+    key = (model_path, backend)
+    with _local_models_lock:
+        model = _local_models.get(key)
+        if model is None:
+            model = _local_models[key] = LocalEmbeddingModel(
+                model_path,
+                backend=backend,
+                max_length=int(os.getenv("LOCAL_EMBEDDING_MAX_LENGTH", "512")),
+                max_workers=int(os.getenv("LOCAL_EMBEDDING_MAX_WORKERS", "2")),
+            )
+    return model
+
+
+@wrap_embedding_func_with_attrs(embedding_dim=384, max_token_size=512)
+async def local_embed(
+    texts: list[str], model: str = DEFAULT_LOCAL_EMBEDDING_MODEL
+) -> np.ndarray:
+    """Embed texts with a local sentence embedding model.
+
+    Args:
+        texts: List of texts to embed
+        model: Local model directory or Hugging Face model name
+
+    Returns:
+        A numpy array of embeddings, one per input text
+    """
+    return await get_local_embedding_model(model).embed(texts)
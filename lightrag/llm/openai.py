@@ -25,6 +25,7 @@ from lightrag.utils import (
     wrap_embedding_func_with_attrs,
     safe_unicode_decode,
     logger,
+    split_cached_prompt,
 )
 
 from lightrag.types import GPTKeywordExtractionFormat
@@ -74,6 +75,40 @@ class InvalidResponseError(Exception):
     pass
 
 
+def _usage_counts(usage: Any) -> dict[str, int]:
+    """Token counts for TokenTracker, including prompt tokens served from cache"""
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0),
+        "completion_tokens": getattr(usage, "completion_tokens", 0),
+        "total_tokens": getattr(usage, "total_tokens", 0),
+        "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+    }
+
+
+def _system_message(system_prompt: str, prompt_cache: bool) -> dict[str, Any]:
+    """System message, with an explicit cache breakpoint after the static prefix
+
+    OpenAI caches prompt prefixes automatically, so the plain string form is
+    used by default. With ``prompt_cache`` the static prefix becomes its own
+    content part carrying ``cache_control``, which OpenAI-compatible gateways
+    in front of Anthropic or Bedrock models forward as a cache marker.
+    """
+    static_prefix, dynamic_suffix = split_cached_prompt(system_prompt)
+    if not (prompt_cache and static_prefix):
+        return {"role": "system", "content": system_prompt}
+    content = [
+        {
+            "type": "text",
+            "text": static_prefix,
+            "cache_control": {"type": "ephemeral"},
+        }
+    ]
+    if dynamic_suffix:
+        content.append({"type": "text", "text": dynamic_suffix})
+    return {"role": "system", "content": content}
+
+
 def create_openai_async_client(
     api_key: str | None = None,
     base_url: str | None = None,
@@ -184,6 +219,7 @@ async def openai_complete_if_cache(
     use_azure: bool = False,
     azure_deployment: str | None = None,
     api_version: str | None = None,
+    prompt_cache: bool = False,
     **kwargs: Any,
 ) -> str:
     """Complete a prompt using OpenAI's API with caching support and Chain of Thought (COT) integration.
@@ -226,6 +262,10 @@ async def openai_complete_if_cache(
         api_version: Azure OpenAI API version (e.g., "2024-02-15-preview"). Only used
             when use_azure=True. If not specified, falls back to AZURE_OPENAI_API_VERSION
             environment variable.
+        prompt_cache: Send the static prefix of a CachedPrompt system prompt as a
+            separate content part with a cache_control marker. OpenAI itself caches
+            prefixes automatically; this is for gateways that need explicit markers.
+            Default is False.
         **kwargs: Additional keyword arguments to pass to the OpenAI API.
             Special kwargs:
             - openai_client_configs: Dict of configuration options for the AsyncOpenAI client.
@@ -274,7 +314,7 @@ async def openai_complete_if_cache(
     # Prepare messages
     messages: list[dict[str, Any]] = []
     if system_prompt:
-        messages.append({"role": "system", "content": system_prompt})
+        messages.append(_system_message(system_prompt, prompt_cache))
     messages.extend(history_messages)
     messages.append({"role": "user", "content": prompt})
 
@@ -423,13 +463,7 @@ async def openai_complete_if_cache(
                 # After streaming is complete, track token usage
                 if token_tracker and final_chunk_usage:
                     # Use actual usage from the API
-                    token_counts = {
-                        "prompt_tokens": getattr(final_chunk_usage, "prompt_tokens", 0),
-                        "completion_tokens": getattr(
-                            final_chunk_usage, "completion_tokens", 0
-                        ),
-                        "total_tokens": getattr(final_chunk_usage, "total_tokens", 0),
-                    }
+                    token_counts = _usage_counts(final_chunk_usage)
                     token_tracker.add_usage(token_counts)
                     logger.debug(f"Streaming token usage (from API): {token_counts}")
                 elif token_tracker:
@@ -574,14 +608,7 @@ async def openai_complete_if_cache(
                 final_content = safe_unicode_decode(final_content.encode("utf-8"))
 
             if token_tracker and hasattr(response, "usage"):
-                token_counts = {
-                    "prompt_tokens": getattr(response.usage, "prompt_tokens", 0),
-                    "completion_tokens": getattr(
-                        response.usage, "completion_tokens", 0
-                    ),
-                    "total_tokens": getattr(response.usage, "total_tokens", 0),
-                }
-                token_tracker.add_usage(token_counts)
+                token_tracker.add_usage(_usage_counts(response.usage))
 
             logger.debug(f"Response content len: {len(final_content)}")
             verbose_debug(f"Response: {response}")
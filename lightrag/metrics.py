@@ -0,0 +1,460 @@
+"""
+Prometheus metrics for queues, the LLM cache, storages and the indexing pipeline.
+
+Every process records into a local ``MetricsRegistry`` with plain dict updates,
+so instrumented hot paths never take a lock or touch shared memory. The
+registry snapshot of each worker is published into shared namespace data,
+periodically and on every scrape, and ``/metrics`` merges the snapshots of all
+Gunicorn workers: counters and histograms are summed, gauges are summed over
+workers that published recently.
+
+The text exposition format is rendered here, so no client library is needed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import math
+import os
+import time
+from bisect import bisect_left
+from collections import deque
+from functools import wraps
+from typing import Any, Iterable
+
+from lightrag.constants import DEFAULT_METRICS_PUBLISH_INTERVAL
+from lightrag.kg.shared_storage import get_namespace_data
+
+# lightrag.utils records queue and cache metrics here, so this module must not import it
+logger = logging.getLogger("lightrag")
+
+METRICS_NAMESPACE = "metrics"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds, from an in-memory KV lookup to a slow LLM queue wait
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+# Window of the per-minute throughput gauges
+RATE_WINDOW_SECONDS = 60.0
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+METER = "meter"  # counter plus a per-minute rate gauge
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def label_key(**labels: Any) -> LabelKey:
+    """Hashable label set; build it once for labels that do not change"""
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class MetricsRegistry:
+    """Metric values of one process"""
+
+    def __init__(self):
+        self.definitions: dict[str, tuple[str, str, tuple[float, ...]]] = {}
+        self._values: dict[tuple[str, LabelKey], float] = {}
+        self._histograms: dict[tuple[str, LabelKey], list] = {}
+        self._windows: dict[tuple[str, LabelKey], deque] = {}
+
+    def define(
+        self,
+        name: str,
+        kind: str,
+        help: str,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.definitions[name] = (kind, help, tuple(buckets))
+
+    def inc(self, name: str, amount: float = 1.0, labels: LabelKey = ()) -> None:
+        """Increase a counter, or move a gauge up or down"""
+        key = (name, labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, name: str, value: float, labels: LabelKey = ()) -> None:
+        self._values[(name, labels)] = value
+
+    def observe(self, name: str, value: float, labels: LabelKey = ()) -> None:
+        key = (name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            buckets = self.definitions[name][2]
+            histogram = self._histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+        histogram[0][bisect_left(self.definitions[name][2], value)] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+    def mark(self, name: str, amount: float = 1.0, labels: LabelKey = ()) -> None:
+        """Count events of a meter and remember them for the per-minute rate"""
+        if amount <= 0:
+            return
+        key = (name, labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = deque()
+        window.append((time.monotonic(), amount))
+
+    def snapshot(self) -> dict[str, Any]:
+        """Picklable copy of all values, as published to other workers"""
+        horizon = time.monotonic() - RATE_WINDOW_SECONDS
+        rates = {}
+        for key, window in self._windows.items():
+            while window and window[0][0] < horizon:
+                window.popleft()
+            rates[key] = sum(amount for _, amount in window)
+        return {
+            "pid": os.getpid(),
+            "time": time.time(),
+            "values": dict(self._values),
+            "histograms": {
+                key: (tuple(counts), total, count)
+                for key, (counts, total, count) in self._histograms.items()
+            },
+            "rates": rates,
+        }
+
+    def reset(self) -> None:
+        self._values.clear()
+        self._histograms.clear()
+        self._windows.clear()
+
+
+registry = MetricsRegistry()
+
+registry.define(
+    "lightrag_queue_depth", GAUGE, "Calls waiting in an LLM or embedding queue"
+)
+registry.define(
+    "lightrag_queue_in_flight", GAUGE, "Calls of a queue currently being executed"
+)
+registry.define(
+    "lightrag_queue_wait_seconds",
+    HISTOGRAM,
+    "Time calls spent in the queue before a worker started them",
+)
+registry.define(
+    "lightrag_llm_cache_requests_total",
+    COUNTER,
+    "LLM cache lookups by cache type and result (hit or miss)",
+)
+registry.define(
+    "lightrag_llm_cache_writes_total", COUNTER, "Responses written to the LLM cache"
+)
+registry.define(
+    "lightrag_storage_operation_seconds",
+    HISTOGRAM,
+    "Latency of storage operations by storage kind, namespace, backend and operation",
+)
+registry.define(
+    "lightrag_storage_operation_errors_total",
+    COUNTER,
+    "Storage operations that raised an exception",
+)
+registry.define(
+    "lightrag_pipeline_chunks", METER, "Chunks processed by entity extraction"
+)
+registry.define(
+    "lightrag_pipeline_entities", METER, "Entities extracted by the indexing pipeline"
+)
+registry.define(
+    "lightrag_pipeline_relations",
+    METER,
+    "Relations extracted by the indexing pipeline",
+)
+registry.define(
+    "lightrag_rerank_seconds", HISTOGRAM, "Latency of local cross-encoder rerank calls"
+)
+registry.define(
+    "lightrag_rerank_documents_total",
+    COUNTER,
+    "Documents scored by the local cross-encoder reranker",
+)
+
+
+# -------------------------- Storage instrumentation --------------------------
+def _storage_kind(storage: Any) -> str | None:
+    from lightrag.base import BaseGraphStorage, BaseKVStorage, BaseVectorStorage
+
+    for kind, base in (
+        ("graph", BaseGraphStorage),
+        ("vector", BaseVectorStorage),
+        ("kv", BaseKVStorage),
+    ):
+        if isinstance(storage, base):
+            return kind
+    return None
+
+
+def _storage_operations(storage: Any) -> list[str]:
+    """Public coroutine methods of the storage's base interface"""
+    from lightrag.base import (
+        BaseGraphStorage,
+        BaseKVStorage,
+        BaseVectorStorage,
+        DocStatusStorage,
+    )
+
+    operations = set()
+    for base in (BaseGraphStorage, BaseVectorStorage, BaseKVStorage, DocStatusStorage):
+        if not isinstance(storage, base):
+            continue
+        for name in dir(base):
+            if name.startswith("_") or name in ("initialize", "finalize"):
+                continue
+            if inspect.iscoroutinefunction(getattr(base, name, None)):
+                operations.add(name)
+    return sorted(operations)
+
+
+def instrument_storage(storage: Any, metrics: MetricsRegistry = registry) -> Any:
+    """Record the latency of every storage operation of ``storage``
+
+    The bound methods are replaced on the instance, so the backend class is not
+    modified and other instances are unaffected.
+    """
+    kind = _storage_kind(storage)
+    if kind is None or getattr(storage, "_metrics_instrumented", False):
+        return storage
+
+    for operation in _storage_operations(storage):
+        method = getattr(storage, operation, None)
+        if method is None or not inspect.iscoroutinefunction(method):
+            continue
+        labels = label_key(
+            kind=kind,
+            namespace=getattr(storage, "namespace", ""),
+            backend=type(storage).__name__,
+            operation=operation,
+        )
+        setattr(storage, operation, _timed_operation(method, labels, metrics))
+    storage._metrics_instrumented = True
+    return storage
+
+
+def _timed_operation(method, labels: LabelKey, metrics: MetricsRegistry):
+    @wraps(method)
+    async def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        except Exception:
+            metrics.inc("lightrag_storage_operation_errors_total", 1, labels)
+            raise
+        finally:
+            metrics.observe(
+                "lightrag_storage_operation_seconds",
+                time.perf_counter() - start,
+                labels,
+            )
+
+    return timed
+
+
+# -------------------------- Cross-worker aggregation --------------------------
+async def publish_metrics(metrics: MetricsRegistry = registry) -> bool:
+    """Publish the snapshot of this process; False when shared data is not set up"""
+    try:
+        shared = await get_namespace_data(METRICS_NAMESPACE, workspace="")
+    except ValueError:
+        return False
+    # Manager dict values must be replaced whole to reach other processes
+    shared[str(os.getpid())] = metrics.snapshot()
+    return True
+
+
+async def collect_metrics(
+    metrics: MetricsRegistry = registry,
+    stale_after: float = DEFAULT_METRICS_PUBLISH_INTERVAL * 3,
+) -> dict[str, Any]:
+    """Merged snapshot of all worker processes"""
+    if not await publish_metrics(metrics):
+        return merge_snapshots([metrics.snapshot()], stale_after, metrics)
+    shared = await get_namespace_data(METRICS_NAMESPACE, workspace="")
+    return merge_snapshots(list(shared.values()), stale_after, metrics)
+
+
+async def run_metrics_publisher(
+    interval: float = DEFAULT_METRICS_PUBLISH_INTERVAL,
+    metrics: MetricsRegistry = registry,
+) -> None:
+    """Publish this worker's snapshot every ``interval`` seconds until cancelled"""
+    while True:
+        try:
+            await publish_metrics(metrics)
+        except Exception as e:
+            logger.warning(f"Failed to publish metrics: {e}")
+        await asyncio.sleep(interval)
+
+
+def merge_snapshots(
+    snapshots: Iterable[dict[str, Any]],
+    stale_after: float,
+    metrics: MetricsRegistry = registry,
+) -> dict[str, Any]:
+    """Sum worker snapshots
+
+    Counters and histograms of workers that exited are kept so totals never go
+    backwards; gauges and rates only count workers that published recently.
+    """
+    now = time.time()
+    merged: dict[str, Any] = {"values": {}, "histograms": {}, "rates": {}}
+    workers = 0
+    for snapshot in snapshots:
+        live = now - snapshot["time"] <= stale_after
+        if live:
+            workers += 1
+        for key, value in snapshot["values"].items():
+            if not live and metrics.definitions.get(key[0], (None,))[0] == GAUGE:
+                continue
+            merged["values"][key] = merged["values"].get(key, 0.0) + value
+        for key, (counts, total, count) in snapshot["histograms"].items():
+            current = merged["histograms"].get(key)
+            if current is None:
+                merged["histograms"][key] = (list(counts), total, count)
+            else:
+                for index, bucket_count in enumerate(counts):
+                    current[0][index] += bucket_count
+                merged["histograms"][key] = (
+                    current[0],
+                    current[1] + total,
+                    current[2] + count,
+                )
+        if live:
+            for key, rate in snapshot["rates"].items():
+                merged["rates"][key] = merged["rates"].get(key, 0.0) + rate
+    merged["workers"] = workers
+    return merged
+
+
+# -------------------------- Exposition format --------------------------
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: LabelKey, extra: tuple[tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _series(values: dict, name: str) -> list[tuple[LabelKey, Any]]:
+    return sorted(
+        (labels, value) for (metric, labels), value in values.items() if metric == name
+    )
+
+
+def render_metrics(merged: dict[str, Any], metrics: MetricsRegistry = registry) -> str:
+    """Prometheus text exposition of a merged snapshot"""
+    lines: list[str] = []
+
+    def header(name: str, kind: str, help: str) -> None:
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    for name, (kind, help, buckets) in metrics.definitions.items():
+        if kind == HISTOGRAM:
+            header(name, HISTOGRAM, help)
+            for labels, (counts, total, count) in _series(merged["histograms"], name):
+                cumulative = 0
+                for bound, bucket_count in zip(buckets + (math.inf,), counts):
+                    cumulative += bucket_count
+                    le = (("le", _format_value(bound)),)
+                    lines.append(
+                        f"{name}_bucket{_format_labels(labels, le)} {cumulative}"
+                    )
+                lines.append(
+                    f"{name}_sum{_format_labels(labels)} {_format_value(total)}"
+                )
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        elif kind == METER:
+            header(f"{name}_total", COUNTER, help)
+            for labels, value in _series(merged["values"], name):
+                lines.append(
+                    f"{name}_total{_format_labels(labels)} {_format_value(value)}"
+                )
+            header(f"{name}_per_minute", GAUGE, f"{help}, over the last minute")
+            for labels, value in _series(merged["rates"], name):
+                lines.append(
+                    f"{name}_per_minute{_format_labels(labels)} {_format_value(value)}"
+                )
+        else:
+            header(name, kind, help)
+            for labels, value in _series(merged["values"], name):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    # Hit ratio derived from the merged lookup counters
+    header(
+        "lightrag_llm_cache_hit_ratio",
+        GAUGE,
+        "Share of LLM cache lookups that were hits, by cache type",
+    )
+    lookups: dict[LabelKey, list[float]] = {}
+    for labels, value in _series(merged["values"], "lightrag_llm_cache_requests_total"):
+        result = dict(labels).get("result")
+        rest = tuple(pair for pair in labels if pair[0] != "result")
+        totals = lookups.setdefault(rest, [0.0, 0.0])
+        totals[0] += value if result == "hit" else 0.0
+        totals[1] += value
+    for labels, (hits, total) in sorted(lookups.items()):
+        if total:
+            lines.append(
+                f"lightrag_llm_cache_hit_ratio{_format_labels(labels)} {_format_value(round(hits / total, 6))}"
+            )
+
+    header(
+        "lightrag_metrics_workers", GAUGE, "Worker processes included in these metrics"
+    )
+    lines.append(f"lightrag_metrics_workers {merged.get('workers', 1)}")
+    return "\n".join(lines) + "\n"
+
+
+async def generate_latest(metrics: MetricsRegistry = registry) -> str:
+    """Collect all workers and render the ``/metrics`` response body"""
+    return render_metrics(await collect_metrics(metrics), metrics)
+
+
+__all__ = [
+    "METRICS_NAMESPACE",
+    "PROMETHEUS_CONTENT_TYPE",
+    "MetricsRegistry",
+    "collect_metrics",
+    "generate_latest",
+    "instrument_storage",
+    "label_key",
+    "merge_snapshots",
+    "publish_metrics",
+    "registry",
+    "render_metrics",
+    "run_metrics_publisher",
+]
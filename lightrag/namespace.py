@@ -19,6 +19,8 @@ class NameSpace:
 
     GRAPH_STORE_CHUNK_ENTITY_RELATION = "chunk_entity_relation"
 
+    LEXICAL_STORE_CHUNKS = "bm25_chunks"
+
     DOC_STATUS = "doc_status"
 
 
@@ -21,6 +21,7 @@ from lightrag.utils import (
     pack_user_ass_to_openai_messages,
     split_string_by_multi_markers,
     truncate_list_by_token_size,
+    count_tokens,
     compute_args_hash,
     handle_cache,
     save_to_cache,
@@ -39,6 +40,10 @@ from lightrag.utils import (
     apply_source_ids_limit,
     merge_source_ids,
     make_relation_chunk_key,
+    reciprocal_rank_fusion,
+    get_gleaning_policy,
+    generate_cache_key,
+    CachedPrompt,
 )
 from lightrag.base import (
     BaseGraphStorage,
@@ -49,6 +54,7 @@ from lightrag.base import (
     QueryResult,
     QueryContextResult,
 )
+from lightrag.kg.bm25_impl import BM25ChunkIndex
 from lightrag.prompt import PROMPTS
 from lightrag.constants import (
     GRAPH_FIELD_SEP,
@@ -66,6 +72,10 @@ from lightrag.constants import (
     DEFAULT_ENTITY_NAME_MAX_LENGTH,
 )
 from lightrag.kg.shared_storage import get_storage_keyed_lock
+from lightrag.progress import DocProgressReporter
+from lightrag.tracing import trace_span
+from lightrag.profiling import profile_stage
+from lightrag import metrics
 import time
 from dotenv import load_dotenv
 
@@ -75,6 +85,24 @@ from dotenv import load_dotenv
 load_dotenv(dotenv_path=Path(__file__).resolve().parent / ".env", override=False)
 
 
+def _format_response_prompt(
+    prompt_name: str, custom_template: str | None = None, **values: Any
+) -> str:
+    """Build a response system prompt with its static instructions first
+
+    The default templates are split into PROMPTS["<name>_static"] and
+    PROMPTS["<name>_dynamic"]; the result is a CachedPrompt so LLM bindings can
+    mark the static part for provider prompt caching. Custom templates are
+    formatted as given.
+    """
+    if custom_template:
+        return custom_template.format(**values)
+    return CachedPrompt(
+        PROMPTS[f"{prompt_name}_static"],
+        PROMPTS[f"{prompt_name}_dynamic"].format(**values),
+    )
+
+
 def _truncate_entity_identifier(
     identifier: str, limit: int, chunk_key: str, identifier_role: str
 ) -> str:
@@ -96,6 +124,7 @@ def _truncate_entity_identifier(
     return display_value
 
 
+@profile_stage("chunking")
 def chunking_by_token_size(
     tokenizer: Tokenizer,
     content: str,
@@ -162,6 +191,7 @@ def chunking_by_token_size(
     return results
 
 
+@profile_stage("summarize")
 async def _handle_entity_relation_summary(
     description_type: str,
     entity_or_relation_name: str,
@@ -208,7 +238,7 @@ async def _handle_entity_relation_summary(
     # Iterative map-reduce process
     while True:
         # Calculate total tokens in current list
-        total_tokens = sum(len(tokenizer.encode(desc)) for desc in current_list)
+        total_tokens = sum(count_tokens(tokenizer, desc) for desc in current_list)
 
         # If total length is within limits, perform final summarization
         if total_tokens <= summary_context_size or len(current_list) <= 2:
@@ -242,7 +272,7 @@ async def _handle_entity_relation_summary(
 
         # Currently least 3 descriptions in current_list
         for i, desc in enumerate(current_list):
-            desc_tokens = len(tokenizer.encode(desc))
+            desc_tokens = count_tokens(tokenizer, desc)
 
             # If adding current description would exceed limit, finalize current chunk
             if current_tokens + desc_tokens > summary_context_size and current_chunk:
@@ -376,6 +406,7 @@ async def _summarize_descriptions(
     return summary
 
 
+@profile_stage("parse_extraction")
 async def _handle_single_entity_extraction(
     record_attributes: list[str],
     chunk_key: str,
@@ -448,6 +479,7 @@ async def _handle_single_entity_extraction(
         return None
 
 
+@profile_stage("parse_extraction")
 async def _handle_single_relationship_extraction(
     record_attributes: list[str],
     chunk_key: str,
@@ -530,6 +562,7 @@ async def _handle_single_relationship_extraction(
         return None
 
 
+@profile_stage("rebuild")
 async def rebuild_knowledge_from_chunks(
     entities_to_rebuild: dict[str, list[str]],
     relationships_to_rebuild: dict[tuple[str, str], list[str]],
@@ -907,6 +940,7 @@ async def _get_cached_extraction_results(
     return sorted_cached_results  # each item: list(extraction_result, create_time)
 
 
+@profile_stage("parse_extraction")
 async def _process_extraction_result(
     result: str,
     chunk_key: str,
@@ -1533,9 +1567,11 @@ async def _rebuild_single_relationship(
         rel_vdb_id = compute_mdhash_id(src + tgt, prefix="rel-")
         rel_vdb_id_reverse = compute_mdhash_id(tgt + src, prefix="rel-")
 
-        # Delete old vector records first (both directions to be safe)
+        # Delete a legacy record stored under the reverse id; the canonical record
+        # is overwritten by the upsert below, keeping its vector if content is unchanged
         try:
-            await relationships_vdb.delete([rel_vdb_id, rel_vdb_id_reverse])
+            if rel_vdb_id_reverse != rel_vdb_id:
+                await relationships_vdb.delete([rel_vdb_id_reverse])
         except Exception as e:
             logger.debug(
                 f"Could not delete old relationship vector records {rel_vdb_id}, {rel_vdb_id_reverse}: {e}"
@@ -1590,6 +1626,7 @@ async def _rebuild_single_relationship(
             pipeline_status["history_messages"].append(status_message)
 
 
+@profile_stage("merge_entity")
 async def _merge_nodes_then_upsert(
     entity_name: str,
     nodes_data: list[dict],
@@ -1868,6 +1905,7 @@ async def _merge_nodes_then_upsert(
     return node_data
 
 
+@profile_stage("merge_relation")
 async def _merge_edges_then_upsert(
     src_id: str,
     tgt_id: str,
@@ -2366,7 +2404,9 @@ async def _merge_edges_then_upsert(
         rel_vdb_id = compute_mdhash_id(src_id + tgt_id, prefix="rel-")
         rel_vdb_id_reverse = compute_mdhash_id(tgt_id + src_id, prefix="rel-")
         try:
-            await relationships_vdb.delete([rel_vdb_id, rel_vdb_id_reverse])
+            # The canonical record is overwritten by the upsert below
+            if rel_vdb_id_reverse != rel_vdb_id:
+                await relationships_vdb.delete([rel_vdb_id_reverse])
         except Exception as e:
             logger.debug(
                 f"Could not delete old relationship vector records {rel_vdb_id}, {rel_vdb_id_reverse}: {e}"
@@ -2395,6 +2435,7 @@ async def _merge_edges_then_upsert(
     return edge_data
 
 
+@profile_stage("merge")
 async def merge_nodes_and_edges(
     chunk_results: list,
     knowledge_graph_inst: BaseGraphStorage,
@@ -2765,6 +2806,80 @@ async def merge_nodes_and_edges(
         pipeline_status["history_messages"].append(log_message)
 
 
+EXTRACTION_STORE_CACHE_TYPE = "extract_result"
+
+
+async def _load_stored_extraction(
+    llm_response_cache: BaseKVStorage,
+    store_hash: str,
+    chunk_key: str,
+    file_path: str,
+) -> tuple[dict, dict, list[str]] | None:
+    """Load a stored extraction result and re-attribute it to this chunk's source.
+
+    Returns:
+        (nodes, edges, cache_keys) or None when nothing is stored. ``cache_keys``
+        lists the LLM cache entries the result was built from (plus the stored
+        entry itself), so the chunk's llm_cache_list stays usable for rebuilds.
+    """
+    cached = await handle_cache(
+        llm_response_cache,
+        store_hash,
+        None,
+        "default",
+        cache_type=EXTRACTION_STORE_CACHE_TYPE,
+    )
+    if cached is None:
+        return None
+    try:
+        payload = json.loads(cached[0])
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring unreadable stored extraction for {chunk_key}")
+        return None
+
+    def reattribute(records: list[dict]) -> list[dict]:
+        return [
+            {**record, "source_id": chunk_key, "file_path": file_path}
+            for record in records
+        ]
+
+    nodes = {
+        name: reattribute(records) for name, records in payload["entities"].items()
+    }
+    edges = {
+        (src, tgt): reattribute(records) for src, tgt, records in payload["relations"]
+    }
+    cache_key = generate_cache_key("default", EXTRACTION_STORE_CACHE_TYPE, store_hash)
+    return nodes, edges, payload.get("llm_cache_keys", []) + [cache_key]
+
+
+async def _save_stored_extraction(
+    llm_response_cache: BaseKVStorage,
+    store_hash: str,
+    chunk_key: str,
+    nodes: dict,
+    edges: dict,
+    llm_cache_keys: list[str],
+) -> None:
+    """Store the extraction result of a chunk under its content-addressed key"""
+    payload = {
+        "entities": nodes,
+        "relations": [[src, tgt, records] for (src, tgt), records in edges.items()],
+        "llm_cache_keys": llm_cache_keys,
+    }
+    await save_to_cache(
+        llm_response_cache,
+        CacheData(
+            args_hash=store_hash,
+            content=json.dumps(payload, ensure_ascii=False),
+            prompt=chunk_key,
+            cache_type=EXTRACTION_STORE_CACHE_TYPE,
+            chunk_id=chunk_key,
+        ),
+    )
+
+
+@profile_stage("extract")
 async def extract_entities(
     chunks: dict[str, TextChunkSchema],
     global_config: dict[str, str],
@@ -2772,7 +2887,14 @@ async def extract_entities(
     pipeline_status_lock=None,
     llm_response_cache: BaseKVStorage | None = None,
     text_chunks_storage: BaseKVStorage | None = None,
+    doc_progress: DocProgressReporter | None = None,
+    gleaning_stats: dict[str, Any] | None = None,
 ) -> list:
+    """Extract entities and relations from chunks.
+
+    When ``gleaning_stats`` is given it is filled with the number of gleaning
+    calls made and skipped (with reasons) for these chunks.
+    """
     # Check for cancellation at the start of entity extraction
     if pipeline_status is not None and pipeline_status_lock is not None:
         async with pipeline_status_lock:
@@ -2809,9 +2931,28 @@ async def extract_entities(
         examples=examples,
         language=language,
     )
+    # Identical for every chunk, so it stays in the provider's prompt cache
+    extraction_static_prompt = PROMPTS["entity_extraction_system_prompt_static"].format(
+        **context_base
+    )
 
     processed_chunks = 0
     total_chunks = len(ordered_chunks)
+    gleaning_policy = (
+        get_gleaning_policy(global_config) if entity_extract_max_gleaning > 0 else None
+    )
+    if gleaning_stats is None:
+        gleaning_stats = {}
+    gleaning_stats.update(
+        {"calls": 0, "skipped": 0, "skip_reasons": {}, "reused_chunks": 0}
+    )
+    extraction_reuse = (
+        llm_response_cache is not None
+        and global_config.get("enable_extraction_reuse", False)
+        and global_config.get("enable_llm_cache_for_entity_extract", True)
+    )
+    model_version = str(global_config.get("llm_model_name", ""))
+    reused_chunks = 0
 
     async def _process_single_content(chunk_key_dp: tuple[str, TextChunkSchema]):
         """Process a single chunk
@@ -2821,7 +2962,7 @@ async def extract_entities(
         Returns:
             tuple: (maybe_nodes, maybe_edges) containing extracted entities and relationships
         """
-        nonlocal processed_chunks
+        nonlocal processed_chunks, reused_chunks
         chunk_key = chunk_key_dp[0]
         chunk_dp = chunk_key_dp[1]
         content = chunk_dp["content"]
@@ -2832,9 +2973,12 @@ async def extract_entities(
         cache_keys_collector = []
 
         # Get initial extraction
-        entity_extraction_system_prompt = PROMPTS[
-            "entity_extraction_system_prompt"
-        ].format(**{**context_base, "input_text": content})
+        entity_extraction_system_prompt = CachedPrompt(
+            extraction_static_prompt,
+            PROMPTS["entity_extraction_system_prompt_dynamic"].format(
+                **{**context_base, "input_text": content}
+            ),
+        )
         entity_extraction_user_prompt = PROMPTS["entity_extraction_user_prompt"].format(
             **{**context_base, "input_text": content}
         )
@@ -2842,46 +2986,47 @@ async def extract_entities(
             "entity_continue_extraction_user_prompt"
         ].format(**{**context_base, "input_text": content})
 
-        final_result, timestamp = await use_llm_func_with_cache(
-            entity_extraction_user_prompt,
-            use_llm_func,
-            system_prompt=entity_extraction_system_prompt,
-            llm_response_cache=llm_response_cache,
-            cache_type="extract",
-            chunk_id=chunk_key,
-            cache_keys_collector=cache_keys_collector,
-        )
-
-        history = pack_user_ass_to_openai_messages(
-            entity_extraction_user_prompt, final_result
-        )
-
-        # Process initial extraction with file path
-        maybe_nodes, maybe_edges = await _process_extraction_result(
-            final_result,
-            chunk_key,
-            timestamp,
-            file_path,
-            tuple_delimiter=context_base["tuple_delimiter"],
-            completion_delimiter=context_base["completion_delimiter"],
-        )
+        # Identical chunks extracted before under the same prompt and model
+        # reuse the stored result instead of running extraction again
+        stored = None
+        store_hash = None
+        if extraction_reuse:
+            store_hash = compute_args_hash(
+                "\n".join(
+                    [
+                        entity_extraction_system_prompt,
+                        entity_extraction_user_prompt,
+                        model_version,
+                        str(entity_extract_max_gleaning),
+                    ]
+                )
+            )
+            stored = await _load_stored_extraction(
+                llm_response_cache, store_hash, chunk_key, file_path
+            )
 
-        # Process additional gleaning results only 1 time when entity_extract_max_gleaning is greater than zero.
-        if entity_extract_max_gleaning > 0:
-            glean_result, timestamp = await use_llm_func_with_cache(
-                entity_continue_extraction_user_prompt,
+        if stored is not None:
+            maybe_nodes, maybe_edges, stored_cache_keys = stored
+            cache_keys_collector.extend(stored_cache_keys)
+            reused_chunks += 1
+        else:
+            final_result, timestamp = await use_llm_func_with_cache(
+                entity_extraction_user_prompt,
                 use_llm_func,
                 system_prompt=entity_extraction_system_prompt,
                 llm_response_cache=llm_response_cache,
-                history_messages=history,
                 cache_type="extract",
                 chunk_id=chunk_key,
                 cache_keys_collector=cache_keys_collector,
             )
 
-            # Process gleaning result separately with file path
-            glean_nodes, glean_edges = await _process_extraction_result(
-                glean_result,
+            history = pack_user_ass_to_openai_messages(
+                entity_extraction_user_prompt, final_result
+            )
+
+            # Process initial extraction with file path
+            maybe_nodes, maybe_edges = await _process_extraction_result(
+                final_result,
                 chunk_key,
                 timestamp,
                 file_path,
@@ -2889,36 +3034,100 @@ async def extract_entities(
                 completion_delimiter=context_base["completion_delimiter"],
             )
 
-            # Merge results - compare description lengths to choose better version
-            for entity_name, glean_entities in glean_nodes.items():
-                if entity_name in maybe_nodes:
-                    # Compare description lengths and keep the better one
-                    original_desc_len = len(
-                        maybe_nodes[entity_name][0].get("description", "") or ""
+            # Process additional gleaning results only 1 time when entity_extract_max_gleaning is greater than zero.
+            run_gleaning = entity_extract_max_gleaning > 0
+            if run_gleaning and gleaning_policy is not None:
+                run_gleaning, reason = gleaning_policy.should_glean(
+                    terminated=context_base["completion_delimiter"].lower()
+                    in final_result.lower(),
+                    chunk_tokens=chunk_dp.get("tokens") or 0,
+                    entities=len(maybe_nodes),
+                    relations=len(maybe_edges),
+                )
+                if not run_gleaning:
+                    gleaning_stats["skipped"] += 1
+                    reasons = gleaning_stats["skip_reasons"]
+                    reasons[reason] = reasons.get(reason, 0) + 1
+
+            if run_gleaning:
+                gleaning_stats["calls"] += 1
+                glean_result, timestamp = await use_llm_func_with_cache(
+                    entity_continue_extraction_user_prompt,
+                    use_llm_func,
+                    system_prompt=entity_extraction_system_prompt,
+                    llm_response_cache=llm_response_cache,
+                    history_messages=history,
+                    cache_type="extract",
+                    chunk_id=chunk_key,
+                    cache_keys_collector=cache_keys_collector,
+                )
+
+                # Process gleaning result separately with file path
+                glean_nodes, glean_edges = await _process_extraction_result(
+                    glean_result,
+                    chunk_key,
+                    timestamp,
+                    file_path,
+                    tuple_delimiter=context_base["tuple_delimiter"],
+                    completion_delimiter=context_base["completion_delimiter"],
+                )
+
+                if gleaning_policy is not None:
+                    gleaning_policy.record_yield(
+                        len(maybe_nodes) + len(maybe_edges),
+                        len(glean_nodes.keys() - maybe_nodes.keys())
+                        + len(glean_edges.keys() - maybe_edges.keys()),
                     )
-                    glean_desc_len = len(glean_entities[0].get("description", "") or "")
 
-                    if glean_desc_len > original_desc_len:
+                # Merge results - compare description lengths to choose better version
+                for entity_name, glean_entities in glean_nodes.items():
+                    if entity_name in maybe_nodes:
+                        # Compare description lengths and keep the better one
+                        original_desc_len = len(
+                            maybe_nodes[entity_name][0].get("description", "") or ""
+                        )
+                        glean_desc_len = len(
+                            glean_entities[0].get("description", "") or ""
+                        )
+
+                        if glean_desc_len > original_desc_len:
+                            maybe_nodes[entity_name] = list(glean_entities)
+                        # Otherwise keep original version
+                    else:
+                        # New entity from gleaning stage
                         maybe_nodes[entity_name] = list(glean_entities)
-                    # Otherwise keep original version
-                else:
-                    # New entity from gleaning stage
-                    maybe_nodes[entity_name] = list(glean_entities)
-
-            for edge_key, glean_edges in glean_edges.items():
-                if edge_key in maybe_edges:
-                    # Compare description lengths and keep the better one
-                    original_desc_len = len(
-                        maybe_edges[edge_key][0].get("description", "") or ""
-                    )
-                    glean_desc_len = len(glean_edges[0].get("description", "") or "")
 
-                    if glean_desc_len > original_desc_len:
+                for edge_key, glean_edges in glean_edges.items():
+                    if edge_key in maybe_edges:
+                        # Compare description lengths and keep the better one
+                        original_desc_len = len(
+                            maybe_edges[edge_key][0].get("description", "") or ""
+                        )
+                        glean_desc_len = len(
+                            glean_edges[0].get("description", "") or ""
+                        )
+
+                        if glean_desc_len > original_desc_len:
+                            maybe_edges[edge_key] = list(glean_edges)
+                        # Otherwise keep original version
+                    else:
+                        # New edge from gleaning stage
                         maybe_edges[edge_key] = list(glean_edges)
-                    # Otherwise keep original version
-                else:
-                    # New edge from gleaning stage
-                    maybe_edges[edge_key] = list(glean_edges)
+
+            if store_hash is not None:
+                await _save_stored_extraction(
+                    llm_response_cache,
+                    store_hash,
+                    chunk_key,
+                    maybe_nodes,
+                    maybe_edges,
+                    list(cache_keys_collector),
+                )
+                cache_keys_collector.append(
+                    generate_cache_key(
+                        "default", EXTRACTION_STORE_CACHE_TYPE, store_hash
+                    )
+                )
 
         # Batch update chunk's llm_cache_list with all collected cache keys
         if cache_keys_collector and text_chunks_storage:
@@ -2932,12 +3141,17 @@ async def extract_entities(
         processed_chunks += 1
         entities_count = len(maybe_nodes)
         relations_count = len(maybe_edges)
+        metrics.registry.mark("lightrag_pipeline_chunks")
+        metrics.registry.mark("lightrag_pipeline_entities", entities_count)
+        metrics.registry.mark("lightrag_pipeline_relations", relations_count)
         log_message = f"Chunk {processed_chunks} of {total_chunks} extracted {entities_count} Ent + {relations_count} Rel {chunk_key}"
         logger.info(log_message)
         if pipeline_status is not None:
             async with pipeline_status_lock:
                 pipeline_status["latest_message"] = log_message
                 pipeline_status["history_messages"].append(log_message)
+        if doc_progress is not None:
+            await doc_progress.chunk_done()
 
         # Return the extracted nodes and edges for centralized processing
         return maybe_nodes, maybe_edges
@@ -3005,11 +3219,18 @@ async def extract_entities(
         prefixed_exception = create_prefixed_exception(first_exception, progress_prefix)
         raise prefixed_exception from first_exception
 
+    if reused_chunks:
+        logger.info(
+            f"Reused stored extraction results for {reused_chunks} of {total_chunks} chunks"
+        )
+    gleaning_stats["reused_chunks"] = reused_chunks
+
     # If all tasks completed successfully, chunk_results already contains the results
     # Return the chunk_results for later processing in merge_nodes_and_edges
     return chunk_results
 
 
+@profile_stage("kg_query")
 async def kg_query(
     query: str,
     knowledge_graph_inst: BaseGraphStorage,
@@ -3021,6 +3242,7 @@ async def kg_query(
     hashing_kv: BaseKVStorage | None = None,
     system_prompt: str | None = None,
     chunks_vdb: BaseVectorStorage = None,
+    lexical_index: BM25ChunkIndex | None = None,
 ) -> QueryResult | None:
     """
     Execute knowledge graph query and return unified QueryResult object.
@@ -3062,9 +3284,10 @@ async def kg_query(
         # Apply higher priority (5) to query relation LLM function
         use_model_func = partial(use_model_func, _priority=5)
 
-    hl_keywords, ll_keywords = await get_keywords_from_query(
-        query, query_param, global_config, hashing_kv
-    )
+    with trace_span("keywords"):
+        hl_keywords, ll_keywords = await get_keywords_from_query(
+            query, query_param, global_config, hashing_kv
+        )
 
     logger.debug(f"High-level keywords: {hl_keywords}")
     logger.debug(f"Low-level  keywords: {ll_keywords}")
@@ -3095,6 +3318,7 @@ async def kg_query(
         text_chunks_db,
         query_param,
         chunks_vdb,
+        lexical_index,
     )
 
     if context_result is None:
@@ -3115,9 +3339,10 @@ async def kg_query(
     )
 
     # Build system prompt
-    sys_prompt_temp = system_prompt if system_prompt else PROMPTS["rag_response"]
     feedback_context = global_config.get("feedback_context", "")
-    sys_prompt = sys_prompt_temp.format(
+    sys_prompt = _format_response_prompt(
+        "rag_response",
+        system_prompt,
         response_type=response_type,
         user_prompt=user_prompt,
         context_data=context_result.context,
@@ -3132,9 +3357,10 @@ async def kg_query(
 
     # Call LLM
     tokenizer: Tokenizer = global_config["tokenizer"]
-    len_of_prompts = len(tokenizer.encode(query + sys_prompt))
+    query_tokens = count_tokens(tokenizer, query)
+    sys_prompt_tokens = count_tokens(tokenizer, sys_prompt)
     logger.debug(
-        f"[kg_query] Sending to LLM: {len_of_prompts:,} tokens (Query: {len(tokenizer.encode(query))}, System: {len(tokenizer.encode(sys_prompt))})"
+        f"[kg_query] Sending to LLM: {query_tokens + sys_prompt_tokens:,} tokens (Query: {query_tokens}, System: {sys_prompt_tokens})"
     )
 
     # Handle cache
@@ -3165,13 +3391,14 @@ async def kg_query(
         )
         response = cached_response
     else:
-        response = await use_model_func(
-            user_query,
-            system_prompt=sys_prompt,
-            history_messages=query_param.conversation_history,
-            enable_cot=True,
-            stream=query_param.stream,
-        )
+        with trace_span("llm", stream=bool(query_param.stream)):
+            response = await use_model_func(
+                user_query,
+                system_prompt=sys_prompt,
+                history_messages=query_param.conversation_history,
+                enable_cot=True,
+                stream=query_param.stream,
+            )
 
         if hashing_kv and hashing_kv.global_config.get("enable_llm_cache"):
             queryparam_dict = {
@@ -3369,18 +3596,24 @@ async def _get_vector_context(
     chunks_vdb: BaseVectorStorage,
     query_param: QueryParam,
     query_embedding: list[float] = None,
+    lexical_index: BM25ChunkIndex | None = None,
+    text_chunks_db: BaseKVStorage | None = None,
 ) -> list[dict]:
     """
     Retrieve text chunks from the vector database without reranking or truncation.
 
     This function performs vector search to find relevant text chunks for a query.
-    Reranking and truncation will be handled later in the unified processing.
+    When a lexical index is given, BM25 matches are fused with the vector results
+    using reciprocal rank fusion. Reranking and truncation will be handled later
+    in the unified processing.
 
     Args:
         query: The query string to search for
         chunks_vdb: Vector database containing document chunks
         query_param: Query parameters including chunk_top_k and ids
         query_embedding: Optional pre-computed query embedding to avoid redundant embedding calls
+        lexical_index: Optional BM25 index over text chunks
+        text_chunks_db: Text chunk storage used to load lexical-only matches
 
     Returns:
         List of text chunks with metadata
@@ -3390,17 +3623,13 @@ async def _get_vector_context(
         search_top_k = query_param.chunk_top_k or query_param.top_k
         cosine_threshold = chunks_vdb.cosine_better_than_threshold
 
-        results = await chunks_vdb.query(
-            query, top_k=search_top_k, query_embedding=query_embedding
-        )
-        if not results:
-            logger.info(
-                f"Naive query: 0 chunks (chunk_top_k:{search_top_k} cosine:{cosine_threshold})"
+        with trace_span("vector_query", storage="chunks"):
+            results = await chunks_vdb.query(
+                query, top_k=search_top_k, query_embedding=query_embedding
             )
-            return []
 
         valid_chunks = []
-        for result in results:
+        for result in results or []:
             if "content" in result:
                 chunk_with_metadata = {
                     "content": result["content"],
@@ -3415,8 +3644,19 @@ async def _get_vector_context(
                 }
                 valid_chunks.append(chunk_with_metadata)
 
+        vector_count = len(valid_chunks)
+        if (
+            lexical_index is not None
+            and text_chunks_db is not None
+            and query_param.enable_lexical_search
+        ):
+            with trace_span("lexical_search"):
+                valid_chunks = await _fuse_lexical_chunks(
+                    query, valid_chunks, lexical_index, text_chunks_db, search_top_k
+                )
+
         logger.info(
-            f"Naive query: {len(valid_chunks)} chunks (chunk_top_k:{search_top_k} cosine:{cosine_threshold})"
+            f"Naive query: {len(valid_chunks)} chunks ({vector_count} vector, chunk_top_k:{search_top_k} cosine:{cosine_threshold})"
         )
         return valid_chunks
 
@@ -3425,6 +3665,54 @@ async def _get_vector_context(
         return []
 
 
+async def _fuse_lexical_chunks(
+    query: str,
+    vector_chunks: list[dict],
+    lexical_index: BM25ChunkIndex,
+    text_chunks_db: BaseKVStorage,
+    top_k: int,
+) -> list[dict]:
+    """Merge BM25 matches into vector chunks with reciprocal rank fusion.
+
+    Chunks found only by BM25 are loaded from the text chunk storage and marked
+    with source_type "lexical"; they carry no vector score.
+    """
+    lexical_hits = await lexical_index.search(query, top_k)
+    if not lexical_hits:
+        return vector_chunks
+
+    chunks_by_id = {
+        chunk["chunk_id"]: chunk for chunk in vector_chunks if chunk.get("chunk_id")
+    }
+    missing_ids = [
+        chunk_id for chunk_id, _ in lexical_hits if chunk_id not in chunks_by_id
+    ]
+    if missing_ids:
+        for chunk_id, chunk_data in zip(
+            missing_ids, await text_chunks_db.get_by_ids(missing_ids)
+        ):
+            if chunk_data and chunk_data.get("content"):
+                chunks_by_id[chunk_id] = {
+                    "content": chunk_data["content"],
+                    "created_at": chunk_data.get("create_time"),
+                    "file_path": chunk_data.get("file_path", "unknown_source"),
+                    "source_type": "lexical",
+                    "chunk_id": chunk_id,
+                    "score": None,
+                }
+
+    fused_ids = reciprocal_rank_fusion(
+        [
+            [chunk["chunk_id"] for chunk in vector_chunks if chunk.get("chunk_id")],
+            [chunk_id for chunk_id, _ in lexical_hits if chunk_id in chunks_by_id],
+        ]
+    )
+    logger.debug(
+        f"Lexical search: {len(lexical_hits)} BM25 hits, {len(missing_ids)} not found by vector search"
+    )
+    return [chunks_by_id[chunk_id] for chunk_id in fused_ids[:top_k]]
+
+
 async def _perform_kg_search(
     query: str,
     ll_keywords: str,
@@ -3435,6 +3723,7 @@ async def _perform_kg_search(
     text_chunks_db: BaseKVStorage,
     query_param: QueryParam,
     chunks_vdb: BaseVectorStorage = None,
+    lexical_index: BM25ChunkIndex | None = None,
 ) -> dict[str, Any]:
     """
     Pure search logic that retrieves raw entities, relations, and vector chunks.
@@ -3463,7 +3752,8 @@ async def _perform_kg_search(
         actual_embedding_func = text_chunks_db.embedding_func
         if actual_embedding_func:
             try:
-                query_embedding = await actual_embedding_func([query])
+                with trace_span("query_embedding"):
+                    query_embedding = await actual_embedding_func([query])
                 query_embedding = query_embedding[
                     0
                 ]  # Extract first embedding from batch result
@@ -3512,6 +3802,8 @@ async def _perform_kg_search(
                 chunks_vdb,
                 query_param,
                 query_embedding,
+                lexical_index=lexical_index,
+                text_chunks_db=text_chunks_db,
             )
             # Track vector chunks with source metadata
             for i, chunk in enumerate(vector_chunks):
@@ -3920,21 +4212,26 @@ async def _build_context_str(
         else "Multiple Paragraphs"
     )
 
-    entities_str = "\n".join(
+    entity_lines = [
         json.dumps(entity, ensure_ascii=False) for entity in entities_context
-    )
-    relations_str = "\n".join(
+    ]
+    relation_lines = [
         json.dumps(relation, ensure_ascii=False) for relation in relations_context
-    )
-
-    # Calculate preliminary kg context tokens
-    pre_kg_context = kg_context_template.format(
-        entities_str=entities_str,
-        relations_str=relations_str,
+    ]
+    entities_str = "\n".join(entity_lines)
+    relations_str = "\n".join(relation_lines)
+
+    # Calculate preliminary kg context tokens from memoized per-line counts
+    # (one extra token per line covers the newline separators)
+    empty_kg_context = kg_context_template.format(
+        entities_str="",
+        relations_str="",
         text_chunks_str="",
         reference_list_str="",
     )
-    kg_context_tokens = len(tokenizer.encode(pre_kg_context))
+    kg_context_tokens = count_tokens(tokenizer, empty_kg_context) + sum(
+        count_tokens(tokenizer, line) + 1 for line in entity_lines + relation_lines
+    )
 
     # Calculate preliminary system prompt tokens
     feedback_context = global_config.get("feedback_context", "")
@@ -3944,10 +4241,10 @@ async def _build_context_str(
         user_prompt=user_prompt,
         feedback_context=feedback_context,
     )
-    sys_prompt_tokens = len(tokenizer.encode(pre_sys_prompt))
+    sys_prompt_tokens = count_tokens(tokenizer, pre_sys_prompt)
 
     # Calculate available tokens for text chunks
-    query_tokens = len(tokenizer.encode(query))
+    query_tokens = count_tokens(tokenizer, query)
     buffer_tokens = 200  # reserved for reference list and safety buffer
     available_chunk_tokens = max_total_tokens - (
         sys_prompt_tokens + kg_context_tokens + query_tokens + buffer_tokens
@@ -4055,6 +4352,7 @@ async def _build_context_str(
 
 
 # Now let's update the old _build_query_context to use the new architecture
+@profile_stage("build_context")
 async def _build_query_context(
     query: str,
     ll_keywords: str,
@@ -4065,6 +4363,7 @@ async def _build_query_context(
     text_chunks_db: BaseKVStorage,
     query_param: QueryParam,
     chunks_vdb: BaseVectorStorage = None,
+    lexical_index: BM25ChunkIndex | None = None,
 ) -> QueryContextResult | None:
     """
     Main query context building function using the new 4-stage architecture:
@@ -4078,17 +4377,19 @@ async def _build_query_context(
         return None
 
     # Stage 1: Pure search
-    search_result = await _perform_kg_search(
-        query,
-        ll_keywords,
-        hl_keywords,
-        knowledge_graph_inst,
-        entities_vdb,
-        relationships_vdb,
-        text_chunks_db,
-        query_param,
-        chunks_vdb,
-    )
+    with trace_span("search"):
+        search_result = await _perform_kg_search(
+            query,
+            ll_keywords,
+            hl_keywords,
+            knowledge_graph_inst,
+            entities_vdb,
+            relationships_vdb,
+            text_chunks_db,
+            query_param,
+            chunks_vdb,
+            lexical_index,
+        )
 
     if not search_result["final_entities"] and not search_result["final_relations"]:
         if query_param.mode != "mix":
@@ -4098,25 +4399,27 @@ async def _build_query_context(
                 return None
 
     # Stage 2: Apply token truncation for LLM efficiency
-    truncation_result = await _apply_token_truncation(
-        search_result,
-        query_param,
-        text_chunks_db.global_config,
-    )
+    with trace_span("truncation"):
+        truncation_result = await _apply_token_truncation(
+            search_result,
+            query_param,
+            text_chunks_db.global_config,
+        )
 
     # Stage 3: Merge chunks using filtered entities/relations
-    merged_chunks = await _merge_all_chunks(
-        filtered_entities=truncation_result["filtered_entities"],
-        filtered_relations=truncation_result["filtered_relations"],
-        vector_chunks=search_result["vector_chunks"],
-        query=query,
-        knowledge_graph_inst=knowledge_graph_inst,
-        text_chunks_db=text_chunks_db,
-        query_param=query_param,
-        chunks_vdb=chunks_vdb,
-        chunk_tracking=search_result["chunk_tracking"],
-        query_embedding=search_result["query_embedding"],
-    )
+    with trace_span("merge_chunks"):
+        merged_chunks = await _merge_all_chunks(
+            filtered_entities=truncation_result["filtered_entities"],
+            filtered_relations=truncation_result["filtered_relations"],
+            vector_chunks=search_result["vector_chunks"],
+            query=query,
+            knowledge_graph_inst=knowledge_graph_inst,
+            text_chunks_db=text_chunks_db,
+            query_param=query_param,
+            chunks_vdb=chunks_vdb,
+            chunk_tracking=search_result["chunk_tracking"],
+            query_embedding=search_result["query_embedding"],
+        )
 
     if (
         not merged_chunks
@@ -4127,17 +4430,18 @@ async def _build_query_context(
 
     # Stage 4: Build final LLM context with dynamic token processing
     # _build_context_str now always returns tuple[str, dict]
-    context, raw_data = await _build_context_str(
-        entities_context=truncation_result["entities_context"],
-        relations_context=truncation_result["relations_context"],
-        merged_chunks=merged_chunks,
-        query=query,
-        query_param=query_param,
-        global_config=text_chunks_db.global_config,
-        chunk_tracking=search_result["chunk_tracking"],
-        entity_id_to_original=truncation_result["entity_id_to_original"],
-        relation_id_to_original=truncation_result["relation_id_to_original"],
-    )
+    with trace_span("build_context"):
+        context, raw_data = await _build_context_str(
+            entities_context=truncation_result["entities_context"],
+            relations_context=truncation_result["relations_context"],
+            merged_chunks=merged_chunks,
+            query=query,
+            query_param=query_param,
+            global_config=text_chunks_db.global_config,
+            chunk_tracking=search_result["chunk_tracking"],
+            entity_id_to_original=truncation_result["entity_id_to_original"],
+            relation_id_to_original=truncation_result["relation_id_to_original"],
+        )
 
     # Convert keywords strings to lists and add complete metadata to raw_data
     hl_keywords_list = hl_keywords.split(", ") if hl_keywords else []
@@ -4186,7 +4490,8 @@ async def _get_node_data(
         f"Query nodes: {query} (top_k:{query_param.top_k}, cosine:{entities_vdb.cosine_better_than_threshold})"
     )
 
-    results = await entities_vdb.query(query, top_k=query_param.top_k)
+    with trace_span("vector_query", storage="entities"):
+        results = await entities_vdb.query(query, top_k=query_param.top_k)
 
     if not len(results):
         return [], []
@@ -4195,10 +4500,11 @@ async def _get_node_data(
     node_ids = [r["entity_name"] for r in results]
 
     # Call the batch node retrieval and degree functions concurrently.
-    nodes_dict, degrees_dict = await asyncio.gather(
-        knowledge_graph_inst.get_nodes_batch(node_ids),
-        knowledge_graph_inst.node_degrees_batch(node_ids),
-    )
+    with trace_span("graph", op="nodes"):
+        nodes_dict, degrees_dict = await asyncio.gather(
+            knowledge_graph_inst.get_nodes_batch(node_ids),
+            knowledge_graph_inst.node_degrees_batch(node_ids),
+        )
 
     # Now, if you need the node data and degree in order:
     node_datas = [nodes_dict.get(nid) for nid in node_ids]
@@ -4218,11 +4524,12 @@ async def _get_node_data(
         if n is not None
     ]
 
-    use_relations = await _find_most_related_edges_from_entities(
-        node_datas,
-        query_param,
-        knowledge_graph_inst,
-    )
+    with trace_span("graph", op="edges_of_entities"):
+        use_relations = await _find_most_related_edges_from_entities(
+            node_datas,
+            query_param,
+            knowledge_graph_inst,
+        )
 
     logger.info(
         f"Local query: {len(node_datas)} entites, {len(use_relations)} relations"
@@ -4458,7 +4765,8 @@ async def _get_edge_data(
         f"Query edges: {keywords} (top_k:{query_param.top_k}, cosine:{relationships_vdb.cosine_better_than_threshold})"
     )
 
-    results = await relationships_vdb.query(keywords, top_k=query_param.top_k)
+    with trace_span("vector_query", storage="relationships"):
+        results = await relationships_vdb.query(keywords, top_k=query_param.top_k)
 
     if not len(results):
         return [], []
@@ -4466,7 +4774,8 @@ async def _get_edge_data(
     # Prepare edge pairs in two forms:
     # For the batch edge properties function, use dicts.
     edge_pairs_dicts = [{"src": r["src_id"], "tgt": r["tgt_id"]} for r in results]
-    edge_data_dict = await knowledge_graph_inst.get_edges_batch(edge_pairs_dicts)
+    with trace_span("graph", op="edges"):
+        edge_data_dict = await knowledge_graph_inst.get_edges_batch(edge_pairs_dicts)
 
     # Reconstruct edge_datas list in the same order as results.
     edge_datas = []
@@ -4491,11 +4800,12 @@ async def _get_edge_data(
 
     # Relations maintain vector search order (sorted by similarity)
 
-    use_entities = await _find_most_related_entities_from_relationships(
-        edge_datas,
-        query_param,
-        knowledge_graph_inst,
-    )
+    with trace_span("graph", op="entities_of_edges"):
+        use_entities = await _find_most_related_entities_from_relationships(
+            edge_datas,
+            query_param,
+            knowledge_graph_inst,
+        )
 
     logger.info(
         f"Global query: {len(use_entities)} entites, {len(edge_datas)} relations"
@@ -4748,6 +5058,8 @@ async def naive_query(
     global_config: dict[str, str],
     hashing_kv: BaseKVStorage | None = None,
     system_prompt: str | None = None,
+    lexical_index: BM25ChunkIndex | None = None,
+    text_chunks_db: BaseKVStorage | None = None,
     return_raw_data: Literal[True] = True,
 ) -> dict[str, Any]: ...
 
@@ -4760,10 +5072,13 @@ async def naive_query(
     global_config: dict[str, str],
     hashing_kv: BaseKVStorage | None = None,
     system_prompt: str | None = None,
+    lexical_index: BM25ChunkIndex | None = None,
+    text_chunks_db: BaseKVStorage | None = None,
     return_raw_data: Literal[False] = False,
 ) -> str | AsyncIterator[str]: ...
 
 
+@profile_stage("naive_query")
 async def naive_query(
     query: str,
     chunks_vdb: BaseVectorStorage,
@@ -4771,6 +5086,8 @@ async def naive_query(
     global_config: dict[str, str],
     hashing_kv: BaseKVStorage | None = None,
     system_prompt: str | None = None,
+    lexical_index: BM25ChunkIndex | None = None,
+    text_chunks_db: BaseKVStorage | None = None,
 ) -> QueryResult | None:
     """
     Execute naive query and return unified QueryResult object.
@@ -4782,6 +5099,8 @@ async def naive_query(
         global_config: Global configuration
         hashing_kv: Cache storage
         system_prompt: System prompt
+        lexical_index: Optional BM25 index fused with vector search
+        text_chunks_db: Text chunks storage used to load lexical-only matches
 
     Returns:
         QueryResult | None: Unified query result object containing:
@@ -4808,7 +5127,15 @@ async def naive_query(
         logger.error("Tokenizer not found in global configuration.")
         return QueryResult(content=PROMPTS["fail_response"])
 
-    chunks = await _get_vector_context(query, chunks_vdb, query_param, None)
+    with trace_span("search"):
+        chunks = await _get_vector_context(
+            query,
+            chunks_vdb,
+            query_param,
+            None,
+            lexical_index=lexical_index,
+            text_chunks_db=text_chunks_db,
+        )
 
     if chunks is None or len(chunks) == 0:
         logger.info(
@@ -4846,8 +5173,8 @@ async def naive_query(
     )
 
     # Calculate available tokens for chunks
-    sys_prompt_tokens = len(tokenizer.encode(pre_sys_prompt))
-    query_tokens = len(tokenizer.encode(query))
+    sys_prompt_tokens = count_tokens(tokenizer, pre_sys_prompt)
+    query_tokens = count_tokens(tokenizer, query)
     buffer_tokens = 200  # reserved for reference list and safety buffer
     available_chunk_tokens = max_total_tokens - (
         sys_prompt_tokens + query_tokens + buffer_tokens
@@ -4858,19 +5185,20 @@ async def naive_query(
     )
 
     # Process chunks using unified processing with dynamic token limit
-    processed_chunks = await process_chunks_unified(
-        query=query,
-        unique_chunks=chunks,
-        query_param=query_param,
-        global_config=global_config,
-        source_type="vector",
-        chunk_token_limit=available_chunk_tokens,  # Pass dynamic limit
-    )
+    with trace_span("build_context"):
+        processed_chunks = await process_chunks_unified(
+            query=query,
+            unique_chunks=chunks,
+            query_param=query_param,
+            global_config=global_config,
+            source_type="vector",
+            chunk_token_limit=available_chunk_tokens,  # Pass dynamic limit
+        )
 
-    # Generate reference list from processed chunks using the new common function
-    reference_list, processed_chunks_with_ref_ids = generate_reference_list_from_chunks(
-        processed_chunks
-    )
+        # Generate reference list from processed chunks using the new common function
+        reference_list, processed_chunks_with_ref_ids = (
+            generate_reference_list_from_chunks(processed_chunks)
+        )
 
     logger.info(f"Final context: {len(processed_chunks_with_ref_ids)} chunks")
 
@@ -4923,8 +5251,10 @@ async def naive_query(
     if query_param.only_need_context and not query_param.only_need_prompt:
         return QueryResult(content=context_content, raw_data=raw_data)
 
-    sys_prompt = sys_prompt_template.format(
-        response_type=query_param.response_type,
+    sys_prompt = _format_response_prompt(
+        "naive_rag_response",
+        system_prompt,
+        response_type=response_type,
         user_prompt=user_prompt,
         content_data=context_content,
         feedback_context=feedback_context,
@@ -4960,13 +5290,14 @@ async def naive_query(
         )
         response = cached_response
     else:
-        response = await use_model_func(
-            user_query,
-            system_prompt=sys_prompt,
-            history_messages=query_param.conversation_history,
-            enable_cot=True,
-            stream=query_param.stream,
-        )
+        with trace_span("llm", stream=bool(query_param.stream)):
+            response = await use_model_func(
+                user_query,
+                system_prompt=sys_prompt,
+                history_messages=query_param.conversation_history,
+                enable_cot=True,
+                stream=query_param.stream,
+            )
 
         if hashing_kv and hashing_kv.global_config.get("enable_llm_cache"):
             queryparam_dict = {
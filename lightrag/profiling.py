@@ -0,0 +1,436 @@
+"""
+On-demand sampling profiler for live servers.
+
+A background thread samples the Python stacks of the process every few
+milliseconds with ``sys._current_frames()``. Nothing is installed in the
+profiled code: functions marked with ``@profile_stage("name")`` only register
+their code object, and a sample is labelled with the innermost marked function
+found on its stack. Because the running coroutine's frames are linked while it
+executes, labels stay correct across interleaved asyncio tasks.
+
+Profiles are written as collapsed stacks (flamegraph.pl, speedscope, inferno)
+and speedscope JSON. ``ProfilerController`` lets an API request in any Gunicorn
+worker start a session in a chosen worker through shared namespace data.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Callable, TypeVar
+
+from lightrag.kg.shared_storage import get_namespace_data, get_namespace_lock
+
+# lightrag.utils marks its hot functions with profile_stage, so this module must not import it
+logger = logging.getLogger("lightrag")
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+PROFILER_NAMESPACE = "profiler"
+DEFAULT_SAMPLE_INTERVAL = 0.005
+MAX_PROFILE_DURATION = 600.0
+NO_STAGE = "(no stage)"
+
+# Leaf frames in these modules are threads waiting for work, not CPU time
+_IDLE_MODULES = ("selectors.py", "threading.py", "queue.py")
+
+# id of code object -> (stage label, code object). Keyed by identity because code
+# objects of functions with identical bodies compare equal; the code object is
+# kept so its id cannot be reused.
+_stage_labels: dict[int, tuple[str, Any]] = {}
+
+
+def profile_stage(label: str) -> Callable[[F], F]:
+    """Label profiler samples taken while the decorated function is on the stack
+
+    The function is returned unchanged, so marking a hot path costs nothing when
+    no profiler is running.
+    """
+
+    def register(func: F) -> F:
+        _stage_labels[id(func.__code__)] = (label, func.__code__)
+        return func
+
+    return register
+
+
+def _frame_name(code) -> str:
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class Profile:
+    """Aggregated samples of one profiling session"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        # (stage, thread name, code objects from root to leaf) -> sample count
+        self.samples: Counter = Counter()
+        self.started_at = time.time()
+        self.duration = 0.0
+
+    @property
+    def sample_count(self) -> int:
+        return sum(self.samples.values())
+
+    def stages(self) -> dict[str, int]:
+        totals: Counter = Counter()
+        for (stage, _, _), count in self.samples.items():
+            totals[stage] += count
+        return dict(totals.most_common())
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed stack format, one ``frames count`` line per stack"""
+        lines = []
+        for (stage, thread, stack), count in self.samples.most_common():
+            frames = [f"[{stage}]", f"thread:{thread}"]
+            frames += [_frame_name(code).replace(";", ":") for code in stack]
+            lines.append(f"{';'.join(frames)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str = "lightrag") -> dict[str, Any]:
+        """Speedscope file format with one sampled profile"""
+        frames: list[dict[str, Any]] = []
+        frame_index: dict[Any, int] = {}
+
+        def index_of(key, frame) -> int:
+            index = frame_index.get(key)
+            if index is None:
+                index = frame_index[key] = len(frames)
+                frames.append(frame)
+            return index
+
+        samples, weights = [], []
+        for (stage, thread, stack), count in self.samples.most_common():
+            sample = [
+                index_of(("stage", stage), {"name": f"[{stage}]"}),
+                index_of(("thread", thread), {"name": f"thread:{thread}"}),
+            ]
+            for code in stack:
+                sample.append(
+                    index_of(
+                        code,
+                        {
+                            "name": code.co_name,
+                            "file": code.co_filename,
+                            "line": code.co_firstlineno,
+                        },
+                    )
+                )
+            samples.append(sample)
+            weights.append(round(count * self.interval, 6))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "lightrag",
+            "name": name,
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": round(sum(weights), 6),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+
+class SamplingProfiler:
+    """Samples all threads of this process from a daemon thread"""
+
+    def __init__(
+        self, interval: float = DEFAULT_SAMPLE_INTERVAL, include_idle: bool = False
+    ):
+        self.interval = max(0.001, interval)
+        self.include_idle = include_idle
+        self.profile: Profile | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            raise RuntimeError("Profiler is already running")
+        self.profile = Profile(self.interval)
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="lightrag-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> Profile:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.profile.duration = time.time() - self.profile.started_at
+        return self.profile
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        samples = self.profile.samples
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if not self.include_idle and frame.f_code.co_filename.endswith(
+                    _IDLE_MODULES
+                ):
+                    continue
+                stack = []
+                stage = None
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(code)
+                    if stage is None and id(code) in _stage_labels:
+                        stage = _stage_labels[id(code)][0]
+                    frame = frame.f_back
+                stack.reverse()
+                thread = names.get(thread_id, str(thread_id))
+                samples[(stage or NO_STAGE, thread, tuple(stack))] += 1
+
+
+class ProfilerController:
+    """Runs profiling sessions requested through the API, in any worker
+
+    Sessions are tracked in shared namespace data. A request handled by one
+    worker may target another: each worker polls for sessions addressed to its
+    pid. Results are written to ``output_dir`` so every worker can serve them.
+    """
+
+    def __init__(self, output_dir: str, poll_interval: float = 1.0):
+        self.output_dir = output_dir
+        self.poll_interval = poll_interval
+        self._profiler: SamplingProfiler | None = None
+        self._session_id: str | None = None
+        self._stop_task: asyncio.Task | None = None
+        os.makedirs(output_dir, exist_ok=True)
+
+    @property
+    def pid(self) -> int:
+        # The controller is created before Gunicorn forks its workers
+        return os.getpid()
+
+    async def _sessions(self) -> dict:
+        return await get_namespace_data(PROFILER_NAMESPACE, workspace="")
+
+    def _lock(self):
+        return get_namespace_lock(PROFILER_NAMESPACE, workspace="")
+
+    def output_path(self, session_id: str, fmt: str) -> str:
+        suffix = "speedscope.json" if fmt == "speedscope" else "collapsed.txt"
+        return os.path.join(self.output_dir, f"{session_id}.{suffix}")
+
+    # -------------------------- API side --------------------------
+    async def workers(self) -> list[dict[str, Any]]:
+        shared = await self._sessions()
+        now = time.time()
+        heartbeats = shared.get("workers", {})
+        stale_after = max(5.0, 3 * self.poll_interval)
+        return [
+            {"pid": int(pid), "last_seen": seen, "alive": now - seen < stale_after}
+            for pid, seen in sorted(heartbeats.items())
+        ]
+
+    async def start(
+        self,
+        duration: float,
+        worker: int | None = None,
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+        include_idle: bool = False,
+    ) -> dict[str, Any]:
+        if not 0 < duration <= MAX_PROFILE_DURATION:
+            raise ValueError(
+                f"duration must be between 0 and {MAX_PROFILE_DURATION:.0f} seconds"
+            )
+        target = worker or self.pid
+        if worker is not None and worker != self.pid:
+            alive = {w["pid"] for w in await self.workers() if w["alive"]}
+            if worker not in alive:
+                raise LookupError(f"Worker {worker} is not running")
+
+        session_id = f"prof-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        session = {
+            "session_id": session_id,
+            "pid": target,
+            "status": "requested",
+            "duration": duration,
+            "interval": interval,
+            "include_idle": include_idle,
+            "requested_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "samples": 0,
+            "stages": {},
+            "error": None,
+            "stop_requested": False,
+        }
+        async with self._lock():
+            shared = await self._sessions()
+            for other in shared.get("sessions", {}).values():
+                if other["pid"] == target and other["status"] in (
+                    "requested",
+                    "running",
+                ):
+                    raise RuntimeError(
+                        f"Worker {target} is already profiling ({other['session_id']})"
+                    )
+            await self._save(session)
+
+        if target == self.pid:
+            await self._begin(session_id)
+        return await self.get(session_id)
+
+    async def stop(self, session_id: str) -> dict[str, Any]:
+        async with self._lock():
+            session = await self.get(session_id)
+            if session is None:
+                raise KeyError(session_id)
+            if session["status"] == "requested":
+                session.update(status="cancelled", finished_at=time.time())
+                await self._save(session)
+            elif session["status"] == "running":
+                session["stop_requested"] = True
+                await self._save(session)
+        if session["pid"] == self.pid:
+            await self._finish(session_id)
+        return await self.get(session_id)
+
+    async def get(self, session_id: str) -> dict[str, Any] | None:
+        session = (await self._sessions()).get("sessions", {}).get(session_id)
+        return dict(session) if session else None
+
+    async def list(self) -> list[dict[str, Any]]:
+        sessions = (await self._sessions()).get("sessions", {})
+        return sorted(
+            (dict(s) for s in sessions.values()),
+            key=lambda s: s["requested_at"],
+            reverse=True,
+        )
+
+    async def _save(self, session: dict[str, Any]) -> None:
+        shared = await self._sessions()
+        sessions = dict(shared.get("sessions", {}))
+        sessions[session["session_id"]] = session
+        # Manager dict values must be replaced whole to reach other processes
+        shared["sessions"] = sessions
+
+    # -------------------------- Worker side --------------------------
+    async def run(self) -> None:
+        """Heartbeat and pick up sessions addressed to this worker until cancelled"""
+        try:
+            while True:
+                try:
+                    await self._poll()
+                except Exception as e:
+                    logger.warning(f"Profiler poll failed: {e}")
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            if self._session_id is not None:
+                await self._finish(self._session_id)
+
+    async def _poll(self) -> None:
+        shared = await self._sessions()
+        async with self._lock():
+            heartbeats = dict(shared.get("workers", {}))
+            heartbeats[str(self.pid)] = time.time()
+            shared["workers"] = heartbeats
+        for session in list(shared.get("sessions", {}).values()):
+            if session["pid"] != self.pid:
+                continue
+            if session["status"] == "requested" and self._session_id is None:
+                await self._begin(session["session_id"])
+            elif (
+                session["status"] == "running"
+                and session["stop_requested"]
+                and self._session_id == session["session_id"]
+            ):
+                await self._finish(session["session_id"])
+
+    async def _begin(self, session_id: str) -> None:
+        async with self._lock():
+            session = await self.get(session_id)
+            if session is None or session["status"] != "requested":
+                return
+            self._profiler = SamplingProfiler(
+                session["interval"], include_idle=session["include_idle"]
+            )
+            self._profiler.start()
+            self._session_id = session_id
+            session.update(status="running", started_at=time.time())
+            await self._save(session)
+        logger.info(
+            f"Profiler session {session_id} started in worker {self.pid} for {session['duration']}s"
+        )
+        self._stop_task = asyncio.create_task(
+            self._stop_after(session_id, session["duration"])
+        )
+
+    async def _stop_after(self, session_id: str, duration: float) -> None:
+        await asyncio.sleep(duration)
+        await self._finish(session_id)
+
+    async def _finish(self, session_id: str) -> None:
+        if self._session_id != session_id or self._profiler is None:
+            return
+        profiler, self._profiler, self._session_id = self._profiler, None, None
+        if (
+            self._stop_task is not None
+            and self._stop_task is not asyncio.current_task()
+        ):
+            self._stop_task.cancel()
+        self._stop_task = None
+
+        profile = profiler.stop()
+        update: dict[str, Any] = {
+            "status": "completed",
+            "finished_at": time.time(),
+            "samples": profile.sample_count,
+            "stages": profile.stages(),
+        }
+        try:
+            await asyncio.to_thread(self._write, session_id, profile)
+        except Exception as e:
+            logger.error(f"Failed to write profile {session_id}: {e}")
+            update.update(status="failed", error=str(e))
+        async with self._lock():
+            session = await self.get(session_id)
+            if session is not None:
+                session.update(update)
+                await self._save(session)
+        logger.info(
+            f"Profiler session {session_id} {update['status']}: {profile.sample_count} samples"
+        )
+
+    def _write(self, session_id: str, profile: Profile) -> None:
+        with open(
+            self.output_path(session_id, "collapsed"), "w", encoding="utf-8"
+        ) as f:
+            f.write(profile.collapsed())
+        with open(
+            self.output_path(session_id, "speedscope"), "w", encoding="utf-8"
+        ) as f:
+            json.dump(profile.speedscope(name=session_id), f)
+
+
+__all__ = [
+    "Profile",
+    "ProfilerController",
+    "SamplingProfiler",
+    "profile_stage",
+]
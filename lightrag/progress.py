@@ -0,0 +1,532 @@
+"""
+Document processing progress bus.
+
+The indexing pipeline publishes per-document progress (stage, chunk counters
+and timings) keyed by ``track_id``. Snapshots live in shared namespace data, so
+any worker process can read them without taking the ``pipeline_status`` lock
+or scanning doc status storage. Subscribers in the publishing process are
+woken immediately; subscribers in other worker processes fall back to a cheap
+periodic check of the shared snapshot.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from lightrag.kg.shared_storage import get_namespace_data
+from lightrag.utils import logger
+
+PROGRESS_NAMESPACE = "doc_progress"
+
+# Seconds a finished track snapshot is kept before being pruned
+PROGRESS_RETENTION_SECONDS = 3600
+
+# Seconds without progress, while the pipeline is idle, after which a watch ends
+PROGRESS_IDLE_TIMEOUT_SECONDS = 300
+
+
+class ProgressStage:
+    """Stages reported for a single document"""
+
+    PENDING = "pending"
+    CHUNKING = "chunking"
+    EXTRACTING = "extracting"
+    MERGING = "merging"
+    PROCESSED = "processed"
+    FAILED = "failed"
+
+
+TERMINAL_STAGES = {ProgressStage.PROCESSED, ProgressStage.FAILED}
+
+# (workspace, track_id) -> events of local subscribers waiting for changes
+_local_subscribers: dict[tuple[str, str], set[asyncio.Event]] = {}
+
+
+def _notify_local(workspace: str, track_id: str) -> None:
+    for event in _local_subscribers.get((workspace, track_id), ()):
+        event.set()
+
+
+def _prune_finished_tracks(progress: dict, now: float) -> None:
+    expired = [
+        track_id
+        for track_id, snapshot in progress.items()
+        if snapshot.get("finished_at")
+        and now - snapshot["finished_at"] > PROGRESS_RETENTION_SECONDS
+    ]
+    for track_id in expired:
+        progress.pop(track_id, None)
+
+
+async def publish_doc_progress(
+    workspace: str,
+    track_id: str | None,
+    doc_id: str,
+    stage: str | None = None,
+    *,
+    file_path: str | None = None,
+    chunks_total: int | None = None,
+    chunks_done_delta: int = 0,
+    error_msg: str | None = None,
+    searchable: bool = False,
+) -> None:
+    """Record a progress update for one document of a track.
+
+    Failures are logged and swallowed: progress reporting must never break the
+    indexing pipeline.
+    """
+    if not track_id:
+        return
+    try:
+        progress = await get_namespace_data(PROGRESS_NAMESPACE, workspace=workspace)
+        now = time.time()
+
+        # Read-modify-write without awaits in between, so it is atomic with
+        # respect to other coroutines. Values are reassigned as a whole so the
+        # update also propagates through multiprocessing Manager dicts.
+        snapshot = progress.get(track_id)
+        if snapshot is None:
+            _prune_finished_tracks(progress, now)
+            snapshot = {"track_id": track_id, "version": 0, "docs": {}}
+        else:
+            snapshot = dict(snapshot)
+        docs = dict(snapshot["docs"])
+
+        doc = dict(
+            docs.get(doc_id)
+            or {
+                "doc_id": doc_id,
+                "file_path": file_path,
+                "stage": ProgressStage.PENDING,
+                "chunks_total": 0,
+                "chunks_done": 0,
+                "started_at": None,
+                "extract_started_at": None,
+                "searchable_at": None,
+                "error_msg": None,
+            }
+        )
+        if file_path is not None:
+            doc["file_path"] = file_path
+        if stage is not None and stage != doc["stage"]:
+            doc["stage"] = stage
+            if stage != ProgressStage.PENDING and doc["started_at"] is None:
+                doc["started_at"] = now
+            if stage == ProgressStage.EXTRACTING:
+                doc["extract_started_at"] = now
+                doc["chunks_done"] = 0
+        if chunks_total is not None:
+            doc["chunks_total"] = chunks_total
+        if chunks_done_delta:
+            doc["chunks_done"] += chunks_done_delta
+            if doc["chunks_total"]:
+                doc["chunks_done"] = min(doc["chunks_done"], doc["chunks_total"])
+        if error_msg is not None:
+            doc["error_msg"] = error_msg
+        if searchable and not doc.get("searchable_at"):
+            doc["searchable_at"] = now
+        doc["updated_at"] = now
+        docs[doc_id] = doc
+
+        snapshot["docs"] = docs
+        snapshot["version"] += 1
+        snapshot["updated_at"] = now
+        snapshot["finished_at"] = (
+            now if all(d["stage"] in TERMINAL_STAGES for d in docs.values()) else None
+        )
+        progress[track_id] = snapshot
+    except Exception as e:
+        logger.debug(f"Failed to publish progress for {track_id}/{doc_id}: {e}")
+        return
+
+    _notify_local(workspace, track_id)
+
+
+async def publish_pending_docs(workspace: str, docs: dict[str, Any]) -> None:
+    """Register a batch of documents as pending, one shared write per track.
+
+    Args:
+        workspace: Workspace the documents belong to
+        docs: Mapping of doc_id to DocProcessingStatus (or any object exposing
+            ``track_id`` and ``file_path``)
+    """
+    by_track: dict[str, dict[str, Any]] = {}
+    for doc_id, status_doc in docs.items():
+        track_id = getattr(status_doc, "track_id", None)
+        if track_id:
+            by_track.setdefault(track_id, {})[doc_id] = getattr(
+                status_doc, "file_path", None
+            )
+    if not by_track:
+        return
+    try:
+        progress = await get_namespace_data(PROGRESS_NAMESPACE, workspace=workspace)
+        now = time.time()
+        _prune_finished_tracks(progress, now)
+        for track_id, track_docs in by_track.items():
+            snapshot = dict(
+                progress.get(track_id)
+                or {"track_id": track_id, "version": 0, "docs": {}}
+            )
+            docs_progress = dict(snapshot["docs"])
+            for doc_id, file_path in track_docs.items():
+                docs_progress[doc_id] = {
+                    "doc_id": doc_id,
+                    "file_path": file_path,
+                    "stage": ProgressStage.PENDING,
+                    "chunks_total": 0,
+                    "chunks_done": 0,
+                    "started_at": None,
+                    "extract_started_at": None,
+                    "error_msg": None,
+                    "updated_at": now,
+                }
+            snapshot["docs"] = docs_progress
+            snapshot["version"] += 1
+            snapshot["updated_at"] = now
+            snapshot["finished_at"] = None
+            progress[track_id] = snapshot
+    except Exception as e:
+        logger.debug(f"Failed to publish pending progress: {e}")
+        return
+
+    for track_id in by_track:
+        _notify_local(workspace, track_id)
+
+
+class DocProgressReporter:
+    """Progress publisher bound to a single document of a track"""
+
+    def __init__(
+        self,
+        workspace: str,
+        track_id: str | None,
+        doc_id: str,
+        file_path: str | None = None,
+    ):
+        self.workspace = workspace
+        self.track_id = track_id
+        self.doc_id = doc_id
+        self.file_path = file_path
+
+    async def stage(self, stage: str, **fields: Any) -> None:
+        await publish_doc_progress(
+            self.workspace,
+            self.track_id,
+            self.doc_id,
+            stage,
+            file_path=self.file_path,
+            **fields,
+        )
+
+    async def mark_searchable(self) -> None:
+        await publish_doc_progress(
+            self.workspace, self.track_id, self.doc_id, searchable=True
+        )
+
+    async def chunk_done(self, count: int = 1) -> None:
+        await publish_doc_progress(
+            self.workspace, self.track_id, self.doc_id, chunks_done_delta=count
+        )
+
+
+def _doc_eta(doc: dict[str, Any], now: float) -> float | None:
+    if doc["stage"] in TERMINAL_STAGES:
+        return 0.0
+    if doc["stage"] != ProgressStage.EXTRACTING:
+        return None
+    done, total = doc["chunks_done"], doc["chunks_total"]
+    if not done or not doc.get("extract_started_at"):
+        return None
+    elapsed = now - doc["extract_started_at"]
+    return round(elapsed / done * max(total - done, 0), 1)
+
+
+def build_track_progress(
+    snapshot: dict[str, Any], now: float | None = None
+) -> dict[str, Any]:
+    """Build the client-facing progress payload (with ETAs) from a snapshot"""
+    now = time.time() if now is None else now
+    documents = []
+    stage_counts: dict[str, int] = {}
+    durations = []
+    active_etas = []
+    for doc in snapshot["docs"].values():
+        eta = _doc_eta(doc, now)
+        documents.append(
+            {
+                "doc_id": doc["doc_id"],
+                "file_path": doc.get("file_path"),
+                "stage": doc["stage"],
+                "chunks_total": doc["chunks_total"],
+                "chunks_done": doc["chunks_done"],
+                "eta_seconds": eta,
+                # Chunks can be retrieved before the knowledge graph is merged
+                "searchable": doc["stage"] == ProgressStage.PROCESSED
+                or bool(doc.get("searchable_at")),
+                "error_msg": doc.get("error_msg"),
+            }
+        )
+        stage_counts[doc["stage"]] = stage_counts.get(doc["stage"], 0) + 1
+        if doc["stage"] in TERMINAL_STAGES and doc.get("started_at"):
+            durations.append(doc["updated_at"] - doc["started_at"])
+        elif eta is not None:
+            active_etas.append(eta)
+
+    total = len(documents)
+    finished = sum(stage_counts.get(s, 0) for s in TERMINAL_STAGES)
+    # Documents that have not reached extraction yet are estimated with the
+    # average duration of documents already finished in this track
+    not_started = total - finished - len(active_etas)
+    track_eta = None
+    if finished == total:
+        track_eta = 0.0
+    elif durations or active_etas:
+        avg_duration = sum(durations) / len(durations) if durations else 0.0
+        parallel = max(len(active_etas), 1)
+        track_eta = round(
+            max(active_etas, default=0.0) + not_started * avg_duration / parallel, 1
+        )
+
+    return {
+        "track_id": snapshot["track_id"],
+        "version": snapshot["version"],
+        "total_docs": total,
+        "finished_docs": finished,
+        "searchable_docs": sum(1 for d in documents if d["searchable"]),
+        "stage_counts": stage_counts,
+        "finished": finished == total,
+        "eta_seconds": track_eta,
+        "documents": documents,
+    }
+
+
+async def get_track_progress(workspace: str, track_id: str) -> dict[str, Any] | None:
+    """Return the current progress payload of a track, or None if unknown"""
+    progress = await get_namespace_data(PROGRESS_NAMESPACE, workspace=workspace)
+    snapshot = progress.get(track_id)
+    return build_track_progress(snapshot) if snapshot else None
+
+
+async def watch_track_progress(
+    workspace: str,
+    track_id: str,
+    poll_interval: float = 1.0,
+    idle_timeout: float | None = None,
+    is_busy: Callable[[], Awaitable[bool]] | None = None,
+) -> AsyncIterator[dict[str, Any] | None]:
+    """Yield track progress payloads whenever the snapshot changes.
+
+    ``None`` is yielded when nothing changed within ``poll_interval`` so that
+    callers can emit keep-alives. Iteration stops once every document of the
+    track has reached a terminal stage, or, with ``idle_timeout``, once the
+    snapshot has not changed for that many seconds while ``is_busy`` reports
+    an idle pipeline (documents left pending would otherwise be watched forever).
+    """
+    key = (workspace, track_id)
+    event = asyncio.Event()
+    _local_subscribers.setdefault(key, set()).add(event)
+    last_version = None
+    last_change = time.monotonic()
+    try:
+        while True:
+            event.clear()
+            payload = await get_track_progress(workspace, track_id)
+            if payload is not None and payload["version"] != last_version:
+                last_version = payload["version"]
+                last_change = time.monotonic()
+                yield payload
+                if payload["finished"]:
+                    return
+            else:
+                if (
+                    idle_timeout is not None
+                    and time.monotonic() - last_change >= idle_timeout
+                    and not (is_busy is not None and await is_busy())
+                ):
+                    return
+                yield None
+            try:
+                await asyncio.wait_for(event.wait(), timeout=poll_interval)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        subscribers = _local_subscribers.get(key)
+        if subscribers is not None:
+            subscribers.discard(event)
+            if not subscribers:
+                _local_subscribers.pop(key, None)
+
+
+class PipelineStage:
+    """Bounded worker pool for one stage of the document pipeline
+
+    Documents waiting for a free worker are counted as queued, so the snapshot
+    shows both how busy the stage is and how much work is piling up before it.
+    """
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = max(1, int(workers))
+        self._semaphore = asyncio.Semaphore(self.workers)
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        self.max_queued = 0
+        self._busy_seconds = 0.0
+        self._started_at = time.monotonic()
+
+    def snapshot(self) -> dict[str, Any]:
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            "workers": self.workers,
+            "active": self.active,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "utilization": round(
+                min(self._busy_seconds / (elapsed * self.workers), 1.0), 4
+            ),
+        }
+
+
+class PipelineStages:
+    """Per-stage worker pools of the indexing pipeline
+
+    Every stage has its own bounded pool, so cheap stages (loading, chunking,
+    chunk embedding) keep feeding new documents while earlier documents wait on
+    the LLM in the extraction stage. An admission bound caps the number of
+    documents in flight across all stages to keep memory in check. Snapshots
+    are written to ``pipeline_status["stages"]`` under ``pipeline_status_lock``
+    on every transition.
+    """
+
+    def __init__(
+        self,
+        workers: dict[str, int],
+        max_inflight: int,
+        pipeline_status: dict | None = None,
+        pipeline_status_lock: Any = None,
+    ):
+        self.stages = {
+            name: PipelineStage(name, count) for name, count in workers.items()
+        }
+        self.max_inflight = max(1, int(max_inflight))
+        self._admission = asyncio.Semaphore(self.max_inflight)
+        self.inflight = 0
+        self.waiting = 0
+        if pipeline_status is not None and pipeline_status_lock is None:
+            raise ValueError("pipeline_status_lock is required with pipeline_status")
+        self._pipeline_status = pipeline_status
+        self._pipeline_status_lock = pipeline_status_lock
+
+    def snapshot(self) -> dict[str, Any]:
+        snapshot: dict[str, Any] = {
+            name: stage.snapshot() for name, stage in self.stages.items()
+        }
+        snapshot["admission"] = {
+            "max_inflight": self.max_inflight,
+            "inflight": self.inflight,
+            "waiting": self.waiting,
+        }
+        return snapshot
+
+    async def _publish(self) -> None:
+        if self._pipeline_status is None:
+            return
+        try:
+            async with self._pipeline_status_lock:
+                # Assign a new dict so the value is propagated to shared Manager dicts
+                self._pipeline_status["stages"] = self.snapshot()
+        except Exception as e:  # pragma: no cover - best effort reporting
+            logger.debug(f"Failed to publish pipeline stage status: {e}")
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold an in-flight slot for one document while it moves through stages"""
+        self.waiting += 1
+        try:
+            await self._publish()
+            await self._admission.acquire()
+        finally:
+            self.waiting -= 1
+        self.inflight += 1
+        try:
+            await self._publish()
+            yield
+        finally:
+            self.inflight -= 1
+            self._admission.release()
+            await self._publish()
+
+    @asynccontextmanager
+    async def slot(self, name: str) -> AsyncIterator[None]:
+        """Run the enclosed block on a worker of stage ``name``"""
+        stage = self.stages[name]
+        stage.queued += 1
+        stage.max_queued = max(stage.max_queued, stage.queued)
+        try:
+            await self._publish()
+            await stage._semaphore.acquire()
+        finally:
+            stage.queued -= 1
+        stage.active += 1
+        started = time.monotonic()
+        try:
+            await self._publish()
+            yield
+        finally:
+            stage._busy_seconds += time.monotonic() - started
+            stage.active -= 1
+            stage.completed += 1
+            stage._semaphore.release()
+            await self._publish()
+
+
+class DebouncedFlush:
+    """Coalesce flush requests of the indexing pipeline into few flushes
+
+    ``request`` returns immediately. The first request schedules a flush after
+    ``delay`` seconds; every request made before that flush starts is covered by
+    it, and requests made while it runs are covered by a single follow-up
+    flush. Callbacks passed to ``request`` run once the flush covering them has
+    completed.
+    """
+
+    def __init__(self, flush: Callable[[], Awaitable[None]], delay: float = 0.0):
+        self._flush = flush
+        self.delay = max(0.0, delay)
+        self.flushes = 0
+        self._requested = False
+        self._callbacks: list[Callable[[], Awaitable[None]]] = []
+        self._task: asyncio.Task | None = None
+
+    def request(self, on_flushed: Callable[[], Awaitable[None]] | None = None) -> None:
+        self._requested = True
+        if on_flushed is not None:
+            self._callbacks.append(on_flushed)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while self._requested:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            self._requested = False
+            callbacks, self._callbacks = self._callbacks, []
+            try:
+                await self._flush()
+            except Exception as e:
+                logger.error(f"Debounced pipeline flush failed: {e}")
+                continue
+            self.flushes += 1
+            for callback in callbacks:
+                await callback()
+
+    async def drain(self) -> None:
+        """Wait for the pending flush, if any"""
+        if self._task is not None:
+            await asyncio.shield(self._task)
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import threading
+import time
 import aiohttp
-from typing import Any, List, Dict, Optional
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Dict, Optional, Tuple
 from tenacity import (
     retry,
     stop_after_attempt,
     wait_exponential,
     retry_if_exception_type,
 )
+from . import metrics
 from .utils import logger
 
 from dotenv import load_dotenv
@@ -290,6 +296,253 @@ async def ali_rerank(
     )
 
 
+class LocalCrossEncoderReranker:
+    """In-process cross-encoder reranker for deployments without a rerank API.
+
+    The model is loaded lazily from a local path (or Hugging Face cache) and
+    runs with ONNX Runtime when an exported ``model.onnx`` is present,
+    otherwise with transformers/torch on CPU (optionally dynamically quantized
+    to int8). Documents are scored in fixed-size batches on a thread pool so
+    inference does not block the event loop.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        backend: str = "auto",
+        batch_size: int = 32,
+        max_length: int = 512,
+        max_workers: int = 2,
+        quantize: bool = False,
+    ):
+        if backend not in ("auto", "onnx", "torch"):
+            raise ValueError(f"Unsupported local rerank backend: {backend}")
+        self.model_path = model_path
+        self.backend = backend
+        self.batch_size = max(1, batch_size)
+        self.max_length = max_length
+        self.quantize = quantize
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="lightrag-rerank"
+        )
+        self._load_lock = threading.Lock()
+        self._scorer: Callable[[List[Tuple[str, str]]], List[float]] | None = None
+        self._stats = {
+            "calls": 0,
+            "documents": 0,
+            "batches": 0,
+            "total_seconds": 0.0,
+            "max_seconds": 0.0,
+            "last_seconds": 0.0,
+        }
+
+    def _find_onnx_file(self) -> str | None:
+        for candidate in ("model.onnx", os.path.join("onnx", "model.onnx")):
+            path = os.path.join(self.model_path, candidate)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def _load_scorer(self) -> Callable[[List[Tuple[str, str]]], List[float]]:
+        """Load tokenizer and model, returning a function scoring (query, doc) pairs"""
+        import pipmaster as pm
+
+        if not pm.is_installed("transformers"):
+            pm.install("transformers")
+        from transformers import AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(self.model_path)
+        # Fast tokenizers are not safe to call from several threads at once
+        tokenizer_lock = threading.Lock()
+
+        def encode(pairs: List[Tuple[str, str]], return_tensors: str):
+            with tokenizer_lock:
+                return tokenizer(
+                    [query for query, _ in pairs],
+                    [doc for _, doc in pairs],
+                    padding=True,
+                    truncation="only_second",
+                    max_length=self.max_length,
+                    return_tensors=return_tensors,
+                )
+
+        onnx_file = self._find_onnx_file() if self.backend != "torch" else None
+        if self.backend == "onnx" and onnx_file is None:
+            raise FileNotFoundError(f"No model.onnx found under {self.model_path}")
+
+        if onnx_file is not None:
+            if not pm.is_installed("onnxruntime"):
+                pm.install("onnxruntime")
+            import onnxruntime as ort
+
+            session = ort.InferenceSession(
+                onnx_file, providers=["CPUExecutionProvider"]
+            )
+            input_names = {item.name for item in session.get_inputs()}
+
+            def score_onnx(pairs: List[Tuple[str, str]]) -> List[float]:
+                encoded = encode(pairs, "np")
+                feeds = {
+                    name: np.asarray(value, dtype=np.int64)
+                    for name, value in encoded.items()
+                    if name in input_names
+                }
+                logits = session.run(None, feeds)[0]
+                return _logits_to_scores(np.asarray(logits))
+
+            logger.info(f"Local reranker loaded with ONNX Runtime: {onnx_file}")
+            return score_onnx
+
+        if not pm.is_installed("torch"):
+            pm.install("torch")
+        import torch
+        from transformers import AutoModelForSequenceClassification
+
+        model = AutoModelForSequenceClassification.from_pretrained(self.model_path)
+        model.eval()
+        if self.quantize:
+            model = torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+
+        def score_torch(pairs: List[Tuple[str, str]]) -> List[float]:
+            encoded = encode(pairs, "pt")
+            with torch.inference_mode():
+                logits = model(**encoded).logits
+            return _logits_to_scores(logits.float().numpy())
+
+        logger.info(
+            f"Local reranker loaded with torch{' (int8 quantized)' if self.quantize else ''}: {self.model_path}"
+        )
+        return score_torch
+
+    def _get_scorer(self) -> Callable[[List[Tuple[str, str]]], List[float]]:
+        if self._scorer is None:
+            with self._load_lock:
+                if self._scorer is None:
+                    self._scorer = self._load_scorer()
+        return self._scorer
+
+    def _score_batch(self, query: str, documents: List[str]) -> List[float]:
+        return self._get_scorer()([(query, doc) for doc in documents])
+
+    async def rerank(
+        self, query: str, documents: List[str], top_n: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Score documents against the query.
+
+        Returns:
+            List of dictionary of ["index": int, "relevance_score": float]
+        """
+        if not documents:
+            return []
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        batches = [
+            documents[i : i + self.batch_size]
+            for i in range(0, len(documents), self.batch_size)
+        ]
+        batch_scores = await asyncio.gather(
+            *(
+                loop.run_in_executor(self._executor, self._score_batch, query, batch)
+                for batch in batches
+            )
+        )
+        scores = [score for batch in batch_scores for score in batch]
+        results = sorted(
+            (
+                {"index": index, "relevance_score": float(score)}
+                for index, score in enumerate(scores)
+            ),
+            key=lambda item: -item["relevance_score"],
+        )
+
+        elapsed = time.perf_counter() - start
+        stats = self._stats
+        stats["calls"] += 1
+        stats["documents"] += len(documents)
+        stats["batches"] += len(batches)
+        stats["total_seconds"] += elapsed
+        stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+        stats["last_seconds"] = elapsed
+        metrics.registry.observe("lightrag_rerank_seconds", elapsed)
+        metrics.registry.inc("lightrag_rerank_documents_total", len(documents))
+        logger.debug(
+            f"Local rerank: {len(documents)} documents in {len(batches)} batches, {elapsed * 1000:.1f} ms"
+        )
+        return results[:top_n] if top_n else results
+
+    def get_stats(self) -> Dict[str, float]:
+        """Per-call latency metrics accumulated since startup"""
+        stats = dict(self._stats)
+        stats["avg_seconds"] = (
+            stats["total_seconds"] / stats["calls"] if stats["calls"] else 0.0
+        )
+        return stats
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+def _logits_to_scores(logits: np.ndarray) -> List[float]:
+    """Map cross-encoder logits to relevance scores in [0, 1]"""
+    if logits.ndim == 1 or logits.shape[-1] == 1:
+        return (1.0 / (1.0 + np.exp(-logits.reshape(-1)))).tolist()
+    shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return (shifted[:, -1] / shifted.sum(axis=-1)).tolist()
+
+
+_local_rerankers: Dict[Tuple[str, str], LocalCrossEncoderReranker] = {}
+_local_rerankers_lock = threading.Lock()
+
+
+def get_local_reranker(
+    model_path: str, backend: Optional[str] = None
+) -> LocalCrossEncoderReranker:
+    """Return a shared local reranker for a model, configured from environment variables"""
+    backend = backend or os.getenv("LOCAL_RERANK_BACKEND", "auto")
+    key = (model_path, backend)
+    with _local_rerankers_lock:
+        reranker = _local_rerankers.get(key)
+        if reranker is None:
+            reranker = _local_rerankers[key] = LocalCrossEncoderReranker(
+                model_path,
+                backend=backend,
+                batch_size=int(os.getenv("LOCAL_RERANK_BATCH_SIZE", "32")),
+                max_length=int(os.getenv("LOCAL_RERANK_MAX_LENGTH", "512")),
+                max_workers=int(os.getenv("LOCAL_RERANK_MAX_WORKERS", "2")),
+                quantize=os.getenv("LOCAL_RERANK_QUANTIZE", "false").lower() == "true",
+            )
+    return reranker
+
+
+async def local_rerank(
+    query: str,
+    documents: List[str],
+    top_n: Optional[int] = None,
+    api_key: Optional[str] = None,
+    model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+    base_url: Optional[str] = None,
+    extra_body: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Rerank documents with a cross-encoder running in this process.
+
+    Args:
+        query: The search query
+        documents: List of strings to rerank
+        top_n: Number of top results to return
+        api_key: Unused, accepted for compatibility with remote bindings
+        model: Local model directory or Hugging Face model name
+        base_url: Unused, accepted for compatibility with remote bindings
+        extra_body: Unused, accepted for compatibility with remote bindings
+
+    Returns:
+        List of dictionary of ["index": int, "relevance_score": float]
+    """
+    return await get_local_reranker(model).rerank(query, documents, top_n=top_n)
+
+
 """Please run this test as a module:
 python -m lightrag.rerank
 """
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Benchmark of per-query framework overhead on the only_need_context path.
+
+A LightRAG instance is built in a temporary directory with an in-process
+tokenizer, a deterministic hash embedding and a canned extraction LLM, so the
+numbers reflect LightRAG's own overhead (config handling, retrieval, context
+assembly) rather than provider latency.
+
+Queries are issued open-loop at a fixed arrival rate (1k QPS by default);
+latency is measured from the scheduled start, so queueing caused by overhead
+shows up in the tail percentiles. The cost of building ``global_config`` with
+``asdict`` versus the cached config view is reported as well.
+
+Usage:
+    python -m lightrag.tools.benchmark_query_overhead
+    python -m lightrag.tools.benchmark_query_overhead --qps 1000 --seconds 5 --mode mix
+"""
+
+import asyncio
+import hashlib
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lightrag import LightRAG, QueryParam
+from lightrag.kg.shared_storage import finalize_share_data, initialize_pipeline_status
+from lightrag.utils import EmbeddingFunc, Tokenizer
+
+TOPICS = [
+    "solar power",
+    "wind turbines",
+    "battery storage",
+    "grid balancing",
+    "hydrogen fuel",
+    "heat pumps",
+    "nuclear fusion",
+    "carbon capture",
+]
+
+
+class _WhitespaceTokenizer:
+    def encode(self, content: str) -> list[int]:
+        return [len(word) for word in content.split()]
+
+    def decode(self, tokens: list[int]) -> str:
+        return " ".join("x" * token for token in tokens)
+
+
+async def _hash_embedding(texts: list[str]) -> np.ndarray:
+    vectors = np.zeros((len(texts), 64), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().split():
+            digest = hashlib.md5(word.encode("utf-8")).digest()
+            vectors[row, digest[0] % 64] += 1.0
+    return vectors
+
+
+async def _canned_llm(prompt, system_prompt=None, history_messages=None, **kwargs):
+    text = f"{system_prompt or ''}\n{prompt}"
+    lines = []
+    for topic in TOPICS:
+        if topic in text:
+            name = topic.title()
+            lines.append(
+                f"entity<|#|>{name}<|#|>concept<|#|>{name} is an energy technology."
+            )
+            lines.append(
+                f"relation<|#|>{name}<|#|>Energy Transition<|#|>part of<|#|>{name} contributes to the energy transition."
+            )
+    if lines:
+        lines.append(
+            "entity<|#|>Energy Transition<|#|>concept<|#|>The shift to low-carbon energy."
+        )
+    lines.append("<|COMPLETE|>")
+    return "\n".join(lines)
+
+
+async def _build_rag(working_dir: str, docs: int) -> LightRAG:
+    rag = LightRAG(
+        working_dir=working_dir,
+        workspace="bench",
+        llm_model_func=_canned_llm,
+        embedding_func=EmbeddingFunc(
+            embedding_dim=64, max_token_size=8192, func=_hash_embedding
+        ),
+        tokenizer=Tokenizer("whitespace", _WhitespaceTokenizer()),
+        # Bag-of-words hash vectors score lower than real embeddings, keep every hit
+        vector_db_storage_cls_kwargs={"cosine_better_than_threshold": 0.0},
+        enable_llm_cache=False,
+    )
+    await rag.initialize_storages()
+    await initialize_pipeline_status(workspace="bench")
+    texts = [
+        f"Document {i} discusses {TOPICS[i % len(TOPICS)]} and "
+        f"{TOPICS[(i + 3) % len(TOPICS)]} as part of the energy transition."
+        for i in range(docs)
+    ]
+    await rag.ainsert(texts, ids=[f"doc-{i}" for i in range(docs)])
+    return rag
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_benchmark(
+    qps: int = 1000, seconds: float = 3.0, mode: str = "naive", docs: int = 64
+) -> dict:
+    """Run the benchmark and return a summary dict"""
+    with tempfile.TemporaryDirectory() as working_dir:
+        rag = await _build_rag(working_dir, docs)
+        try:
+            # Config construction cost per query
+            rounds = 2000
+            start = time.perf_counter()
+            for _ in range(rounds):
+                asdict(rag)
+            asdict_us = (time.perf_counter() - start) / rounds * 1e6
+            start = time.perf_counter()
+            for _ in range(rounds):
+                rag.config_view
+            view_us = (time.perf_counter() - start) / rounds * 1e6
+
+            param = QueryParam(
+                mode=mode,
+                only_need_context=True,
+                top_k=10,
+                chunk_top_k=5,
+                hl_keywords=["energy transition"],
+                ll_keywords=["solar power"],
+                enable_rerank=False,
+            )
+            total = int(qps * seconds)
+            interval = 1.0 / qps
+            latencies: list[float] = []
+            failures = 0
+
+            async def one(index: int, scheduled: float) -> None:
+                nonlocal failures
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                result = await rag.aquery_data(
+                    f"How does {TOPICS[index % len(TOPICS)]} help?", param=param
+                )
+                if result.get("status") != "success":
+                    failures += 1
+                latencies.append((time.perf_counter() - scheduled) * 1000)
+
+            began = time.perf_counter()
+            await asyncio.gather(*(one(i, began + i * interval) for i in range(total)))
+            elapsed = time.perf_counter() - began
+        finally:
+            await rag.finalize_storages()
+            finalize_share_data()
+
+    return {
+        "mode": mode,
+        "target_qps": qps,
+        "queries": total,
+        "achieved_qps": round(total / elapsed, 1),
+        "failures": failures,
+        "latency_ms": {
+            "p50": round(statistics.median(latencies), 3),
+            "p95": round(_percentile(latencies, 95), 3),
+            "p99": round(_percentile(latencies, 99), 3),
+            "max": round(max(latencies), 3),
+        },
+        "global_config_us": {
+            "asdict": round(asdict_us, 2),
+            "config_view": round(view_us, 2),
+        },
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark LightRAG query overhead on the only_need_context path"
+    )
+    parser.add_argument("--qps", type=int, default=1000, help="Arrival rate")
+    parser.add_argument(
+        "--seconds", type=float, default=3.0, help="Duration of the run"
+    )
+    parser.add_argument(
+        "--mode",
+        default="naive",
+        choices=["naive", "local", "global", "hybrid", "mix"],
+        help="Query mode",
+    )
+    parser.add_argument("--docs", type=int, default=64, help="Documents to index")
+    args = parser.parse_args()
+
+    summary = asyncio.run(
+        run_benchmark(
+            qps=args.qps, seconds=args.seconds, mode=args.mode, docs=args.docs
+        )
+    )
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,700 @@
+#!/usr/bin/env python3
+"""
+Offline retrieval benchmark with per-stage latency percentiles.
+
+A synthetic corpus (chunks, entities and relations) is written straight into
+the configured storage backends, so corpora of 10k, 100k or 1M chunks can be
+built without running extraction. The LLM is replaced by a deterministic fake
+that answers keyword extraction from the query text, embeddings come from a
+hash-based embedder and reranking from a term-overlap scorer, so the numbers
+only reflect LightRAG's own retrieval path and the storage backends.
+
+A query workload (synthetic, or replayed from a JSONL file with ``query`` and
+optional ``mode`` fields) is run through ``aquery_data`` and the time spent
+in each retrieval stage is reported as p50/p95/p99:
+
+    keywords         keyword extraction (prompt building and parsing)
+    vector_search    entity/relation/chunk vector queries and query embedding
+    graph_expansion  node/edge lookups and neighbourhood expansion
+    chunk_pick       selecting text chunks for the found entities/relations
+    rerank           rerank scoring of candidate chunks
+    context_build    token truncation and context assembly
+
+Times are exclusive: a stage nested in another one is only counted once.
+Reports can be compared with a baseline to catch regressions.
+
+Usage:
+    python -m lightrag.tools.benchmark_retrieval --sizes 10000
+    python -m lightrag.tools.benchmark_retrieval --sizes 10000,100000 --modes mix,naive \\
+        --backends NanoVectorDBStorage:NetworkXStorage --output report.json
+    python -m lightrag.tools.benchmark_retrieval --baseline report.json --max-regression 0.2
+"""
+
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lightrag import LightRAG, QueryParam
+from lightrag import operate, utils
+from lightrag.constants import GRAPH_FIELD_SEP
+from lightrag.kg.shared_storage import finalize_share_data
+from lightrag.prompt import PROMPTS
+from lightrag.utils import EmbeddingFunc, Tokenizer, compute_mdhash_id, logger
+
+STAGES = (
+    "keywords",
+    "vector_search",
+    "graph_expansion",
+    "chunk_pick",
+    "rerank",
+    "context_build",
+)
+DEFAULT_BACKEND = "NanoVectorDBStorage:NetworkXStorage"
+DEFAULT_MODES = ("local", "global", "hybrid", "mix", "naive")
+
+TOPICS = [
+    "solar power",
+    "wind turbines",
+    "battery storage",
+    "grid balancing",
+    "hydrogen fuel",
+    "heat pumps",
+    "carbon capture",
+    "nuclear fusion",
+    "tidal energy",
+    "smart meters",
+    "demand response",
+    "power electronics",
+]
+NAME_PREFIXES = [
+    "Orion",
+    "Vega",
+    "Lyra",
+    "Draco",
+    "Cygnus",
+    "Aquila",
+    "Carina",
+    "Perseus",
+    "Hydra",
+    "Auriga",
+    "Pavo",
+    "Corvus",
+]
+FILLER = (
+    "the report describes how the system operates under load and notes that "
+    "field trials measured output efficiency cost and reliability across seasons"
+).split()
+ENTITY_PATTERN = re.compile(r"\b[A-Z][a-z]+-\d{6}\b")
+
+
+# -------------------------- Deterministic fakes --------------------------
+class WhitespaceTokenizer:
+    """Tokenizer counting whitespace separated words, needs no model download"""
+
+    def encode(self, content: str) -> list[int]:
+        return [len(word) for word in content.split()]
+
+    def decode(self, tokens: list[int]) -> str:
+        return " ".join("x" * token for token in tokens)
+
+
+class HashEmbedder:
+    """Bag-of-words embedding: every word is hashed to one of ``dim`` buckets"""
+
+    def __init__(self, dim: int = 64):
+        self.dim = dim
+        self._buckets: dict[str, int] = {}
+
+    def _bucket(self, word: str) -> int:
+        bucket = self._buckets.get(word)
+        if bucket is None:
+            bucket = self._buckets[word] = int(compute_mdhash_id(word)[:8], 16) % (
+                self.dim
+            )
+        return bucket
+
+    async def __call__(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, self._bucket(word)] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.clip(norms, 1e-12, None)
+
+
+_KEYWORD_QUERY_MARKER = PROMPTS["keywords_extraction"].split("{query}")[0]
+_KEYWORD_QUERY_MARKER = _KEYWORD_QUERY_MARKER.rsplit("\n", 1)[-1]
+
+
+async def fake_llm(prompt, system_prompt=None, history_messages=None, **kwargs):
+    """Answer keyword extraction from the query text, deterministically"""
+    if not kwargs.get("keyword_extraction"):
+        return ""
+    query = prompt.rsplit(_KEYWORD_QUERY_MARKER, 1)[-1].split("\n", 1)[0]
+    return json.dumps(
+        {
+            "high_level_keywords": [t for t in TOPICS if t in query.lower()],
+            "low_level_keywords": ENTITY_PATTERN.findall(query),
+        }
+    )
+
+
+async def fake_rerank(query: str, documents: list[str], top_n: int | None = None, **_):
+    """Score documents by the share of query words they contain"""
+    terms = set(query.lower().split())
+    results = [
+        {
+            "index": index,
+            "relevance_score": len(terms & set(doc.lower().split()))
+            / max(1, len(terms)),
+        }
+        for index, doc in enumerate(documents)
+    ]
+    results.sort(key=lambda item: item["relevance_score"], reverse=True)
+    return results[:top_n] if top_n else results
+
+
+# -------------------------- Synthetic corpus --------------------------
+def _entity_name(index: int) -> str:
+    return f"{NAME_PREFIXES[index % len(NAME_PREFIXES)]}-{index:06d}"
+
+
+def corpus_shape(chunks: int) -> dict[str, int]:
+    """Number of entities and relations generated for a corpus size"""
+    return {
+        "chunks": chunks,
+        "entities": max(20, chunks // 4),
+        "relations": max(20, chunks // 2),
+    }
+
+
+async def build_corpus(
+    rag: LightRAG, chunks: int, seed: int = 42, batch_size: int = 5000
+) -> dict[str, int]:
+    """Write a synthetic corpus straight into the storages of ``rag``"""
+    shape = corpus_shape(chunks)
+    rng = random.Random(seed)
+    entity_chunks: dict[int, list[str]] = defaultdict(list)
+    relations: dict[tuple[int, int], str] = {}
+    doc_id = "doc-synthetic"
+    file_path = "synthetic.txt"
+
+    for start in range(0, chunks, batch_size):
+        batch = {}
+        for index in range(start, min(chunks, start + batch_size)):
+            chunk_id = f"chunk-{index:07d}"
+            members = rng.sample(range(shape["entities"]), 3)
+            topic = TOPICS[index % len(TOPICS)]
+            words = [_entity_name(m) for m in members] + topic.split()
+            words += rng.choices(FILLER, k=40)
+            rng.shuffle(words)
+            content = " ".join(words)
+            batch[chunk_id] = {
+                "content": content,
+                "tokens": len(words),
+                "chunk_order_index": index,
+                "full_doc_id": doc_id,
+                "file_path": file_path,
+            }
+            for member in members:
+                if len(entity_chunks[member]) < 5:
+                    entity_chunks[member].append(chunk_id)
+            if len(relations) < shape["relations"]:
+                src, tgt = sorted(members[:2])
+                relations.setdefault((src, tgt), chunk_id)
+        await rag.text_chunks.upsert(batch)
+        await rag.chunks_vdb.upsert(batch)
+        if rag.lexical_index is not None:
+            await rag.lexical_index.upsert(batch)
+
+    now = int(time.time())
+    entity_ids = sorted(entity_chunks)
+    for start in range(0, len(entity_ids), batch_size):
+        vdb_batch = {}
+        for member in entity_ids[start : start + batch_size]:
+            name = _entity_name(member)
+            topic = TOPICS[member % len(TOPICS)]
+            description = f"{name} is a {topic} installation studied in field trials."
+            source_id = GRAPH_FIELD_SEP.join(entity_chunks[member])
+            await rag.chunk_entity_relation_graph.upsert_node(
+                name,
+                {
+                    "entity_id": name,
+                    "entity_type": "installation",
+                    "description": description,
+                    "source_id": source_id,
+                    "file_path": file_path,
+                    "created_at": now,
+                },
+            )
+            vdb_batch[compute_mdhash_id(name, prefix="ent-")] = {
+                "entity_name": name,
+                "entity_type": "installation",
+                "content": f"{name}\n{description}",
+                "source_id": source_id,
+                "description": description,
+                "file_path": file_path,
+            }
+        await rag.entities_vdb.upsert(vdb_batch)
+
+    relation_items = sorted(relations.items())
+    for start in range(0, len(relation_items), batch_size):
+        vdb_batch = {}
+        for (src, tgt), chunk_id in relation_items[start : start + batch_size]:
+            src_name, tgt_name = sorted((_entity_name(src), _entity_name(tgt)))
+            keywords = TOPICS[(src + tgt) % len(TOPICS)]
+            description = f"{src_name} shares {keywords} capacity with {tgt_name}."
+            await rag.chunk_entity_relation_graph.upsert_edge(
+                src_name,
+                tgt_name,
+                {
+                    "weight": 1.0,
+                    "description": description,
+                    "keywords": keywords,
+                    "source_id": chunk_id,
+                    "file_path": file_path,
+                    "created_at": now,
+                },
+            )
+            vdb_batch[compute_mdhash_id(src_name + tgt_name, prefix="rel-")] = {
+                "src_id": src_name,
+                "tgt_id": tgt_name,
+                "source_id": chunk_id,
+                "content": f"{keywords}\t{src_name}\n{tgt_name}\n{description}",
+                "keywords": keywords,
+                "description": description,
+                "weight": 1.0,
+                "file_path": file_path,
+            }
+        await rag.relationships_vdb.upsert(vdb_batch)
+
+    return {
+        "chunks": chunks,
+        "entities": len(entity_ids),
+        "relations": len(relation_items),
+    }
+
+
+def synthetic_workload(
+    count: int, entities: int, modes: list[str], seed: int = 7
+) -> list[dict[str, str]]:
+    """Queries mentioning one or two known entities and a topic"""
+    rng = random.Random(seed)
+    workload = []
+    for index in range(count):
+        first, second = rng.sample(range(entities), 2)
+        topic = rng.choice(TOPICS)
+        if index % 2:
+            query = f"How does {_entity_name(first)} use {topic}?"
+        else:
+            query = (
+                f"Compare {_entity_name(first)} and {_entity_name(second)} on {topic}"
+            )
+        workload.append({"query": query, "mode": modes[index % len(modes)]})
+    return workload
+
+
+def load_workload(path: str, modes: list[str]) -> list[dict[str, str]]:
+    """Read a JSONL workload with ``query`` and optional ``mode`` fields"""
+    workload = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            mode = item.get("mode") or modes[len(workload) % len(modes)]
+            workload.append({"query": item["query"], "mode": mode})
+    return workload
+
+
+# -------------------------- Stage instrumentation --------------------------
+_frame: contextvars.ContextVar[dict | None] = contextvars.ContextVar(
+    "benchmark_stage_frame", default=None
+)
+
+
+def _timed(stage: str, func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        parent = _frame.get()
+        if parent is None:
+            return await func(*args, **kwargs)
+        frame = {"stages": parent["stages"], "child": 0.0}
+        token = _frame.set(frame)
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            _frame.reset(token)
+            frame["stages"][stage] += max(0.0, elapsed - frame["child"])
+            parent["child"] += elapsed
+
+    return wrapper
+
+
+@contextmanager
+def instrument_stages(rag: LightRAG):
+    """Time the retrieval stages of ``rag`` while the context is active"""
+    module_targets = [
+        (operate, "get_keywords_from_query", "keywords"),
+        (operate, "_get_vector_context", "vector_search"),
+        (operate, "_perform_kg_search", "graph_expansion"),
+        (operate, "_get_node_data", "graph_expansion"),
+        (operate, "_get_edge_data", "graph_expansion"),
+        (operate, "_merge_all_chunks", "chunk_pick"),
+        (utils, "apply_rerank_if_enabled", "rerank"),
+        (operate, "_apply_token_truncation", "context_build"),
+        (operate, "_build_context_str", "context_build"),
+        (operate, "process_chunks_unified", "context_build"),
+    ]
+    instance_targets = [
+        (rag.entities_vdb, "query", "vector_search"),
+        (rag.relationships_vdb, "query", "vector_search"),
+        (rag.chunks_vdb, "query", "vector_search"),
+    ]
+    if rag.text_chunks.embedding_func is not None:
+        # Query embedding computed up front for chunk selection
+        instance_targets.append((rag.text_chunks, "embedding_func", "vector_search"))
+
+    originals = []
+    for target, name, stage in module_targets + instance_targets:
+        original = getattr(target, name)
+        originals.append((target, name, original, name in vars(target)))
+        setattr(target, name, _timed(stage, original))
+    try:
+        yield
+    finally:
+        for target, name, original, own_attribute in reversed(originals):
+            if own_attribute:
+                setattr(target, name, original)
+            else:
+                delattr(target, name)
+
+
+async def timed_query(rag: LightRAG, query: str, param: QueryParam) -> dict[str, Any]:
+    """Run one retrieval and return its total and per-stage seconds"""
+    root = {"stages": defaultdict(float), "child": 0.0}
+    token = _frame.set(root)
+    start = time.perf_counter()
+    try:
+        result = await rag.aquery_data(query, param=param)
+    finally:
+        total = time.perf_counter() - start
+        _frame.reset(token)
+    return {
+        "status": result.get("status"),
+        "total": total,
+        "stages": {stage: root["stages"].get(stage, 0.0) for stage in STAGES},
+    }
+
+
+# -------------------------- Benchmark run --------------------------
+def _percentiles(values: list[float]) -> dict[str, float]:
+    ordered = sorted(values)
+
+    def pick(pct: float) -> float:
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "p50": round(statistics.median(ordered) * 1000, 3),
+        "p95": pick(95),
+        "p99": pick(99),
+    }
+
+
+def _parse_backend(spec: str) -> dict[str, str]:
+    parts = spec.split(":")
+    if len(parts) not in (2, 3):
+        raise ValueError(
+            f"Backend must be VectorStorage:GraphStorage[:KVStorage], got {spec!r}"
+        )
+    backend = {"vector_storage": parts[0], "graph_storage": parts[1]}
+    if len(parts) == 3:
+        backend["kv_storage"] = parts[2]
+    return backend
+
+
+async def benchmark_backend(
+    backend: str,
+    chunks: int,
+    workload: list[dict[str, str]] | None = None,
+    queries: int = 200,
+    modes: list[str] = list(DEFAULT_MODES),
+    concurrency: int = 1,
+    warmup: int = 10,
+    top_k: int = 40,
+    chunk_top_k: int = 20,
+    enable_rerank: bool = True,
+    working_dir: str | None = None,
+    seed: int = 42,
+) -> dict[str, Any]:
+    """Build (or reuse) a corpus on one backend and replay the workload"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base_dir = working_dir or temp_dir
+        workspace = f"bench_{chunks}"
+        rag_dir = os.path.join(base_dir, backend.replace(":", "_"))
+        os.makedirs(rag_dir, exist_ok=True)
+        marker = os.path.join(rag_dir, f"{workspace}.corpus.json")
+
+        embedder = HashEmbedder()
+        rag = LightRAG(
+            working_dir=rag_dir,
+            workspace=workspace,
+            llm_model_func=fake_llm,
+            embedding_func=EmbeddingFunc(
+                embedding_dim=embedder.dim, max_token_size=8192, func=embedder
+            ),
+            tokenizer=Tokenizer("whitespace", WhitespaceTokenizer()),
+            rerank_model_func=fake_rerank,
+            # Bag-of-words hash vectors score lower than real embeddings, keep every hit
+            vector_db_storage_cls_kwargs={"cosine_better_than_threshold": 0.0},
+            enable_llm_cache=False,
+            embedding_batch_num=256,
+            **_parse_backend(backend),
+        )
+        await rag.initialize_storages()
+        try:
+            build_start = time.perf_counter()
+            corpus = None
+            if working_dir and os.path.exists(marker):
+                with open(marker, "r", encoding="utf-8") as f:
+                    corpus = json.load(f)
+                if corpus.get("seed") != seed:
+                    corpus = None
+            reused = corpus is not None
+            if corpus is None:
+                corpus = await build_corpus(rag, chunks, seed=seed)
+                corpus["seed"] = seed
+                if working_dir:
+                    await rag._insert_done()
+                    with open(marker, "w", encoding="utf-8") as f:
+                        json.dump(corpus, f)
+            build_seconds = time.perf_counter() - build_start
+
+            workload = workload or synthetic_workload(
+                queries, corpus["entities"], modes
+            )
+            semaphore = asyncio.Semaphore(max(1, concurrency))
+            samples: dict[str, list[dict[str, Any]]] = defaultdict(list)
+            failures = 0
+
+            async def run(item: dict[str, str], record: bool) -> None:
+                nonlocal failures
+                param = QueryParam(
+                    mode=item["mode"],
+                    top_k=top_k,
+                    chunk_top_k=chunk_top_k,
+                    enable_rerank=enable_rerank,
+                )
+                async with semaphore:
+                    sample = await timed_query(rag, item["query"], param)
+                if not record:
+                    return
+                if sample["status"] != "success":
+                    failures += 1
+                samples[item["mode"]].append(sample)
+
+            with instrument_stages(rag):
+                for item in workload[:warmup]:
+                    await run(item, record=False)
+                replay_start = time.perf_counter()
+                await asyncio.gather(*(run(item, record=True) for item in workload))
+                replay_seconds = time.perf_counter() - replay_start
+        finally:
+            await rag.finalize_storages()
+            finalize_share_data()
+
+    return {
+        "backend": backend,
+        "corpus": {key: corpus[key] for key in ("chunks", "entities", "relations")},
+        "corpus_reused": reused,
+        "build_seconds": round(build_seconds, 2),
+        "queries": len(workload),
+        "failures": failures,
+        "concurrency": concurrency,
+        "qps": round(len(workload) / replay_seconds, 1) if replay_seconds else None,
+        "modes": {
+            mode: {
+                "queries": len(mode_samples),
+                "total_ms": _percentiles([s["total"] for s in mode_samples]),
+                "stages_ms": {
+                    stage: _percentiles([s["stages"][stage] for s in mode_samples])
+                    for stage in STAGES
+                },
+            }
+            for mode, mode_samples in sorted(samples.items())
+        },
+    }
+
+
+async def run_benchmark(
+    sizes: list[int],
+    backends: list[str] = [DEFAULT_BACKEND],
+    **kwargs,
+) -> dict[str, Any]:
+    """Benchmark every backend at every corpus size"""
+    runs = []
+    for backend in backends:
+        for chunks in sizes:
+            runs.append(await benchmark_backend(backend, chunks, **kwargs))
+    return {"stages": list(STAGES), "runs": runs}
+
+
+def compare_reports(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    max_regression: float = 0.2,
+    min_delta_ms: float = 1.0,
+    percentile: str = "p95",
+) -> list[str]:
+    """List stage latencies that regressed against a baseline report.
+
+    A stage regresses when its percentile grows by more than ``max_regression``
+    (relative) and by more than ``min_delta_ms`` (absolute, to ignore noise).
+    """
+
+    def index(report):
+        return {
+            (run["backend"], run["corpus"]["chunks"], mode): stats
+            for run in report.get("runs", [])
+            for mode, stats in run["modes"].items()
+        }
+
+    regressions = []
+    old_runs = index(baseline)
+    for key, stats in index(current).items():
+        old = old_runs.get(key)
+        if old is None:
+            continue
+        pairs = [("total", old["total_ms"], stats["total_ms"])]
+        pairs += [
+            (stage, old["stages_ms"].get(stage), stats["stages_ms"].get(stage))
+            for stage in STAGES
+        ]
+        for stage, before, after in pairs:
+            if not before or not after:
+                continue
+            delta = after[percentile] - before[percentile]
+            if delta > min_delta_ms and after[percentile] > before[percentile] * (
+                1 + max_regression
+            ):
+                backend, chunks, mode = key
+                regressions.append(
+                    f"{backend} chunks={chunks} mode={mode} {stage} {percentile}: "
+                    f"{before[percentile]:.3f}ms -> {after[percentile]:.3f}ms"
+                )
+    return regressions
+
+
+def _format_table(report: dict[str, Any]) -> str:
+    lines = []
+    for run in report["runs"]:
+        corpus = run["corpus"]
+        lines.append(
+            f"\n{run['backend']}  chunks={corpus['chunks']} entities={corpus['entities']} "
+            f"relations={corpus['relations']}  build={run['build_seconds']}s  "
+            f"qps={run['qps']}  failures={run['failures']}"
+        )
+        lines.append(f"  {'mode':<8}{'stage':<17}{'p50':>10}{'p95':>10}{'p99':>10}")
+        for mode, stats in run["modes"].items():
+            rows = [("total", stats["total_ms"])] + list(stats["stages_ms"].items())
+            for stage, pct in rows:
+                lines.append(
+                    f"  {mode:<8}{stage:<17}{pct['p50']:>10.3f}{pct['p95']:>10.3f}{pct['p99']:>10.3f}"
+                )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Offline LightRAG retrieval benchmark with per-stage latency percentiles"
+    )
+    parser.add_argument(
+        "--sizes", default="10000", help="Comma separated corpus sizes in chunks"
+    )
+    parser.add_argument(
+        "--backends",
+        default=DEFAULT_BACKEND,
+        help="Comma separated VectorStorage:GraphStorage[:KVStorage] combinations",
+    )
+    parser.add_argument(
+        "--modes", default=",".join(DEFAULT_MODES), help="Comma separated query modes"
+    )
+    parser.add_argument("--queries", type=int, default=200, help="Synthetic queries")
+    parser.add_argument("--workload", help="JSONL file of queries to replay")
+    parser.add_argument("--concurrency", type=int, default=1, help="Queries in flight")
+    parser.add_argument("--warmup", type=int, default=10, help="Unrecorded queries")
+    parser.add_argument("--top-k", type=int, default=40)
+    parser.add_argument("--chunk-top-k", type=int, default=20)
+    parser.add_argument("--no-rerank", action="store_true", help="Disable reranking")
+    parser.add_argument(
+        "--working-dir",
+        help="Keep generated corpora here and reuse them in later runs",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Compare against this JSON report")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="Allowed relative p95 growth per stage before failing",
+    )
+    args = parser.parse_args()
+    logger.setLevel("WARNING")
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    report = asyncio.run(
+        run_benchmark(
+            sizes=[int(size) for size in args.sizes.split(",")],
+            backends=[b.strip() for b in args.backends.split(",") if b.strip()],
+            workload=load_workload(args.workload, modes) if args.workload else None,
+            queries=args.queries,
+            modes=modes,
+            concurrency=args.concurrency,
+            warmup=args.warmup,
+            top_k=args.top_k,
+            chunk_top_k=args.chunk_top_k,
+            enable_rerank=not args.no_rerank,
+            working_dir=args.working_dir,
+            seed=args.seed,
+        )
+    )
+    print(_format_table(report))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare_reports(
+                json.load(f), report, max_regression=args.max_regression
+            )
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nNo regressions against baseline")
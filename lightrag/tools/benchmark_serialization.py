@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Benchmark of API response serialization and compression.
+
+Synthetic payloads shaped like the largest API responses are built in memory:
+
+    graph          /graphs KnowledgeGraph (nodes with descriptions, edges)
+    query_data     /query/data result (entities, relations, chunks, references)
+    documents      /documents/paginated page of document statuses
+
+Each payload is encoded the way FastAPI does by default (``jsonable_encoder``
+followed by Starlette's ``json.dumps``) and with ``FastJSONResponse`` (orjson
+when installed). The encoded body is then compressed with gzip and, when the
+``brotli`` package is installed, brotli, to report the bytes on the wire and
+the time spent compressing.
+
+Usage:
+    python -m lightrag.tools.benchmark_serialization
+    python -m lightrag.tools.benchmark_serialization --nodes 5000 --chunks 200 --repeat 10
+"""
+
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+
+from lightrag.api import responses
+from lightrag.api.responses import compress_body, dumps_json
+from lightrag.types import KnowledgeGraph, KnowledgeGraphEdge, KnowledgeGraphNode
+
+WORDS = (
+    "graph retrieval entity relation chunk context vector embedding keyword "
+    "document storage pipeline summary index query answer source reference"
+).split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def build_graph(nodes: int, seed: int = 0) -> KnowledgeGraph:
+    """A KnowledgeGraph with ``nodes`` nodes and about two edges per node"""
+    rng = random.Random(seed)
+    graph_nodes = [
+        KnowledgeGraphNode(
+            id=f"Entity {i}",
+            labels=[f"Entity {i}"],
+            properties={
+                "entity_id": f"Entity {i}",
+                "entity_type": rng.choice(["person", "concept", "organization"]),
+                "description": _sentence(rng, 40),
+                "source_id": "<SEP>".join(
+                    f"chunk-{rng.randrange(10**6):06d}" for _ in range(4)
+                ),
+                "file_path": f"docs/file_{i % 50}.md",
+                "created_at": 1700000000 + i,
+            },
+        )
+        for i in range(nodes)
+    ]
+    graph_edges = []
+    for i in range(nodes * 2):
+        src, tgt = rng.randrange(nodes), rng.randrange(nodes)
+        graph_edges.append(
+            KnowledgeGraphEdge(
+                id=f"Entity {src}-Entity {tgt}-{i}",
+                type="DIRECTED",
+                source=f"Entity {src}",
+                target=f"Entity {tgt}",
+                properties={
+                    "description": _sentence(rng, 25),
+                    "keywords": ",".join(rng.sample(WORDS, 3)),
+                    "weight": round(rng.random() * 5, 3),
+                },
+            )
+        )
+    return KnowledgeGraph(nodes=graph_nodes, edges=graph_edges)
+
+
+def build_query_data(chunks: int, seed: int = 0) -> dict[str, Any]:
+    """A /query/data result with ``chunks`` chunks of about 1,200 tokens each"""
+    rng = random.Random(seed)
+    entities = [
+        {
+            "entity_name": f"Entity {i}",
+            "entity_type": "concept",
+            "description": _sentence(rng, 60),
+            "source_id": f"chunk-{i:06d}",
+            "file_path": f"docs/file_{i % 20}.md",
+            "reference_id": str(i % 20 + 1),
+        }
+        for i in range(chunks)
+    ]
+    relationships = [
+        {
+            "src_id": f"Entity {i}",
+            "tgt_id": f"Entity {(i + 1) % chunks}",
+            "description": _sentence(rng, 40),
+            "keywords": ",".join(rng.sample(WORDS, 3)),
+            "weight": round(rng.random() * 5, 3),
+            "file_path": f"docs/file_{i % 20}.md",
+            "reference_id": str(i % 20 + 1),
+        }
+        for i in range(chunks)
+    ]
+    text_chunks = [
+        {
+            "chunk_id": f"chunk-{i:06d}",
+            "content": " ".join(_sentence(rng, 12) for _ in range(80)),
+            "file_path": f"docs/file_{i % 20}.md",
+            "reference_id": str(i % 20 + 1),
+            "score": round(rng.random(), 4),
+        }
+        for i in range(chunks)
+    ]
+    return {
+        "status": "success",
+        "message": "Query executed successfully",
+        "data": {
+            "entities": entities,
+            "relationships": relationships,
+            "chunks": text_chunks,
+            "references": [
+                {"reference_id": str(i + 1), "file_path": f"docs/file_{i}.md"}
+                for i in range(20)
+            ],
+        },
+        "metadata": {
+            "query_mode": "mix",
+            "keywords": {"high_level": WORDS[:3], "low_level": WORDS[3:8]},
+            "processing_info": {"total_chunks_found": chunks},
+        },
+    }
+
+
+def build_documents(count: int, seed: int = 0) -> dict[str, Any]:
+    """A /documents/paginated page with ``count`` document statuses"""
+    rng = random.Random(seed)
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    documents = [
+        {
+            "id": f"doc-{i:08x}",
+            "content_summary": _sentence(rng, 30),
+            "content_length": rng.randrange(1000, 200000),
+            "status": rng.choice(["processed", "pending", "failed"]),
+            "created_at": base + timedelta(minutes=i),
+            "updated_at": base + timedelta(minutes=i, seconds=30),
+            "track_id": f"upload_{i // 10:06d}",
+            "chunks_count": rng.randrange(1, 200),
+            "error_msg": None,
+            "metadata": {"processing_start_time": 1700000000 + i},
+            "file_path": f"docs/file_{i}.pdf",
+        }
+        for i in range(count)
+    ]
+    return {
+        "documents": documents,
+        "pagination": {
+            "page": 1,
+            "page_size": count,
+            "total_count": count * 10,
+            "total_pages": 10,
+            "has_next": True,
+            "has_prev": False,
+        },
+        "status_counts": {"processed": count * 8, "pending": count, "failed": count},
+    }
+
+
+def _stdlib_body(payload: Any) -> bytes:
+    # Starlette JSONResponse.render after FastAPI's jsonable_encoder
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _time_ms(func: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    timings, result = [], None
+    for _ in range(repeat):
+        began = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - began) * 1000)
+    return round(statistics.median(timings), 3), result
+
+
+def benchmark_payload(payload: Any, repeat: int = 5) -> dict[str, Any]:
+    """Serialization time and encoded sizes of one payload"""
+    stdlib_ms, stdlib_body = _time_ms(lambda: _stdlib_body(payload), repeat)
+    fast_ms, fast_body = _time_ms(lambda: dumps_json(payload), repeat)
+
+    encodings = ["gzip"] + (["br"] if responses.brotli is not None else [])
+    wire = {"identity": {"bytes": len(fast_body), "ms": 0.0}}
+    for encoding in encodings:
+        ms, compressed = _time_ms(
+            lambda encoding=encoding: compress_body(fast_body, encoding), repeat
+        )
+        wire[encoding] = {
+            "bytes": len(compressed),
+            "ratio": round(len(compressed) / len(fast_body), 3),
+            "ms": ms,
+        }
+
+    return {
+        "serializer": "orjson" if responses.orjson is not None else "json",
+        "serialize_ms": {
+            "jsonable_encoder+json": stdlib_ms,
+            "fast_json": fast_ms,
+            "speedup": round(stdlib_ms / fast_ms, 2) if fast_ms else None,
+        },
+        "body_bytes": {"stdlib": len(stdlib_body), "fast_json": len(fast_body)},
+        "wire": wire,
+    }
+
+
+def run_benchmark(
+    nodes: int = 1000, chunks: int = 60, documents: int = 200, repeat: int = 5
+) -> dict[str, Any]:
+    return {
+        "graph": benchmark_payload(build_graph(nodes), repeat),
+        "query_data": benchmark_payload(build_query_data(chunks), repeat),
+        "documents": benchmark_payload(build_documents(documents), repeat),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark API response serialization and compression"
+    )
+    parser.add_argument("--nodes", type=int, default=1000, help="Graph nodes")
+    parser.add_argument(
+        "--chunks", type=int, default=60, help="Chunks in the query_data payload"
+    )
+    parser.add_argument(
+        "--documents", type=int, default=200, help="Documents in the page"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+    args = parser.parse_args()
+
+    summary = run_benchmark(
+        nodes=args.nodes,
+        chunks=args.chunks,
+        documents=args.documents,
+        repeat=args.repeat,
+    )
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,174 @@
+"""
+Lightweight span recorder for the query path.
+
+A ``QueryTrace`` is bound to the running query through a context variable, so
+timings are collected across ``kg_query``/``naive_query`` and the helpers they
+call without threading a tracer through every signature. Code marks a stage
+with ``trace_span("name")``; when no trace is active this returns a shared
+no-op context manager, so disabled tracing costs one context variable lookup.
+
+The recorded spans are returned as the ``timings`` section of the query
+metadata and can optionally be exported to OpenTelemetry.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+# lightrag.utils records queue waits here, so this module must not import it
+logger = logging.getLogger("lightrag")
+
+_current_trace: ContextVar["QueryTrace | None"] = ContextVar(
+    "lightrag_query_trace", default=None
+)
+# Index of the innermost open span of the current task, -1 for the root
+_current_span: ContextVar[int] = ContextVar("lightrag_query_span", default=-1)
+
+_NULL_SPAN = nullcontext()
+
+
+class QueryTrace:
+    """Spans recorded for one query"""
+
+    __slots__ = ("name", "attributes", "spans", "_start", "_wall_start_ns")
+
+    def __init__(self, name: str = "query", attributes: dict[str, Any] | None = None):
+        self.name = name
+        self.attributes = attributes or {}
+        # (name, parent index, start, end, attributes); times from perf_counter
+        self.spans: list[list[Any]] = []
+        self._start = time.perf_counter()
+        self._wall_start_ns = time.time_ns()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[None]:
+        index = len(self.spans)
+        self.spans.append(
+            [name, _current_span.get(), time.perf_counter(), None, attributes]
+        )
+        token = _current_span.set(index)
+        try:
+            yield
+        finally:
+            _current_span.reset(token)
+            self.spans[index][3] = time.perf_counter()
+
+    def record(self, name: str, start: float, end: float, **attributes: Any) -> None:
+        """Add a span measured elsewhere (``perf_counter`` start and end)"""
+        self.spans.append([name, _current_span.get(), start, end, attributes])
+
+    def timings(self) -> dict[str, Any]:
+        """Summary for query metadata: total, time per stage name and the spans"""
+        now = time.perf_counter()
+        stages: dict[str, float] = {}
+        spans = []
+        for name, parent, start, end, attributes in self.spans:
+            duration = ((end or now) - start) * 1000
+            stages[name] = stages.get(name, 0.0) + duration
+            span = {
+                "name": name,
+                "parent": self.spans[parent][0] if parent >= 0 else None,
+                "start_ms": round((start - self._start) * 1000, 3),
+                "duration_ms": round(duration, 3),
+            }
+            if attributes:
+                span["attributes"] = attributes
+            spans.append(span)
+        return {
+            "total_ms": round((now - self._start) * 1000, 3),
+            "stages": {name: round(ms, 3) for name, ms in stages.items()},
+            "spans": spans,
+        }
+
+    def export_otel(self) -> None:
+        """Export the spans to OpenTelemetry, if it is installed and configured"""
+        try:
+            from opentelemetry import trace as otel_trace
+        except ImportError:
+            logger.debug("OpenTelemetry is not installed, query trace not exported")
+            return
+
+        tracer = otel_trace.get_tracer("lightrag")
+        end = time.perf_counter()
+
+        def to_ns(moment: float) -> int:
+            return self._wall_start_ns + int((moment - self._start) * 1e9)
+
+        root = tracer.start_span(
+            f"lightrag.{self.name}",
+            start_time=self._wall_start_ns,
+            attributes=_otel_attributes(self.attributes),
+        )
+        otel_spans = []
+        for name, parent, start, span_end, attributes in self.spans:
+            parent_span = otel_spans[parent] if parent >= 0 else root
+            otel_span = tracer.start_span(
+                f"lightrag.{name}",
+                context=otel_trace.set_span_in_context(parent_span),
+                start_time=to_ns(start),
+                attributes=_otel_attributes(attributes),
+            )
+            otel_spans.append(otel_span)
+        for otel_span, (_, _, _, span_end, _) in zip(otel_spans, self.spans):
+            otel_span.end(end_time=to_ns(span_end or end))
+        root.end(end_time=to_ns(end))
+
+
+def _otel_attributes(attributes: dict[str, Any]) -> dict[str, Any]:
+    return {
+        key: value if isinstance(value, (str, bool, int, float)) else str(value)
+        for key, value in attributes.items()
+    }
+
+
+def current_trace() -> QueryTrace | None:
+    """The trace of the running query, if tracing is enabled"""
+    return _current_trace.get()
+
+
+def trace_span(name: str, **attributes: Any):
+    """Context manager timing a stage of the current query; no-op without a trace"""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NULL_SPAN
+    return trace.span(name, **attributes)
+
+
+@contextmanager
+def query_trace(
+    enabled: bool, name: str = "query", **attributes: Any
+) -> Iterator[QueryTrace | None]:
+    """Bind a new trace to the current query, or nothing when disabled"""
+    if not enabled:
+        yield None
+        return
+    trace = QueryTrace(name, attributes)
+    token = _current_trace.set(trace)
+    span_token = _current_span.set(-1)
+    try:
+        yield trace
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(token)
+
+
+def attach_timings(
+    result: dict[str, Any] | None, trace: QueryTrace | None, export_otel: bool = False
+) -> None:
+    """Store the trace summary as ``metadata.timings`` of a query result"""
+    if trace is None:
+        return
+    if export_otel:
+        try:
+            trace.export_otel()
+        except Exception as e:
+            logger.warning(f"Failed to export query trace to OpenTelemetry: {e}")
+    if result is not None:
+        metadata = result.get("metadata")
+        if not isinstance(metadata, dict):
+            metadata = result["metadata"] = {}
+        metadata["timings"] = trace.timings()
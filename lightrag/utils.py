@@ -2,6 +2,7 @@ from __future__ import annotations
 import weakref
 
 import sys
+from array import array
 
 import asyncio
 import html
@@ -15,8 +16,9 @@ import time
 import uuid
 from dataclasses import dataclass
 from datetime import datetime
-from functools import wraps
-from hashlib import md5
+from functools import lru_cache, update_wrapper, wraps
+from collections import OrderedDict
+from hashlib import blake2b, md5
 from typing import (
     Any,
     Protocol,
@@ -38,9 +40,17 @@ from lightrag.constants import (
     GRAPH_FIELD_SEP,
     DEFAULT_MAX_TOTAL_TOKENS,
     DEFAULT_SOURCE_IDS_LIMIT_METHOD,
+    DEFAULT_TOKEN_COUNT_CACHE_SIZE,
+    DEFAULT_RERANK_CACHE_SIZE,
+    DEFAULT_RERANK_CACHE_TTL,
+    DEFAULT_GLEANING_SKIP_MIN_TOKENS,
+    DEFAULT_GLEANING_MIN_YIELD,
     VALID_SOURCE_IDS_LIMIT_METHODS,
     SOURCE_IDS_LIMIT_METHOD_FIFO,
 )
+from lightrag.tracing import current_trace, trace_span
+from lightrag.profiling import profile_stage
+from lightrag import metrics
 
 # Precompile regex pattern for JSON sanitization (module-level, compiled once)
 _SURROGATE_PATTERN = re.compile(r"[\uD800-\uDFFF\uFFFE\uFFFF]")
@@ -473,6 +483,92 @@ class EmbeddingFunc:
         return result
 
 
+class EmbeddingMicroBatcher:
+    """Coalesce concurrent embedding calls into batched provider requests.
+
+    Calls arriving within ``max_wait_ms`` of each other are concatenated (up to
+    ``max_batch_size`` texts) into one call of ``func``; the resulting vectors
+    are split back to each caller in order. Calls that are already large
+    enough are passed straight through.
+    """
+
+    def __init__(self, func: Callable, max_batch_size: int, max_wait_ms: float):
+        self.func = func
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._groups: dict[tuple, dict[str, Any]] = {}
+        # Strong references to in-flight batches; the loop only keeps weak ones
+        self._tasks: set[asyncio.Task] = set()
+        # Keep the wrapped signature visible to inspect.signature()
+        update_wrapper(self, func)
+
+    async def __call__(self, texts: list[str], **kwargs) -> np.ndarray:
+        if self.max_wait <= 0 or len(texts) >= self.max_batch_size:
+            return await self.func(texts, **kwargs)
+        try:
+            loop = asyncio.get_running_loop()
+            key = (id(loop), tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError:
+            # Unhashable keyword arguments cannot be grouped
+            return await self.func(texts, **kwargs)
+
+        future = loop.create_future()
+        group = self._groups.get(key)
+        if group is not None and group["size"] + len(texts) > self.max_batch_size:
+            # Never let a provider call exceed the configured batch size
+            self._flush(key)
+            group = None
+        if group is None:
+            group = self._groups[key] = {
+                "kwargs": kwargs,
+                "requests": [],
+                "size": 0,
+                "timer": loop.call_later(self.max_wait, self._flush, key),
+            }
+        group["requests"].append((list(texts), future))
+        group["size"] += len(texts)
+        if group["size"] >= self.max_batch_size:
+            self._flush(key)
+        return await future
+
+    def _flush(self, key: tuple) -> None:
+        group = self._groups.pop(key, None)
+        if group is None:
+            return
+        group["timer"].cancel()
+        task = asyncio.ensure_future(self._run(group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, group: dict[str, Any]) -> None:
+        requests = group["requests"]
+        texts = [text for request_texts, _ in requests for text in request_texts]
+        try:
+            embeddings = np.asarray(await self.func(texts, **group["kwargs"]))
+            if len(embeddings) != len(texts):
+                raise ValueError(
+                    f"Embedding batch returned {len(embeddings)} vectors for {len(texts)} texts"
+                )
+        except BaseException as e:
+            for _, future in requests:
+                if not future.done():
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        if len(requests) > 1:
+            logger.debug(
+                f"Embedding micro-batch: {len(requests)} calls, {len(texts)} texts"
+            )
+        offset = 0
+        for request_texts, future in requests:
+            end = offset + len(request_texts)
+            if not future.done():
+                future.set_result(embeddings[offset:end])
+            offset = end
+
+
 def compute_args_hash(*args: Any) -> str:
     """Compute a hash for the given arguments with safe Unicode handling.
 
@@ -620,6 +716,7 @@ def priority_limit_async_func_call(
         task_states_lock = asyncio.Lock()
         active_futures = weakref.WeakSet()
         reinit_count = 0
+        queue_labels = metrics.label_key(queue=queue_name)
 
         async def worker():
             """Enhanced worker that processes tasks with proper timeout and state management"""
@@ -637,6 +734,7 @@ def priority_limit_async_func_call(
                             ) = await asyncio.wait_for(queue.get(), timeout=1.0)
                         except asyncio.TimeoutError:
                             continue
+                        metrics.registry.inc("lightrag_queue_depth", -1, queue_labels)
 
                         # Get task state and mark worker as started
                         async with task_states_lock:
@@ -660,6 +758,14 @@ def priority_limit_async_func_call(
                             queue.task_done()
                             continue
 
+                        metrics.registry.observe(
+                            "lightrag_queue_wait_seconds",
+                            task_state.execution_start_time - task_state.start_time,
+                            queue_labels,
+                        )
+                        metrics.registry.inc(
+                            "lightrag_queue_in_flight", 1, queue_labels
+                        )
                         try:
                             # Execute function with timeout protection
                             if max_execution_timeout is not None:
@@ -699,6 +805,9 @@ def priority_limit_async_func_call(
                             if not task_state.future.done():
                                 task_state.future.set_exception(e)
                         finally:
+                            metrics.registry.inc(
+                                "lightrag_queue_in_flight", -1, queue_labels
+                            )
                             # Clean up task state
                             async with task_states_lock:
                                 task_states.pop(task_id, None)
@@ -944,6 +1053,7 @@ def priority_limit_async_func_call(
                         await queue.put(
                             (_priority, current_count, task_id, args, kwargs)
                         )
+                    metrics.registry.inc("lightrag_queue_depth", 1, queue_labels)
                 except asyncio.TimeoutError:
                     raise QueueFullError(
                         f"{queue_name}: Queue full, timeout after {_queue_timeout} seconds"
@@ -995,6 +1105,15 @@ def priority_limit_async_func_call(
                 active_futures.discard(future)
                 async with task_states_lock:
                     task_states.pop(task_id, None)
+                trace = current_trace()
+                if trace is not None and task_state.execution_start_time is not None:
+                    # Queue times use the loop clock, spans use perf_counter
+                    offset = time.perf_counter() - asyncio.get_event_loop().time()
+                    trace.record(
+                        f"{queue_name} wait",
+                        task_state.start_time + offset,
+                        task_state.execution_start_time + offset,
+                    )
 
         # Add shutdown method to decorated function
         wait_func.shutdown = shutdown
@@ -1172,6 +1291,7 @@ class SanitizingJSONEncoder(json.JSONEncoder):
             return obj
 
 
+@profile_stage("json_write")
 def write_json(json_obj, file_name):
     """
     Write JSON data to file with optimized sanitization strategy.
@@ -1263,6 +1383,37 @@ class Tokenizer:
         """
         return self.tokenizer.decode(tokens)
 
+    def count_tokens(self, content: str) -> int:
+        """
+        Returns the number of tokens in a string, memoized in a bounded LRU.
+
+        Counts are keyed by a hash of the content, so repeated context pieces
+        (entity/relation lines, chunk contents, prompt templates) are encoded
+        only once across queries.
+
+        Args:
+            content: The string to count tokens for.
+
+        Returns:
+            The number of tokens.
+        """
+        if not content:
+            return 0
+        # Created lazily so subclasses that skip __init__ still work
+        cache = self.__dict__.get("_token_counts")
+        if cache is None:
+            cache = self._token_counts = OrderedDict()
+        key = blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        count = cache.get(key)
+        if count is not None:
+            cache.move_to_end(key)
+            return count
+        count = len(self.encode(content))
+        cache[key] = count
+        if len(cache) > DEFAULT_TOKEN_COUNT_CACHE_SIZE:
+            cache.popitem(last=False)
+        return count
+
 
 class TiktokenTokenizer(Tokenizer):
     """
@@ -1314,23 +1465,71 @@ def is_float_regex(value: str) -> bool:
     return bool(re.match(r"^[-+]?[0-9]*\.?[0-9]+$", value))
 
 
+def count_tokens(tokenizer: Tokenizer, content: str) -> int:
+    """Count tokens of a string, using the tokenizer's memoized counter when available"""
+    if isinstance(tokenizer, Tokenizer):
+        return tokenizer.count_tokens(content)
+    return len(tokenizer.encode(content))
+
+
+def chunk_token_count(chunk: dict[str, Any], tokenizer: Tokenizer) -> int:
+    """Token count of a chunk's JSON line in the context.
+
+    The content part reuses the ``tokens`` count stored at chunking time when
+    the chunk carries it, otherwise the memoized count of the content. Only the
+    small remaining fields (file path, ids, scores) are encoded per query.
+    """
+    content = chunk.get("content") or ""
+    stored_tokens = chunk.get("tokens")
+    if isinstance(stored_tokens, int) and stored_tokens >= 0:
+        content_tokens = stored_tokens
+    else:
+        content_tokens = count_tokens(tokenizer, content)
+    metadata = {k: v for k, v in chunk.items() if k not in ("content", "tokens")}
+    return content_tokens + count_tokens(
+        tokenizer, json.dumps(metadata, ensure_ascii=False)
+    )
+
+
 def truncate_list_by_token_size(
     list_data: list[Any],
     key: Callable[[Any], str],
     max_token_size: int,
     tokenizer: Tokenizer,
+    token_count: Callable[[Any], int] | None = None,
 ) -> list[int]:
-    """Truncate a list of data by token size"""
+    """Truncate a list of data by token size
+
+    Keeps the longest prefix whose running token sum fits ``max_token_size``.
+    Item sizes come from ``token_count`` when given (e.g. precomputed counts),
+    otherwise from the memoized token count of ``key(item)``.
+    """
     if max_token_size <= 0:
         return []
     tokens = 0
     for i, data in enumerate(list_data):
-        tokens += len(tokenizer.encode(key(data)))
+        if token_count is not None:
+            tokens += token_count(data)
+        else:
+            tokens += count_tokens(tokenizer, key(data))
         if tokens > max_token_size:
             return list_data[:i]
     return list_data
 
 
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[str]:
+    """Fuse several ranked id lists into one using reciprocal rank fusion
+
+    Each id scores ``sum(1 / (k + rank))`` over the lists it appears in; ties
+    keep the order of first appearance.
+    """
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda item_id: -scores[item_id])
+
+
 def cosine_similarity(v1, v2):
     """Calculate cosine similarity between two vectors"""
     dot_product = np.dot(v1, v2)
@@ -1366,11 +1565,21 @@ async def handle_cache(
     cache_entry = await hashing_kv.get_by_id(flattened_key)
     if cache_entry:
         logger.debug(f"Flattened cache hit(key:{flattened_key})")
+        metrics.registry.inc(
+            "lightrag_llm_cache_requests_total",
+            1,
+            metrics.label_key(cache_type=cache_type, result="hit"),
+        )
         content = cache_entry["return"]
         timestamp = cache_entry.get("create_time", 0)
         return content, timestamp
 
     logger.debug(f"Cache missed(mode:{mode} type:{cache_type})")
+    metrics.registry.inc(
+        "lightrag_llm_cache_requests_total",
+        1,
+        metrics.label_key(cache_type=cache_type, result="miss"),
+    )
     return None
 
 
@@ -1431,6 +1640,11 @@ async def save_to_cache(hashing_kv, cache_data: CacheData):
 
     # Save using flattened key
     await hashing_kv.upsert({flattened_key: cache_entry})
+    metrics.registry.inc(
+        "lightrag_llm_cache_writes_total",
+        1,
+        metrics.label_key(cache_type=cache_data.cache_type),
+    )
 
 
 def safe_unicode_decode(content):
@@ -1900,6 +2114,49 @@ def remove_think_tags(text: str) -> str:
     ).strip()
 
 
+class CachedPrompt(str):
+    """Prompt text whose leading ``static_prefix`` is identical across calls
+
+    It behaves as a plain ``str`` everywhere (hashing, caching, logging). LLM
+    bindings that support provider-side prompt caching read ``static_prefix`` to
+    place a cache breakpoint after it, see ``split_cached_prompt``.
+    """
+
+    static_prefix: str
+
+    def __new__(cls, static_prefix: str, dynamic_suffix: str = ""):
+        prompt = super().__new__(cls, static_prefix + dynamic_suffix)
+        prompt.static_prefix = static_prefix
+        return prompt
+
+
+def split_cached_prompt(prompt: str) -> tuple[str, str]:
+    """Split a prompt into (static prefix, dynamic suffix)
+
+    The prefix is empty unless the prompt is a ``CachedPrompt``.
+    """
+    prefix = getattr(prompt, "static_prefix", "")
+    text = str(prompt)
+    return prefix, text[len(prefix) :]
+
+
+@lru_cache(maxsize=32)
+def _sanitize_static_prefix(prefix: str) -> str:
+    # Static prefixes repeat for every chunk, so sanitize each one only once
+    return sanitize_text_for_encoding(prefix)
+
+
+def _sanitize_prompt(prompt: str) -> str:
+    """sanitize_text_for_encoding that keeps the static prefix of a CachedPrompt"""
+    safe_prompt = sanitize_text_for_encoding(prompt)
+    prefix = getattr(prompt, "static_prefix", "")
+    if prefix and safe_prompt:
+        safe_prefix = _sanitize_static_prefix(prefix)
+        if safe_prompt.startswith(safe_prefix):
+            return CachedPrompt(safe_prefix, safe_prompt[len(safe_prefix) :])
+    return safe_prompt
+
+
 async def use_llm_func_with_cache(
     user_prompt: str,
     use_llm_func: callable,
@@ -1936,9 +2193,7 @@ async def use_llm_func_with_cache(
     """
     # Sanitize input text to prevent UTF-8 encoding errors for all LLM providers
     safe_user_prompt = sanitize_text_for_encoding(user_prompt)
-    safe_system_prompt = (
-        sanitize_text_for_encoding(system_prompt) if system_prompt else None
-    )
+    safe_system_prompt = _sanitize_prompt(system_prompt) if system_prompt else None
 
     # Sanitize history messages if provided
     safe_history_messages = None
@@ -2542,16 +2797,22 @@ class TokenTracker:
         self.prompt_tokens = 0
         self.completion_tokens = 0
         self.total_tokens = 0
+        self.cached_tokens = 0
+        self.cache_write_tokens = 0
         self.call_count = 0
 
     def add_usage(self, token_counts):
         """Add token usage from one LLM call.
 
         Args:
-            token_counts: A dictionary containing prompt_tokens, completion_tokens, total_tokens
+            token_counts: A dictionary containing prompt_tokens, completion_tokens, total_tokens,
+                and optionally cached_tokens (prompt tokens read from the provider's prompt
+                cache) and cache_write_tokens (prompt tokens written to it)
         """
         self.prompt_tokens += token_counts.get("prompt_tokens", 0)
         self.completion_tokens += token_counts.get("completion_tokens", 0)
+        self.cached_tokens += token_counts.get("cached_tokens", 0) or 0
+        self.cache_write_tokens += token_counts.get("cache_write_tokens", 0) or 0
 
         # If total_tokens is provided, use it directly; otherwise calculate the sum
         if "total_tokens" in token_counts:
@@ -2569,6 +2830,8 @@ class TokenTracker:
             "prompt_tokens": self.prompt_tokens,
             "completion_tokens": self.completion_tokens,
             "total_tokens": self.total_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
             "call_count": self.call_count,
         }
 
@@ -2577,11 +2840,168 @@ class TokenTracker:
         return (
             f"LLM call count: {usage['call_count']}, "
             f"Prompt tokens: {usage['prompt_tokens']}, "
+            f"Cached prompt tokens: {usage['cached_tokens']}, "
             f"Completion tokens: {usage['completion_tokens']}, "
             f"Total tokens: {usage['total_tokens']}"
         )
 
 
+class GleaningPolicy:
+    """Decides per chunk whether the gleaning round is worth an extra LLM call.
+
+    Gleaning always runs when the first pass was not terminated by the
+    completion delimiter (the output was likely cut short). For terminated
+    results it is skipped on short chunks, on chunks where the first pass found
+    almost nothing (boilerplate), and once the observed gleaning yield of the
+    workspace has dropped below ``min_yield``. While skipping for low yield,
+    every ``explore_every``-th chunk is still gleaned to keep the yield estimate
+    current.
+    """
+
+    def __init__(
+        self,
+        min_tokens: int = DEFAULT_GLEANING_SKIP_MIN_TOKENS,
+        min_yield: float = DEFAULT_GLEANING_MIN_YIELD,
+        min_entity_density: float = 1.0,
+        warmup: int = 20,
+        explore_every: int = 10,
+        alpha: float = 0.1,
+    ):
+        self.min_tokens = min_tokens
+        self.min_yield = min_yield
+        self.min_entity_density = min_entity_density  # entities per 1k tokens
+        self.warmup = warmup
+        self.explore_every = max(1, explore_every)
+        self.alpha = alpha
+        self.observations = 0
+        self.yield_ema: float | None = None
+        self._low_yield_chunks = 0
+
+    def should_glean(
+        self, *, terminated: bool, chunk_tokens: int, entities: int, relations: int
+    ) -> tuple[bool, str]:
+        """Return (glean, reason) for a chunk after its first extraction pass"""
+        if not terminated:
+            return True, "unterminated"
+        if chunk_tokens and chunk_tokens < self.min_tokens:
+            return False, "short_chunk"
+        if chunk_tokens and entities * 1000 / chunk_tokens < self.min_entity_density:
+            return False, "sparse"
+        if (
+            self.observations >= self.warmup
+            and self.yield_ema is not None
+            and self.yield_ema < self.min_yield
+        ):
+            self._low_yield_chunks += 1
+            if self._low_yield_chunks % self.explore_every:
+                return False, "low_yield"
+            return True, "explore"
+        return True, "default"
+
+    def record_yield(self, first_pass_items: int, added_items: int) -> None:
+        """Record how many new entities/relations a gleaning round added"""
+        value = added_items / max(first_pass_items, 1)
+        if self.yield_ema is None:
+            self.yield_ema = value
+        else:
+            self.yield_ema += self.alpha * (value - self.yield_ema)
+        self.observations += 1
+
+
+# One gleaning policy (and its yield history) per (working_dir, workspace)
+_gleaning_policies: dict[tuple[str, str], GleaningPolicy] = {}
+
+
+def get_gleaning_policy(global_config: dict) -> GleaningPolicy | None:
+    """Return the gleaning policy for the instance described by global_config"""
+    if not global_config.get("enable_gleaning_skip", False):
+        return None
+    key = (global_config.get("working_dir", ""), global_config.get("workspace", ""))
+    min_tokens = global_config.get(
+        "gleaning_skip_min_tokens", DEFAULT_GLEANING_SKIP_MIN_TOKENS
+    )
+    min_yield = global_config.get("gleaning_min_yield", DEFAULT_GLEANING_MIN_YIELD)
+    policy = _gleaning_policies.get(key)
+    if policy is None:
+        policy = _gleaning_policies[key] = GleaningPolicy(min_tokens, min_yield)
+    else:
+        policy.min_tokens, policy.min_yield = min_tokens, min_yield
+    return policy
+
+
+class RerankScoreCache:
+    """LRU cache of rerank scores keyed by (query, chunk) with a TTL.
+
+    Scores are dropped when the corpus version is bumped, i.e. after documents
+    are inserted or deleted.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.corpus_version = 0
+        self._scores: OrderedDict[tuple[str, str], tuple[float, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def get(self, query: str, doc_key: str) -> float | None:
+        key = (query, doc_key)
+        entry = self._scores.get(key)
+        if entry is None:
+            return None
+        score, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._scores[key]
+            return None
+        self._scores.move_to_end(key)
+        return score
+
+    def put(self, query: str, doc_key: str, score: float) -> None:
+        key = (query, doc_key)
+        self._scores[key] = (score, time.monotonic() + self.ttl)
+        self._scores.move_to_end(key)
+        while len(self._scores) > self.max_size:
+            self._scores.popitem(last=False)
+
+    def bump_corpus_version(self) -> None:
+        self.corpus_version += 1
+        self._scores.clear()
+
+
+# One rerank score cache per (working_dir, workspace)
+_rerank_caches: dict[tuple[str, str], RerankScoreCache] = {}
+
+
+def get_rerank_cache(global_config: dict) -> RerankScoreCache | None:
+    """Return the rerank score cache for the instance described by global_config"""
+    ttl = global_config.get("rerank_cache_ttl", DEFAULT_RERANK_CACHE_TTL)
+    max_size = global_config.get("rerank_cache_size", DEFAULT_RERANK_CACHE_SIZE)
+    if not ttl or ttl <= 0 or max_size <= 0:
+        return None
+    key = (global_config.get("working_dir", ""), global_config.get("workspace", ""))
+    cache = _rerank_caches.get(key)
+    if cache is None:
+        cache = _rerank_caches[key] = RerankScoreCache(max_size, ttl)
+    else:
+        cache.max_size, cache.ttl = max_size, ttl
+    return cache
+
+
+def invalidate_rerank_cache(working_dir: str, workspace: str) -> None:
+    """Drop cached rerank scores after the corpus of a workspace changed"""
+    cache = _rerank_caches.get((working_dir, workspace))
+    if cache is not None:
+        cache.bump_corpus_version()
+
+
+def _rerank_doc_key(doc: dict, content: str) -> str:
+    chunk_id = doc.get("chunk_id") or doc.get("id")
+    if chunk_id:
+        return str(chunk_id)
+    return blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
 async def apply_rerank_if_enabled(
     query: str,
     retrieved_docs: list[dict],
@@ -2592,6 +3012,10 @@ async def apply_rerank_if_enabled(
     """
     Apply reranking to retrieved documents if rerank is enabled.
 
+    Vector hits scoring below ``rerank_min_vector_score`` are dropped first.
+    Scores already cached for (query, chunk) are reused, so only unseen
+    candidates are sent to the rerank model.
+
     Args:
         query: The search query
         retrieved_docs: List of retrieved documents
@@ -2613,9 +3037,25 @@ async def apply_rerank_if_enabled(
         return retrieved_docs
 
     try:
+        # Pre-filter weak vector hits; chunks without a vector score are kept
+        candidates = retrieved_docs
+        min_vector_score = global_config.get("rerank_min_vector_score", 0.0)
+        if min_vector_score > 0.0:
+            candidates = [
+                doc
+                for doc in retrieved_docs
+                if doc.get("score") is None or doc["score"] >= min_vector_score
+            ]
+            if not candidates:
+                candidates = retrieved_docs
+            elif len(candidates) < len(retrieved_docs):
+                logger.debug(
+                    f"Rerank pre-filter: dropped {len(retrieved_docs) - len(candidates)} chunks below vector score {min_vector_score}"
+                )
+
         # Extract document content for reranking
         document_texts = []
-        for doc in retrieved_docs:
+        for doc in candidates:
             # Try multiple possible content fields
             content = (
                 doc.get("content")
@@ -2626,40 +3066,61 @@ async def apply_rerank_if_enabled(
             )
             document_texts.append(content)
 
-        # Call the new rerank function that returns index-based results
-        rerank_results = await rerank_func(
-            query=query,
-            documents=document_texts,
-            top_n=top_n,
-        )
-
-        # Process rerank results based on return format
-        if rerank_results and len(rerank_results) > 0:
-            # Check if results are in the new index-based format
-            if isinstance(rerank_results[0], dict) and "index" in rerank_results[0]:
-                # New format: [{"index": 0, "relevance_score": 0.85}, ...]
-                reranked_docs = []
-                for result in rerank_results:
-                    index = result["index"]
-                    relevance_score = result["relevance_score"]
-
-                    # Get original document and add rerank score
-                    if 0 <= index < len(retrieved_docs):
-                        doc = retrieved_docs[index].copy()
-                        doc["rerank_score"] = relevance_score
-                        reranked_docs.append(doc)
-
-                logger.info(
-                    f"Successfully reranked: {len(reranked_docs)} chunks from {len(retrieved_docs)} original chunks"
-                )
-                return reranked_docs
-            else:
+        cache = get_rerank_cache(global_config)
+        scores: list[float | None] = [None] * len(candidates)
+        doc_keys: list[str] = []
+        if cache is not None:
+            doc_keys = [
+                _rerank_doc_key(doc, text)
+                for doc, text in zip(candidates, document_texts)
+            ]
+            scores = [cache.get(query, doc_key) for doc_key in doc_keys]
+        pending = [i for i, score in enumerate(scores) if score is None]
+
+        if pending:
+            # Call the new rerank function that returns index-based results.
+            # With a cache, every new candidate is scored so it can be reused.
+            rerank_results = await rerank_func(
+                query=query,
+                documents=[document_texts[i] for i in pending],
+                top_n=None if cache is not None else top_n,
+            )
+            if rerank_results and not (
+                isinstance(rerank_results[0], dict) and "index" in rerank_results[0]
+            ):
                 # Legacy format: assume it's already reranked documents
                 logger.info(f"Using legacy rerank format: {len(rerank_results)} chunks")
                 return rerank_results[:top_n] if top_n else rerank_results
-        else:
+            # New format: [{"index": 0, "relevance_score": 0.85}, ...]
+            for result in rerank_results or []:
+                index = result["index"]
+                if 0 <= index < len(pending):
+                    position = pending[index]
+                    scores[position] = result["relevance_score"]
+                    if cache is not None:
+                        cache.put(query, doc_keys[position], scores[position])
+
+        ranked = sorted(
+            (i for i, score in enumerate(scores) if score is not None),
+            key=lambda i: -scores[i],
+        )
+        if not ranked:
             logger.warning("Rerank returned empty results, using original chunks")
             return retrieved_docs
+        if top_n:
+            ranked = ranked[:top_n]
+
+        reranked_docs = []
+        for i in ranked:
+            # Get original document and add rerank score
+            doc = candidates[i].copy()
+            doc["rerank_score"] = scores[i]
+            reranked_docs.append(doc)
+
+        logger.info(
+            f"Successfully reranked: {len(reranked_docs)} chunks from {len(retrieved_docs)} original chunks ({len(candidates) - len(pending)} cached)"
+        )
+        return reranked_docs
 
     except Exception as e:
         logger.error(f"Error during reranking: {e}, using original chunks")
@@ -2696,13 +3157,14 @@ async def process_chunks_unified(
     # 1. Apply reranking if enabled and query is provided
     if query_param.enable_rerank and query and unique_chunks:
         rerank_top_k = query_param.chunk_top_k or len(unique_chunks)
-        unique_chunks = await apply_rerank_if_enabled(
-            query=query,
-            retrieved_docs=unique_chunks,
-            global_config=global_config,
-            enable_rerank=query_param.enable_rerank,
-            top_n=rerank_top_k,
-        )
+        with trace_span("rerank"):
+            unique_chunks = await apply_rerank_if_enabled(
+                query=query,
+                retrieved_docs=unique_chunks,
+                global_config=global_config,
+                enable_rerank=query_param.enable_rerank,
+                top_n=rerank_top_k,
+            )
 
     # 2. Filter by minimum rerank score if reranking is enabled
     if query_param.enable_rerank and unique_chunks:
@@ -2758,6 +3220,7 @@ async def process_chunks_unified(
             ),
             max_token_size=chunk_token_limit,
             tokenizer=tokenizer,
+            token_count=lambda x: chunk_token_count(x, tokenizer),
         )
 
         logger.debug(
@@ -2956,6 +3419,10 @@ def get_pinyin_sort_key(text: str) -> str:
     if not text:
         return ""
 
+    if text.isascii():
+        # No Chinese characters, pypinyin would return the text unchanged
+        return text.lower()
+
     if _PYPINYIN_AVAILABLE:
         try:
             # Convert Chinese characters to pinyin, keep non-Chinese as-is
@@ -2969,6 +3436,112 @@ def get_pinyin_sort_key(text: str) -> str:
         return text.lower()
 
 
+class TrigramIndex:
+    """Incremental trigram index for case-insensitive substring search.
+
+    Each key (document id, node label, ...) is indexed by the set of lowercase
+    character trigrams of its texts. Postings are compact ``array('I')`` lists
+    of key ordinals; removed keys leave tombstones that are compacted away once
+    they outnumber live keys.
+
+    ``candidates()`` returns keys that *may* contain the search term; callers
+    must verify matches against the original text. Terms shorter than three
+    characters cannot be answered by the index and return ``None``.
+    """
+
+    GRAM_SIZE = 3
+
+    def __init__(self):
+        self._postings: dict[str, array] = {}
+        self._keys: list[str | None] = []
+        self._ordinals: dict[str, int] = {}
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._ordinals
+
+    @classmethod
+    def grams(cls, text: str) -> set[str]:
+        text = text.lower()
+        n = cls.GRAM_SIZE
+        return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+    def add(self, key: str, *texts: str | None) -> None:
+        """Index ``key`` under the trigrams of ``texts``, replacing any previous entry"""
+        if key in self._ordinals:
+            self.remove(key)
+        ordinal = len(self._keys)
+        self._keys.append(key)
+        self._ordinals[key] = ordinal
+        grams: set[str] = set()
+        for text in texts:
+            if text:
+                grams |= self.grams(text)
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                posting = self._postings[gram] = array("I")
+            posting.append(ordinal)
+
+    def remove(self, key: str) -> None:
+        ordinal = self._ordinals.pop(key, None)
+        if ordinal is None:
+            return
+        self._keys[ordinal] = None
+        self._dead += 1
+        if self._dead > 1024 and self._dead > len(self._ordinals):
+            self._compact()
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._keys.clear()
+        self._ordinals.clear()
+        self._dead = 0
+
+    def candidates(self, term: str) -> list[str] | None:
+        """Return live keys whose texts may contain ``term`` (unverified)"""
+        grams = self.grams(term)
+        if not grams:
+            return None
+        postings = []
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        # The rarest trigram bounds the candidate set; narrow it further with
+        # the next rarest one when both are small enough to intersect cheaply
+        postings.sort(key=len)
+        ordinals = postings[0]
+        if len(postings) > 1 and len(postings[1]) <= 8 * len(ordinals):
+            second = set(postings[1])
+            ordinals = [o for o in ordinals if o in second]
+        keys = self._keys
+        return [keys[o] for o in ordinals if keys[o] is not None]
+
+    def _compact(self) -> None:
+        remap = array("I", [0]) * len(self._keys)
+        live_keys: list[str | None] = []
+        for ordinal, key in enumerate(self._keys):
+            if key is not None:
+                remap[ordinal] = len(live_keys)
+                live_keys.append(key)
+        keys = self._keys
+        postings = {}
+        for gram, posting in self._postings.items():
+            compacted = array("I", (remap[o] for o in posting if keys[o] is not None))
+            if compacted:
+                postings[gram] = compacted
+        self._postings = postings
+        self._keys = live_keys
+        self._ordinals = {key: i for i, key in enumerate(live_keys)}
+        self._dead = 0
+
+
+@profile_stage("delimiter_repair")
 def fix_tuple_delimiter_corruption(
     record: str, delimiter_core: str, tuple_delimiter: str
 ) -> str:
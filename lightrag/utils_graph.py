@@ -761,15 +761,20 @@ async def aedit_relation(
                 source_entity, target_entity
             )
             # Important: First delete the old relation record from the vector database
-            # Delete both permutations to handle relationships created before normalization
-            rel_ids_to_delete = [
-                compute_mdhash_id(source_entity + target_entity, prefix="rel-"),
-                compute_mdhash_id(target_entity + source_entity, prefix="rel-"),
-            ]
-            await relationships_vdb.delete(rel_ids_to_delete)
-            logger.debug(
-                f"Relation Delete: delete vdb for `{source_entity}`~`{target_entity}`"
+            # Delete the reverse permutation to handle relationships created before
+            # normalization; the forward record is overwritten by the upsert below,
+            # which keeps its stored vector when the content did not change
+            relation_id = compute_mdhash_id(
+                source_entity + target_entity, prefix="rel-"
+            )
+            reverse_relation_id = compute_mdhash_id(
+                target_entity + source_entity, prefix="rel-"
             )
+            if reverse_relation_id != relation_id:
+                await relationships_vdb.delete([reverse_relation_id])
+                logger.debug(
+                    f"Relation Delete: delete vdb for `{target_entity}`~`{source_entity}`"
+                )
 
             # 2. Update relation information in the graph
             new_edge_data = {**edge_data, **updated_data}
@@ -786,11 +791,6 @@ async def aedit_relation(
             # Create content for embedding
             content = f"{source_entity}\t{target_entity}\n{keywords}\n{description}"
 
-            # Calculate relation ID
-            relation_id = compute_mdhash_id(
-                source_entity + target_entity, prefix="rel-"
-            )
-
             # Prepare data for vector database update
             relation_data = {
                 relation_id: {
@@ -1383,8 +1383,7 @@ async def _merge_entities_impl(
     logger.debug(
         f"Entity Merge: deleting {len(relations_to_delete)} relations from vdb"
     )
-    await relationships_vdb.delete(relations_to_delete)
-
+    relation_data_for_vdb = {}
     for rel_data in relation_updates.values():
         edge_data = rel_data["data"]
         normalized_src = rel_data["norm_src"]
@@ -1399,22 +1398,31 @@ async def _merge_entities_impl(
         content = f"{keywords}\t{normalized_src}\n{normalized_tgt}\n{description}"
         relation_id = compute_mdhash_id(normalized_src + normalized_tgt, prefix="rel-")
 
-        relation_data_for_vdb = {
-            relation_id: {
-                "content": content,
-                "src_id": normalized_src,
-                "tgt_id": normalized_tgt,
-                "source_id": source_id,
-                "description": description,
-                "keywords": keywords,
-                "weight": weight,
-            }
+        relation_data_for_vdb[relation_id] = {
+            "content": content,
+            "src_id": normalized_src,
+            "tgt_id": normalized_tgt,
+            "source_id": source_id,
+            "description": description,
+            "keywords": keywords,
+            "weight": weight,
         }
-        await relationships_vdb.upsert(relation_data_for_vdb)
         logger.debug(
             f"Entity Merge: updating vdb `{normalized_src}`~`{normalized_tgt}`"
         )
 
+    # Records that are rewritten are upserted in place (not deleted first) so
+    # unchanged relations keep their stored vectors
+    await relationships_vdb.delete(
+        [
+            rel_id
+            for rel_id in relations_to_delete
+            if rel_id not in relation_data_for_vdb
+        ]
+    )
+    if relation_data_for_vdb:
+        await relationships_vdb.upsert(relation_data_for_vdb)
+
     logger.info(f"Entity Merge: {len(relation_updates)} relations in vdb updated")
 
     # 8. Update entity vector representation
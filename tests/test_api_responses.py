@@ -0,0 +1,135 @@
+# pytest tests/test_api_responses.py -v
+
+import gzip
+import json
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from lightrag.api import responses
+from lightrag.api.responses import (
+    CompressionMiddleware,
+    FastJSONResponse,
+    dumps_json,
+    negotiate_encoding,
+)
+from lightrag.tools.benchmark_serialization import benchmark_payload, build_graph
+from lightrag.types import KnowledgeGraph, KnowledgeGraphNode
+
+pytestmark = pytest.mark.offline
+
+LARGE = {"items": [{"id": i, "text": "lorem ipsum " * 10} for i in range(200)]}
+
+
+@pytest.fixture
+def client():
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/large")
+    async def large():
+        return LARGE
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/ndjson")
+    async def ndjson():
+        async def lines():
+            for i in range(100):
+                yield json.dumps({"response": "x" * 50, "i": i}) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    @app.get("/chunked")
+    async def chunked():
+        async def parts():
+            for i in range(50):
+                yield "chunk " * 50
+
+        return StreamingResponse(parts(), media_type="application/json")
+
+    @app.get("/text")
+    async def text():
+        return PlainTextResponse("plain " * 500)
+
+    return TestClient(app)
+
+
+def test_dumps_json_handles_models_numpy_and_sets():
+    graph = KnowledgeGraph(
+        nodes=[KnowledgeGraphNode(id="A", labels=["A"], properties={"w": 1})]
+    )
+    payload = {
+        "graph": graph,
+        "score": np.float32(0.5),
+        "vector": np.array([1.0, 2.0]),
+        "tags": {"x"},
+        "text": "中文",
+    }
+    decoded = json.loads(dumps_json(payload))
+    assert decoded["graph"]["nodes"][0]["id"] == "A"
+    assert decoded["score"] == 0.5
+    assert decoded["vector"] == [1.0, 2.0]
+    assert decoded["tags"] == ["x"]
+    assert decoded["text"] == "中文"
+
+
+def test_negotiate_encoding(monkeypatch):
+    monkeypatch.setattr(responses, "brotli", object())
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    assert negotiate_encoding("br;q=0.5, gzip") == "gzip"
+    assert negotiate_encoding("br;q=0, gzip;q=0") is None
+    assert negotiate_encoding("*") == "br"
+    assert negotiate_encoding("") is None
+
+    monkeypatch.setattr(responses, "brotli", None)
+    assert negotiate_encoding("br") is None
+    assert negotiate_encoding("br, gzip") == "gzip"
+
+
+def test_large_body_is_gzipped(client):
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    # TestClient decodes gzip transparently
+    assert response.json() == LARGE
+
+
+def test_small_body_and_identity_are_not_compressed(client):
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"ok": True}
+
+    response = client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == LARGE
+
+
+def test_ndjson_streams_are_not_compressed(client):
+    response = client.get("/ndjson", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert len(response.text.splitlines()) == 100
+
+
+def test_chunked_responses_are_compressed_incrementally(client):
+    response = client.get("/chunked", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == "chunk " * 50 * 50
+
+
+def test_compressed_bytes_decode():
+    body = dumps_json(LARGE)
+    assert gzip.decompress(responses.compress_body(body, "gzip")) == body
+
+
+def test_serialization_benchmark_reports_sizes():
+    report = benchmark_payload(build_graph(50), repeat=1)
+    assert report["body_bytes"]["fast_json"] > 0
+    assert report["wire"]["gzip"]["bytes"] < report["wire"]["identity"]["bytes"]
+    assert set(report["serialize_ms"]) >= {"jsonable_encoder+json", "fast_json"}
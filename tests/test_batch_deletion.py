@@ -0,0 +1,165 @@
+# pytest tests/test_batch_deletion.py -v
+
+import asyncio
+import sys
+
+import numpy as np
+import pytest
+
+from lightrag import LightRAG
+from lightrag import lightrag as lightrag_module
+from lightrag.kg.shared_storage import (
+    finalize_share_data,
+    get_namespace_data,
+    initialize_pipeline_status,
+    initialize_share_data,
+)
+from lightrag.utils import EmbeddingFunc, Tokenizer
+
+pytestmark = pytest.mark.offline
+
+DOCS = {
+    "alpha": "DOC-ALPHA talks about the shared topic and alpha details.",
+    "beta": "DOC-BETA talks about the shared topic and beta details.",
+    "gamma": "DOC-GAMMA talks about the shared topic and gamma details.",
+}
+
+
+class _CharTokenizer:
+    def encode(self, content: str) -> list[int]:
+        return [ord(ch) for ch in content]
+
+    def decode(self, tokens: list[int]) -> str:
+        return "".join(chr(t) for t in tokens)
+
+
+async def _mock_llm(prompt, system_prompt=None, history_messages=[], **kwargs):
+    await asyncio.sleep(0)
+    text = f"{system_prompt or ''}\n{prompt}"
+    for name in DOCS:
+        if f"DOC-{name.upper()}" in text:
+            return f"""entity<|#|>Shared Topic<|#|>concept<|#|>Shared topic as seen by {name}.
+entity<|#|>Topic {name}<|#|>concept<|#|>Details only found in {name}.
+relation<|#|>Topic {name}<|#|>Shared Topic<|#|>part of<|#|>Topic {name} is part of the shared topic.
+<|COMPLETE|>"""
+    return "<|COMPLETE|>"
+
+
+async def _mock_embedding(texts: list[str]) -> np.ndarray:
+    await asyncio.sleep(0)
+    return np.random.rand(len(texts), 16)
+
+
+@pytest.fixture
+async def rag(tmp_path):
+    initialize_share_data()
+    instance = LightRAG(
+        working_dir=str(tmp_path),
+        workspace="batch_delete",
+        llm_model_func=_mock_llm,
+        embedding_func=EmbeddingFunc(
+            embedding_dim=16, max_token_size=8192, func=_mock_embedding
+        ),
+        tokenizer=Tokenizer("char-tokenizer", _CharTokenizer()),
+    )
+    await instance.initialize_storages()
+    await initialize_pipeline_status(workspace="batch_delete")
+    for name, text in DOCS.items():
+        await instance.ainsert(text, ids=[f"doc-{name}"], file_paths=[f"{name}.txt"])
+    yield instance
+    await instance.finalize_storages()
+    finalize_share_data()
+
+
+@pytest.mark.asyncio
+async def test_batch_deletion_rebuilds_shared_entities_once(rag, monkeypatch):
+    rebuild_calls = []
+    original_rebuild = lightrag_module.rebuild_knowledge_from_chunks
+
+    async def counting_rebuild(**kwargs):
+        rebuild_calls.append(
+            (
+                dict(kwargs["entities_to_rebuild"]),
+                dict(kwargs["relationships_to_rebuild"]),
+            )
+        )
+        return await original_rebuild(**kwargs)
+
+    monkeypatch.setattr(
+        lightrag_module, "rebuild_knowledge_from_chunks", counting_rebuild
+    )
+
+    gamma_chunks = (await rag.doc_status.get_by_id("doc-gamma"))["chunks_list"]
+    results = await rag.adelete_by_doc_ids(["doc-alpha", "doc-beta", "doc-missing"])
+
+    assert [r.status for r in results] == ["success", "success", "not_found"]
+    assert [r.file_path for r in results[:2]] == ["alpha.txt", "beta.txt"]
+
+    # One rebuild for the whole batch, covering the shared entity only once
+    assert len(rebuild_calls) == 1
+    entities_to_rebuild, relationships_to_rebuild = rebuild_calls[0]
+    assert entities_to_rebuild == {"Shared Topic": gamma_chunks}
+    assert relationships_to_rebuild == {}
+
+    graph = rag.chunk_entity_relation_graph
+    assert not await graph.has_node("Topic alpha")
+    assert not await graph.has_node("Topic beta")
+    assert await graph.has_node("Topic gamma")
+    shared = await graph.get_node("Shared Topic")
+    assert shared["source_id"] == gamma_chunks[0]
+
+    assert await rag.doc_status.get_by_id("doc-alpha") is None
+    assert await rag.full_docs.get_by_id("doc-beta") is None
+    assert await rag.doc_status.get_by_id("doc-gamma") is not None
+
+
+@pytest.mark.asyncio
+async def test_single_deletion_uses_batch_path(rag):
+    result = await rag.adelete_by_doc_id("doc-gamma")
+    assert result.status == "success"
+    assert result.doc_id == "doc-gamma"
+    assert not await rag.chunk_entity_relation_graph.has_node("Topic gamma")
+
+    missing = await rag.adelete_by_doc_id("doc-gamma")
+    assert missing.status == "not_found"
+
+
+@pytest.mark.asyncio
+async def test_background_deletion_isolates_failing_document(rag, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["pytest_runner"])
+    from lightrag.api.routers.document_routes import background_delete_documents
+
+    original_delete = rag.adelete_by_doc_ids
+    calls = []
+
+    async def failing_delete(doc_ids, delete_llm_cache=False):
+        calls.append(list(doc_ids))
+        if "doc-beta" in doc_ids:
+            raise RuntimeError("beta is broken")
+        return await original_delete(doc_ids, delete_llm_cache=delete_llm_cache)
+
+    monkeypatch.setattr(rag, "adelete_by_doc_ids", failing_delete)
+    rag.deletion_batch_size = 10
+
+    await background_delete_documents(
+        rag, None, ["doc-alpha", "doc-beta", "doc-alpha", "doc-gamma"]
+    )
+
+    # The shared plan fails, then each document is retried on its own
+    assert calls == [
+        ["doc-alpha", "doc-beta", "doc-gamma"],
+        ["doc-alpha"],
+        ["doc-beta"],
+        ["doc-gamma"],
+    ]
+    assert await rag.doc_status.get_by_id("doc-alpha") is None
+    assert await rag.doc_status.get_by_id("doc-beta") is not None
+    assert await rag.doc_status.get_by_id("doc-gamma") is None
+
+    pipeline_status = await get_namespace_data(
+        "pipeline_status", workspace="batch_delete"
+    )
+    history = pipeline_status["history_messages"]
+    assert "Document deleted 3/3: doc-gamma[gamma.txt]" in history
+    assert any(msg.startswith("Failed to delete 2/3: doc-beta") for msg in history)
+    assert history[-1] == "Deletion completed: 2 successful, 1 failed"
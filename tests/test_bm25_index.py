@@ -0,0 +1,154 @@
+# pytest tests/test_bm25_index.py -v
+
+import pytest
+
+from lightrag.base import QueryParam
+from lightrag.kg.bm25_impl import BM25ChunkIndex, BM25Index, tokenize_for_bm25
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+from lightrag.operate import _get_vector_context
+from lightrag.utils import reciprocal_rank_fusion
+
+pytestmark = pytest.mark.offline
+
+
+def test_tokenizer_keeps_identifiers_and_splits_cjk():
+    terms = tokenize_for_bm25("Error E-1042 in foo_bar.baz")
+    assert "e-1042" in terms and "e" in terms and "1042" in terms
+    assert "foo_bar.baz" in terms and "foo" in terms and "baz" in terms
+    assert "error" in terms
+
+    assert tokenize_for_bm25("知识图谱") == [
+        "知",
+        "识",
+        "图",
+        "谱",
+        "知识",
+        "识图",
+        "图谱",
+    ]
+
+
+def test_bm25_ranking_and_removal():
+    index = BM25Index()
+    index.add("a", "the pump model XR-200 overheats")
+    index.add("b", "the pump is quiet")
+    index.add("c", "XR-200 XR-200 manual and XR-200 warranty")
+
+    ranked = index.search("XR-200", top_k=10)
+    assert [doc_id for doc_id, _ in ranked] == ["c", "a"]
+    assert index.search("pump", top_k=1)[0][0] in {"a", "b"}
+
+    assert index.remove("c")
+    assert not index.remove("c")
+    assert [doc_id for doc_id, _ in index.search("XR-200", top_k=10)] == ["a"]
+    assert "xr-200" in index.postings and "manual" not in index.postings
+
+
+def test_very_frequent_terms_are_skipped_when_rarer_terms_match():
+    index = BM25Index()
+    for i in range(8):
+        index.add(f"filler-{i}", "的的的的的 是 其他内容")
+    index.add("target", "知识图谱 的")
+
+    ranked = index.search("知识图谱的", top_k=10)
+    # 的 occurs in every chunk and is not scored, so fillers do not match
+    assert [doc_id for doc_id, _ in ranked] == ["target"]
+    # A query made only of frequent terms still scores them
+    assert len(index.search("的", top_k=20)) == 9
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d"]])
+    assert fused[0] == "c"
+    assert set(fused) == {"a", "b", "c", "d"}
+
+
+@pytest.fixture
+def shared_data():
+    initialize_share_data()
+    yield
+    finalize_share_data()
+
+
+def _make_index(tmp_path):
+    return BM25ChunkIndex(
+        namespace="bm25_chunks",
+        workspace="lexical",
+        global_config={"working_dir": str(tmp_path)},
+    )
+
+
+@pytest.mark.asyncio
+async def test_chunk_index_persists_and_reloads(tmp_path, shared_data):
+    index = _make_index(tmp_path)
+    await index.initialize()
+    assert index.needs_backfill
+
+    await index.upsert(
+        {
+            "chunk-1": {"content": "reset the router with code RST-77"},
+            "chunk-2": {"content": "router firmware update"},
+        }
+    )
+    await index.delete(["chunk-2"])
+    assert await index.index_done_callback()
+
+    reloaded = _make_index(tmp_path)
+    await reloaded.initialize()
+    assert not reloaded.needs_backfill
+    assert [cid for cid, _ in await reloaded.search("RST-77 router", 5)] == ["chunk-1"]
+
+    await reloaded.drop()
+    assert await reloaded.search("router", 5) == []
+
+
+class _FakeChunksVDB:
+    cosine_better_than_threshold = 0.2
+
+    async def query(self, query, top_k, query_embedding=None):
+        return [
+            {"id": "v1", "content": "semantic match", "file_path": "a.md", "score": 0.9}
+        ]
+
+
+class _FakeTextChunks:
+    def __init__(self, data):
+        self.data = data
+
+    async def get_by_ids(self, ids):
+        return [self.data.get(chunk_id) for chunk_id in ids]
+
+
+@pytest.mark.asyncio
+async def test_vector_context_fuses_lexical_matches(tmp_path, shared_data):
+    index = _make_index(tmp_path)
+    await index.initialize()
+    chunks = {
+        "v1": {"content": "semantic match", "file_path": "a.md"},
+        "k1": {"content": "error code QX-9 means low voltage", "file_path": "b.md"},
+    }
+    await index.upsert(chunks)
+
+    param = QueryParam(mode="naive", chunk_top_k=5)
+    results = await _get_vector_context(
+        "QX-9",
+        _FakeChunksVDB(),
+        param,
+        lexical_index=index,
+        text_chunks_db=_FakeTextChunks(chunks),
+    )
+    by_id = {chunk["chunk_id"]: chunk for chunk in results}
+    assert set(by_id) == {"v1", "k1"}
+    assert by_id["k1"]["source_type"] == "lexical"
+    assert by_id["k1"]["score"] is None
+    assert by_id["k1"]["file_path"] == "b.md"
+
+    param.enable_lexical_search = False
+    results = await _get_vector_context(
+        "QX-9",
+        _FakeChunksVDB(),
+        param,
+        lexical_index=index,
+        text_chunks_db=_FakeTextChunks(chunks),
+    )
+    assert [chunk["chunk_id"] for chunk in results] == ["v1"]
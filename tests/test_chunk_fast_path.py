@@ -0,0 +1,125 @@
+# pytest tests/test_chunk_fast_path.py -v
+
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+from lightrag import LightRAG
+from lightrag.base import DocStatus
+from lightrag.kg.shared_storage import (
+    finalize_share_data,
+    initialize_pipeline_status,
+    initialize_share_data,
+)
+from lightrag.progress import DebouncedFlush, get_track_progress
+from lightrag.utils import EmbeddingFunc, Tokenizer
+
+pytestmark = pytest.mark.offline
+
+
+class _CharTokenizer:
+    def encode(self, content: str) -> list[int]:
+        return [ord(ch) for ch in content]
+
+    def decode(self, tokens: list[int]) -> str:
+        return "".join(chr(t) for t in tokens)
+
+
+async def _mock_embedding(texts: list[str]) -> np.ndarray:
+    return np.random.rand(len(texts), 16)
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_searchable_before_extraction_finishes(tmp_path):
+    initialize_share_data()
+    release_llm = asyncio.Event()
+
+    async def blocked_llm(prompt, system_prompt=None, history_messages=[], **kwargs):
+        await release_llm.wait()
+        return "<|COMPLETE|>"
+
+    rag = LightRAG(
+        working_dir=str(tmp_path),
+        workspace="fast_path",
+        llm_model_func=blocked_llm,
+        embedding_func=EmbeddingFunc(
+            embedding_dim=16, max_token_size=8192, func=_mock_embedding
+        ),
+        tokenizer=Tokenizer("char-tokenizer", _CharTokenizer()),
+        enable_chunk_fast_path=True,
+        chunk_fast_path_flush_delay=0.05,
+    )
+    await rag.initialize_storages()
+    await initialize_pipeline_status(workspace="fast_path")
+    try:
+        track_id = await rag.apipeline_enqueue_documents(
+            "Fast path document about searchable chunks.",
+            ids=["doc-fast"],
+            file_paths=["fast.txt"],
+        )
+        pipeline = asyncio.create_task(rag.apipeline_process_enqueue_documents())
+
+        progress = None
+        for _ in range(200):
+            progress = await get_track_progress("fast_path", track_id)
+            if progress and progress["searchable_docs"] == 1:
+                break
+            await asyncio.sleep(0.01)
+        status = await rag.doc_status.get_by_id("doc-fast")
+
+        # Extraction is still blocked on the LLM, but the chunks are flushed
+        assert status["status"] == DocStatus.PROCESSING
+        assert not pipeline.done()
+        chunk_id = status["chunks_list"][0]
+        assert (await rag.text_chunks.get_by_id(chunk_id)) is not None
+        assert os.path.exists(
+            os.path.join(str(tmp_path), "fast_path", "vdb_chunks.json")
+        )
+        assert status["metadata"]["searchable"] == "chunks"
+        assert progress["searchable_docs"] == 1
+        assert progress["documents"][0]["searchable"] is True
+
+        release_llm.set()
+        await pipeline
+        final = await rag.doc_status.get_by_id("doc-fast")
+        assert final["status"] == DocStatus.PROCESSED
+    finally:
+        release_llm.set()
+        await rag.finalize_storages()
+        finalize_share_data()
+
+
+@pytest.mark.asyncio
+async def test_fast_path_flushes_are_coalesced():
+    flushed = []
+    release_flush = asyncio.Event()
+
+    async def flush():
+        flushed.append(len(flushed))
+        await release_flush.wait()
+
+    notified = []
+
+    def notify(doc):
+        async def callback():
+            notified.append((doc, len(flushed)))
+
+        return callback
+
+    debounced = DebouncedFlush(flush, delay=0.01)
+    for doc in ("a", "b", "c"):
+        debounced.request(notify(doc))
+    await asyncio.sleep(0.05)
+    # Three requests inside the delay share one flush, which is still running
+    assert debounced.flushes == 0 and len(flushed) == 1
+
+    # Requests made while a flush runs share a single follow-up flush
+    debounced.request(notify("d"))
+    debounced.request(notify("e"))
+    release_flush.set()
+    await debounced.drain()
+
+    assert debounced.flushes == 2
+    assert notified == [("a", 1), ("b", 1), ("c", 1), ("d", 2), ("e", 2)]
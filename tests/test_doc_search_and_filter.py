@@ -223,3 +223,165 @@ async def test_status_filter_interaction(storage):
         status_filter=DocStatus.PROCESSED, file_type="pdf"
     )
     assert total == 2
+
+
+@pytest.fixture
+async def indexed_storage(tmp_path):
+    """创建一个真实初始化的 JsonDocStatusStorage，用于验证二级索引的增量维护"""
+    from lightrag.kg.shared_storage import initialize_share_data
+
+    initialize_share_data()
+    storage_instance = JsonDocStatusStorage(
+        namespace="doc_status",
+        workspace=f"index_{tmp_path.name}",
+        global_config={"working_dir": str(tmp_path)},
+        embedding_func=None,
+    )
+    await storage_instance.initialize()
+    await storage_instance.upsert({k: dict(v) for k, v in MOCK_DATA.items()})
+    return storage_instance
+
+
+def _brute_force_page(data, status=None, keyword=None, ext=None, field="updated_at"):
+    matched = []
+    for doc_id, doc in data.items():
+        if status and doc["status"] != status:
+            continue
+        if ext and not doc["file_path"].lower().endswith(ext):
+            continue
+        if keyword:
+            texts = [doc_id, doc["file_path"], doc["content_summary"]]
+            if not any(keyword in t.lower() for t in texts):
+                continue
+        matched.append((doc_id if field == "id" else doc[field], doc_id))
+    return [doc_id for _, doc_id in sorted(matched, reverse=True)]
+
+
+@pytest.mark.asyncio
+async def test_indexes_follow_upsert_and_delete(indexed_storage):
+    """测试：upsert/delete 后索引（状态计数、track_id、file_path、关键词）保持一致"""
+    await indexed_storage.upsert(
+        {
+            "doc_2": {
+                **MOCK_DATA["doc_2"],
+                "status": "failed",
+                "track_id": "track_a",
+                "content_summary": "Rewritten summary about Rust",
+                "updated_at": "2023-12-01T10:00:00",
+            },
+            "doc_6": {
+                **MOCK_DATA["doc_1"],
+                "file_path": "papers/rust_book.pdf",
+                "track_id": "track_a",
+            },
+        }
+    )
+    await indexed_storage.delete(["doc_4"])
+
+    counts = await indexed_storage.get_status_counts()
+    assert counts["processed"] == 4
+    assert counts["failed"] == 1
+
+    by_track = await indexed_storage.get_docs_by_track_id("track_a")
+    assert set(by_track) == {"doc_2", "doc_6"}
+
+    assert await indexed_storage.get_doc_by_file_path("notes/roadmap.docx") is None
+    found = await indexed_storage.get_doc_by_file_path("papers/rust_book.pdf")
+    assert found["track_id"] == "track_a"
+
+    # 旧摘要不能再命中，新摘要可以命中
+    docs, total = await indexed_storage.get_docs_paginated(keyword="beginner")
+    assert total == 0
+    docs, total = await indexed_storage.get_docs_paginated(keyword="rust")
+    assert [d[0] for d in docs] == ["doc_2", "doc_6"]
+
+    failed = await indexed_storage.get_docs_by_status(DocStatus.FAILED)
+    assert list(failed) == ["doc_2"]
+
+
+@pytest.mark.asyncio
+async def test_indexed_pagination_matches_full_scan(indexed_storage):
+    """测试：基于索引的分页结果与全量扫描排序结果一致"""
+    extra = {}
+    for i in range(100):
+        extra[f"doc_x{i:03d}"] = {
+            "content_summary": f"Generated report number {i}",
+            "content_length": 10,
+            "file_path": f"gen/report_{i}.{'pdf' if i % 3 else 'md'}",
+            "status": "processed" if i % 4 else "pending",
+            "created_at": f"2024-01-01T00:{i % 60:02d}:00",
+            "updated_at": f"2024-02-01T{i % 24:02d}:00:{i % 60:02d}",
+        }
+    await indexed_storage.upsert(extra)
+    data = {**MOCK_DATA, **extra}
+
+    cases = [
+        {},
+        {"status": "pending"},
+        {"ext": ".pdf"},
+        {"keyword": "report"},
+        {"keyword": "py"},
+        {"status": "processed", "ext": ".md", "keyword": "number 1"},
+    ]
+    for case in cases:
+        expected = _brute_force_page(data, **case)
+        collected = []
+        for page in (1, 2, 3):
+            docs, total = await indexed_storage.get_docs_paginated(
+                status_filter=DocStatus(case["status"]) if "status" in case else None,
+                page=page,
+                page_size=10,
+                keyword=case.get("keyword"),
+                file_type=case.get("ext"),
+            )
+            assert total == len(expected), case
+            collected.extend(d[0] for d in docs)
+        assert collected == expected[:30], case
+
+    docs, _ = await indexed_storage.get_docs_paginated(
+        page=1, page_size=10, sort_field="id", sort_direction="asc"
+    )
+    assert [d[0] for d in docs] == sorted(data)[:10]
+
+
+@pytest.mark.asyncio
+async def test_foreign_writes_are_replayed_without_rebuild(indexed_storage, tmp_path):
+    """测试：其他实例（进程）的写入通过变更日志增量回放，不会触发全量重建"""
+    other = JsonDocStatusStorage(
+        namespace="doc_status",
+        workspace=indexed_storage.workspace,
+        global_config={"working_dir": str(tmp_path)},
+        embedding_func=None,
+    )
+    await other.initialize()
+    assert (await other.get_status_counts())["processed"] == 4
+
+    await indexed_storage.upsert(
+        {"doc_7": {**MOCK_DATA["doc_4"], "file_path": "notes/doc_7.md"}}
+    )
+    await indexed_storage.delete(["doc_1"])
+
+    with patch(
+        "lightrag.kg.json_doc_status_impl._DocStatusIndex.build",
+        side_effect=AssertionError("full rebuild"),
+    ):
+        counts = await other.get_status_counts()
+        found = await other.get_doc_by_file_path("notes/doc_7.md")
+    assert counts["processed"] == 3 and counts["failed"] == 2
+    assert found is not None
+
+    # Writes too large for the change log fall back to a bulk rebuild
+    from lightrag.kg import json_doc_status_impl
+
+    with patch.object(json_doc_status_impl, "INDEX_CHANGE_MAX_IDS", 1):
+        await indexed_storage.upsert(
+            {
+                f"doc_b{i}": {**MOCK_DATA["doc_2"], "file_path": f"archive/{i}.md"}
+                for i in range(3)
+            }
+        )
+    docs, total = await other.get_docs_paginated(
+        page_size=10, sort_field="file_path", sort_direction="asc"
+    )
+    assert total == 8
+    assert [d[0] for d in docs[:3]] == ["doc_b0", "doc_b1", "doc_b2"]
@@ -0,0 +1,73 @@
+# pytest tests/test_embedding_micro_batcher.py -v
+
+import asyncio
+import inspect
+
+import numpy as np
+import pytest
+
+from lightrag.utils import EmbeddingMicroBatcher
+
+pytestmark = pytest.mark.offline
+
+
+class _RecordingEmbedder:
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    async def __call__(self, texts, embedding_dim=None):
+        self.calls.append(list(texts))
+        await asyncio.sleep(0)
+        return np.array([[float(len(text)), 1.0] for text in texts])
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_are_coalesced():
+    embedder = _RecordingEmbedder()
+    batcher = EmbeddingMicroBatcher(embedder, max_batch_size=4, max_wait_ms=20)
+
+    results = await asyncio.gather(
+        batcher(["a"]), batcher(["bb", "ccc"]), batcher(["dddd"]), batcher(["eeeee"])
+    )
+
+    # The first three calls fill a batch of four; the last waits for the timer
+    assert embedder.calls == [["a", "bb", "ccc", "dddd"], ["eeeee"]]
+    assert [r[:, 0].tolist() for r in results] == [[1.0], [2.0, 3.0], [4.0], [5.0]]
+
+    # Large calls and calls with different arguments are never merged
+    await asyncio.gather(
+        batcher(["x"] * 4), batcher(["y"], embedding_dim=2), batcher(["z"])
+    )
+    assert ["x"] * 4 in embedder.calls
+    assert ["y"] in embedder.calls and ["z"] in embedder.calls
+    assert "embedding_dim" in inspect.signature(batcher).parameters
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller():
+    async def failing(texts):
+        raise RuntimeError("provider down")
+
+    batcher = EmbeddingMicroBatcher(failing, max_batch_size=8, max_wait_ms=5)
+    results = await asyncio.gather(
+        batcher(["a"]), batcher(["b"]), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_provider_calls_never_exceed_max_batch_size():
+    embedder = _RecordingEmbedder()
+    batcher = EmbeddingMicroBatcher(embedder, max_batch_size=10, max_wait_ms=20)
+
+    requests = [
+        [f"{i}-{j}" for j in range(size)] for i, size in enumerate([9, 9, 3, 7, 1])
+    ]
+    results = await asyncio.gather(*(batcher(texts) for texts in requests))
+
+    assert all(len(call) <= 10 for call in embedder.calls)
+    assert sorted(t for call in embedder.calls for t in call) == sorted(
+        t for texts in requests for t in texts
+    )
+    assert [len(r) for r in results] == [9, 9, 3, 7, 1]
+    assert not batcher._tasks
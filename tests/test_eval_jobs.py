@@ -0,0 +1,185 @@
+# pytest tests/test_eval_jobs.py -v
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "eval_accuracy_citation"))
+
+from eval_jobs import EvalJobManager  # noqa: E402
+
+pytestmark = pytest.mark.offline
+
+QUESTIONS = [{"q": f"question {i}", "gold": ["a"], "doc_hint": []} for i in range(6)]
+
+
+class _Evaluator:
+    """Scores in worker threads with a blocking call, like the LLM scorer"""
+
+    def __init__(self, fail_on=None, block=None):
+        self.fail_on = fail_on
+        self.block = block
+        self.evaluated = []
+        self.threads = set()
+        self.running = 0
+        self.max_running = 0
+
+    def _score(self, question):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(0.02)  # blocking scorer call
+        scores = (
+            "faithfulness",
+            "answer_relevancy",
+            "context_recall",
+            "context_precision",
+        )
+        return {"question": question["q"], **dict.fromkeys(scores, 1.0)}
+
+    async def __call__(self, question, rag=None, run_sync=None):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            if self.block is not None and question["q"] == "question 3":
+                await self.block.wait()
+            if question["q"] == self.fail_on:
+                raise RuntimeError("scorer unavailable")
+            result = await run_sync(lambda: self._score(question))
+            self.evaluated.append(question["q"])
+            return result
+        finally:
+            self.running -= 1
+
+
+def _manager(tmp_path, evaluator, concurrency=3):
+    return EvalJobManager(
+        jobs_dir=str(tmp_path / "jobs"),
+        concurrency=concurrency,
+        evaluate=evaluator,
+        question_loader=lambda line_number: list(QUESTIONS),
+    )
+
+
+@pytest.mark.asyncio
+async def test_job_runs_in_background_with_bounded_parallelism(tmp_path):
+    evaluator = _Evaluator(fail_on="question 4")
+    manager = _manager(tmp_path, evaluator)
+    output = tmp_path / "results.json"
+
+    job = manager.start(output_file=str(output))
+    assert job["status"] == "queued" and job["total"] == 6
+
+    # The event loop stays responsive while questions are scored in threads
+    ticks = 0
+    while manager.get(job["job_id"])["status"] in ("queued", "running"):
+        ticks += 1
+        await asyncio.sleep(0.005)
+    assert ticks > 3
+
+    job = manager.get(job["job_id"])
+    assert job["status"] == "failed" and job["failed"] == 1
+    assert job["completed"] == 5
+    assert 1 < evaluator.max_running <= 3
+    assert all(name.startswith("eval-") for name in evaluator.threads)
+    saved = json.loads(output.read_text(encoding="utf-8"))
+    assert saved["total_count"] == 5
+    assert [r["question"] for r in saved["detailed_results"]] == [
+        "question 0",
+        "question 1",
+        "question 2",
+        "question 3",
+        "question 5",
+    ]
+
+    # Resuming retries only the failed question
+    evaluator.fail_on = None
+    evaluator.evaluated.clear()
+    manager.resume(job["job_id"])
+    job = await manager.wait(job["job_id"])
+    assert job["status"] == "completed" and job["completed"] == 6
+    assert evaluator.evaluated == ["question 4"]
+    assert json.loads(output.read_text(encoding="utf-8"))["total_count"] == 6
+
+
+@pytest.mark.asyncio
+async def test_interrupted_job_resumes_from_partial_results(tmp_path):
+    block = asyncio.Event()
+    evaluator = _Evaluator(block=block)
+    manager = _manager(tmp_path, evaluator, concurrency=2)
+    job_id = manager.start(output_file=str(tmp_path / "out.json"))["job_id"]
+
+    while len(evaluator.evaluated) < 2:
+        await asyncio.sleep(0.005)
+    job = await manager.cancel(job_id)
+    assert job["status"] == "cancelled"
+    finished = list(evaluator.evaluated)
+
+    # A restarted server sees the partial results and resumes the remaining questions
+    evaluator = _Evaluator()
+    restarted = _manager(tmp_path, evaluator)
+    assert restarted.get(job_id)["status"] == "cancelled"
+    restarted.resume(job_id)
+    job = await restarted.wait(job_id)
+    assert job["status"] == "completed" and job["completed"] == 6
+    assert sorted(evaluator.evaluated + finished) == [q["q"] for q in QUESTIONS]
+
+
+@pytest.mark.asyncio
+async def test_jobs_are_shared_between_worker_processes(tmp_path, monkeypatch):
+    import eval_jobs
+
+    monkeypatch.setattr(eval_jobs, "CANCEL_POLL_INTERVAL", 0.01)
+    block = asyncio.Event()
+    evaluator = _Evaluator(block=block)
+    owner = _manager(tmp_path, evaluator, concurrency=2)
+    job_id = owner.start(output_file=str(tmp_path / "out.json"))["job_id"]
+    while "question 2" not in evaluator.evaluated:
+        await asyncio.sleep(0.005)
+
+    # A sibling worker spawned meanwhile sees the running job and leaves it alone
+    sibling = _manager(tmp_path, _Evaluator())
+    job = sibling.get(job_id)
+    assert job["status"] == "running" and job["owner_pid"] is not None
+    assert [j["job_id"] for j in sibling.list()] == [job_id]
+    with pytest.raises(ValueError):
+        sibling.resume(job_id)
+
+    # Cancelling from the sibling is carried out by the owning worker
+    job = await sibling.cancel(job_id)
+    assert job["cancel_requested"] is True
+    job = await owner.wait(job_id)
+    assert job["status"] == "cancelled" and job["owner_pid"] is None
+
+    # Once the owner has stopped, any worker can resume the job
+    sibling_evaluator = _Evaluator()
+    sibling._evaluate = sibling_evaluator
+    sibling.resume(job_id)
+    job = await sibling.wait(job_id)
+    assert job["status"] == "completed" and job["completed"] == 6
+    assert not set(sibling_evaluator.evaluated) & set(evaluator.evaluated)
+
+
+@pytest.mark.asyncio
+async def test_jobs_of_dead_workers_are_reported_interrupted(tmp_path):
+    manager = _manager(tmp_path, _Evaluator())
+    job_dir = tmp_path / "jobs" / "eval-orphan"
+    job_dir.mkdir(parents=True)
+    (job_dir / "job.json").write_text(
+        json.dumps(
+            {
+                "job_id": "eval-orphan",
+                "status": "running",
+                "owner_pid": 999999,
+                "total": 2,
+                "completed": 1,
+                "created_at": "2025-01-01T00:00:00+00:00",
+            }
+        ),
+        encoding="utf-8",
+    )
+    # Nobody holds the job lock, so the worker that ran it is gone
+    assert manager.get("eval-orphan")["status"] == "interrupted"
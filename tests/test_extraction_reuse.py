@@ -0,0 +1,87 @@
+# pytest tests/test_extraction_reuse.py -v
+
+import pytest
+
+from lightrag.kg.json_kv_impl import JsonKVStorage
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+from lightrag.operate import extract_entities
+
+pytestmark = pytest.mark.offline
+
+RESULT = """entity<|#|>Clause<|#|>concept<|#|>A standard liability clause.
+entity<|#|>Party<|#|>organization<|#|>The contracting party.
+relation<|#|>Party<|#|>Clause<|#|>bound by<|#|>The party is bound by the clause.
+<|COMPLETE|>"""
+
+
+@pytest.fixture
+async def llm_cache(tmp_path):
+    initialize_share_data()
+    config = {
+        "working_dir": str(tmp_path),
+        "enable_llm_cache_for_entity_extract": True,
+    }
+    cache = JsonKVStorage(
+        namespace="llm_response_cache",
+        workspace="reuse",
+        global_config=config,
+        embedding_func=None,
+    )
+    await cache.initialize()
+    yield cache
+    finalize_share_data()
+
+
+@pytest.mark.asyncio
+async def test_identical_chunks_reuse_stored_extraction(tmp_path, llm_cache):
+    calls = []
+
+    async def llm(prompt, system_prompt=None, history_messages=None, **kwargs):
+        calls.append(prompt)
+        return RESULT
+
+    config = {
+        "llm_model_func": llm,
+        "llm_model_name": "model-a",
+        "entity_extract_max_gleaning": 0,
+        "addon_params": {},
+        "working_dir": str(tmp_path),
+        "workspace": "reuse",
+        "enable_extraction_reuse": True,
+        "enable_llm_cache_for_entity_extract": True,
+    }
+    content = "The party is bound by the standard liability clause."
+
+    stats = {}
+    await extract_entities(
+        {"chunk-1": {"content": content, "tokens": 12, "file_path": "a.txt"}},
+        config,
+        llm_response_cache=llm_cache,
+        gleaning_stats=stats,
+    )
+    assert len(calls) == 1 and stats["reused_chunks"] == 0
+
+    stats = {}
+    results = await extract_entities(
+        {"chunk-1": {"content": content, "tokens": 12, "file_path": "b.txt"}},
+        config,
+        llm_response_cache=llm_cache,
+        gleaning_stats=stats,
+    )
+    assert stats["reused_chunks"] == 1
+    nodes, edges = results[0]
+    assert set(nodes) == {"Clause", "Party"}
+    assert set(edges) == {("Party", "Clause")}
+    # The reused result is attributed to the new document's source
+    assert nodes["Clause"][0]["file_path"] == "b.txt"
+    assert edges[("Party", "Clause")][0]["source_id"] == "chunk-1"
+
+    # A different model version does not reuse the stored result
+    stats = {}
+    await extract_entities(
+        {"chunk-1": {"content": content, "tokens": 12, "file_path": "c.txt"}},
+        {**config, "llm_model_name": "model-b"},
+        llm_response_cache=llm_cache,
+        gleaning_stats=stats,
+    )
+    assert stats["reused_chunks"] == 0
@@ -73,7 +73,7 @@ async def test_submit_and_retrieve_feedback(rag_instance):
     assert history_list[0]["query_id"] == query_id_1
 
     # --- 步骤 4: 验证生成的 Prompt 上下文 ---
-    context_str = await rag_instance._get_feedback_context()
+    context_str = rag_instance.feedback_store.context()
 
     print(f"\n生成的上下文: {context_str}")
 
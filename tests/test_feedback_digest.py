@@ -0,0 +1,95 @@
+# pytest tests/test_feedback_digest.py -v
+
+import pytest
+
+from lightrag.feedback import FeedbackStore, feedback_cluster_key
+from lightrag.kg.json_kv_impl import JsonKVStorage
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+
+pytestmark = pytest.mark.offline
+
+
+class _CountingKV(JsonKVStorage):
+    def __post_init__(self):
+        super().__post_init__()
+        self.reads = 0
+        self.flushes = 0
+
+    async def get_by_id(self, id):
+        self.reads += 1
+        return await super().get_by_id(id)
+
+    async def index_done_callback(self):
+        self.flushes += 1
+        return await super().index_done_callback()
+
+
+async def _make_storage(tmp_path):
+    storage = _CountingKV(
+        namespace="feedback",
+        workspace="fb",
+        global_config={"working_dir": str(tmp_path)},
+        embedding_func=None,
+    )
+    await storage.initialize()
+    return storage
+
+
+def _feedback(kind, query, comment="ok"):
+    return {"feedback_type": kind, "query": query, "comment": comment}
+
+
+@pytest.fixture
+async def storage(tmp_path):
+    initialize_share_data()
+    yield await _make_storage(tmp_path)
+    finalize_share_data()
+
+
+@pytest.mark.asyncio
+async def test_digest_serves_context_without_storage_reads(storage):
+    store = FeedbackStore(storage, workspace="fb", flush_delay=60)
+    await store.load()
+    assert store.context() == "暂无反馈记录。"
+
+    await store.submit("q1", _feedback("dislike", "What is RAG?", "too <short>"))
+    await store.submit("q2", _feedback("like", "what is rag", "clear"))
+    reads = storage.reads
+
+    context = store.context()
+    assert context.splitlines()[0].startswith("- [用户点赞/Like] 问题: 'what is rag'")
+    assert "[用户不满/Dislike]" in context and "too [short]" in context
+    assert storage.reads == reads
+
+    # Records are stored right away, the disk write waits for the debounce
+    assert (await storage.get_by_id("q1"))["comment"] == "too <short>"
+    assert len((await storage.get_by_id("recent_history"))["data"]) == 2
+    assert storage.flushes == 0
+    await store.close()
+    assert storage.flushes == 1
+
+
+@pytest.mark.asyncio
+async def test_cluster_stats_are_incremental_and_reloaded(storage, tmp_path):
+    store = FeedbackStore(storage, workspace="fb", flush_delay=60)
+    await store.load()
+    for i in range(12):
+        kind = "dislike" if i % 4 == 0 else "like"
+        await store.submit(f"q{i}", _feedback(kind, "How do heat pumps work?"))
+    await store.submit("other", _feedback("dislike", "Solar panel costs"))
+
+    stats = store.stats()
+    assert stats["totals"]["total"] == 13
+    cluster = stats["clusters"][feedback_cluster_key("heat pumps WORK, how do")]
+    assert (cluster["like"], cluster["dislike"]) == (9, 3)
+    assert cluster["dislike_rate"] == 0.25
+    assert len(store.recent()) == 10
+    await store.close()
+
+    # A new process rebuilds the digest from the persisted records
+    finalize_share_data()
+    initialize_share_data()
+    reloaded = FeedbackStore(await _make_storage(tmp_path), workspace="fb")
+    await reloaded.load()
+    assert reloaded.stats() == stats
+    assert reloaded.context() == store.context()
@@ -0,0 +1,86 @@
+# pytest tests/test_gleaning_policy.py -v
+
+import pytest
+
+from lightrag.operate import extract_entities
+from lightrag.utils import GleaningPolicy
+
+pytestmark = pytest.mark.offline
+
+FIRST_PASS = """entity<|#|>Alpha<|#|>concept<|#|>Alpha is a concept.
+entity<|#|>Beta<|#|>concept<|#|>Beta is a concept.
+relation<|#|>Alpha<|#|>Beta<|#|>related<|#|>Alpha relates to Beta.
+<|COMPLETE|>"""
+
+
+def test_policy_rules():
+    policy = GleaningPolicy(min_tokens=100, min_yield=0.1, warmup=2, explore_every=3)
+    assert policy.should_glean(
+        terminated=False, chunk_tokens=10, entities=0, relations=0
+    ) == (True, "unterminated")
+    assert policy.should_glean(
+        terminated=True, chunk_tokens=50, entities=5, relations=2
+    ) == (False, "short_chunk")
+    assert policy.should_glean(
+        terminated=True, chunk_tokens=1200, entities=0, relations=0
+    ) == (False, "sparse")
+    assert policy.should_glean(
+        terminated=True, chunk_tokens=1200, entities=6, relations=3
+    ) == (True, "default")
+
+    # Gleaning that keeps adding nothing is skipped, with periodic exploration
+    policy.record_yield(9, 0)
+    policy.record_yield(9, 0)
+    decisions = [
+        policy.should_glean(terminated=True, chunk_tokens=1200, entities=6, relations=3)
+        for _ in range(3)
+    ]
+    assert decisions == [(False, "low_yield"), (False, "low_yield"), (True, "explore")]
+
+    policy.record_yield(4, 8)
+    assert policy.yield_ema > 0.1
+    assert policy.should_glean(
+        terminated=True, chunk_tokens=1200, entities=6, relations=3
+    ) == (True, "default")
+
+
+@pytest.mark.asyncio
+async def test_extract_entities_reports_saved_calls(tmp_path):
+    prompts = []
+
+    async def llm(prompt, system_prompt=None, history_messages=None, **kwargs):
+        prompts.append(prompt)
+        return FIRST_PASS if not history_messages else "<|COMPLETE|>"
+
+    config = {
+        "llm_model_func": llm,
+        "entity_extract_max_gleaning": 1,
+        "addon_params": {},
+        "llm_model_max_async": 2,
+        "working_dir": str(tmp_path),
+        "workspace": "gleaning",
+        "enable_gleaning_skip": True,
+        "gleaning_skip_min_tokens": 100,
+    }
+    chunks = {
+        "chunk-short": {"content": "Alpha and Beta.", "tokens": 20},
+        "chunk-long": {"content": "Alpha and Beta, at length.", "tokens": 400},
+    }
+    stats = {}
+    results = await extract_entities(chunks, config, gleaning_stats=stats)
+
+    assert len(results) == 2
+    assert stats == {
+        "calls": 1,
+        "skipped": 1,
+        "skip_reasons": {"short_chunk": 1},
+        "reused_chunks": 0,
+    }
+    assert len(prompts) == 3
+
+    # Without the policy every chunk is gleaned
+    stats = {}
+    await extract_entities(
+        chunks, {**config, "enable_gleaning_skip": False}, gleaning_stats=stats
+    )
+    assert stats["calls"] == 2 and stats["skipped"] == 0
@@ -0,0 +1,73 @@
+# pytest tests/test_local_rerank.py -v
+
+import threading
+
+import numpy as np
+import pytest
+
+from lightrag import metrics
+from lightrag.rerank import LocalCrossEncoderReranker, _logits_to_scores
+
+pytestmark = pytest.mark.offline
+
+
+class _KeywordReranker(LocalCrossEncoderReranker):
+    """Scores by keyword overlap instead of loading a model"""
+
+    def __init__(self, **kwargs):
+        super().__init__("unused-model-path", **kwargs)
+        self.batches: list[int] = []
+        self.threads: set[str] = set()
+
+    def _load_scorer(self):
+        def score(pairs):
+            self.batches.append(len(pairs))
+            self.threads.add(threading.current_thread().name)
+            return [
+                float(len(set(query.split()) & set(doc.split())))
+                for query, doc in pairs
+            ]
+
+        return score
+
+
+@pytest.mark.asyncio
+async def test_local_reranker_batches_and_ranks():
+    reranker = _KeywordReranker(batch_size=2, max_workers=2)
+    documents = [
+        "red apple",
+        "green pear",
+        "red apple pie recipe",
+        "apple",
+        "banana",
+    ]
+
+    results = await reranker.rerank("red apple pie", documents, top_n=3)
+    assert [r["index"] for r in results] == [2, 0, 3]
+    assert results[0]["relevance_score"] == 3.0
+    assert sorted(reranker.batches) == [1, 2, 2]
+    assert all(name.startswith("lightrag-rerank") for name in reranker.threads)
+
+    full = await reranker.rerank("banana", documents)
+    assert len(full) == len(documents) and full[0]["index"] == 4
+
+    stats = reranker.get_stats()
+    snapshot = metrics.registry.snapshot()
+    assert snapshot["histograms"][("lightrag_rerank_seconds", ())][2] >= 2
+    assert snapshot["values"][("lightrag_rerank_documents_total", ())] >= 10
+    assert stats["calls"] == 2
+    assert stats["documents"] == 10
+    assert stats["batches"] == 6
+    assert stats["max_seconds"] >= stats["avg_seconds"] > 0
+    assert await reranker.rerank("anything", []) == []
+    reranker.close()
+
+
+def test_logits_to_scores():
+    single = _logits_to_scores(np.array([[0.0], [100.0]]))
+    assert single[0] == pytest.approx(0.5) and single[1] == pytest.approx(1.0)
+    pair = _logits_to_scores(np.array([[0.0, 0.0], [-50.0, 50.0]]))
+    assert pair == pytest.approx([0.5, 1.0])
+
+    with pytest.raises(ValueError):
+        LocalCrossEncoderReranker("model", backend="tensorrt")
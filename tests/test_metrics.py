@@ -0,0 +1,178 @@
+# pytest tests/test_metrics.py -v
+
+import asyncio
+import multiprocessing
+
+import pytest
+
+from lightrag.kg.json_kv_impl import JsonKVStorage
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+from lightrag.metrics import (
+    MetricsRegistry,
+    collect_metrics,
+    instrument_storage,
+    label_key,
+    merge_snapshots,
+    publish_metrics,
+    registry,
+    render_metrics,
+)
+from lightrag.utils import (
+    CacheData,
+    handle_cache,
+    priority_limit_async_func_call,
+    save_to_cache,
+)
+
+pytestmark = pytest.mark.offline
+
+
+def _sample_registry(scale=1):
+    metrics = MetricsRegistry()
+    metrics.definitions = dict(registry.definitions)
+    hit = label_key(cache_type="extract", result="hit")
+    miss = label_key(cache_type="extract", result="miss")
+    metrics.inc("lightrag_llm_cache_requests_total", 3 * scale, hit)
+    metrics.inc("lightrag_llm_cache_requests_total", 1 * scale, miss)
+    metrics.inc("lightrag_queue_in_flight", 2, label_key(queue="LLM func"))
+    for seconds in (0.002, 0.02, 7.0):
+        metrics.observe(
+            "lightrag_queue_wait_seconds", seconds, label_key(queue="LLM func")
+        )
+    metrics.mark("lightrag_pipeline_chunks", 5 * scale)
+    return metrics
+
+
+def _series(text):
+    return dict(
+        line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#")
+    )
+
+
+def test_render_exposition_format():
+    metrics = _sample_registry()
+    text = render_metrics(merge_snapshots([metrics.snapshot()], 15, metrics), metrics)
+    series = _series(text)
+
+    assert "# TYPE lightrag_queue_wait_seconds histogram" in text
+    assert (
+        series['lightrag_queue_wait_seconds_bucket{queue="LLM func",le="0.0025"}']
+        == "1"
+    )
+    assert series['lightrag_queue_wait_seconds_bucket{queue="LLM func",le="10"}'] == "3"
+    assert (
+        series['lightrag_queue_wait_seconds_bucket{queue="LLM func",le="+Inf"}'] == "3"
+    )
+    assert series['lightrag_queue_wait_seconds_count{queue="LLM func"}'] == "3"
+    assert series['lightrag_queue_in_flight{queue="LLM func"}'] == "2"
+    assert series['lightrag_llm_cache_hit_ratio{cache_type="extract"}'] == "0.75"
+    assert "# TYPE lightrag_pipeline_chunks_total counter" in text
+    assert series["lightrag_pipeline_chunks_total"] == "5"
+    assert series["lightrag_pipeline_chunks_per_minute"] == "5"
+    assert series["lightrag_metrics_workers"] == "1"
+
+
+def test_merge_keeps_totals_of_stale_workers_but_not_their_gauges():
+    live = _sample_registry().snapshot()
+    exited = _sample_registry(scale=2).snapshot()
+    exited["time"] -= 60
+
+    merged = merge_snapshots([live, exited], stale_after=15)
+    in_flight = ("lightrag_queue_in_flight", label_key(queue="LLM func"))
+    hits = (
+        "lightrag_llm_cache_requests_total",
+        label_key(cache_type="extract", result="hit"),
+    )
+    waits = ("lightrag_queue_wait_seconds", label_key(queue="LLM func"))
+    assert merged["workers"] == 1
+    assert merged["values"][in_flight] == 2
+    assert merged["values"][hits] == 9
+    assert merged["histograms"][waits][2] == 6
+    assert merged["rates"][("lightrag_pipeline_chunks", ())] == 5
+
+
+def _worker_process(done):
+    metrics = _sample_registry(scale=10)
+    asyncio.run(publish_metrics(metrics))
+    done.set()
+
+
+@pytest.mark.asyncio
+async def test_metrics_aggregate_across_worker_processes():
+    initialize_share_data(workers=2)
+    try:
+        # Like Gunicorn with preload_app: the worker is forked after shared data setup
+        context = multiprocessing.get_context("fork")
+        done = context.Event()
+        worker = context.Process(target=_worker_process, args=(done,))
+        worker.start()
+        worker.join(timeout=30)
+        assert done.is_set()
+
+        metrics = _sample_registry()
+        series = _series(render_metrics(await collect_metrics(metrics), metrics))
+        assert series["lightrag_metrics_workers"] == "2"
+        assert series["lightrag_pipeline_chunks_total"] == "55"
+        assert series['lightrag_queue_in_flight{queue="LLM func"}'] == "4"
+        assert series['lightrag_llm_cache_hit_ratio{cache_type="extract"}'] == "0.75"
+    finally:
+        finalize_share_data()
+
+
+@pytest.mark.asyncio
+async def test_queue_cache_and_storage_metrics_are_recorded(tmp_path):
+    registry.reset()
+    queue = label_key(queue="Test func")
+
+    @priority_limit_async_func_call(1, queue_name="Test func")
+    async def slow(value):
+        await asyncio.sleep(0.01)
+        return value
+
+    assert await asyncio.gather(slow(1), slow(2), slow(3)) == [1, 2, 3]
+    await slow.shutdown()
+    snapshot = registry.snapshot()
+    assert snapshot["values"][("lightrag_queue_depth", queue)] == 0
+    assert snapshot["values"][("lightrag_queue_in_flight", queue)] == 0
+    assert snapshot["histograms"][("lightrag_queue_wait_seconds", queue)][2] == 3
+
+    initialize_share_data()
+    try:
+        cache = JsonKVStorage(
+            namespace="llm_response_cache",
+            workspace="metrics",
+            global_config={"working_dir": str(tmp_path), "enable_llm_cache": True},
+            embedding_func=None,
+        )
+        await cache.initialize()
+        instrument_storage(cache)
+
+        assert await handle_cache(cache, "h1", "prompt", "mix", "query") is None
+        await save_to_cache(
+            cache,
+            CacheData(args_hash="h1", content="answer", prompt="prompt", mode="mix"),
+        )
+        hit = await handle_cache(cache, "h1", "prompt", "mix", "query")
+        assert hit[0] == "answer"
+    finally:
+        finalize_share_data()
+
+    snapshot = registry.snapshot()
+
+    def value(name, **labels):
+        return snapshot["values"][(name, label_key(**labels))]
+
+    requests = "lightrag_llm_cache_requests_total"
+    assert value(requests, cache_type="query", result="hit") == 1
+    assert value(requests, cache_type="query", result="miss") == 1
+    assert value("lightrag_llm_cache_writes_total", cache_type="query") == 1
+    get_by_id = label_key(
+        kind="kv",
+        namespace="llm_response_cache",
+        backend="JsonKVStorage",
+        operation="get_by_id",
+    )
+    latency = snapshot["histograms"][("lightrag_storage_operation_seconds", get_by_id)]
+    # Two lookups plus the duplicate check of save_to_cache
+    assert latency[2] == 3
+    registry.reset()
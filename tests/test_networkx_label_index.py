@@ -0,0 +1,151 @@
+# pytest tests/test_networkx_label_index.py -v
+
+import json
+import random
+import sys
+
+import pytest
+
+from lightrag.kg.networkx_impl import NetworkXStorage
+from lightrag.kg.shared_storage import initialize_share_data
+
+pytestmark = pytest.mark.offline
+
+
+def _reference_search(graph, query, limit=50):
+    """Full-scan scoring identical to the original search_labels implementation"""
+    query_lower = query.lower().strip()
+    if not query_lower:
+        return []
+    matches = []
+    for node in graph.nodes():
+        node_str = str(node)
+        node_lower = node_str.lower()
+        if query_lower not in node_lower:
+            continue
+        if node_lower == query_lower:
+            score = 1000
+        elif node_lower.startswith(query_lower):
+            score = 500
+        else:
+            score = 100 - len(node_str)
+            if f" {query_lower}" in node_lower or f"_{query_lower}" in node_lower:
+                score += 50
+        matches.append((node_str, score))
+    matches.sort(key=lambda x: (-x[1], x[0]))
+    return [m[0] for m in matches[:limit]]
+
+
+def _reference_popular(graph, limit):
+    degrees = dict(graph.degree())
+    ordered = sorted(degrees.items(), key=lambda x: x[1], reverse=True)
+    return [str(node) for node, _ in ordered[:limit]]
+
+
+@pytest.fixture
+async def storage(tmp_path):
+    initialize_share_data()
+    graph_storage = NetworkXStorage(
+        namespace="chunk_entity_relation",
+        workspace=f"labels_{tmp_path.name}",
+        global_config={"working_dir": str(tmp_path), "max_graph_nodes": 1000},
+        embedding_func=None,
+    )
+    await graph_storage.initialize()
+    return graph_storage
+
+
+@pytest.mark.asyncio
+async def test_search_and_popular_follow_mutations(storage):
+    rng = random.Random(7)
+    words = ["Apple", "Banana", "Cherry", "apple pie", "Green_Apple", "AI", "Pineapple"]
+    names = [f"{rng.choice(words)} {i}" for i in range(150)] + words
+
+    for name in names:
+        await storage.upsert_node(name, {"entity_id": name})
+    # Build the index before further mutations so incremental updates are exercised
+    assert await storage.search_labels("apple") == _reference_search(
+        storage._graph, "apple"
+    )
+
+    for _ in range(400):
+        src, tgt = rng.sample(names, 2)
+        await storage.upsert_edge(src, tgt, {"weight": "1.0"})
+    await storage.upsert_edge("Orphan edge A", "Orphan edge B", {"weight": "1.0"})
+    await storage.delete_node(names[3])
+    await storage.remove_nodes(names[10:20])
+    edges = list(storage._graph.edges())[:30]
+    await storage.remove_edges(edges)
+
+    graph = storage._graph
+    for query in ["apple", "APPLE PIE", "ai", "an", "orphan", "zzz", "e 1", " "]:
+        assert await storage.search_labels(query, limit=20) == _reference_search(
+            graph, query, limit=20
+        ), query
+
+    for limit in (1, 5, 50, 1000):
+        assert await storage.get_popular_labels(limit) == _reference_popular(
+            graph, limit
+        )
+
+
+@pytest.mark.asyncio
+async def test_index_rebuilt_after_drop(storage):
+    await storage.upsert_node("Alpha Node", {"entity_id": "Alpha Node"})
+    assert await storage.search_labels("alpha") == ["Alpha Node"]
+
+    await storage.drop()
+    assert await storage.search_labels("alpha") == []
+    assert await storage.get_popular_labels(10) == []
+
+    await storage.upsert_node("Alphabet", {"entity_id": "Alphabet"})
+    assert await storage.search_labels("alpha") == ["Alphabet"]
+
+
+@pytest.mark.asyncio
+async def test_knowledge_graph_cache_follows_mutations(storage):
+    for i in range(30):
+        await storage.upsert_node(f"N{i}", {"entity_id": f"N{i}"})
+    for i in range(1, 30):
+        await storage.upsert_edge(f"N{i // 3}", f"N{i}", {"weight": "1.0"})
+
+    top = await storage.get_knowledge_graph("*", max_nodes=5)
+    assert {n.id for n in top.nodes} == set(_reference_popular(storage._graph, 5))
+    assert top.is_truncated
+    # Unchanged graph reuses the cached response
+    assert await storage.get_knowledge_graph("*", max_nodes=5) is top
+
+    bfs = await storage.get_knowledge_graph("N1", max_depth=1)
+    assert {n.id for n in bfs.nodes} == {"N0", "N1", "N3", "N4", "N5"}
+
+    await storage.upsert_edge("N1", "N29", {"weight": "1.0"})
+    updated = await storage.get_knowledge_graph("N1", max_depth=1)
+    assert updated is not bfs
+    assert "N29" in {n.id for n in updated.nodes}
+
+
+def test_streamed_graph_json_matches_model(monkeypatch):
+    # The API package parses command line arguments on import
+    monkeypatch.setattr(sys, "argv", ["pytest_runner"])
+    from lightrag.api.routers.graph_routes import iter_knowledge_graph_json
+    from lightrag.types import KnowledgeGraph, KnowledgeGraphEdge, KnowledgeGraphNode
+
+    graph = KnowledgeGraph(
+        nodes=[
+            KnowledgeGraphNode(id=f"n{i}", labels=[f"n{i}"], properties={"i": i})
+            for i in range(7)
+        ],
+        edges=[
+            KnowledgeGraphEdge(
+                id="n0-n1", type="DIRECTED", source="n0", target="n1", properties={}
+            )
+        ],
+        is_truncated=True,
+    )
+    body = "".join(iter_knowledge_graph_json(graph, batch_size=3))
+    assert json.loads(body) == json.loads(graph.model_dump_json())
+    assert json.loads("".join(iter_knowledge_graph_json(KnowledgeGraph()))) == {
+        "nodes": [],
+        "edges": [],
+        "is_truncated": False,
+    }
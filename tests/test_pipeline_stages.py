@@ -0,0 +1,52 @@
+# pytest tests/test_pipeline_stages.py -v
+
+import asyncio
+
+import pytest
+
+from lightrag.progress import PipelineStages
+
+pytestmark = pytest.mark.offline
+
+
+@pytest.mark.asyncio
+async def test_stages_bound_workers_and_report_queue_depth():
+    status: dict = {}
+    stages = PipelineStages(
+        {"chunk": 2, "extract": 1},
+        max_inflight=3,
+        pipeline_status=status,
+        pipeline_status_lock=asyncio.Lock(),
+    )
+    peak = {"chunk": 0, "extract": 0, "inflight": 0}
+    release_extract = asyncio.Event()
+
+    async def document():
+        async with stages.admit():
+            peak["inflight"] = max(peak["inflight"], stages.inflight)
+            async with stages.slot("chunk"):
+                peak["chunk"] = max(peak["chunk"], stages.stages["chunk"].active)
+                await asyncio.sleep(0)
+            async with stages.slot("extract"):
+                peak["extract"] = max(peak["extract"], stages.stages["extract"].active)
+                await release_extract.wait()
+
+    tasks = [asyncio.create_task(document()) for _ in range(5)]
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+    # One document is extracting, two wait for the LLM stage, two wait for admission
+    snapshot = status["stages"]
+    assert snapshot["extract"]["active"] == 1
+    assert snapshot["extract"]["queued"] == 2
+    assert snapshot["admission"] == {"max_inflight": 3, "inflight": 3, "waiting": 2}
+
+    release_extract.set()
+    await asyncio.gather(*tasks)
+
+    assert peak == {"chunk": 2, "extract": 1, "inflight": 3}
+    final = status["stages"]
+    assert final["chunk"]["completed"] == final["extract"]["completed"] == 5
+    assert final["extract"]["max_queued"] >= 2
+    assert final["admission"]["inflight"] == 0
+    assert 0 < final["extract"]["utilization"] <= 1
@@ -0,0 +1,175 @@
+# pytest tests/test_profiling.py -v
+
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+from lightrag.profiling import ProfilerController, SamplingProfiler, profile_stage
+
+pytestmark = pytest.mark.offline
+
+_original_argv = sys.argv
+sys.argv = ["pytest_runner"]
+from lightrag.api import utils_api  # noqa: E402
+from lightrag.api.auth import auth_handler  # noqa: E402
+
+sys.argv = _original_argv
+
+
+def _burn(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(200))
+    return total
+
+
+@profile_stage("merge")
+async def _merge_step(rounds):
+    for _ in range(rounds):
+        _burn(0.02)
+        await asyncio.sleep(0)
+
+
+@profile_stage("extract")
+async def _extract_step(rounds):
+    for _ in range(rounds):
+        _burn(0.02)
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_samples_carry_the_stage_of_the_running_task():
+    profiler = SamplingProfiler(interval=0.002)
+    profiler.start()
+    # Interleaved tasks: each sample must be labelled by the task actually running
+    await asyncio.gather(_merge_step(10), _extract_step(10))
+    profile = profiler.stop()
+
+    stages = profile.stages()
+    assert stages["merge"] > 5 and stages["extract"] > 5
+    for (stage, _, stack), _ in profile.samples.items():
+        names = {code.co_name for code in stack}
+        if stage == "merge":
+            assert "_merge_step" in names and "_extract_step" not in names
+        elif stage == "extract":
+            assert "_extract_step" in names and "_merge_step" not in names
+
+    collapsed = profile.collapsed().splitlines()
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed)
+    assert any(
+        line.startswith("[merge];thread:MainThread;")
+        and "_burn (test_profiling.py" in line
+        for line in collapsed
+    )
+
+    speedscope = profile.speedscope()
+    sampled = speedscope["profiles"][0]
+    assert sampled["type"] == "sampled"
+    assert len(sampled["samples"]) == len(sampled["weights"]) == len(profile.samples)
+    frames = speedscope["shared"]["frames"]
+    assert {"name": "[extract]"} in frames
+    assert max(i for sample in sampled["samples"] for i in sample) < len(frames)
+
+
+def _profiled_worker(output_dir, ready, stop):
+    async def main():
+        controller = ProfilerController(output_dir, poll_interval=0.05)
+        runner = asyncio.create_task(controller.run())
+        ready.set()
+        while not stop.is_set():
+            await _merge_step(5)
+        runner.cancel()
+
+    asyncio.run(main())
+
+
+@pytest.mark.asyncio
+async def test_session_runs_in_the_chosen_worker(tmp_path):
+    output_dir = str(tmp_path / "profiles")
+    # Shared data left single-process by an earlier test would not reach the worker
+    finalize_share_data()
+    initialize_share_data(workers=2)
+    context = multiprocessing.get_context("fork")
+    ready, stop = context.Event(), context.Event()
+    worker = context.Process(target=_profiled_worker, args=(output_dir, ready, stop))
+    try:
+        worker.start()
+        assert ready.wait(10)
+        controller = ProfilerController(output_dir, poll_interval=0.05)
+        deadline = time.time() + 15
+        while worker.pid not in {w["pid"] for w in await controller.workers()}:
+            assert time.time() < deadline
+            await asyncio.sleep(0.05)
+
+        with pytest.raises(LookupError):
+            await controller.start(1.0, worker=worker.pid + 100000)
+        session = await controller.start(0.5, worker=worker.pid, interval=0.002)
+        assert session["status"] == "requested" and session["pid"] == worker.pid
+        with pytest.raises(RuntimeError):
+            await controller.start(0.5, worker=worker.pid)
+
+        deadline = time.time() + 15
+        while (await controller.get(session["session_id"]))["status"] != "completed":
+            assert time.time() < deadline
+            await asyncio.sleep(0.05)
+
+        session = await controller.get(session["session_id"])
+        assert session["samples"] > 0 and "merge" in session["stages"]
+        path = controller.output_path(session["session_id"], "speedscope")
+        with open(path, encoding="utf-8") as f:
+            assert json.load(f)["profiles"][0]["samples"]
+        assert os.path.exists(
+            controller.output_path(session["session_id"], "collapsed")
+        )
+    finally:
+        stop.set()
+        worker.join(timeout=10)
+        finalize_share_data()
+
+
+@pytest.mark.asyncio
+async def test_local_session_can_be_stopped_early(tmp_path):
+    initialize_share_data()
+    try:
+        controller = ProfilerController(str(tmp_path))
+        session = await controller.start(60, interval=0.002)
+        assert session["status"] == "running"
+        await _extract_step(5)
+        session = await controller.stop(session["session_id"])
+        assert session["status"] == "completed"
+        assert session["stages"].get("extract", 0) > 0
+        assert (await controller.list())[0]["session_id"] == session["session_id"]
+    finally:
+        finalize_share_data()
+
+
+def test_profiling_requires_admin(monkeypatch):
+    app = FastAPI()
+
+    @app.get("/admin", dependencies=[Depends(utils_api.get_admin_auth_dependency("k"))])
+    async def admin_only():
+        return {"ok": True}
+
+    monkeypatch.setattr(utils_api, "auth_configured", True)
+    monkeypatch.setattr(utils_api, "admin_accounts", {"admin"})
+    client = TestClient(app)
+
+    def bearer(username, role="user"):
+        token = auth_handler.create_token(username, role=role)
+        return {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/admin", headers={"X-API-Key": "k"}).status_code == 200
+    assert client.get("/admin", headers=bearer("admin")).status_code == 200
+    assert client.get("/admin", headers=bearer("user1")).status_code == 403
+    assert client.get("/admin", headers=bearer("admin", "guest")).status_code == 403
+    assert client.get("/admin", headers={"X-API-Key": "wrong"}).status_code == 403
+    assert client.get("/admin").status_code == 403
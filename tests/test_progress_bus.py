@@ -0,0 +1,123 @@
+# pytest tests/test_progress_bus.py -v
+
+import asyncio
+
+import pytest
+
+from lightrag.kg.shared_storage import initialize_share_data
+from lightrag.progress import (
+    DocProgressReporter,
+    ProgressStage,
+    get_track_progress,
+    publish_pending_docs,
+    watch_track_progress,
+)
+
+pytestmark = pytest.mark.offline
+
+
+class _StatusDoc:
+    def __init__(self, track_id, file_path):
+        self.track_id = track_id
+        self.file_path = file_path
+
+
+@pytest.fixture(autouse=True)
+def shared_data():
+    initialize_share_data()
+
+
+@pytest.mark.asyncio
+async def test_stage_and_chunk_counters():
+    workspace = "progress_ws_1"
+    await publish_pending_docs(
+        workspace,
+        {
+            "doc-a": _StatusDoc("track-1", "a.txt"),
+            "doc-b": _StatusDoc("track-1", "b.txt"),
+        },
+    )
+
+    payload = await get_track_progress(workspace, "track-1")
+    assert payload["total_docs"] == 2
+    assert payload["stage_counts"] == {ProgressStage.PENDING: 2}
+    assert payload["finished"] is False
+
+    reporter = DocProgressReporter(workspace, "track-1", "doc-a", "a.txt")
+    await reporter.stage(ProgressStage.EXTRACTING, chunks_total=4)
+    await reporter.chunk_done()
+    await reporter.chunk_done()
+
+    payload = await get_track_progress(workspace, "track-1")
+    doc_a = next(d for d in payload["documents"] if d["doc_id"] == "doc-a")
+    assert doc_a["stage"] == ProgressStage.EXTRACTING
+    assert doc_a["chunks_done"] == 2
+    assert doc_a["chunks_total"] == 4
+    assert doc_a["eta_seconds"] is not None
+
+
+@pytest.mark.asyncio
+async def test_unknown_track_and_missing_track_id():
+    workspace = "progress_ws_2"
+    assert await get_track_progress(workspace, "nope") is None
+
+    # Documents without track_id are silently ignored
+    reporter = DocProgressReporter(workspace, None, "doc-x")
+    await reporter.stage(ProgressStage.CHUNKING)
+    assert await get_track_progress(workspace, "None") is None
+
+
+@pytest.mark.asyncio
+async def test_watch_stops_when_track_finished():
+    workspace = "progress_ws_3"
+    await publish_pending_docs(workspace, {"doc-a": _StatusDoc("track-3", "a.txt")})
+    reporter = DocProgressReporter(workspace, "track-3", "doc-a", "a.txt")
+
+    received = []
+
+    async def consume():
+        async for payload in watch_track_progress(
+            workspace, "track-3", poll_interval=0.05
+        ):
+            if payload is not None:
+                received.append(payload)
+
+    consumer = asyncio.create_task(consume())
+    await asyncio.sleep(0.01)
+    await reporter.stage(ProgressStage.EXTRACTING, chunks_total=1)
+    await reporter.chunk_done()
+    await reporter.stage(ProgressStage.MERGING)
+    await reporter.stage(ProgressStage.PROCESSED)
+    await asyncio.wait_for(consumer, timeout=2)
+
+    assert received[-1]["finished"] is True
+    assert received[-1]["eta_seconds"] == 0.0
+    assert received[-1]["stage_counts"] == {ProgressStage.PROCESSED: 1}
+
+
+@pytest.mark.asyncio
+async def test_watch_stops_when_pending_track_is_idle():
+    workspace = "progress_ws_4"
+    await publish_pending_docs(workspace, {"doc-a": _StatusDoc("track-4", "a.txt")})
+    busy = [True]
+
+    async def is_busy():
+        return busy[0]
+
+    received = []
+
+    async def consume():
+        async for payload in watch_track_progress(
+            workspace, "track-4", poll_interval=0.02, idle_timeout=0.05, is_busy=is_busy
+        ):
+            received.append(payload)
+
+    consumer = asyncio.create_task(consume())
+    # A busy pipeline may still pick the pending document up
+    await asyncio.sleep(0.2)
+    assert not consumer.done()
+
+    busy[0] = False
+    await asyncio.wait_for(consumer, timeout=2)
+    assert received[0]["stage_counts"] == {ProgressStage.PENDING: 1}
+    assert all(payload is None for payload in received[1:])
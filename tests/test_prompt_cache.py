@@ -0,0 +1,109 @@
+# pytest tests/test_prompt_cache.py -v
+
+import pytest
+
+from lightrag.operate import _format_response_prompt
+from lightrag.prompt import PROMPTS
+from lightrag.utils import (
+    CachedPrompt,
+    TokenTracker,
+    _sanitize_prompt,
+    split_cached_prompt,
+)
+
+pytestmark = pytest.mark.offline
+
+RESPONSE_VALUES = dict(
+    response_type="Multiple Paragraphs",
+    user_prompt="n/a",
+    feedback_context="",
+)
+
+
+def test_cached_prompt_is_a_plain_string():
+    prompt = CachedPrompt("static\n", "dynamic")
+    assert prompt == "static\ndynamic"
+    assert isinstance(prompt, str)
+    assert split_cached_prompt(prompt) == ("static\n", "dynamic")
+    assert split_cached_prompt("plain") == ("", "plain")
+
+
+def test_response_prompts_start_with_identical_static_prefix():
+    first = _format_response_prompt(
+        "rag_response", context_data="context one", **RESPONSE_VALUES
+    )
+    second = _format_response_prompt(
+        "rag_response",
+        context_data="context two",
+        **{**RESPONSE_VALUES, "feedback_context": "liked: short answers"},
+    )
+    assert first.static_prefix == second.static_prefix == PROMPTS["rag_response_static"]
+    assert "context one" not in first.static_prefix
+    # The combined template still formats to the same text for custom callers
+    assert first == PROMPTS["rag_response"].format(
+        context_data="context one", **RESPONSE_VALUES
+    )
+
+    naive = _format_response_prompt(
+        "naive_rag_response", content_data="chunks", **RESPONSE_VALUES
+    )
+    assert naive.static_prefix == PROMPTS["naive_rag_response_static"]
+    assert naive.endswith("chunks\n")
+
+
+def test_custom_response_template_is_formatted_as_given():
+    prompt = _format_response_prompt(
+        "rag_response",
+        "Answer as {response_type}: {context_data}",
+        context_data="ctx",
+        **RESPONSE_VALUES,
+    )
+    assert prompt == "Answer as Multiple Paragraphs: ctx"
+    assert split_cached_prompt(prompt)[0] == ""
+
+
+def test_static_prompt_parts_have_no_per_query_placeholders():
+    for name in ("rag_response_static", "naive_rag_response_static"):
+        assert "{" not in PROMPTS[name]
+    static = PROMPTS["entity_extraction_system_prompt_static"]
+    assert "{input_text}" not in static
+    assert PROMPTS["entity_extraction_system_prompt"] == (
+        static + PROMPTS["entity_extraction_system_prompt_dynamic"]
+    )
+
+
+def test_sanitizing_keeps_the_static_prefix():
+    prompt = CachedPrompt("\n  instructions\n\n", "input \x00text\n")
+    safe = _sanitize_prompt(prompt)
+    assert safe == "instructions\n\ninput text"
+    assert safe.static_prefix == "instructions"
+
+
+def test_token_tracker_reports_cached_tokens():
+    tracker = TokenTracker()
+    tracker.add_usage(
+        {"prompt_tokens": 1200, "completion_tokens": 100, "cached_tokens": 1024}
+    )
+    tracker.add_usage(
+        {"prompt_tokens": 1200, "completion_tokens": 80, "cache_write_tokens": 1024}
+    )
+    usage = tracker.get_usage()
+    assert usage["cached_tokens"] == 1024
+    assert usage["cache_write_tokens"] == 1024
+    assert usage["total_tokens"] == 2580
+    assert "Cached prompt tokens: 1024" in str(tracker)
+
+
+def test_openai_cache_control_marker_is_opt_in():
+    pytest.importorskip("openai")
+    from lightrag.llm.openai import _system_message
+
+    prompt = CachedPrompt("static", "dynamic")
+    assert _system_message(prompt, prompt_cache=False)["content"] == "staticdynamic"
+    parts = _system_message(prompt, prompt_cache=True)["content"]
+    assert parts[0] == {
+        "type": "text",
+        "text": "static",
+        "cache_control": {"type": "ephemeral"},
+    }
+    assert parts[1] == {"type": "text", "text": "dynamic"}
@@ -0,0 +1,63 @@
+# pytest tests/test_query_config.py -v
+
+import numpy as np
+import pytest
+
+from lightrag import LightRAG
+from lightrag.base import QueryContext
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+from lightrag.utils import EmbeddingFunc, Tokenizer
+
+pytestmark = pytest.mark.offline
+
+
+class _CharTokenizer:
+    def encode(self, content: str) -> list[int]:
+        return [ord(ch) for ch in content]
+
+    def decode(self, tokens: list[int]) -> str:
+        return "".join(chr(t) for t in tokens)
+
+
+async def _llm(prompt, system_prompt=None, history_messages=[], **kwargs):
+    return ""
+
+
+async def _embedding(texts: list[str]) -> np.ndarray:
+    return np.zeros((len(texts), 8))
+
+
+@pytest.fixture
+def rag(tmp_path):
+    initialize_share_data()
+    yield LightRAG(
+        working_dir=str(tmp_path),
+        workspace="config_view",
+        llm_model_func=_llm,
+        embedding_func=EmbeddingFunc(embedding_dim=8, func=_embedding),
+        tokenizer=Tokenizer("char-tokenizer", _CharTokenizer()),
+    )
+    finalize_share_data()
+
+
+def test_config_view_is_cached_read_only_and_refreshed(rag):
+    view = rag.config_view
+    assert rag.config_view is view
+    assert view["top_k"] == rag.top_k
+    assert view["addon_params"] is rag.addon_params  # shared, not deep-copied
+    with pytest.raises(TypeError):
+        view["top_k"] = 1
+
+    rag.top_k = 7
+    refreshed = rag.config_view
+    assert refreshed is not view and refreshed["top_k"] == 7
+
+
+def test_query_config_layers_request_state(rag):
+    context = QueryContext(query_id="q-1", feedback_context="be concise")
+    config = rag.query_config(context)
+
+    assert config["feedback_context"] == "be concise"
+    assert config["query_id"] == "q-1"
+    assert config["top_k"] == rag.top_k
+    assert "feedback_context" not in rag.config_view
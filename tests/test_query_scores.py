@@ -148,3 +148,74 @@ def test_score_fallback(client, mock_rag):
     # 【修正】验证列表
     assert isinstance(scores, list)
     assert scores == [0.5]
+
+
+def _stream_events(response):
+    import json
+
+    return [json.loads(line) for line in response.text.splitlines() if line.strip()]
+
+
+def test_stream_emits_context_before_scored_references(client, mock_rag):
+    """
+    测试场景 4: 流式输出事件顺序
+    预期: context_ready 先于 token 发送，打分后的 references 作为后续事件到达
+    """
+
+    async def tokens():
+        yield "Hello"
+        yield " world"
+
+    mock_rag.aquery_llm.return_value = {
+        "status": "success",
+        "query_id": "q-1",
+        "data": {
+            "chunks": [{"reference_id": "doc_1", "content": "Content", "score": 0.88}],
+            "references": [{"reference_id": "doc_1", "file_path": "test.pdf"}],
+        },
+        "llm_response": {"is_streaming": True, "response_iterator": tokens()},
+    }
+
+    payload = {"query": "test", "mode": "naive", "include_references": True}
+    response = client.post("/query/stream", json=payload)
+
+    assert response.status_code == 200
+    events = _stream_events(response)
+    kinds = [event["event"] for event in events]
+
+    assert kinds[0] == "context_ready"
+    assert events[0]["query_id"] == "q-1"
+    assert "scores" not in events[0]["references"][0]
+    assert kinds.count("token") == 2
+    assert kinds[-1] == "done"
+    scored = events[kinds.index("references")]["references"]
+    assert scored[0]["scores"] == [0.88]
+    assert "".join(e["response"] for e in events if e["event"] == "token") == (
+        "Hello world"
+    )
+
+
+def test_stream_without_references_skips_scoring(client, mock_rag):
+    """
+    测试场景 5: 不需要引用时
+    预期: 不计算向量，也不发送 references 事件
+    """
+
+    async def tokens():
+        yield "Hi"
+
+    mock_rag.aquery_llm.return_value = {
+        "status": "success",
+        "data": {
+            "chunks": [{"reference_id": "doc_2", "content": "Graph", "score": None}],
+            "references": [{"reference_id": "doc_2", "file_path": "graph.pdf"}],
+        },
+        "llm_response": {"is_streaming": True, "response_iterator": tokens()},
+    }
+
+    payload = {"query": "test", "mode": "hybrid", "include_references": False}
+    response = client.post("/query/stream", json=payload)
+
+    kinds = [event["event"] for event in _stream_events(response)]
+    assert kinds == ["context_ready", "token", "done"]
+    mock_rag.embedding_func.assert_not_called()
@@ -0,0 +1,150 @@
+# pytest tests/test_query_tracing.py -v
+
+import asyncio
+
+import pytest
+
+from lightrag import LightRAG, QueryParam
+from lightrag.tools.benchmark_retrieval import (
+    HashEmbedder,
+    WhitespaceTokenizer,
+    build_corpus,
+    fake_llm,
+    fake_rerank,
+)
+from lightrag.tracing import attach_timings, current_trace, query_trace, trace_span
+from lightrag.utils import EmbeddingFunc, Tokenizer, priority_limit_async_func_call
+
+pytestmark = pytest.mark.offline
+
+
+def test_trace_span_is_a_noop_without_a_trace():
+    assert current_trace() is None
+    assert trace_span("search") is trace_span("rerank")
+    with query_trace(False) as trace:
+        assert trace is None and current_trace() is None
+    result = {"status": "success", "metadata": {}}
+    attach_timings(result, None)
+    assert result["metadata"] == {}
+
+
+@pytest.mark.asyncio
+async def test_nested_and_concurrent_spans_keep_their_parents():
+    async def lookup(name):
+        with trace_span("vector_query", storage=name):
+            await asyncio.sleep(0.01)
+
+    with query_trace(True, mode="hybrid") as trace:
+        with trace_span("search"):
+            await asyncio.gather(lookup("entities"), lookup("relationships"))
+        with trace_span("build_context"):
+            pass
+    assert current_trace() is None
+
+    result = {"status": "success", "metadata": {"query_mode": "hybrid"}}
+    attach_timings(result, trace)
+    timings = result["metadata"]["timings"]
+    assert result["metadata"]["query_mode"] == "hybrid"
+    assert [s["name"] for s in timings["spans"]] == [
+        "search",
+        "vector_query",
+        "vector_query",
+        "build_context",
+    ]
+    assert [s["parent"] for s in timings["spans"]] == [None, "search", "search", None]
+    assert timings["spans"][1]["attributes"] == {"storage": "entities"}
+    # Concurrent lookups overlap, the stage total is their sum
+    assert timings["stages"]["vector_query"] >= 20
+    assert timings["stages"]["search"] < timings["stages"]["vector_query"]
+    assert timings["total_ms"] >= timings["stages"]["search"]
+
+
+@pytest.mark.asyncio
+async def test_queue_wait_is_recorded_under_the_calling_stage():
+    @priority_limit_async_func_call(1, queue_name="LLM func")
+    async def llm(prompt):
+        await asyncio.sleep(0.02)
+        return prompt
+
+    await llm("warm up")
+    with query_trace(True) as trace:
+        other = asyncio.create_task(llm("other request"))
+        await asyncio.sleep(0)
+        with trace_span("llm"):
+            await llm("query")
+        await other
+    await llm.shutdown()
+
+    spans = trace.timings()["spans"]
+    waits = [s for s in spans if s["name"] == "LLM func wait"]
+    assert [s["parent"] for s in waits] == [None, "llm"]
+    # The query waited for the request ahead of it in the queue
+    assert waits[1]["duration_ms"] >= 10
+
+
+async def _make_rag(tmp_path, **kwargs):
+    embedder = HashEmbedder()
+    rag = LightRAG(
+        working_dir=str(tmp_path),
+        workspace="tracing",
+        llm_model_func=fake_llm,
+        embedding_func=EmbeddingFunc(
+            embedding_dim=embedder.dim, max_token_size=8192, func=embedder
+        ),
+        tokenizer=Tokenizer("whitespace", WhitespaceTokenizer()),
+        rerank_model_func=fake_rerank,
+        vector_db_storage_cls_kwargs={"cosine_better_than_threshold": 0.0},
+        enable_llm_cache=False,
+        **kwargs,
+    )
+    await rag.initialize_storages()
+    await build_corpus(rag, 80)
+    return rag
+
+
+@pytest.mark.asyncio
+async def test_query_results_carry_stage_timings(tmp_path):
+    rag = await _make_rag(tmp_path)
+    try:
+        query = "How does Aurora-000003 handle solar power?"
+        data = await rag.aquery_data(query, QueryParam(mode="mix"))
+        assert data["status"] == "success"
+        timings = data["metadata"]["timings"]
+        for stage in (
+            "keywords",
+            "search",
+            "query_embedding",
+            "vector_query",
+            "graph",
+            "truncation",
+            "merge_chunks",
+            "rerank",
+            "build_context",
+        ):
+            assert stage in timings["stages"], stage
+        assert "llm" not in timings["stages"]
+        storages = {
+            s["attributes"]["storage"]
+            for s in timings["spans"]
+            if s["name"] == "vector_query"
+        }
+        assert storages == {"entities", "relationships", "chunks"}
+
+        answer = await rag.aquery_llm(query, QueryParam(mode="naive"))
+        stages = answer["metadata"]["timings"]["stages"]
+        assert {"search", "vector_query", "build_context", "llm"} <= set(stages)
+        assert "LLM func wait" in stages
+        assert current_trace() is None
+    finally:
+        await rag.finalize_storages()
+
+
+@pytest.mark.asyncio
+async def test_tracing_can_be_disabled(tmp_path):
+    rag = await _make_rag(tmp_path, enable_query_tracing=False)
+    try:
+        data = await rag.aquery_data("solar power", QueryParam(mode="naive"))
+        assert data["status"] == "success"
+        assert "timings" not in data["metadata"]
+    finally:
+        await rag.finalize_storages()
@@ -0,0 +1,95 @@
+# pytest tests/test_rerank_cache.py -v
+
+import pytest
+
+from lightrag import utils
+from lightrag.utils import apply_rerank_if_enabled, invalidate_rerank_cache
+
+pytestmark = pytest.mark.offline
+
+
+class _CountingReranker:
+    """Scores documents by the number in their text and records what was sent"""
+
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    async def __call__(self, query, documents, top_n=None):
+        self.calls.append(list(documents))
+        results = [
+            {"index": i, "relevance_score": float(doc.split()[-1]) / 10}
+            for i, doc in enumerate(documents)
+        ]
+        results.sort(key=lambda r: -r["relevance_score"])
+        return results[:top_n] if top_n else results
+
+
+def _chunks(*numbers, score=None):
+    return [
+        {"chunk_id": f"chunk-{n}", "content": f"text {n}", "score": score}
+        for n in numbers
+    ]
+
+
+def _config(tmp_path, reranker, **overrides):
+    config = {
+        "working_dir": str(tmp_path),
+        "workspace": "rerank",
+        "rerank_model_func": reranker,
+        "rerank_cache_ttl": 60,
+        "rerank_cache_size": 100,
+    }
+    config.update(overrides)
+    return config
+
+
+@pytest.mark.asyncio
+async def test_only_unseen_candidates_are_reranked(tmp_path):
+    reranker = _CountingReranker()
+    config = _config(tmp_path, reranker)
+
+    first = await apply_rerank_if_enabled("q", _chunks(1, 5, 3), config, top_n=2)
+    assert [c["chunk_id"] for c in first] == ["chunk-5", "chunk-3"]
+    assert [c["rerank_score"] for c in first] == [0.5, 0.3]
+
+    second = await apply_rerank_if_enabled("q", _chunks(3, 7, 1), config, top_n=2)
+    assert [c["chunk_id"] for c in second] == ["chunk-7", "chunk-3"]
+    assert reranker.calls[1] == ["text 7"]
+
+    # A different query does not reuse scores
+    await apply_rerank_if_enabled("other", _chunks(1), config)
+    assert reranker.calls[2] == ["text 1"]
+
+    # Corpus changes drop every cached score
+    invalidate_rerank_cache(str(tmp_path), "rerank")
+    await apply_rerank_if_enabled("q", _chunks(1, 3), config)
+    assert reranker.calls[3] == ["text 1", "text 3"]
+
+
+@pytest.mark.asyncio
+async def test_cache_entries_expire(tmp_path, monkeypatch):
+    reranker = _CountingReranker()
+    config = _config(tmp_path, reranker, workspace="expiry")
+    now = [1000.0]
+    monkeypatch.setattr(utils.time, "monotonic", lambda: now[0])
+
+    await apply_rerank_if_enabled("q", _chunks(1), config)
+    await apply_rerank_if_enabled("q", _chunks(1), config)
+    assert len(reranker.calls) == 1
+
+    now[0] += 61
+    await apply_rerank_if_enabled("q", _chunks(1), config)
+    assert len(reranker.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_low_vector_scores_are_prefiltered(tmp_path):
+    reranker = _CountingReranker()
+    config = _config(
+        tmp_path, reranker, rerank_cache_ttl=0, rerank_min_vector_score=0.5
+    )
+    docs = _chunks(1, score=0.9) + _chunks(2, score=0.1) + _chunks(3)
+
+    reranked = await apply_rerank_if_enabled("q", docs, config)
+    assert reranker.calls == [["text 1", "text 3"]]
+    assert [c["chunk_id"] for c in reranked] == ["chunk-3", "chunk-1"]
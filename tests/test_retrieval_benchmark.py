@@ -0,0 +1,55 @@
+# pytest tests/test_retrieval_benchmark.py -v
+
+import copy
+
+import pytest
+
+from lightrag.tools.benchmark_retrieval import (
+    STAGES,
+    benchmark_backend,
+    compare_reports,
+)
+
+pytestmark = pytest.mark.offline
+
+
+@pytest.mark.asyncio
+async def test_stage_latencies_are_reported_per_mode(tmp_path):
+    run = await benchmark_backend(
+        "NanoVectorDBStorage:NetworkXStorage",
+        chunks=200,
+        queries=12,
+        modes=["hybrid", "naive"],
+        warmup=2,
+        working_dir=str(tmp_path),
+    )
+    assert run["failures"] == 0
+    assert run["corpus"]["chunks"] == 200 and run["corpus"]["entities"] == 50
+    assert set(run["modes"]) == {"hybrid", "naive"}
+
+    hybrid = run["modes"]["hybrid"]["stages_ms"]
+    assert set(hybrid) == set(STAGES)
+    for stage in STAGES:
+        assert hybrid[stage]["p50"] > 0, stage
+        assert hybrid[stage]["p50"] <= hybrid[stage]["p95"] <= hybrid[stage]["p99"]
+    naive = run["modes"]["naive"]["stages_ms"]
+    assert naive["vector_search"]["p50"] > 0 and naive["graph_expansion"]["p99"] == 0
+
+    # The corpus is kept in the working directory and reused
+    again = await benchmark_backend(
+        "NanoVectorDBStorage:NetworkXStorage",
+        chunks=200,
+        queries=4,
+        modes=["local"],
+        warmup=0,
+        working_dir=str(tmp_path),
+    )
+    assert again["corpus_reused"] and again["failures"] == 0
+    assert again["modes"]["local"]["stages_ms"]["graph_expansion"]["p50"] > 0
+
+    report = {"runs": [run]}
+    slower = copy.deepcopy(report)
+    slower["runs"][0]["modes"]["hybrid"]["stages_ms"]["rerank"]["p95"] += 50.0
+    assert compare_reports(report, report) == []
+    regressions = compare_reports(report, slower)
+    assert len(regressions) == 1 and "mode=hybrid rerank p95" in regressions[0]
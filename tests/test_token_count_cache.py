@@ -0,0 +1,66 @@
+# pytest tests/test_token_count_cache.py -v
+
+import json
+
+import pytest
+
+from lightrag.utils import (
+    Tokenizer,
+    chunk_token_count,
+    count_tokens,
+    truncate_list_by_token_size,
+)
+
+pytestmark = pytest.mark.offline
+
+
+class _CountingTokenizerImpl:
+    def __init__(self):
+        self.encode_calls = 0
+
+    def encode(self, content: str) -> list[int]:
+        self.encode_calls += 1
+        return [ord(ch) for ch in content]
+
+    def decode(self, tokens: list[int]) -> str:
+        return "".join(chr(t) for t in tokens)
+
+
+def test_count_tokens_is_memoized():
+    impl = _CountingTokenizerImpl()
+    tokenizer = Tokenizer("counting", impl)
+
+    assert tokenizer.count_tokens("hello world") == 11
+    assert tokenizer.count_tokens("hello world") == 11
+    assert impl.encode_calls == 1
+    assert tokenizer.count_tokens("") == 0
+
+    # Objects that only implement encode are still supported
+    assert count_tokens(impl, "abc") == 3
+
+
+def test_truncation_with_stored_chunk_tokens():
+    impl = _CountingTokenizerImpl()
+    tokenizer = Tokenizer("counting", impl)
+    chunks = [
+        {"content": "x" * 40, "tokens": 40, "chunk_id": f"c{i}"} for i in range(5)
+    ]
+    metadata_tokens = len(json.dumps({"chunk_id": "c0"}))
+
+    kept = truncate_list_by_token_size(
+        chunks,
+        key=lambda x: json.dumps(x),
+        max_token_size=3 * (40 + metadata_tokens),
+        tokenizer=tokenizer,
+        token_count=lambda x: chunk_token_count(x, tokenizer),
+    )
+    assert [c["chunk_id"] for c in kept] == ["c0", "c1", "c2"]
+    # Stored counts are used: only the metadata of the 4 inspected chunks is encoded
+    assert impl.encode_calls == 4
+
+    assert (
+        truncate_list_by_token_size(
+            chunks, key=json.dumps, max_token_size=0, tokenizer=tokenizer
+        )
+        == []
+    )
@@ -0,0 +1,70 @@
+# pytest tests/test_vector_reuse.py -v
+
+import numpy as np
+import pytest
+
+from lightrag.kg.nano_vector_db_impl import NanoVectorDBStorage
+from lightrag.kg.shared_storage import finalize_share_data, initialize_share_data
+from lightrag.utils import EmbeddingFunc
+
+pytestmark = pytest.mark.offline
+
+
+@pytest.fixture
+async def storage(tmp_path):
+    initialize_share_data()
+    embedded: list[str] = []
+
+    async def embed(texts):
+        embedded.extend(texts)
+        return np.array([[float(len(text)), 1.0, 0.5, 0.25] for text in texts])
+
+    vdb = NanoVectorDBStorage(
+        namespace="entities",
+        workspace="reuse",
+        global_config={
+            "working_dir": str(tmp_path),
+            "embedding_batch_num": 2,
+            "vector_db_storage_cls_kwargs": {"cosine_better_than_threshold": 0.2},
+        },
+        embedding_func=EmbeddingFunc(embedding_dim=4, func=embed),
+        meta_fields={"entity_name", "content"},
+    )
+    await vdb.initialize()
+    vdb.embedded = embedded
+    yield vdb
+    finalize_share_data()
+
+
+def _entity(name, description):
+    return {"entity_name": name, "content": f"{name}\n{description}"}
+
+
+@pytest.mark.asyncio
+async def test_unchanged_content_reuses_stored_vectors(storage):
+    await storage.upsert(
+        {
+            "ent-a": _entity("A", "first"),
+            "ent-b": _entity("B", "second"),
+            "ent-c": _entity("C", "third"),
+        }
+    )
+    assert len(storage.embedded) == 3
+    stored = await storage.get_vectors_by_ids(["ent-a", "ent-b", "ent-c"])
+
+    storage.embedded.clear()
+    await storage.upsert(
+        {
+            "ent-a": _entity("A", "first"),
+            "ent-b": _entity("B", "second, now longer"),
+            "ent-c": _entity("C", "third"),
+            "ent-d": _entity("D", "new"),
+        }
+    )
+    assert storage.embedded == ["B\nsecond, now longer", "D\nnew"]
+
+    vectors = await storage.get_vectors_by_ids(["ent-a", "ent-b", "ent-c", "ent-d"])
+    assert vectors["ent-a"] == stored["ent-a"]
+    assert vectors["ent-c"] == stored["ent-c"]
+    assert vectors["ent-b"][0] == pytest.approx(len("B\nsecond, now longer"))
+    assert (await storage.get_by_id("ent-b"))["content"] == "B\nsecond, now longer"